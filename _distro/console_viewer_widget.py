@@ -0,0 +1,334 @@
+import re
+import sys
+import time
+import threading
+from collections import deque
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QListView, QLineEdit, QComboBox, QCheckBox, QPushButton, QLabel, QFileDialog, QApplication, QAbstractItemView
+from PyQt6.QtGui import QColor, QFont, QKeySequence, QShortcut
+from PyQt6.QtCore import Qt, QAbstractListModel, QSortFilterProxyModel, QModelIndex, QTimer
+
+CONSOLE_CAPACITY = 20000
+MAX_LINE_CHARS = 2000
+LEVELS = ('DEBUG', 'INFO', 'SUCCESS', 'WARNING', 'ERROR')
+LEVEL_RANK = {level: rank for rank, level in enumerate(LEVELS)}
+LEVEL_TAGS = {'DEBUG': 'DEBUG', 'INFO': 'INFO', 'WARNING': 'WARNING', 'WARN': 'WARNING', 'ERROR': 'ERROR', 'CRITICAL': 'ERROR'}
+ANSI_COLOR_LEVELS = {'31': 'ERROR', '91': 'ERROR', '33': 'WARNING', '93': 'WARNING', '32': 'DEBUG', '92': 'DEBUG'}
+LEVEL_COLORS = {'DEBUG': '#8fbf8f', 'INFO': '#dddddd', 'SUCCESS': '#66ff66', 'WARNING': '#ffaa00', 'ERROR': '#ff6666'}
+ANSI_RE = re.compile('\x1b\\[([0-9;]*)m')
+TAG_RE = re.compile('\\[([A-Za-z][A-Za-z0-9_ -]{0,23})\\]')
+
+def classify_line(raw, stream='stdout'):
+    colors = ANSI_RE.findall(raw)
+    text = ANSI_RE.sub('', raw).rstrip()
+    level = None
+    stage = None
+    for tag in TAG_RE.findall(text):
+        upper = tag.upper()
+        if upper in LEVEL_TAGS:
+            level = level or LEVEL_TAGS[upper]
+        elif stage is None:
+            stage = upper
+    if level is None:
+        if stream == 'stderr':
+            level = 'ERROR'
+        elif '✓' in text:
+            level = 'SUCCESS'
+        else:
+            for code in colors:
+                level = ANSI_COLOR_LEVELS.get(code.split(';')[-1])
+                if level:
+                    break
+            level = level or 'INFO'
+    if len(text) > MAX_LINE_CHARS:
+        text = text[:MAX_LINE_CHARS] + '…'
+    return (level, stage, text)
+
+class ConsoleStream:
+
+    def __init__(self, capture, original, name):
+        self.capture = capture
+        self.original = original
+        self.name = name
+        self.pending = ''
+
+    def write(self, text):
+        if self.original is not None:
+            try:
+                self.original.write(text)
+            except (OSError, ValueError):
+                pass
+        if text:
+            self.capture.feed(self, text)
+        return len(text)
+
+    def flush(self):
+        if self.original is not None:
+            try:
+                self.original.flush()
+            except (OSError, ValueError):
+                pass
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, attr):
+        return getattr(self.original, attr)
+
+class ConsoleCapture:
+
+    def __init__(self, capacity=CONSOLE_CAPACITY, install=True):
+        self.records = deque(maxlen=capacity)
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.next_seq = 0
+        self.cleared = 0
+        self.stages = set()
+        self.stdout = ConsoleStream(self, sys.stdout, 'stdout')
+        self.stderr = ConsoleStream(self, sys.stderr, 'stderr')
+        if install:
+            sys.stdout = self.stdout
+            sys.stderr = self.stderr
+
+    def feed(self, stream, text):
+        with self.lock:
+            lines = (stream.pending + text).split('\n')
+            stream.pending = lines.pop()
+            if len(stream.pending) > MAX_LINE_CHARS:
+                lines.append(stream.pending)
+                stream.pending = ''
+            for raw in lines:
+                self._append(raw, stream.name)
+
+    def _append(self, raw, stream_name):
+        level, stage, text = classify_line(raw, stream_name)
+        if not text:
+            return
+        if stage:
+            self.stages.add(stage)
+        self.records.append((self.next_seq, time.time(), level, stage, text))
+        self.next_seq += 1
+
+    @property
+    def dropped(self):
+        return self.next_seq - len(self.records) - self.cleared
+
+    def since(self, seq):
+        with self.lock:
+            if not self.records or seq >= self.next_seq:
+                return []
+            count = min(self.next_seq - seq, len(self.records))
+            return [self.records[i] for i in range(len(self.records) - count, len(self.records))]
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+    def clear(self):
+        with self.lock:
+            self.cleared += len(self.records)
+            self.records.clear()
+
+    def get_text(self):
+        return '\n'.join((record[4] for record in self.snapshot()))
+
+    def restore(self):
+        if sys.stdout is self.stdout:
+            sys.stdout = self.stdout.original
+        if sys.stderr is self.stderr:
+            sys.stderr = self.stderr.original
+
+class ConsoleRecordModel(QAbstractListModel):
+    LevelRole = Qt.ItemDataRole.UserRole + 1
+    StageRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, capture, parent=None):
+        super().__init__(parent)
+        self.capture = capture
+        self.records = []
+        self.head = 0
+        self.last_seq = 0
+        self.colors = {level: QColor(color) for level, color in LEVEL_COLORS.items()}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records) - self.head
+
+    def record(self, row):
+        return self.records[self.head + row]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.rowCount():
+            return None
+        seq, stamp, level, stage, text = self.record(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{time.strftime('%H:%M:%S', time.localtime(stamp))}  {text}"
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.colors[level]
+        if role == self.LevelRole:
+            return level
+        if role == self.StageRole:
+            return stage
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f'#{seq} {level}' + (f' [{stage}]' if stage else '')
+        return None
+
+    def poll(self):
+        fresh = self.capture.since(self.last_seq)
+        if not fresh:
+            return 0
+        self.last_seq = fresh[-1][0] + 1
+        rows = self.rowCount()
+        overflow = rows + len(fresh) - self.capture.capacity
+        if overflow >= rows and rows:
+            self.beginResetModel()
+            self.records = fresh[-self.capture.capacity:]
+            self.head = 0
+            self.endResetModel()
+            return len(fresh)
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self.head += overflow
+            if self.head >= self.capture.capacity:
+                del self.records[:self.head]
+                self.head = 0
+            self.endRemoveRows()
+        start = self.rowCount()
+        self.beginInsertRows(QModelIndex(), start, start + len(fresh) - 1)
+        self.records.extend(fresh)
+        self.endInsertRows()
+        return len(fresh)
+
+    def clear(self):
+        self.beginResetModel()
+        self.records = []
+        self.head = 0
+        self.endResetModel()
+
+class ConsoleFilterModel(QSortFilterProxyModel):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_rank = 0
+        self.stage = None
+        self.needle = ''
+
+    def set_filters(self, min_level=None, stage=None, needle=None):
+        if min_level is not None:
+            self.min_rank = LEVEL_RANK[min_level]
+        if stage is not None:
+            self.stage = stage or None
+        if needle is not None:
+            self.needle = needle.lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, row, parent):
+        seq, stamp, level, stage, text = self.sourceModel().record(row)
+        if LEVEL_RANK[level] < self.min_rank:
+            return False
+        if self.stage and stage != self.stage:
+            return False
+        return not self.needle or self.needle in text.lower()
+
+class ConsoleViewerDialog(QDialog):
+
+    def __init__(self, capture, parent=None):
+        super().__init__(parent)
+        self.capture = capture
+        self.setWindowTitle('Console Output')
+        self.resize(1000, 600)
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel('Level:'))
+        self.level_combo = QComboBox()
+        self.level_combo.addItems(LEVELS)
+        self.level_combo.currentTextChanged.connect(lambda level: self.filter_model.set_filters(min_level=level))
+        controls.addWidget(self.level_combo)
+        controls.addWidget(QLabel('Stage:'))
+        self.stage_combo = QComboBox()
+        self.stage_combo.addItem('All stages', '')
+        self.stage_combo.currentIndexChanged.connect(lambda _: self.filter_model.set_filters(stage=self.stage_combo.currentData()))
+        controls.addWidget(self.stage_combo)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText('Filter text...')
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(lambda: self.filter_model.set_filters(needle=self.search_edit.text()))
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        controls.addWidget(self.search_edit, 1)
+        self.follow_checkbox = QCheckBox('Follow')
+        self.follow_checkbox.setChecked(True)
+        controls.addWidget(self.follow_checkbox)
+        layout.addLayout(controls)
+        self.source_model = ConsoleRecordModel(capture, self)
+        self.filter_model = ConsoleFilterModel(self)
+        self.filter_model.setSourceModel(self.source_model)
+        self.list_view = QListView()
+        self.list_view.setModel(self.filter_model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.list_view.setStyleSheet('QListView { background-color: #1e1e1e; }')
+        font = QFont('Consolas')
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPointSize(9)
+        self.list_view.setFont(font)
+        layout.addWidget(self.list_view, 1)
+        buttons = QHBoxLayout()
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
+        buttons.addWidget(self.status_label, 1)
+        btn_copy = QPushButton('Copy Selected')
+        btn_copy.clicked.connect(self.copy_selected)
+        buttons.addWidget(btn_copy)
+        btn_save = QPushButton('Save...')
+        btn_save.clicked.connect(self.save_log)
+        buttons.addWidget(btn_save)
+        btn_clear = QPushButton('Clear')
+        btn_clear.clicked.connect(self.clear_log)
+        buttons.addWidget(btn_clear)
+        btn_close = QPushButton('Close')
+        btn_close.clicked.connect(self.close)
+        buttons.addWidget(btn_close)
+        layout.addLayout(buttons)
+        QShortcut(QKeySequence.StandardKey.Copy, self.list_view, activated=self.copy_selected)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(200)
+        self.poll_timer.timeout.connect(self.refresh)
+        self.poll_timer.start()
+        self.refresh()
+
+    def refresh(self):
+        if self.source_model.poll():
+            for stage in sorted(self.capture.stages):
+                if self.stage_combo.findData(stage) < 0:
+                    self.stage_combo.addItem(stage, stage)
+            if self.follow_checkbox.isChecked():
+                self.list_view.scrollToBottom()
+        dropped = self.capture.dropped
+        self.status_label.setText(f'{self.filter_model.rowCount()} of {self.source_model.rowCount()} lines shown' + (f' ({dropped} older lines discarded, buffer holds {self.capture.capacity})' if dropped else ''))
+
+    def selected_text(self):
+        rows = sorted((index.row() for index in self.list_view.selectionModel().selectedIndexes()))
+        return '\n'.join((self.filter_model.index(row, 0).data() for row in rows))
+
+    def copy_selected(self):
+        text = self.selected_text()
+        if text:
+            QApplication.clipboard().setText(text)
+
+    def save_log(self):
+        path = QFileDialog.getSaveFileName(self, 'Save Console Output', 'console.log', 'Log files (*.log *.txt)')[0]
+        if not path:
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in range(self.filter_model.rowCount()):
+                f.write(self.filter_model.index(row, 0).data() + '\n')
+
+    def clear_log(self):
+        self.capture.clear()
+        self.source_model.clear()
+        self.refresh()
+
+    def closeEvent(self, event):
+        self.poll_timer.stop()
+        super().closeEvent(event)
@@ -1,25 +1,45 @@
-import argparse
 import shutil
 import os
 import sys
 import json
+import struct
 import subprocess
 import uuid
 import logging
 import atexit
 import glob
-import urllib.request
-import zipfile
+import bisect
+import heapq
+import hashlib
+import functools
+import importlib
 import tempfile
 import math
+import re
+import time
+import html
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from xml.dom.minidom import parseString, Document
 from xml.parsers.expat import ExpatError
-from PIL import Image, ImageOps
-import numpy as np
 import colorama
 from colorama import Fore, Style
-colorama.init(autoreset=True)
+
+class LazyModule:
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+Image = LazyModule('PIL.Image')
+ImageOps = LazyModule('PIL.ImageOps')
+np = LazyModule('numpy')
+minidom = LazyModule('xml.dom.minidom')
 
 def download_texconv(dest_dir=None):
     if dest_dir is None:
@@ -32,6 +52,7 @@ def download_texconv(dest_dir=None):
     print(Fore.GREEN + f'[DEBUG] Destination: {texconv_path}')
     try:
         print(Fore.YELLOW + '[TEXCONV] Downloading... (this may take a minute)')
+        import urllib.request
         urllib.request.urlretrieve(TEXCONV_URL, texconv_path)
         if os.path.exists(texconv_path):
             file_size = os.path.getsize(texconv_path) / 1024 / 1024
@@ -64,18 +85,27 @@ def find_texconv(prefs_path=None):
     print(Fore.YELLOW + '[INFO] Texconv will be needed for DDS conversion')
     print(Fore.YELLOW + '[INFO] You can download it from Preferences tab')
     return None
-TEXCONV_PATH = find_texconv()
-HAS_PYQT = True
-try:
-    from PyQt6.QtWidgets import QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QFileDialog, QComboBox, QMessageBox, QInputDialog, QToolTip, QTabWidget, QLineEdit, QRadioButton, QButtonGroup, QGroupBox, QMenu, QDialog, QCheckBox, QSpinBox, QSizePolicy
-    from PyQt6.QtGui import QPixmap, QImage, QColor, QPalette, QCursor, QPainter, QPen, QAction
-    from PyQt6.QtCore import Qt, QEvent, QTimer
-    from console_viewer_widget import ConsoleCapture, ConsoleViewerDialog
-except ImportError:
-    HAS_PYQT = False
+TEXCONV_PATH = None
+_texconv_resolved = False
+
+def get_texconv_path():
+    global TEXCONV_PATH, _texconv_resolved
+    if not _texconv_resolved:
+        TEXCONV_PATH = find_texconv()
+        _texconv_resolved = True
+    return TEXCONV_PATH
+
+def set_texconv_path(path):
+    global TEXCONV_PATH, _texconv_resolved
+    TEXCONV_PATH = path
+    _texconv_resolved = True
+    return path
 VERSION = '1.8.0'
 TEMP_DIR = os.path.abspath('temp')
-os.makedirs(TEMP_DIR, exist_ok=True)
+
+def ensure_temp_dir():
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    return TEMP_DIR
 CONSOLE_CAPTURE = None
 EXPORT_ORDER_ITEMS = [{'folder': 'AssetsLowRes\\ControllerUIIcons\\items_png', 'size': 72}, {'folder': 'Assets\\ControllerUIIcons\\items_png', 'size': 144}, {'folder': 'AssetsLowRes\\Tooltips\\ItemIcons', 'size': 192}, {'folder': 'Assets\\Tooltips\\ItemIcons', 'size': 380}]
 EXPORT_ORDER_SKILLS = [{'folder': 'AssetsLowRes\\ControllerUIIcons\\skills_png', 'size': 72}, {'folder': 'Assets\\ControllerUIIcons\\skills_png', 'size': 144}, {'folder': 'AssetsLowRes\\Tooltips\\SkillIcons', 'size': 192}, {'folder': 'Assets\\Tooltips\\SkillIcons', 'size': 380}]
@@ -120,16 +150,25 @@ def cleanup_old_logs(log_dir=None, max_files=10):
         return
     log_pattern = os.path.join(log_dir, 'icon_manager_*.log')
     log_files = glob.glob(log_pattern)
-    if len(log_files) <= max_files:
-        return
     log_files.sort(key=os.path.getmtime)
-    files_to_delete = log_files[:-max_files]
+    files_to_delete = log_files[:-max_files] if len(log_files) > max_files else []
     for old_log in files_to_delete:
         try:
             os.remove(old_log)
             print(Fore.YELLOW + f'[LOGGING] Cleaned up old log: {os.path.basename(old_log)}')
         except Exception as e:
             print(Fore.RED + f'[LOGGING] Failed to delete old log {old_log}: {e}')
+    kept = {os.path.splitext(os.path.basename(path))[0] for path in log_files if path not in files_to_delete}
+    if _log_file_path:
+        kept.add(os.path.splitext(os.path.basename(_log_file_path))[0])
+    for pattern in PROFILE_FILE_PATTERNS:
+        for old_profile in glob.glob(os.path.join(log_dir, pattern)):
+            if os.path.basename(old_profile).split('.', 1)[0] in kept:
+                continue
+            try:
+                os.remove(old_profile)
+            except OSError as e:
+                print(Fore.RED + f'[LOGGING] Failed to delete old profile {old_profile}: {e}')
 
 def cleanup_logging():
     global _log_file_handler, _log_file_path
@@ -140,6 +179,108 @@ def cleanup_logging():
         logging.shutdown()
         print(Fore.GREEN + f'[LOGGING] Session log saved: {_log_file_path}')
 
+PROFILING = False
+PROFILE_DIR = None
+PROFILE_TOP_ALLOCATIONS = 25
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_TRACE_FRAMES = 1
+PROFILE_FILE_PATTERNS = ('icon_manager_*.pstats', 'icon_manager_*.alloc.txt')
+_profile_lock = threading.Lock()
+_profile_sequence = 0
+
+def configure_profiling(enabled=True, directory=None):
+    global PROFILING, PROFILE_DIR
+    PROFILING = bool(enabled)
+    PROFILE_DIR = directory
+    if PROFILING:
+        print(Fore.CYAN + f'[PROFILE] Profiling operations with cProfile + tracemalloc into {profile_output_dir()}')
+    return PROFILING
+
+def profile_output_dir():
+    if _log_file_path:
+        return os.path.dirname(_log_file_path)
+    return PROFILE_DIR or os.path.join(os.path.dirname(__file__), 'logs')
+
+def profile_session_stem():
+    if _log_file_path:
+        return os.path.splitext(os.path.basename(_log_file_path))[0]
+    return f"icon_manager_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+def write_profile_report(name, profiler, snapshot, elapsed, peak, current):
+    import io
+    import pstats
+    import tracemalloc
+    global _profile_sequence
+    _profile_sequence += 1
+    folder = profile_output_dir()
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, f'{profile_session_stem()}.{_profile_sequence:03d}_{name}')
+    profiler.dump_stats(base + '.pstats')
+    stats_text = io.StringIO()
+    pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap>'), tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')))
+    with open(base + '.alloc.txt', 'w', encoding='utf-8') as f:
+        f.write(f'Operation: {name}\nWall time: {elapsed:.3f}s\nPeak traced memory: {peak / 1048576:.1f} MB\nStill allocated at end: {current / 1048576:.1f} MB\n\n')
+        f.write(f'Top {PROFILE_TOP_ALLOCATIONS} allocation sites still alive at the end of the operation:\n')
+        for stat in snapshot.statistics('lineno')[:PROFILE_TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            f.write(f'{stat.size / 1024:10.1f} KiB {stat.count:8d} block(s)  {frame.filename}:{frame.lineno}\n')
+        f.write(f'\nTop {PROFILE_TOP_FUNCTIONS} functions by cumulative time (full data in {os.path.basename(base)}.pstats):\n')
+        f.write(stats_text.getvalue())
+    return base
+
+class profile_operation:
+
+    def __init__(self, name):
+        self.name = name
+        self.profiler = None
+
+    def __enter__(self):
+        if not PROFILING or not _profile_lock.acquire(blocking=False):
+            return self
+        import cProfile
+        import tracemalloc
+        self.own_tracing = not tracemalloc.is_tracing()
+        if self.own_tracing:
+            tracemalloc.start(PROFILE_TRACE_FRAMES)
+        tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is None:
+            return False
+        import tracemalloc
+        self.profiler.disable()
+        elapsed = time.perf_counter() - self.started
+        try:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if self.own_tracing:
+                tracemalloc.stop()
+            base = write_profile_report(self.name, self.profiler, snapshot, elapsed, peak, current)
+            print(Fore.CYAN + f'[PROFILE] {self.name}: {elapsed:.2f}s, peak {peak / 1048576:.1f} MB -> {base}.pstats / .alloc.txt')
+            logging.info(f'[PROFILE] {self.name}: {elapsed:.2f}s, peak {peak / 1048576:.1f} MB -> {base}.pstats')
+        except Exception as e:
+            print(Fore.RED + f'[PROFILE] Could not write the {self.name} profile: {e}')
+        finally:
+            self.profiler = None
+            _profile_lock.release()
+        return False
+
+def profiled(name):
+
+    def decorate(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_operation(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
 def log_print(message, level='DEBUG', color=Fore.GREEN):
     print(color + message)
     if _logging_enabled:
@@ -160,7 +301,9 @@ def log_print(message, level='DEBUG', color=Fore.GREEN):
 DEFAULT_BG3_PATHS = ['C:\\SteamLibrary\\steamapps\\common\\Baldurs Gate 3\\Data', '/home/deck/.steam/steam/steamapps/common/Baldurs Gate 3/Data', '~/Library/Application Support/Steam/steamapps/common/Baldurs Gate 3/Data']
 STRINGS_EN = {'window_title': f'BG3 Icon Tool v{VERSION}', 'load_atlas': 'Load .lsx Atlas', 'replace_icon': 'Replace Selected Icon', 'add_icon': 'Add New Icon', 'save_atlas': 'Save Updated Atlas', 'resize_item': 'Resize Item PNG to Smaller Sizes', 'resize_skill': 'Resize Skill PNG to Smaller Sizes', 'select_png_replace': 'Select PNG to Replace', 'select_png_add': 'Select PNG to Add', 'mapkey_prompt': 'Enter MapKey for new icon:', 'error_load': 'Load atlas first.', 'error_no_slots': 'No free slots.', 'success_replace': 'Replaced {key}', 'success_add': 'Added {key}', 'success_save': 'Saved to {lsx} and {dds}', 'success_resize': 'Resized {type} DDS files saved to specified folders.', 'select_item_png': 'Select Item PNG to Resize', 'select_skill_png': 'Select Skill PNG to Resize', 'select_dest_dir': 'Select Destination Directory'}
 
-def resize_with_alpha(im, size, resample=Image.BICUBIC):
+def resize_with_alpha(im, size, resample=None):
+    if resample is None:
+        resample = Image.BICUBIC
     if im.mode != 'RGBA':
         return im.resize(size, resample)
     original_width, original_height = im.size
@@ -177,258 +320,2409 @@ def resize_with_alpha(im, size, resample=Image.BICUBIC):
         print(Fore.GREEN + f'[RESIZE] Single-stage: {original_width}x{original_height} → {target_width}x{target_height}')
         return im.resize(size, resample)
 
-def apply_alpha_dither(im, strength=0.5):
+def apply_alpha_dither(im, strength=0.5, seed=0):
     if im.mode != 'RGBA':
         return im
     img_array = np.array(im, dtype=np.float32)
     alpha = img_array[:, :, 3]
-    noise = np.random.uniform(-strength, strength, alpha.shape)
+    noise = np.random.default_rng(seed).uniform(-strength, strength, alpha.shape)
     alpha_dithered = np.clip(alpha + noise, 0, 255)
     img_array[:, :, 3] = alpha_dithered
     return Image.fromarray(img_array.astype(np.uint8), 'RGBA')
 
-def main():
-    global CONSOLE_CAPTURE
-    if HAS_PYQT:
-        try:
-            CONSOLE_CAPTURE = ConsoleCapture()
-            print(Fore.CYAN + '=' * 60)
-            print(Fore.CYAN + 'BG3 Icon Manager v6.1 - Console Capture Active')
-            print(Fore.CYAN + "Click 'Show Console' button to view logs")
-            print(Fore.CYAN + '=' * 60)
-        except Exception as e:
-            print(Fore.YELLOW + f'[WARNING] Console capture initialization failed: {e}')
-            print(Fore.YELLOW + '[INFO] Console viewer will not be available')
-    prefs_file = os.path.join(os.path.dirname(__file__), 'preferences.json')
-    if os.path.exists(prefs_file):
-        with open(prefs_file, 'r', encoding='utf-8') as f:
-            prefs = json.load(f)
-    else:
-        prefs = {}
-    log_enabled = prefs.get('log_enabled', True)
-    log_directory = prefs.get('log_directory', os.path.join(os.path.dirname(__file__), 'logs'))
-    log_level = prefs.get('log_level', 'DEBUG')
-    max_log_files = prefs.get('max_log_files', 10)
-    setup_logging(log_dir=log_directory, log_level=log_level, enabled=log_enabled)
-    atexit.register(cleanup_logging)
-    if log_enabled:
-        cleanup_old_logs(log_dir=log_directory, max_files=max_log_files)
-    if not HAS_PYQT:
-        print(Fore.RED + 'PyQt6 not installed. Exiting.')
-        sys.exit(1)
-    app = QApplication(sys.argv)
-    app.setStyle('Fusion')
-    palette = QPalette()
-    palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.Base, QColor(35, 35, 35))
-    palette.setColor(QPalette.ColorRole.AlternateBase, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.ToolTipBase, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.ToolTipText, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.Button, QColor(53, 53, 53))
-    palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.white)
-    palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red)
-    palette.setColor(QPalette.ColorRole.Link, QColor(42, 130, 218))
-    palette.setColor(QPalette.ColorRole.Highlight, QColor(42, 130, 218))
-    palette.setColor(QPalette.ColorRole.HighlightedText, Qt.GlobalColor.black)
-    app.setPalette(palette)
-    window = GuiWindow()
-    window.show()
-    sys.exit(app.exec())
-
-def resize_png(png_path, skill_mode=False, dest_dir='', output_name=None):
-    print(Fore.CYAN + f'\n=== RESIZE PNG OPERATION START ===')
-    print(Fore.GREEN + f'[DEBUG] Input PNG: {png_path}')
-    print(Fore.GREEN + f'[DEBUG] Skill Mode: {skill_mode}')
-    print(Fore.GREEN + f'[DEBUG] Destination Directory: {dest_dir}')
-    print(Fore.GREEN + f"[DEBUG] Output Name Override: {(output_name if output_name else '(auto-detect)')}")
-    im = Image.open(png_path)
-    width, height = im.size
-    print(Fore.GREEN + f'[DEBUG] Image dimensions: {width}x{height}')
-    if width != height:
-        print(Fore.YELLOW + f'[WARNING] Skipping non-square image: {png_path}')
-        return
-    if output_name:
-        base_name = output_name
-        print(Fore.GREEN + f'✓ Base name from override: {base_name}')
-    else:
-        base_name = os.path.basename(png_path).rsplit('.', 1)[0]
-        print(Fore.GREEN + f'✓ Base name auto-extracted from filename: {base_name}')
-        print(Fore.CYAN + f'[INFO] This will be used as the icon name (no manual input required)')
-    if skill_mode:
-        base_name += '_skill'
-        print(Fore.GREEN + f'[DEBUG] Skill mode suffix added: {base_name}')
-    export_order = EXPORT_ORDER_SKILLS if skill_mode else EXPORT_ORDER_ITEMS
-    print(Fore.GREEN + f"[DEBUG] Export order selected: {('SKILLS' if skill_mode else 'ITEMS')} ({len(export_order)} sizes)")
-    temp_png = os.path.join(TEMP_DIR, f'{base_name}_temp.png')
-    print(Fore.GREEN + f'[DEBUG] Temporary PNG path: {temp_png}')
-    for idx, exp in enumerate(export_order):
-        folder = exp['folder']
-        size = exp['size']
-        print(Fore.CYAN + f'[STEP {idx + 1}/{len(export_order)}] Processing size {size}x{size} for folder: {folder}')
-        full_folder = os.path.join(dest_dir, folder)
-        print(Fore.GREEN + f'[DEBUG] Full folder path: {full_folder}')
-        os.makedirs(full_folder, exist_ok=True)
-        print(Fore.GREEN + f'[DEBUG] Directory created/verified')
-        resized = resize_with_alpha(im, (size, size), Image.BICUBIC)
-        print(Fore.GREEN + f'[DEBUG] Image resized to {size}x{size} with alpha preservation')
-        resized.save(temp_png, 'PNG')
-        print(Fore.GREEN + f'[DEBUG] Temporary PNG saved')
-        out_path = os.path.join(full_folder, f'{base_name}.dds')
-        print(Fore.GREEN + f'[DEBUG] Converting to DDS: {out_path}')
-        png_to_dds(temp_png, out_path, format='BC7_UNORM', mipmaps=1)
-        print(Fore.GREEN + f'✓ Saved resized DDS to {out_path}')
-    if os.path.exists(temp_png):
-        os.remove(temp_png)
-        print(Fore.GREEN + f'[DEBUG] Cleaned up temporary PNG')
-    print(Fore.GREEN + f'=== RESIZE PNG OPERATION COMPLETE ===\n')
+MIP_MIN_TILE = 4
 
-def dds_to_png(dds_path, png_path):
-    print(Fore.CYAN + f'\n--- DDS to PNG Conversion Start ---')
-    print(Fore.GREEN + f'[DEBUG] Input DDS: {dds_path}')
-    print(Fore.GREEN + f'[DEBUG] Output PNG: {png_path}')
-    print(Fore.GREEN + f'[DEBUG] DDS file exists: {os.path.exists(dds_path)}')
+def mip_level_count(width, height, tile_size=None, min_tile=MIP_MIN_TILE):
+    size = min(tile_size or min(width, height), width, height)
+    levels = 1
+    while size // 2 >= min_tile:
+        size //= 2
+        levels += 1
+    return levels
+
+def tile_grid(arr, tile_size):
+    height, width = arr.shape[:2]
+    if tile_size and height % tile_size == 0 and width % tile_size == 0:
+        return (height // tile_size, tile_size, width // tile_size, tile_size)
+    return (1, height, 1, width)
+
+def tile_alpha_coverage(alpha, grid, alpha_ref, scale=None):
+    tiles = alpha.reshape(grid)
+    if scale is not None:
+        tiles = tiles * scale[:, None, :, None]
+    return (tiles >= alpha_ref).mean(axis=(1, 3))
+
+def fill_transparent_texels(arr, grid):
+    tiles = arr.reshape(grid + (4,))
+    alpha = tiles[..., 3]
+    weight = alpha.sum(axis=(1, 3))
+    color = np.einsum('abcdk,abcd->ack', tiles[..., :3], alpha) / np.maximum(weight, 1e-06)[..., None]
+    np.copyto(tiles[..., :3], color[:, None, :, None, :], where=(alpha <= 0)[..., None])
+
+def downsample_premultiplied(arr):
+    height, width = arr.shape[0] // 2 * 2, arr.shape[1] // 2 * 2
+    src = arr[:height, :width]
+    premultiplied = src * src[..., 3:4]
+    premultiplied[..., 3] = src[..., 3]
+    out = premultiplied[0::2, 0::2] + premultiplied[1::2, 0::2]
+    out += premultiplied[0::2, 1::2]
+    out += premultiplied[1::2, 1::2]
+    out *= 0.25
+    np.divide(out[..., :3], out[..., 3:4], out=out[..., :3], where=out[..., 3:4] > 0)
+    return out
+
+def float_to_rgba8(arr):
+    scaled = arr * 255.0
+    np.rint(scaled, out=scaled)
+    return Image.fromarray(scaled.astype(np.uint8), 'RGBA')
+
+def build_mip_chain(im, tile_size=None, levels=None, alpha_ref=0.5, gutter=1):
+    arr = np.asarray(im.convert('RGBA'), dtype=np.float32)
+    arr /= 255.0
+    height, width = arr.shape[:2]
+    if levels is None:
+        levels = mip_level_count(width, height, tile_size)
+    grid = tile_grid(arr, tile_size)
+    coverage = tile_alpha_coverage(arr[..., 3], grid, alpha_ref)
+    tiles = arr[..., 3].reshape(grid)
+    clear_border = None
+    if gutter:
+        clear_border = (tiles[:, :gutter].max(axis=(1, 3)) <= 0) & (tiles[:, -gutter:].max(axis=(1, 3)) <= 0) & (tiles[:, :, :, :gutter].max(axis=(1, 3)) <= 0) & (tiles[:, :, :, -gutter:].max(axis=(1, 3)) <= 0)
+    fill_transparent_texels(arr, grid)
+    chain = [arr]
+    print(Fore.GREEN + f'[MIPS] Building {levels} level(s) for {width}x{height} ({grid[0] * grid[2]} tile(s), alpha ref {alpha_ref})')
+    for _ in range(1, levels):
+        arr = downsample_premultiplied(arr)
+        grid = (grid[0], arr.shape[0] // grid[0], grid[2], arr.shape[1] // grid[2])
+        alpha = arr[..., 3]
+        current = tile_alpha_coverage(alpha, grid, alpha_ref)
+        grow = current < coverage - 0.5 / (grid[1] * grid[3])
+        shrink = current > coverage + 0.5 / (grid[1] * grid[3])
+        lo = np.where(grow, 1.0, 0.0).astype(np.float32)
+        hi = np.where(grow, 4.0, 1.0).astype(np.float32)
+        for _ in range(12):
+            mid = (lo + hi) / 2
+            mid_coverage = tile_alpha_coverage(alpha, grid, alpha_ref, mid)
+            below = np.where(grow, mid_coverage < coverage, mid_coverage <= coverage)
+            lo = np.where(below, mid, lo)
+            hi = np.where(below, hi, mid)
+        lo_error = np.abs(tile_alpha_coverage(alpha, grid, alpha_ref, lo) - coverage)
+        hi_error = np.abs(tile_alpha_coverage(alpha, grid, alpha_ref, hi) - coverage)
+        scale = np.where(grow | shrink, np.where(lo_error < hi_error, lo, hi), 1.0).astype(np.float32)
+        tiles = alpha.reshape(grid)
+        tiles *= scale[:, None, :, None]
+        np.clip(tiles, 0.0, 1.0, out=tiles)
+        if clear_border is not None and min(grid[1], grid[3]) >= 8 * gutter:
+            ring = np.zeros((grid[1], grid[3]), dtype=bool)
+            ring[:gutter, :] = ring[-gutter:, :] = True
+            ring[:, :gutter] = ring[:, -gutter:] = True
+            tiles[clear_border[:, None, :, None] & ring[None, :, None, :]] = 0.0
+        fill_transparent_texels(arr, grid)
+        chain.append(arr)
+    return [float_to_rgba8(level) for level in chain]
+
+def write_rgba_dds(levels, dds_path):
+    width, height = levels[0].size
+    flags = 1 | 2 | 4 | 8 | 4096 | 131072
+    caps = 4096 | (8 | 4194304 if len(levels) > 1 else 0)
+    header = struct.pack('<4s7I11I', b'DDS ', 124, flags, height, width, width * 4, 0, len(levels), *[0] * 11)
+    header += struct.pack('<8I', 32, 65, 0, 32, 16711680, 65280, 255, 4278190080)
+    header += struct.pack('<5I', caps, 0, 0, 0, 0)
+    with open(dds_path, 'wb') as f:
+        f.write(header)
+        for level in levels:
+            f.write(np.asarray(level.convert('RGBA'))[..., [2, 1, 0, 3]].tobytes())
+
+def write_dds_with_mips(im, dds_path, format='BC3_UNORM', tile_size=None, mipmaps=True):
+    if mipmaps and (not get_texconv_path()):
+        print(Fore.YELLOW + '[MIPS] texconv not found - skipping the mip chain, the Pillow fallback writes the top level only')
+        mipmaps = False
+    levels = build_mip_chain(im, tile_size) if mipmaps else [im.convert('RGBA')]
+    base_name = f'{os.path.splitext(os.path.basename(dds_path))[0]}_{uuid.uuid4().hex[:8]}'
+    if len(levels) == 1:
+        temp_src = os.path.join(ensure_temp_dir(), f'{base_name}.png')
+        levels[0].save(temp_src, 'PNG')
+    else:
+        temp_src = os.path.join(ensure_temp_dir(), f'{base_name}.dds')
+        write_rgba_dds(levels, temp_src)
     try:
-        output_dir = os.path.normpath(os.path.dirname(png_path))
-        input_dds = os.path.normpath(dds_path)
-        cmd = [TEXCONV_PATH, '-ft', 'PNG', '-o', output_dir, '-y', input_dds]
-        print(Fore.CYAN + f"[TEXCONV] Running command: {' '.join(cmd)}")
-        print(Fore.GREEN + f'[DEBUG] Output directory: {output_dir}')
-        subprocess.check_call(cmd)
-        print(Fore.GREEN + f'[DEBUG] texconv completed successfully')
-        output_file = os.path.join(os.path.dirname(png_path), os.path.basename(dds_path).replace('.dds', '.PNG').replace('.DDS', '.PNG'))
-        print(Fore.GREEN + f'[DEBUG] Expected texconv output: {output_file}')
-        print(Fore.GREEN + f'[DEBUG] Output file exists: {os.path.exists(output_file)}')
-        if os.path.exists(png_path):
-            print(Fore.GREEN + f'[DEBUG] Removing existing PNG at destination')
-            os.remove(png_path)
-        if os.path.exists(output_file):
-            print(Fore.GREEN + f'[DEBUG] Renaming {output_file} to {png_path}')
-            os.rename(output_file, png_path)
-        print(Fore.GREEN + f'✓ Converted DDS to PNG: {dds_path} -> {png_path}')
-    except FileNotFoundError:
-        print(Fore.RED + "[ERROR] texconv.exe not found. Ensure it's downloaded and in PATH/script dir.")
-        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion (basic support)')
+        png_to_dds(temp_src, dds_path, format=format, mipmaps=len(levels))
+    finally:
+        if os.path.exists(temp_src):
+            os.remove(temp_src)
+
+PILLOW_DDS_FORMATS = {'BC1_UNORM': 'DXT1', 'BC3_UNORM': 'DXT5'}
+DDS_FORMAT_RE = re.compile('^[A-Z][A-Z0-9_]*$')
+RESAMPLE_FILTERS = {'nearest': 'NEAREST', 'box': 'BOX', 'bilinear': 'BILINEAR', 'hamming': 'HAMMING', 'bicubic': 'BICUBIC', 'lanczos': 'LANCZOS'}
+EXPORT_PROFILE_DEFAULTS = {'format': 'BC7_UNORM', 'alpha_format': 'BC7_UNORM', 'mipmaps': True, 'resample': 'bicubic', 'suffix': ''}
+BUILTIN_EXPORT_PROFILES = {'items': {'tiers': EXPORT_ORDER_ITEMS}, 'skills': {'tiers': EXPORT_ORDER_SKILLS, 'suffix': '_skill'}}
+EXPORT_PROFILES = {}
+ATLAS_FORMAT = 'BC3_UNORM'
+
+def check_dds_format(name, format, allow_auto=True):
+    if not (allow_auto and format == 'auto') and (not isinstance(format, str) or not DDS_FORMAT_RE.match(format)):
+        hint = " or 'auto'" if allow_auto else ''
+        raise ValueError(f'{name}: format {format!r} is not a DXGI format name{hint}')
+    return format
+
+def normalize_export_profile(name, data):
+    profile = dict(EXPORT_PROFILE_DEFAULTS)
+    profile.update({key: value for key, value in data.items() if key != 'tiers'})
+    profile['name'] = name
+    tiers = []
+    for tier in data.get('tiers') or []:
+        tier = dict(tier)
+        for key in ('format', 'alpha_format', 'mipmaps', 'resample'):
+            tier.setdefault(key, profile[key])
+        if not tier.get('folder') or not isinstance(tier.get('size'), int) or tier['size'] <= 0:
+            raise ValueError(f'{name}: every tier needs a folder and a positive integer size')
+        check_dds_format(name, tier['format'])
+        check_dds_format(name, tier['alpha_format'], allow_auto=False)
+        if tier['resample'] not in RESAMPLE_FILTERS:
+            raise ValueError(f"{name}: unknown resampler {tier['resample']!r} (use {', '.join(RESAMPLE_FILTERS)})")
+        tiers.append(tier)
+    if not tiers:
+        raise ValueError(f'{name}: profile has no tiers')
+    profile['tiers'] = tiers
+    return profile
+
+def configure_export_profiles(profiles=None, atlas_format=None):
+    global ATLAS_FORMAT
+    EXPORT_PROFILES.clear()
+    for name, data in list(BUILTIN_EXPORT_PROFILES.items()) + list((profiles or {}).items()):
         try:
-            im = Image.open(dds_path)
-            print(Fore.GREEN + f'[DEBUG] PIL opened DDS successfully')
-            im.save(png_path, 'PNG')
-            print(Fore.GREEN + f'✓ Pillow fallback conversion successful')
-        except Exception as pil_e:
-            print(Fore.RED + f'[ERROR] Pillow conversion failed: {pil_e}')
-    except subprocess.CalledProcessError as e:
-        print(Fore.RED + f'[ERROR] Texconv DDS to PNG failed with error code {e.returncode}')
-        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion')
+            EXPORT_PROFILES[name] = normalize_export_profile(name, data)
+        except (ValueError, TypeError, AttributeError) as e:
+            print(Fore.YELLOW + f'[PROFILES] Ignoring export profile: {e}')
+    try:
+        ATLAS_FORMAT = check_dds_format('atlas_format', atlas_format or 'BC3_UNORM')
+    except ValueError as e:
+        print(Fore.YELLOW + f'[PROFILES] {e} - using BC3_UNORM')
+        ATLAS_FORMAT = 'BC3_UNORM'
+    return EXPORT_PROFILES
+
+def get_export_profile(profile=None, skill_mode=False):
+    if isinstance(profile, dict):
+        return profile
+    if not EXPORT_PROFILES:
+        configure_export_profiles()
+    name = profile or ('skills' if skill_mode else 'items')
+    if name not in EXPORT_PROFILES:
+        raise ValueError(f"unknown export profile {name!r} (known: {', '.join(sorted(EXPORT_PROFILES))})")
+    return EXPORT_PROFILES[name]
+
+def alpha_tile_analysis(im, tile_size=None):
+    alpha = np.asarray(im.convert('RGBA').getchannel('A'))
+    tiles = alpha.reshape(tile_grid(alpha, tile_size))
+    lowest = tiles.min(axis=(1, 3))
+    empty = tiles.max(axis=(1, 3)) == 0
+    opaque = lowest == 255
+    return {'tiles': int(lowest.size), 'opaque': int(opaque.sum()), 'alpha': int((~opaque & ~empty).sum()), 'empty': int(empty.sum())}
+
+def select_dds_format(im, format, alpha_format='BC7_UNORM', tile_size=None):
+    if format != 'auto':
+        return format
+    stats = alpha_tile_analysis(im, tile_size)
+    chosen = 'BC1_UNORM' if stats['opaque'] and (not stats['alpha']) else alpha_format
+    print(Fore.GREEN + f"[FORMAT] auto -> {chosen} ({stats['opaque']} opaque, {stats['alpha']} translucent, {stats['empty']} empty tile(s))")
+    return chosen
+
+BUILD_CACHE_SCHEMA = 1
+BUILD_CACHE_KEY_RE = re.compile('^[0-9a-f]{64}$')
+BUILD_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+BUILD_CACHE_PRUNE_RATIO = 0.9
+BUILD_CACHE = None
+
+class BuildCache:
+
+    def __init__(self, cache_dir, remote_url=None, timeout=5.0, max_bytes=BUILD_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.remote_url = remote_url.rstrip('/') if remote_url else None
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.local_bytes = None
+        self.remote_ok = True
+        self.stats = {'local_hits': 0, 'remote_hits': 0, 'misses': 0, 'uploads': 0, 'evictions': 0}
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def get(self, key):
+        path = self.path_for(key)
         try:
-            im = Image.open(dds_path)
-            print(Fore.GREEN + f'[DEBUG] PIL opened DDS successfully')
-            im.save(png_path, 'PNG')
-            print(Fore.GREEN + f'✓ Fallback converted DDS to PNG: {dds_path} -> {png_path}')
-        except Exception as fallback_e:
-            print(Fore.RED + f'[ERROR] PIL fallback also failed: {fallback_e}')
-    print(Fore.CYAN + f'--- DDS to PNG Conversion End ---\n')
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            self._count('local_hits')
+            return data
+        except OSError:
+            pass
+        data = self._remote_get(key)
+        if data is None:
+            self._count('misses')
+            return None
+        self._write_local(key, data)
+        self._count('remote_hits')
+        return data
 
-def png_to_dds(png_path, dds_path, format='BC3_UNORM', mipmaps=None):
-    print(Fore.CYAN + f'\n--- PNG to DDS Conversion Start ---')
-    print(Fore.GREEN + f'[DEBUG] Input PNG: {png_path}')
-    print(Fore.GREEN + f'[DEBUG] Output DDS: {dds_path}')
-    print(Fore.GREEN + f'[DEBUG] PNG file exists: {os.path.exists(png_path)}')
-    try:
-        with Image.open(png_path) as img:
-            width, height = img.size
-        if mipmaps is None:
-            max_dimension = max(width, height)
-            mipmaps = math.floor(math.log2(max_dimension)) + 1
-        print(Fore.GREEN + f'[DEBUG] Image dimensions: {width}x{height}')
-        print(Fore.GREEN + f'[DEBUG] Mipmap levels: {mipmaps}')
-        output_dir = os.path.normpath(os.path.dirname(dds_path))
-        input_png = os.path.normpath(png_path)
-        format_label = 'BC3_UNORM (DXT5)' if format == 'BC3_UNORM' else f'{format}'
-        cmd = [TEXCONV_PATH, '-f', format, '-m', str(mipmaps), '-o', output_dir, '-y', input_png]
-        print(Fore.CYAN + f"[TEXCONV] Running command: {' '.join(cmd)}")
-        print(Fore.GREEN + f'[DEBUG] Output directory: {output_dir}')
-        print(Fore.GREEN + f'[DEBUG] Compression format: {format_label}')
-        print(Fore.GREEN + f'[DEBUG] Mipmap levels: {mipmaps}')
-        subprocess.check_call(cmd)
-        print(Fore.GREEN + f'[DEBUG] texconv completed successfully')
-        output_dir = os.path.dirname(dds_path)
-        base_name = os.path.basename(png_path).lower().replace('.png', '')
-        possible_outputs = [os.path.join(output_dir, base_name + '.DDS'), os.path.join(output_dir, base_name + '.dds'), os.path.join(output_dir, os.path.basename(png_path).replace('.png', '.DDS')), os.path.join(output_dir, os.path.basename(png_path).replace('.png', '.dds')), os.path.join(output_dir, os.path.basename(png_path).replace('.PNG', '.DDS')), os.path.join(output_dir, os.path.basename(png_path).replace('.PNG', '.dds'))]
-        output_file = None
-        for candidate in possible_outputs:
-            if os.path.exists(candidate):
-                output_file = candidate
-                print(Fore.GREEN + f'[DEBUG] Found texconv output: {output_file}')
+    def put(self, key, data):
+        self._write_local(key, data)
+        if self._remote_put(key, data):
+            self._count('uploads')
+
+    def _write_local(self, key, data):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with self.lock:
+            if self.local_bytes is None:
+                self.local_bytes = sum((size for _, size, _ in self._local_entries()))
+            else:
+                self.local_bytes += len(data)
+            if self.max_bytes and self.local_bytes > self.max_bytes:
+                self._prune(keep=path)
+
+    def _local_entries(self):
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if BUILD_CACHE_KEY_RE.match(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _prune(self, keep=None):
+        entries = sorted(self._local_entries())
+        total = sum((size for _, size, _ in entries))
+        target = self.max_bytes * BUILD_CACHE_PRUNE_RATIO
+        for _, size, path in entries:
+            if total <= target:
                 break
-        if not output_file:
-            print(Fore.RED + f'[ERROR] Could not find texconv output! Checked:')
-            for candidate in possible_outputs[:3]:
-                print(Fore.RED + f'  - {candidate}')
-            raise FileNotFoundError(f'Texconv output not found in {output_dir}')
-        if os.path.exists(dds_path) and output_file != dds_path:
-            print(Fore.GREEN + f'[DEBUG] Removing existing DDS at destination')
-            os.remove(dds_path)
-        if output_file != dds_path:
-            print(Fore.GREEN + f'[DEBUG] Renaming {output_file} to {dds_path}')
-            os.rename(output_file, dds_path)
-        print(Fore.GREEN + f'✓ Converted PNG to DDS: {png_path} -> {dds_path}')
-    except FileNotFoundError:
-        print(Fore.RED + "[ERROR] texconv.exe not found. Ensure it's downloaded and in PATH/script dir.")
-        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion (basic support)')
-        try:
-            with Image.open(png_path) as img:
-                width, height = img.size
-                im = img.convert('RGBA')
-            if mipmaps is None:
-                max_dimension = max(width, height)
-                mipmaps = math.floor(math.log2(max_dimension)) + 1
-            dxt_format = 'DXT5'
-            print(Fore.GREEN + f'[DEBUG] PIL opened PNG and converted to RGBA')
-            print(Fore.GREEN + f'[DEBUG] Image dimensions: {width}x{height}')
-            print(Fore.GREEN + f'[DEBUG] Using {dxt_format} compression with {mipmaps} mipmap levels')
-            im.save(dds_path, 'DDS', format=dxt_format, mipmaps=mipmaps)
-            print(Fore.GREEN + f'✓ Pillow fallback conversion successful')
-        except Exception as pil_e:
-            print(Fore.RED + f'[ERROR] Pillow conversion failed: {pil_e}')
-    except subprocess.CalledProcessError as e:
-        print(Fore.RED + f'[ERROR] Texconv PNG to DDS failed with error code {e.returncode}')
-        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion')
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats['evictions'] += 1
+        self.local_bytes = total
+
+    def _remote_request(self, method, key, data=None):
+        import urllib.request
+        import urllib.error
+        if not self.remote_url or not self.remote_ok:
+            return None
+        request = urllib.request.Request(f'{self.remote_url}/v1/artifacts/{key}', data=data, method=method)
+        if data is not None:
+            request.add_header('Content-Type', 'application/octet-stream')
+            request.add_header('X-Artifact-SHA256', hashlib.sha256(data).hexdigest())
         try:
-            with Image.open(png_path) as img:
-                width, height = img.size
-                im = img.convert('RGBA')
-            if mipmaps is None:
-                max_dimension = max(width, height)
-                mipmaps = math.floor(math.log2(max_dimension)) + 1
-            dxt_format = 'DXT5'
-            print(Fore.GREEN + f'[DEBUG] PIL opened PNG and converted to RGBA')
-            print(Fore.GREEN + f'[DEBUG] Image dimensions: {width}x{height}')
-            print(Fore.GREEN + f'[DEBUG] Using {dxt_format} compression with {mipmaps} mipmap levels')
-            im.save(dds_path, 'DDS', format=dxt_format, mipmaps=mipmaps)
-            print(Fore.GREEN + f'✓ Fallback converted PNG to DDS: {png_path} -> {dds_path}')
-        except Exception as fallback_e:
-            print(Fore.RED + f'[ERROR] PIL fallback also failed: {fallback_e}')
-    print(Fore.CYAN + f'--- PNG to DDS Conversion End ---\n')
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return (response.status, response.read(), response.headers.get('X-Artifact-SHA256'))
+        except urllib.error.HTTPError as e:
+            return (e.code, b'', None)
+        except (urllib.error.URLError, OSError) as e:
+            print(Fore.YELLOW + f'[BUILD CACHE] Remote cache {self.remote_url} unavailable ({e}) - using the local cache only')
+            self.remote_ok = False
+            return None
 
-def parse_lsx(lsx_path, game_dir=None, mode='standalone'):
-    print(Fore.CYAN + f'\n=== PARSING LSX FILE ===')
-    print(Fore.GREEN + f'[DEBUG] LSX Path: {lsx_path}')
-    print(Fore.GREEN + f'[DEBUG] Game Directory: {game_dir}')
-    print(Fore.GREEN + f'[DEBUG] Mode: {mode}')
-    print(Fore.GREEN + f'[DEBUG] LSX file exists: {os.path.exists(lsx_path)}')
-    from pathlib import Path
-    print(Fore.GREEN + f'[DEBUG] Reading LSX file...')
-    with open(lsx_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    print(Fore.GREEN + f'[DEBUG] LSX file size: {len(content)} bytes')
+    def _remote_get(self, key):
+        result = self._remote_request('GET', key)
+        if result is None or result[0] != 200:
+            return None
+        status, data, digest = result
+        if digest and hashlib.sha256(data).hexdigest() != digest:
+            print(Fore.YELLOW + f'[BUILD CACHE] Discarding corrupt remote artifact {key[:12]}')
+            return None
+        return data
+
+    def _remote_put(self, key, data):
+        result = self._remote_request('PUT', key, data)
+        return result is not None and result[0] in (200, 201, 204)
+
+    def describe(self):
+        stats = self.stats
+        remote = f', remote {self.remote_url}' + ('' if self.remote_ok else ' (offline)') if self.remote_url else ''
+        evicted = f", {stats['evictions']} evicted" if stats['evictions'] else ''
+        return f"Build cache: {stats['local_hits']} local + {stats['remote_hits']} remote hits / {stats['misses']} misses, {stats['uploads']} uploaded{evicted}{remote}"
+
+def configure_build_cache(cache_dir=None, remote_url=None, enabled=True, max_bytes=BUILD_CACHE_MAX_BYTES):
+    global BUILD_CACHE
+    BUILD_CACHE = BuildCache(cache_dir or os.path.join(ensure_temp_dir(), 'build_cache'), remote_url, max_bytes=max_bytes) if enabled else None
+    return BUILD_CACHE
+
+def get_build_cache():
+    return BUILD_CACHE
+
+def build_cache_key(kind, *parts):
+    texconv = get_texconv_path()
+    encoder = f'texconv:{os.path.getsize(texconv)}' if texconv and os.path.isfile(texconv) else 'pillow'
+    payload = json.dumps([BUILD_CACHE_SCHEMA, kind, encoder, MIP_MIN_TILE] + [list(p) if isinstance(p, tuple) else p for p in parts])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def fetch_cached_artifact(key, dest_path):
+    if BUILD_CACHE is None:
+        return False
+    data = BUILD_CACHE.get(key)
+    if data is None:
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    with open(dest_path, 'wb') as f:
+        f.write(data)
+    return True
+
+def store_cached_artifact(key, path):
+    if BUILD_CACHE is None or not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        BUILD_CACHE.put(key, f.read())
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+BUILD_CACHE_MAX_UPLOAD = 256 * 1024 * 1024
+
+def make_build_cache_server(store_dir, host='127.0.0.1', port=8765, read_only=False, max_bytes=BUILD_CACHE_MAX_BYTES):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    store = BuildCache(store_dir, max_bytes=max_bytes)
+
+    class BuildCacheRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def artifact_key(self):
+            prefix = '/v1/artifacts/'
+            key = self.path[len(prefix):] if self.path.startswith(prefix) else ''
+            if not BUILD_CACHE_KEY_RE.match(key):
+                self.reply(404)
+                return None
+            return key
+
+        def reply(self, status, body=b'', digest=None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(body)))
+            if digest:
+                self.send_header('X-Artifact-SHA256', digest)
+            self.end_headers()
+            if body and self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def do_GET(self):
+            key = self.artifact_key()
+            if key is None:
+                return
+            try:
+                with open(store.path_for(key), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                self.reply(404)
+                return
+            self.reply(200, data, hashlib.sha256(data).hexdigest())
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_PUT(self):
+            key = self.artifact_key()
+            if key is None:
+                return
+            if read_only:
+                self.reply(403)
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0 or length > BUILD_CACHE_MAX_UPLOAD:
+                self.reply(413 if length > 0 else 411)
+                return
+            data = self.rfile.read(length)
+            digest = self.headers.get('X-Artifact-SHA256')
+            if len(data) != length or (digest and hashlib.sha256(data).hexdigest() != digest):
+                self.reply(400)
+                return
+            store._write_local(key, data)
+            self.reply(201)
+
+        def log_message(self, format, *args):
+            print(Fore.GREEN + f'[CACHE SERVER] {self.address_string()} {format % args}')
+    return ThreadingHTTPServer((host, port), BuildCacheRequestHandler)
+
+def run_cache_server_command(args):
+    store_dir = args.dir or os.path.join(ensure_temp_dir(), 'build_cache_server')
     try:
-        print(Fore.GREEN + f'[DEBUG] Parsing XML content...')
-        dom = parseString(content)
-        print(Fore.GREEN + f'✓ XML parsed successfully')
-    except ExpatError as e:
-        print(Fore.RED + f'[ERROR] XML parse error in {lsx_path}: {e}')
-        return (None, None, None, None, None)
+        server = make_build_cache_server(store_dir, args.host, args.port, args.read_only, args.max_mb * 1024 * 1024)
+    except OSError as e:
+        print(Fore.RED + f'[ERROR] Cannot listen on {args.host}:{args.port}: {e}')
+        return 1
+    print(Fore.CYAN + f"[CACHE SERVER] Serving {store_dir} on http://{args.host}:{server.server_address[1]}{(' (read-only)' if args.read_only else '')} - press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+def write_atlas_dds(im, dds_path, tile_size=64, mipmaps=True, format=None):
+    format = format or ATLAS_FORMAT
+    key = build_cache_key('atlas', hashlib.sha256(im.convert('RGBA').tobytes()).hexdigest(), im.size, format, tile_size, mipmaps)
+    if fetch_cached_artifact(key, dds_path):
+        print(Fore.GREEN + f'[BUILD CACHE] Atlas DDS reused: {dds_path}')
+        return
+    format = select_dds_format(im, format, 'BC3_UNORM', tile_size)
+    source = im if format == 'BC1_UNORM' else apply_alpha_dither(im, strength=0.5)
+    write_dds_with_mips(source, dds_path, format=format, tile_size=tile_size, mipmaps=mipmaps)
+    store_cached_artifact(key, dds_path)
+
+def smallest_atlas_size(icon_count, tile_size=64, min_size=None):
+    size = min_size or tile_size
+    while (size // tile_size) ** 2 < icon_count:
+        size *= 2
+    return size
+
+def compose_atlas_image(images, tile_size=64, resize=None, atlas_size=None):
+    resize = resize or resize_with_alpha
+    atlas_size = atlas_size or smallest_atlas_size(len(images), tile_size)
+    grid_size = atlas_size // tile_size
+    atlas = Image.new('RGBA', (atlas_size, atlas_size), (0, 0, 0, 0))
+    for idx, im in enumerate(images[:grid_size * grid_size]):
+        tile = resize(im, (tile_size, tile_size))
+        atlas.paste(tile, (idx % grid_size * tile_size, idx // grid_size * tile_size))
+    return atlas
+
+def resize_reference(im, size):
+    return resize_with_alpha(im, size, Image.BICUBIC)
+
+def resize_single_bicubic(im, size):
+    return im.resize(size, Image.BICUBIC)
+
+def resize_lanczos(im, size):
+    return im.resize(size, Image.LANCZOS)
+
+def resize_reduce(im, size):
+    factor = max(1, min(im.size[0] // size[0], im.size[1] // size[1]))
+    if factor > 1:
+        im = im.reduce(factor)
+    return im.resize(size, Image.BICUBIC)
+RESIZE_ENGINES = {'reference': resize_reference, 'bicubic': resize_single_bicubic, 'lanczos': resize_lanczos, 'reduce': resize_reduce}
+
+def encode_texconv(im, format):
+    if not get_texconv_path():
+        raise FileNotFoundError('texconv not found - the Pillow fallback would be measured instead (use --encode pillow for that)')
+    work_dir = tempfile.mkdtemp(prefix='quality_', dir=ensure_temp_dir())
+    try:
+        dds_path = os.path.join(work_dir, 'encoded.dds')
+        write_dds_with_mips(im, dds_path, format=format, mipmaps=False)
+        return decode_dds_image(dds_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def encode_pillow(im, format):
+    work_dir = tempfile.mkdtemp(prefix='quality_', dir=ensure_temp_dir())
+    try:
+        dds_path = os.path.join(work_dir, 'encoded.dds')
+        im.convert('RGBA').save(dds_path, 'DDS', pixel_format='DXT5')
+        return decode_dds_image(dds_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def encode_none(im, format):
+    return im.convert('RGBA')
+ENCODE_ENGINES = {'texconv': encode_texconv, 'pillow': encode_pillow, 'none': encode_none}
+
+def box_mean(x, k):
+    c = np.pad(x, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    return (c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]) / (k * k)
+
+def ssim_index(a, b, window=7):
+    k = min(window, a.shape[0], a.shape[1])
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    mu_a = box_mean(a, k)
+    mu_b = box_mean(b, k)
+    var_a = box_mean(a * a, k) - mu_a * mu_a
+    var_b = box_mean(b * b, k) - mu_b * mu_b
+    cov = box_mean(a * b, k) - mu_a * mu_b
+    ssim = (2 * mu_a * mu_b + c1) * (2 * cov + c2) / ((mu_a * mu_a + mu_b * mu_b + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+def image_quality_metrics(reference, candidate):
+    ref = np.asarray(reference.convert('RGBA'), dtype=np.float64)
+    cand = np.asarray(candidate.convert('RGBA'), dtype=np.float64)
+    if ref.shape != cand.shape:
+        raise ValueError(f'size mismatch: reference {ref.shape[1]}x{ref.shape[0]}, candidate {cand.shape[1]}x{cand.shape[0]}')
+    ref_rgb = ref[..., :3] * ref[..., 3:4] / 255.0
+    cand_rgb = cand[..., :3] * cand[..., 3:4] / 255.0
+    mse = float(np.mean((ref_rgb - cand_rgb) ** 2))
+    psnr = float('inf') if mse == 0 else 10 * math.log10(255.0 ** 2 / mse)
+    luma = np.array([0.299, 0.587, 0.114])
+    ssim = ssim_index(ref_rgb @ luma, cand_rgb @ luma)
+    alpha_error = np.abs(ref[..., 3] - cand[..., 3])
+    return {'psnr': psnr, 'ssim': ssim, 'alpha_mean': float(alpha_error.mean()), 'alpha_max': float(alpha_error.max())}
+
+def load_quality_sources(golden_dir):
+    source_dir = os.path.join(golden_dir, 'source')
+    sources = []
+    for name in sorted(os.listdir(source_dir)) if os.path.isdir(source_dir) else []:
+        if not name.lower().endswith('.png'):
+            continue
+        with Image.open(os.path.join(source_dir, name)) as im:
+            im = im.convert('RGBA')
+        if im.size[0] != im.size[1]:
+            print(Fore.YELLOW + f'[QUALITY] Skipping non-square source: {name}')
+            continue
+        sources.append((os.path.splitext(name)[0], im))
+    return sources
+
+def render_quality_set(sources, resize, encode, tile_size=64):
+    rendered = {}
+    encoded = {}
+    for kind, export_order in (('items', EXPORT_ORDER_ITEMS), ('skills', EXPORT_ORDER_SKILLS)):
+        for exp in export_order:
+            size = exp['size']
+            for name, im in sources:
+                if (size, name) not in encoded:
+                    encoded[size, name] = encode(resize(im, (size, size)), 'BC7_UNORM')
+                rendered[f'{kind}/{size}/{name}.png'] = encoded[size, name]
+    if sources:
+        atlas = compose_atlas_image([im for _, im in sources], tile_size, resize)
+        rendered['atlas.png'] = encode(atlas, 'BC3_UNORM')
+    return rendered
+
+RARITY_STYLES = {'blue': {'top': (34, 78, 158), 'bottom': (8, 20, 56), 'glow': (115, 180, 255), 'border': (140, 200, 255)}, 'purple': {'top': (108, 46, 153), 'bottom': (31, 10, 51), 'glow': (205, 140, 255), 'border': (215, 160, 255)}, 'green': {'top': (46, 122, 51), 'bottom': (10, 38, 15), 'glow': (140, 242, 115), 'border': (160, 242, 128)}, 'gold': {'top': (158, 115, 31), 'bottom': (51, 31, 5), 'glow': (255, 217, 115), 'border': (255, 214, 102)}}
+RARITY_STYLE_DEFAULTS = {'glow_radius': 0.55, 'glow_strength': 0.6, 'vignette': 0.35, 'border_width': 0.02, 'corner_radius': 0.08, 'halo_radius': 0.03, 'halo_strength': 0.8}
+RARITY_SIZES = [{'folder': 'Original', 'size': 1000}, {'folder': 'GUI/380x380 Tooltip PNG', 'size': 380}, {'folder': 'GUI/144x144 ControllerUI PNG', 'size': 144}, {'folder': 'GUI/64x64 PNG', 'size': 64}]
+RARITY_TEMPLATES = {}
+_rarity_template_lock = threading.Lock()
+
+def rarity_style(rarity):
+    style = dict(RARITY_STYLE_DEFAULTS)
+    style.update(RARITY_STYLES[rarity])
+    return style
+
+def load_rarity_styles(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        styles = json.load(f)
+    for name, style in styles.items():
+        missing = [key for key in ('top', 'bottom', 'glow', 'border') if key not in style and key not in RARITY_STYLES.get(name, {})]
+        if missing:
+            raise ValueError(f"rarity style {name!r} is missing {', '.join(missing)}")
+        RARITY_STYLES[name] = dict(RARITY_STYLES.get(name, {}), **style)
+    with _rarity_template_lock:
+        RARITY_TEMPLATES.clear()
+    return list(styles)
+
+def box_blur(x, radius):
+    if radius < 1:
+        return x
+    return box_mean(np.pad(x, radius, mode='edge'), 2 * radius + 1)
+
+def rarity_template(rarity, size):
+    with _rarity_template_lock:
+        template = RARITY_TEMPLATES.get((rarity, size))
+    if template is not None:
+        return template
+    style = rarity_style(rarity)
+    color = {key: np.array(style[key], dtype=np.float32) / 255.0 for key in ('top', 'bottom', 'glow', 'border')}
+    coords = (np.arange(size, dtype=np.float32) + 0.5) / size * 2 - 1
+    x = coords[None, :]
+    y = coords[:, None]
+    radius = np.sqrt(x * x + y * y) / math.sqrt(2)
+    t = ((y + 1) / 2)[..., None]
+    rgb = color['top'] * (1 - t) + color['bottom'] * t
+    glow = (np.exp(-(radius / style['glow_radius']) ** 2) * style['glow_strength'])[..., None]
+    rgb = rgb + (color['glow'] - rgb) * glow
+    rgb = rgb * (1 - style['vignette'] * radius ** 2)[..., None]
+    half = size / 2
+    corner = style['corner_radius'] * size
+    qx = np.abs(x) * half - (half - corner)
+    qy = np.abs(y) * half - (half - corner)
+    outside = np.sqrt(np.maximum(qx, 0) ** 2 + np.maximum(qy, 0) ** 2) + np.minimum(np.maximum(qx, qy), 0) - corner
+    border = np.clip(outside + max(1.0, style['border_width'] * size) + 0.5, 0, 1)[..., None]
+    rgb = rgb + (color['border'] - rgb) * border
+    template = np.concatenate([np.clip(rgb, 0, 1), np.clip(0.5 - outside, 0, 1)[..., None]], axis=-1).astype(np.float32)
+    template.setflags(write=False)
+    with _rarity_template_lock:
+        RARITY_TEMPLATES[rarity, size] = template
+    return template
+
+def composite_rarity_icon(icon, rarity, prepared=None):
+    size = icon.size[0]
+    style = rarity_style(rarity)
+    base = rarity_template(rarity, size)
+    if prepared is None:
+        prepared = {}
+    if 'src' not in prepared:
+        prepared['src'] = np.asarray(icon.convert('RGBA'), dtype=np.float32) / 255.0
+    src = prepared['src']
+    alpha = src[..., 3]
+    halo_radius = max(1, int(round(style['halo_radius'] * size)))
+    if halo_radius not in prepared:
+        prepared[halo_radius] = box_blur(box_blur(alpha, halo_radius), halo_radius)
+    halo = np.clip(prepared[halo_radius] * style['halo_strength'], 0, 1)[..., None]
+    glow = np.array(style['glow'], dtype=np.float32) / 255.0
+    rgb = base[..., :3] + (glow - base[..., :3]) * halo
+    rgb += (src[..., :3] - rgb) * alpha[..., None]
+    out_alpha = base[..., 3] + alpha * (1 - base[..., 3])
+    out = np.concatenate([rgb, out_alpha[..., None]], axis=-1)
+    return Image.fromarray(np.round(out * 255).astype(np.uint8), 'RGBA')
+
+def export_rarity_variants(png_path, dest_dir, rarities=None, sizes=None, tiers_dir=None, profile=None):
+    rarities = rarities or list(RARITY_STYLES)
+    sizes = sizes or RARITY_SIZES
+    base_name = os.path.splitext(os.path.basename(png_path))[0]
+    with Image.open(png_path) as src:
+        im = src.convert('RGBA')
+    if im.size[0] != im.size[1]:
+        print(Fore.YELLOW + f'[RARITY] Skipping non-square image: {png_path}')
+        return {}
+    written = {}
+    for tier in sorted(sizes, key=lambda tier: -tier['size']):
+        size = tier['size']
+        icon = im if im.size[0] == size else resize_with_alpha(im, (size, size), Image.LANCZOS)
+        folder = os.path.join(dest_dir, *tier['folder'].split('/'))
+        os.makedirs(folder, exist_ok=True)
+        prepared = {}
+        for rarity in rarities:
+            out_path = os.path.join(folder, f'{base_name}_{rarity}.png')
+            composite_rarity_icon(icon, rarity, prepared).save(out_path, 'PNG')
+            written[rarity, size] = out_path
+    if tiers_dir:
+        largest = max((tier['size'] for tier in sizes))
+        for rarity in rarities:
+            resize_png(written[rarity, largest], dest_dir=tiers_dir, output_name=f'{base_name}_{rarity}', profile=profile)
+    return written
+
+def export_rarity_folder(folder, dest_dir, rarities=None, sizes=None, tiers_dir=None, profile=None, max_workers=None):
+    started = time.perf_counter()
+    rarities = rarities or list(RARITY_STYLES)
+    sizes = sizes or RARITY_SIZES
+    with os.scandir(folder) as it:
+        paths = [entry.path for entry in sorted(it, key=lambda e: e.name) if entry.name.lower().endswith('.png') and entry.is_file()]
+    for rarity in rarities:
+        for tier in sizes:
+            rarity_template(rarity, tier['size'])
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1), thread_name_prefix='rarity') as executor:
+        futures = [executor.submit(export_rarity_variants, path, dest_dir, rarities, sizes, tiers_dir, profile) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                results.append((path, future.result(), None))
+            except Exception as e:
+                print(Fore.RED + f'[RARITY] ✗ {os.path.basename(path)}: {e}')
+                results.append((path, {}, str(e)))
+    written = sum((len(files) for _, files, _ in results))
+    print(Fore.GREEN + f'[RARITY] {written} variant(s) for {len(paths)} icon(s) x {len(rarities)} rarities in {time.perf_counter() - started:.1f}s')
+    return results
+
+def run_rarity_command(args):
+    if not os.path.isdir(args.folder):
+        print(Fore.RED + f'[ERROR] Not a folder: {args.folder}')
+        return 1
+    try:
+        if args.styles:
+            print(Fore.CYAN + f"[RARITY] Loaded style(s) {', '.join(load_rarity_styles(args.styles))} from {args.styles}")
+        rarities = args.rarities.split(',') if args.rarities else list(RARITY_STYLES)
+        unknown = [rarity for rarity in rarities if rarity not in RARITY_STYLES]
+        if unknown:
+            raise ValueError(f"unknown rarity {', '.join(unknown)} (known: {', '.join(RARITY_STYLES)})")
+        profile = get_export_profile(args.profile) if args.tiers else None
+    except (OSError, ValueError) as e:
+        print(Fore.RED + f'[ERROR] {e}')
+        return 1
+    results = export_rarity_folder(args.folder, args.output_dir, rarities, tiers_dir=args.tiers, profile=profile, max_workers=args.workers)
+    failed = [path for path, _, error in results if error]
+    if args.atlas:
+        smallest = min(RARITY_SIZES, key=lambda tier: tier['size'])
+        png_folder = os.path.join(args.output_dir, *smallest['folder'].split('/'))
+        png_files = sorted((os.path.basename(files[rarity, smallest['size']]) for _, files, _ in results for rarity in rarities if (rarity, smallest['size']) in files))
+        if not png_files:
+            print(Fore.RED + '[RARITY] ✗ No variants to put in an atlas')
+            return 1
+        atlas_size = smallest_atlas_size(len(png_files), args.tile_size, 512)
+        create_new_atlas(png_folder, args.atlas, atlas_size, args.tile_size, atlas_size // args.tile_size, png_files=png_files)
+    return 1 if failed else 0
+
+def run_profiles_command(args):
+    profiles = EXPORT_PROFILES if not args.names else {}
+    for name in args.names:
+        try:
+            profiles[name] = get_export_profile(name)
+        except ValueError as e:
+            print(Fore.RED + f'[ERROR] {e}')
+            return 1
+    if args.json:
+        print(json.dumps({'export_profiles': {name: {key: value for key, value in profile.items() if key != 'name'} for name, profile in profiles.items()}, 'atlas_format': ATLAS_FORMAT}, indent=2))
+        return 0
+    print(Fore.CYAN + f'[PROFILES] Atlas format: {ATLAS_FORMAT}')
+    for name, profile in profiles.items():
+        origin = 'built-in' if name in BUILTIN_EXPORT_PROFILES else 'preferences'
+        suffix = f" - suffix {profile['suffix']}" if profile['suffix'] else ''
+        print(Fore.CYAN + f'[PROFILES] {name} ({origin}){suffix}')
+        for tier in profile['tiers']:
+            alpha = f" (alpha: {tier['alpha_format']})" if tier['format'] == 'auto' else ''
+            print(Fore.GREEN + f"  {tier['size']:>4}px  {tier['format']}{alpha}, {tier['resample']}, {('mips' if tier['mipmaps'] else 'no mips')} -> {tier['folder']}")
+    return 0
+
+def write_atlas_pair(dom, atlas_im, lsx_path, atlas_path, tile_size, tag):
+    stem, ext = os.path.splitext(lsx_path)
+    temp_dds = f'{os.path.splitext(atlas_path)[0]}.{tag}.dds'
+    temp_lsx = f'{stem}.{tag}{ext}'
+    try:
+        write_atlas_dds(atlas_im, temp_dds, tile_size=tile_size)
+        if not os.path.exists(temp_dds):
+            raise RuntimeError('DDS encoding produced no output')
+        write_lsx(dom, temp_lsx)
+        os.replace(temp_dds, atlas_path)
+        os.replace(temp_lsx, lsx_path)
+    finally:
+        for path in (temp_dds, temp_lsx):
+            if os.path.exists(path):
+                os.remove(path)
+
+def run_delete_command(args):
+    mode = 'mod_project' if args.game_dir else 'standalone'
+    names = list(args.keys)
+    if args.from_file:
+        with open(args.from_file, 'r', encoding='utf-8') as f:
+            names.extend((line.strip() for line in f if line.strip() and (not line.startswith('#'))))
+    if not (names or args.glob or args.regex):
+        print(Fore.RED + '[ERROR] Nothing selected: pass MapKeys, --from-file, --glob or --regex')
+        return 1
+    try:
+        if args.regex:
+            re.compile(args.regex)
+    except re.error as e:
+        print(Fore.RED + f'[ERROR] Invalid --regex: {e}')
+        return 1
+    dom, atlas_path, icons, atlas_size, tile_size = parse_lsx(args.lsx, args.game_dir, mode)
+    if dom is None or not atlas_path or not os.path.exists(atlas_path):
+        print(Fore.RED + f'[ERROR] Could not resolve the atlas DDS for {args.lsx}')
+        return 1
+    selected, missing = select_mapkeys([icon['mapkey'] for icon in icons], names, args.glob, args.regex)
+    for name in missing:
+        print(Fore.YELLOW + f'[DELETE] {name} is not in {args.lsx}')
+    shown = ', '.join(selected[:10]) + (' ...' if len(selected) > 10 else '')
+    print(Fore.CYAN + f'[DELETE] {len(selected)} of {len(icons)} icon(s) selected: {shown}')
+    if not selected or args.dry_run:
+        if args.dry_run:
+            print(Fore.YELLOW + '[DELETE] Dry run - nothing written')
+        return 0 if selected or not missing else 1
+    atlas_im = decode_dds_image(atlas_path)
+    if atlas_im.size != (atlas_size, atlas_size):
+        atlas_im = atlas_im.resize((atlas_size, atlas_size), Image.BICUBIC)
+    bulk_delete_icons(dom, icons, atlas_im, selected, atlas_size // tile_size, tile_size, tier_roots=args.tiers_root or [])
+    write_atlas_pair(dom, atlas_im, args.lsx, atlas_path, tile_size, 'delete')
+    print(Fore.GREEN + f'✓ Updated atlas written: {atlas_path}, {args.lsx}')
+    return 0
+
+def run_lint_command(args):
+    try:
+        roots, tier_root, mode = lint_targets(args.roots, args.game_dir, args.mod)
+        report = lint_mod(roots, args.game_dir, mode, args.profile, tier_root)
+    except ValueError as e:
+        print(Fore.RED + f'[ERROR] {e}')
+        return 1
+    print_lint_report(report)
+    if args.repair and (report['tiers'] or (args.prune_orphans and report['orphans'])):
+        if not get_texconv_path():
+            print(Fore.YELLOW + '[LINT] texconv not found - regenerated tiers fall back to Pillow (DXT1/DXT5, no mip chain)')
+        result = repair_lint_issues(report, args.png_dir, args.prune_orphans)
+        report = lint_mod(roots, args.game_dir, mode, args.profile, tier_root)
+        print_lint_report(report)
+        report['repair'] = result
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(Fore.GREEN + f'[LINT] Report written: {args.report}')
+    return 1 if report['layout'] or report['tiers'] else 0
+
+def run_compact_command(args):
+    mode = 'mod_project' if args.game_dir else 'standalone'
+    failed = 0
+    for lsx_path in args.lsx:
+        try:
+            result = compact_atlas(lsx_path, game_dir=args.game_dir, mode=mode, min_size=args.min_size, dry_run=args.dry_run)
+        except (ValueError, RuntimeError, OSError) as e:
+            print(Fore.RED + f'[ERROR] Compaction failed for {lsx_path}: {e}')
+            result = None
+        failed += result is None
+    return 1 if failed else 0
+
+def run_build_command(args):
+    if not os.path.isdir(args.folder):
+        print(Fore.RED + f'[ERROR] Not a folder: {args.folder}')
+        return 1
+    if args.atlas_size and args.atlas_size % args.tile_size != 0:
+        print(Fore.RED + f'[ERROR] atlas size {args.atlas_size} is not divisible by tile size {args.tile_size}')
+        return 1
+    report = preflight_import_folder(args.folder, capacity=(args.atlas_size // args.tile_size) ** 2 if args.atlas_size else None)
+    atlas_size = args.atlas_size or smallest_atlas_size(len(report['entries']), args.tile_size, 512)
+    grid_size = atlas_size // args.tile_size
+    report['capacity'] = grid_size * grid_size
+    print_preflight_report(report)
+    print(Fore.CYAN + f"[BUILD] Atlas {atlas_size}x{atlas_size}, {args.tile_size}px tiles, {grid_size * grid_size} slot(s)")
+    failed = preflight_has_errors(report) or (args.strict and (report['non_square'] or report['small']))
+    if args.dry_run:
+        print(Fore.YELLOW + '[BUILD] Dry run - nothing written')
+        return 1 if failed else 0
+    if failed and args.strict:
+        print(Fore.RED + '[BUILD] ✗ Aborting because of preflight issues (--strict)')
+        return 1
+    if not report['entries']:
+        print(Fore.RED + '[BUILD] ✗ No usable PNGs')
+        return 1
+    create_new_atlas(args.folder, args.output, atlas_size, args.tile_size, grid_size, dedupe=not args.no_dedupe, png_files=[png_file for png_file, _ in report['entries']])
+    return 0
+
+DIST_PROTOCOL = 1
+DIST_DEFAULT_PORT = 8766
+DIST_AUTHKEY_ENV = 'ICONMANAGER_DIST_KEY'
+
+def dist_collect_files(root):
+    files = {}
+    for folder, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(folder, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root).replace(os.sep, '/').replace('\\', '/')] = f.read()
+    return files
+
+def dist_write_sources(job, folder):
+    os.makedirs(folder, exist_ok=True)
+    names = []
+    for name, payload in job['pngs']:
+        name = os.path.basename(name)
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(payload)
+        names.append(name)
+    return names
+
+def dist_tiers_job(job, work_dir):
+    src = os.path.join(work_dir, 'png')
+    out = os.path.join(work_dir, 'out')
+    for name, (_, mapkey) in zip(dist_write_sources(job, src), job['entries']):
+        resize_png(os.path.join(src, name), dest_dir=out, output_name=mapkey, mipmaps=job['mipmaps'], profile=job['profile'])
+    return dist_collect_files(out)
+
+def dist_atlas_job(job, work_dir):
+    src = os.path.join(work_dir, 'png')
+    out = os.path.join(work_dir, 'out')
+    names = dist_write_sources(job, src)
+    atlas_rel = f"Assets/Textures/Icons/{job['name']}.dds"
+    dds_path = os.path.join(out, *atlas_rel.split('/'))
+    os.makedirs(os.path.dirname(dds_path), exist_ok=True)
+    grid_size = job['atlas_size'] // job['tile_size']
+    create_new_atlas(src, dds_path, job['atlas_size'], job['tile_size'], grid_size, dedupe=job['dedupe'], png_files=names, format=job['atlas_format'])
+    built_lsx = os.path.splitext(dds_path)[0] + '.lsx'
+    dom = minidom.parse(built_lsx)
+    os.remove(built_lsx)
+    for attr in dom.getElementsByTagName('attribute'):
+        if attr.getAttribute('id') == 'Path':
+            attr.setAttribute('value', atlas_rel)
+    write_lsx(dom, os.path.join(out, f"{job['name']}.lsx"))
+    return dist_collect_files(out)
+
+def dist_package_job(job, work_dir):
+    import io
+    from zipfile import ZIP_DEFLATED, ZipFile
+    buffer = io.BytesIO()
+    with ZipFile(buffer, 'w', ZIP_DEFLATED) as zipf:
+        for rel, payload in sorted(job['files'].items()):
+            zipf.writestr(rel, payload)
+    return {job['archive']: buffer.getvalue()}
+
+DIST_JOB_HANDLERS = {'tiers': dist_tiers_job, 'atlas': dist_atlas_job, 'package': dist_package_job}
+
+def run_dist_job(job, worker=''):
+    started = time.perf_counter()
+    work_dir = tempfile.mkdtemp(prefix='dist_', dir=ensure_temp_dir())
+    files = {}
+    error = None
+    try:
+        handler = DIST_JOB_HANDLERS.get(job['kind'])
+        if handler is None:
+            raise ValueError(f"unknown job kind {job['kind']!r}")
+        files = handler(job, work_dir)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {'id': job['id'], 'files': files, 'error': error, 'worker': worker, 'seconds': time.perf_counter() - started}
+
+def dist_job_payload(job):
+    payload = {key: value for key, value in job.items() if key not in ('paths', 'dest', 'source_dir')}
+    if 'paths' in job:
+        pngs = []
+        for path in job['paths']:
+            with open(path, 'rb') as f:
+                pngs.append((os.path.basename(path), f.read()))
+        payload['pngs'] = pngs
+    if job['kind'] == 'package':
+        payload['files'] = dist_collect_files(job['source_dir'])
+    return payload
+
+def gather_dist_result(job, result):
+    dest = os.path.abspath(job['dest'])
+    for rel, payload in result['files'].items():
+        parts = rel.split('/')
+        if rel.startswith('/') or '..' in parts or ':' in parts[0]:
+            raise ValueError(f'refusing to write {rel!r} outside {dest}')
+        path = os.path.join(dest, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(payload)
+    return len(result['files'])
+
+def plan_dist_jobs(folder, entries, dest, atlas_name='Icons', icons_per_atlas=1024, tile_size=64, profile=None, batch=8, dedupe=True, mipmaps=True):
+    jobs = []
+    for shard, start in enumerate(range(0, len(entries), icons_per_atlas)):
+        chunk = entries[start:start + icons_per_atlas]
+        name = atlas_name if len(entries) <= icons_per_atlas else f'{atlas_name}_{shard + 1}'
+        jobs.append({'id': f'atlas:{name}', 'kind': 'atlas', 'name': name, 'paths': [os.path.join(folder, png_file) for png_file, _ in chunk], 'atlas_size': smallest_atlas_size(len(chunk), tile_size, 512), 'tile_size': tile_size, 'atlas_format': ATLAS_FORMAT, 'dedupe': dedupe, 'dest': dest})
+    for start in range(0, len(entries), batch):
+        chunk = entries[start:start + batch]
+        jobs.append({'id': f'tiers:{chunk[0][1]}' + (f'+{len(chunk) - 1}' if len(chunk) > 1 else ''), 'kind': 'tiers', 'entries': chunk, 'paths': [os.path.join(folder, png_file) for png_file, _ in chunk], 'profile': profile, 'mipmaps': mipmaps, 'dest': dest})
+    return jobs
+
+def parse_dist_address(text, default_host='127.0.0.1'):
+    host, _, port = text.rpartition(':')
+    return (host or default_host, int(port) if port else DIST_DEFAULT_PORT)
+
+def dist_authkey(value=None):
+    value = value or os.environ.get(DIST_AUTHKEY_ENV)
+    return value.encode('utf-8') if value else None
+
+class DistCoordinator:
+
+    def __init__(self, host='127.0.0.1', port=DIST_DEFAULT_PORT, authkey=None, max_attempts=3, on_result=None):
+        from multiprocessing.connection import Listener
+        self.listener = Listener((host, port), authkey=authkey)
+        self.address = self.listener.address
+        self.max_attempts = max_attempts
+        self.on_result = on_result
+        self.cond = threading.Condition()
+        self.pending = []
+        self.leased = {}
+        self.attempts = {}
+        self.results = {}
+        self.submitted = 0
+        self.workers = {}
+        self.closed = False
+        threading.Thread(target=self._accept_loop, name='dist-accept', daemon=True).start()
+
+    def submit(self, jobs):
+        with self.cond:
+            self.pending.extend(reversed(jobs))
+            self.submitted += len(jobs)
+            self.cond.notify_all()
+
+    def wait(self, timeout=None):
+        with self.cond:
+            return self.cond.wait_for(lambda: len(self.results) >= self.submitted, timeout)
+
+    def failures(self):
+        with self.cond:
+            return [result for result in self.results.values() if result['error']]
+
+    def active_workers(self):
+        with self.cond:
+            return len(self.workers)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+
+    def _accept_loop(self):
+        from multiprocessing import AuthenticationError
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError as e:
+                print(Fore.YELLOW + f'[DIST] Rejected a worker: {e}')
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), name='dist-conn', daemon=True).start()
+
+    def _finish(self, job, result):
+        if self.on_result is not None and not result['error']:
+            try:
+                self.on_result(job, result)
+            except Exception as e:
+                result['error'] = f'gather failed: {e}'
+        with self.cond:
+            self.results[job['id']] = result
+            self.cond.notify_all()
+
+    def _lease(self, worker):
+        while True:
+            with self.cond:
+                if not self.pending:
+                    return (None, {'op': 'stop'} if self.closed else {'op': 'wait', 'seconds': 0.2})
+                job = self.pending.pop()
+                self.leased[job['id']] = (job, worker)
+                self.attempts[job['id']] = self.attempts.get(job['id'], 0) + 1
+            try:
+                return (job, {'op': 'job', 'job': dist_job_payload(job)})
+            except OSError as e:
+                with self.cond:
+                    self.leased.pop(job['id'], None)
+                self._finish(job, {'id': job['id'], 'files': {}, 'error': f'cannot read inputs: {e}', 'worker': '', 'seconds': 0.0})
+
+    def _release(self, job, worker):
+        with self.cond:
+            self.leased.pop(job['id'], None)
+            if self.attempts[job['id']] < self.max_attempts:
+                print(Fore.YELLOW + f"[DIST] {worker} dropped {job['id']} - requeued")
+                self.pending.append(job)
+                self.cond.notify_all()
+                return
+        self._finish(job, {'id': job['id'], 'files': {}, 'error': f'lost {self.max_attempts} time(s) with its worker', 'worker': worker, 'seconds': 0.0})
+
+    def _serve(self, conn):
+        job = None
+        worker = '?'
+        try:
+            while True:
+                message = conn.recv()
+                worker = message.get('worker', worker)
+                if message.get('protocol') != DIST_PROTOCOL:
+                    conn.send({'op': 'stop', 'error': f"protocol {message.get('protocol')} is not {DIST_PROTOCOL} - update the worker"})
+                    break
+                with self.cond:
+                    self.workers[worker] = time.monotonic()
+                result = message.get('result')
+                if job is not None and result is not None and result['id'] == job['id']:
+                    with self.cond:
+                        self.leased.pop(job['id'], None)
+                    self._finish(job, result)
+                    job = None
+                job, reply = self._lease(worker)
+                conn.send(reply)
+                if reply['op'] == 'stop':
+                    break
+        except (EOFError, OSError):
+            pass
+        finally:
+            if job is not None:
+                self._release(job, worker)
+            with self.cond:
+                self.workers.pop(worker, None)
+            conn.close()
+
+def run_dist_worker(address, authkey=None, name=None, connect_timeout=30.0):
+    import socket
+    from multiprocessing.connection import Client
+    name = name or f'{socket.gethostname()}:{os.getpid()}'
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            conn = Client(address, authkey=authkey)
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+    completed = 0
+    result = None
+    with conn:
+        while True:
+            try:
+                conn.send({'op': 'next', 'protocol': DIST_PROTOCOL, 'worker': name, 'result': result})
+                reply = conn.recv()
+            except (EOFError, OSError):
+                break
+            result = None
+            if reply['op'] == 'stop':
+                if reply.get('error'):
+                    print(Fore.RED + f"[DIST] Coordinator refused {name}: {reply['error']}")
+                break
+            if reply['op'] == 'wait':
+                time.sleep(reply.get('seconds', 0.2))
+                continue
+            result = run_dist_job(reply['job'], name)
+            completed += 1
+            status = Fore.GREEN + '✓' if result['error'] is None else Fore.RED + f"✗ {result['error']}"
+            print(status + f" [DIST] {name} finished {result['id']} in {result['seconds']:.2f}s")
+    return completed
+
+def spawn_local_dist_workers(address, authkey, count, cache_url=None, no_build_cache=False, verbose=False):
+    host, port = address
+    if host in ('0.0.0.0', '', '::'):
+        host = '127.0.0.1'
+    command = [sys.executable, os.path.abspath(__file__)]
+    if cache_url:
+        command += ['--cache-url', cache_url]
+    if no_build_cache:
+        command.append('--no-build-cache')
+    env = dict(os.environ)
+    if authkey:
+        env[DIST_AUTHKEY_ENV] = authkey.decode('utf-8')
+    output = None if verbose else subprocess.DEVNULL
+    return [subprocess.Popen(command + ['dist-worker', f'{host}:{port}', '--name', f'local-{i + 1}'], env=env, stdout=output, stderr=output) for i in range(count)]
+
+def wait_for_dist_jobs(coordinator, procs, total):
+    reported = 0
+    idle_since = time.monotonic()
+    while not coordinator.wait(1.0):
+        done = len(coordinator.results)
+        if done != reported:
+            print(Fore.CYAN + f'[DIST] {done}/{total} unit(s) done, {coordinator.active_workers()} worker(s) connected')
+            reported = done
+        if coordinator.active_workers() or (procs and any((p.poll() is None for p in procs))):
+            idle_since = time.monotonic()
+        elif procs or time.monotonic() - idle_since > 300:
+            print(Fore.RED + '[DIST] ✗ No workers left to run the remaining units')
+            return False
+    return True
+
+def run_dist_build_command(args):
+    import secrets
+    if not os.path.isdir(args.folder):
+        print(Fore.RED + f'[ERROR] Not a folder: {args.folder}')
+        return 1
+    report = preflight_import_folder(args.folder)
+    print_preflight_report(report)
+    if not report['entries']:
+        print(Fore.RED + '[DIST] ✗ No usable PNGs')
+        return 1
+    if args.strict and (preflight_has_errors(report) or report['non_square'] or report['small']):
+        print(Fore.RED + '[DIST] ✗ Aborting because of preflight issues (--strict)')
+        return 1
+    try:
+        profile = get_export_profile(args.profile, args.skill)
+    except ValueError as e:
+        print(Fore.RED + f'[ERROR] {e}')
+        return 1
+    host, port = parse_dist_address(args.listen)
+    authkey = dist_authkey(args.authkey)
+    if authkey is None:
+        authkey = secrets.token_hex(16).encode('utf-8')
+        if host not in ('127.0.0.1', 'localhost'):
+            print(Fore.YELLOW + f"[DIST] Generated auth key for remote workers: {authkey.decode('utf-8')}")
+    dest = os.path.abspath(args.output_dir)
+    jobs = plan_dist_jobs(args.folder, report['entries'], dest, atlas_name=args.atlas_name, icons_per_atlas=args.icons_per_atlas, tile_size=args.tile_size, profile=profile, batch=args.batch, dedupe=not args.no_dedupe, mipmaps=not args.no_mipmaps)
+    started = time.perf_counter()
+    try:
+        coordinator = DistCoordinator(host, port, authkey, on_result=gather_dist_result)
+    except OSError as e:
+        print(Fore.RED + f'[ERROR] Cannot listen on {host}:{port}: {e}')
+        return 1
+    print(Fore.CYAN + f"[DIST] Coordinator on {coordinator.address[0]}:{coordinator.address[1]} - {len(jobs)} unit(s) for {len(report['entries'])} icon(s), output {dest}")
+    procs = spawn_local_dist_workers(coordinator.address, authkey, args.workers, args.cache_url, args.no_build_cache, args.verbose)
+    ok = False
+    try:
+        coordinator.submit(jobs)
+        ok = wait_for_dist_jobs(coordinator, procs, len(jobs))
+        if ok and args.zip and not coordinator.failures():
+            archive = os.path.basename(args.zip)
+            coordinator.submit([{'id': f'package:{archive}', 'kind': 'package', 'archive': archive, 'source_dir': dest, 'dest': os.path.dirname(os.path.abspath(args.zip))}])
+            ok = wait_for_dist_jobs(coordinator, procs, len(jobs) + 1)
+    except KeyboardInterrupt:
+        print(Fore.YELLOW + '[DIST] Interrupted')
+    finally:
+        coordinator.close()
+        for proc in procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    failures = coordinator.failures()
+    for result in failures:
+        print(Fore.RED + f"[DIST] ✗ {result['id']} ({result['worker'] or 'coordinator'}): {result['error']}")
+    per_worker = {}
+    for result in coordinator.results.values():
+        per_worker[result['worker']] = per_worker.get(result['worker'], 0) + 1
+    summary = ', '.join((f'{worker} x{count}' for worker, count in sorted(per_worker.items()) if worker))
+    color = Fore.GREEN if ok and not failures else Fore.RED
+    print(color + f'[DIST] {len(coordinator.results) - len(failures)}/{coordinator.submitted} unit(s) gathered in {time.perf_counter() - started:.1f}s ({summary})')
+    return 0 if ok and not failures else 1
+
+def run_dist_worker_command(args):
+    from multiprocessing import AuthenticationError
+    try:
+        address = parse_dist_address(args.coordinator)
+        completed = run_dist_worker(address, dist_authkey(args.authkey), args.name, args.connect_timeout)
+    except AuthenticationError as e:
+        print(Fore.RED + f'[ERROR] Coordinator {args.coordinator} rejected the auth key ({e}) - pass the same --authkey or ${DIST_AUTHKEY_ENV}')
+        return 1
+    except (OSError, EOFError) as e:
+        print(Fore.RED + f'[ERROR] Cannot reach coordinator {args.coordinator}: {e}')
+        return 1
+    except Exception as e:
+        print(Fore.RED + f'[ERROR] Worker stopped: {e}')
+        return 1
+    print(Fore.GREEN + f'[DIST] Worker done - {completed} unit(s) processed')
+    return 0
+
+def run_diff_command(args):
+    mode = 'mod_project' if args.game_dir else 'standalone'
+    start = time.perf_counter()
+    try:
+        old = load_diff_side(args.old, args.game_dir, mode, args.old_dds)
+        new = load_diff_side(args.new, args.game_dir, mode, args.new_dds)
+    except (FileNotFoundError, RuntimeError, OSError) as e:
+        print(Fore.RED + f'[ERROR] {e}')
+        return 2
+    result = diff_atlases(old, new)
+    elapsed = time.perf_counter() - start
+    if result['rescaled']:
+        print(Fore.YELLOW + f"[DIFF] Tile size changed ({old['tile_size']} -> {new['tile_size']}), every shared icon counts as changed")
+    for mapkey in result['added']:
+        print(Fore.GREEN + f'[DIFF] + {mapkey}')
+    for mapkey in result['removed']:
+        print(Fore.RED + f'[DIFF] - {mapkey}')
+    for move in result['moved']:
+        print(Fore.CYAN + f"[DIFF] > {move['mapkey']}: slot {tuple(move['from'])} -> {tuple(move['to'])}" + (' (pixels changed)' if move['changed'] else ''))
+    moved_keys = set((m['mapkey'] for m in result['moved']))
+    for mapkey in result['changed']:
+        if mapkey not in moved_keys:
+            print(Fore.YELLOW + f'[DIFF] ~ {mapkey}')
+    print(Fore.CYAN + f"[DIFF] {len(result['added'])} added, {len(result['removed'])} removed, {len(result['moved'])} moved, {len(result['changed'])} pixel-changed, {result['unchanged']} unchanged ({elapsed:.2f}s)")
+    if args.sheet:
+        if render_diff_sheet(old, new, result, args.sheet):
+            print(Fore.GREEN + f'[DIFF] ✓ Contact sheet written: {args.sheet}')
+        else:
+            print(Fore.GREEN + '[DIFF] No changed tiles - contact sheet skipped')
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(dict(result, old=args.old, new=args.new), f, indent=2)
+    if args.fail_on_change and atlas_diff_has_changes(result):
+        return 1
+    return 0
+
+def run_pak_command(args):
+    import lspk
+    start = time.perf_counter()
+    try:
+        paks = lspk.PakSet(args.paks)
+    except (lspk.PakError, OSError) as e:
+        print(Fore.RED + f'[ERROR] {e}')
+        return 2
+    with paks:
+        print(Fore.CYAN + f"[PAK] Indexed {sum((len(reader) for reader in paks.readers))} entries in {len(paks.readers)} package(s) ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        if args.list:
+            for name in paks.names(args.list):
+                print(name)
+        try:
+            for name in args.extract or []:
+                start = time.perf_counter()
+                dest_path = extract_pak_entry(paks, name, args.dest or os.path.join(ensure_temp_dir(), 'pak_cache'))
+                print(Fore.GREEN + f'[PAK] ✓ {name} -> {dest_path} ({(time.perf_counter() - start) * 1000:.1f} ms)')
+            for lsx_entry in args.atlas or []:
+                start = time.perf_counter()
+                result = extract_pak_atlas(paks, lsx_entry, args.dest)
+                print(Fore.GREEN + f"[PAK] ✓ {lsx_entry}: {result['icons']} icons, texture {result['dds_entry']} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+                print(Fore.GREEN + f"[PAK]   {result['lsx_path']}")
+                print(Fore.GREEN + f"[PAK]   {result['dds_path']}")
+        except (lspk.PakError, FileNotFoundError, RuntimeError, KeyError, OSError) as e:
+            print(Fore.RED + f'[ERROR] {e}')
+            return 1
+    return 0
+
+def convert_atlas_resource(src_path, dest_path, compression='zlib'):
+    import lsf
+    import lspk
+    if is_lsf_path(src_path):
+        resource = lsf.read_lsf(src_path)
+    else:
+        resource = lsf.resource_from_dom(minidom.parse(src_path))
+    if is_lsf_path(dest_path):
+        lsf.write_lsf(resource, dest_path, compression=lspk.COMPRESSION_ZLIB if compression == 'zlib' else lspk.COMPRESSION_NONE)
+    else:
+        write_lsx(lsf.resource_to_dom(resource), dest_path)
+    return resource
+
+def run_convert_command(args):
+    import lsf
+    failed = 0
+    for src_path in args.files:
+        dest_path = os.path.splitext(src_path)[0] + ('.lsx' if is_lsf_path(src_path) else '.lsf')
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            dest_path = os.path.join(args.output_dir, os.path.basename(dest_path))
+        start = time.perf_counter()
+        try:
+            convert_atlas_resource(src_path, dest_path, args.compression)
+        except (lsf.LsfError, ExpatError, OSError) as e:
+            print(Fore.RED + f'[ERROR] {src_path}: {e}')
+            failed += 1
+            continue
+        print(Fore.GREEN + f'[CONVERT] ✓ {src_path} ({os.path.getsize(src_path)} bytes) -> {dest_path} ({os.path.getsize(dest_path)} bytes, {(time.perf_counter() - start) * 1000:.1f} ms)')
+    return 1 if failed else 0
+
+def run_quality_command(args):
+    sources = load_quality_sources(args.golden)
+    if not sources:
+        print(Fore.RED + f"[ERROR] No square PNGs in {os.path.join(args.golden, 'source')}")
+        return 1
+    reference_dir = os.path.join(args.golden, 'reference')
+    print(Fore.CYAN + f'[QUALITY] {len(sources)} source icon(s), resize={args.resize}, encode={args.encode}')
+    try:
+        rendered = render_quality_set(sources, RESIZE_ENGINES[args.resize], ENCODE_ENGINES[args.encode])
+    except FileNotFoundError as e:
+        print(Fore.RED + f'[ERROR] encode={args.encode}: {e}')
+        return 1
+    if args.record:
+        for rel_path, im in rendered.items():
+            out_path = os.path.join(reference_dir, *rel_path.split('/'))
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            im.save(out_path, 'PNG')
+        print(Fore.GREEN + f'[QUALITY] ✓ Recorded {len(rendered)} reference image(s) in {reference_dir}')
+        return 0
+    results = {}
+    failures = 0
+    for rel_path, im in rendered.items():
+        ref_path = os.path.join(reference_dir, *rel_path.split('/'))
+        if not os.path.exists(ref_path):
+            print(Fore.RED + f'[QUALITY] Missing reference: {rel_path} (run with --record first)')
+            failures += 1
+            continue
+        with Image.open(ref_path) as ref:
+            try:
+                metrics = image_quality_metrics(ref, im)
+            except ValueError as e:
+                print(Fore.RED + f'[QUALITY] {rel_path}: {e}')
+                failures += 1
+                continue
+        failed = metrics['psnr'] < args.min_psnr or metrics['ssim'] < args.min_ssim or metrics['alpha_mean'] > args.max_alpha_error
+        failures += failed
+        metrics['failed'] = failed
+        results[rel_path] = metrics
+        color = Fore.RED if failed else Fore.GREEN
+        print(color + f"[QUALITY] {rel_path}: PSNR {metrics['psnr']:.2f} dB, SSIM {metrics['ssim']:.4f}, alpha err {metrics['alpha_mean']:.2f} mean / {metrics['alpha_max']:.0f} max")
+    if results:
+        worst = min(results.values(), key=lambda m: m['psnr'])
+        print(Fore.CYAN + f"[QUALITY] Worst PSNR {worst['psnr']:.2f} dB, lowest SSIM {min((m['ssim'] for m in results.values())):.4f}, worst alpha err {max((m['alpha_mean'] for m in results.values())):.2f}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'resize': args.resize, 'encode': args.encode, 'results': results}, f, indent=2)
+    if failures:
+        print(Fore.RED + f'[QUALITY] ✗ {failures} image(s) outside thresholds (PSNR >= {args.min_psnr}, SSIM >= {args.min_ssim}, alpha err <= {args.max_alpha_error})')
+        return 1
+    print(Fore.GREEN + f'[QUALITY] ✓ All {len(results)} image(s) within thresholds')
+    return 0
+
+SERVICE_DEFAULT_PORT = 8767
+SERVICE_TOKEN_ENV = 'ICONMANAGER_SERVICE_TOKEN'
+SERVICE_JOB_HISTORY = 256
+SERVICE_MAX_REQUEST = 16 * 1024 * 1024
+SERVICE_HEARTBEAT = 15.0
+SERVICE_LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+class ServiceError(Exception):
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+class IconService:
+
+    def __init__(self, atlas_cache_mb=512, workers=1):
+        self.atlases = LRUCache(atlas_cache_mb * 1024 * 1024, atlas_entry_nbytes, 'service atlases')
+        self.atlas_locks = {}
+        self.decode_lock = threading.Lock()
+        self.lock = threading.Condition()
+        self.queue = []
+        self.jobs = OrderedDict()
+        self.next_job = 1
+        self.started = time.time()
+        self.calls = 0
+        self.running = True
+        self.methods = {'ping': self.ping, 'cache.stats': self.cache_stats, 'cache.drop': self.cache_drop, 'atlas.info': self.atlas_info, 'atlas.icons': self.atlas_icons, 'atlas.tile': self.atlas_tile, 'jobs.list': self.jobs_list, 'jobs.status': self.job_status, 'jobs.cancel': self.job_cancel}
+        self.job_methods = {'atlas.load': self.job_atlas_load, 'atlas.delete': self.job_atlas_delete, 'resize': self.job_resize, 'lint': self.job_lint}
+        self.threads = [threading.Thread(target=self._work, name=f'service-job-{i + 1}', daemon=True) for i in range(max(workers, 1))]
+        for thread in self.threads:
+            thread.start()
+
+    def close(self):
+        with self.lock:
+            self.running = False
+            self.lock.notify_all()
+
+    def handle_rpc(self, request):
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str):
+            return {'jsonrpc': '2.0', 'id': request.get('id') if isinstance(request, dict) else None, 'error': {'code': -32600, 'message': 'invalid JSON-RPC 2.0 request'}}
+        params = request.get('params') or {}
+        try:
+            if not isinstance(params, dict):
+                raise ServiceError(-32602, 'params must be an object')
+            result = self.call(request['method'], dict(params))
+        except ServiceError as e:
+            error = {'code': e.code, 'message': str(e)}
+        except (TypeError, ValueError, KeyError, re.error) as e:
+            error = {'code': -32602, 'message': f'{type(e).__name__}: {e}'}
+        except Exception as e:
+            print(Fore.RED + f"[SERVICE] {request['method']} failed: {e}")
+            error = {'code': -32000, 'message': f'{type(e).__name__}: {e}'}
+        else:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'result': result} if 'id' in request else None
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': error} if 'id' in request else None
+
+    def call(self, method, params):
+        self.calls += 1
+        priority = params.pop('priority', 0)
+        if method in self.job_methods:
+            return self.submit(method, params, priority)
+        if method not in self.methods:
+            raise ServiceError(-32601, f'unknown method {method!r}')
+        with profile_operation(f'serve_{method}'):
+            return self.methods[method](**params)
+
+    def submit(self, method, params, priority=0):
+        import inspect
+        inspect.signature(self.job_methods[method]).bind(None, **params)
+        with self.lock:
+            job = {'id': str(self.next_job), 'method': method, 'params': params, 'priority': int(priority), 'state': 'queued', 'events': [], 'result': None, 'error': None, 'submitted': time.time(), 'started': None, 'finished': None}
+            self.next_job += 1
+            self.jobs[job['id']] = job
+            heapq.heappush(self.queue, (-job['priority'], int(job['id']), job['id']))
+            self._emit(job, 'queued', queued=len(self.queue))
+            self._trim()
+        return self.job_view(job)
+
+    def _emit(self, job, event, **data):
+        job['events'].append(dict(seq=len(job['events']), event=event, time=round(time.time() - job['submitted'], 3), **data))
+        self.lock.notify_all()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job['finished'] is not None]
+        for job_id in finished[:max(len(finished) - SERVICE_JOB_HISTORY, 0)]:
+            del self.jobs[job_id]
+
+    def _work(self):
+        while True:
+            with self.lock:
+                while self.running and (not self.queue):
+                    self.lock.wait()
+                if not self.running:
+                    return
+                job = self.jobs.get(heapq.heappop(self.queue)[2])
+                if job is None or job['state'] != 'queued':
+                    continue
+                job['state'] = 'running'
+                job['started'] = time.time()
+                self._emit(job, 'started')
+
+            def progress(done, total, message='', job=job):
+                with self.lock:
+                    self._emit(job, 'progress', done=done, total=total, message=message)
+            try:
+                with profile_operation(f"serve_{job['method']}"):
+                    result, error = (self.job_methods[job['method']](progress, **job['params']), None)
+            except Exception as e:
+                print(Fore.RED + f"[SERVICE] Job {job['id']} ({job['method']}) failed: {e}")
+                result, error = (None, f'{type(e).__name__}: {e}')
+            with self.lock:
+                job.update(state='failed' if error else 'done', result=result, error=error, finished=time.time())
+                if error:
+                    self._emit(job, 'failed', error=error)
+                else:
+                    self._emit(job, 'done', elapsed_ms=round((job['finished'] - job['started']) * 1000, 1))
+                self._trim()
+
+    def job_view(self, job, result=False):
+        view = {key: job[key] for key in ('id', 'method', 'priority', 'state', 'error', 'submitted', 'started', 'finished')}
+        view['progress'] = next((event for event in reversed(job['events']) if event['event'] == 'progress'), None)
+        if result:
+            view['result'] = job['result']
+        return view
+
+    def find_job(self, job_id):
+        job = self.jobs.get(str(job_id))
+        if job is None:
+            raise ServiceError(-32602, f'unknown job {job_id}')
+        return job
+
+    def job_events(self, job_id, since=0, timeout=SERVICE_HEARTBEAT):
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            job = self.find_job(job_id)
+            while len(job['events']) <= since and job['finished'] is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.lock.wait(remaining)
+            return (job['events'][since:], job['finished'] is not None)
+
+    def jobs_list(self):
+        with self.lock:
+            return [self.job_view(job) for job in self.jobs.values()]
+
+    def job_status(self, job_id):
+        with self.lock:
+            return self.job_view(self.find_job(job_id), result=True)
+
+    def job_cancel(self, job_id):
+        with self.lock:
+            job = self.find_job(job_id)
+            if job['state'] != 'queued':
+                return False
+            job.update(state='cancelled', finished=time.time())
+            self._emit(job, 'cancelled')
+            return True
+
+    def atlas_lock(self, lsx):
+        with self.lock:
+            return self.atlas_locks.setdefault(atlas_workspace_key(lsx), threading.RLock())
+
+    def atlas_entry(self, lsx, game_dir=None, decode=True):
+        key = atlas_workspace_key(lsx)
+        entry = self.atlases.get(key, validate=atlas_entry_is_current)
+        if entry is None or entry['game_dir'] != game_dir:
+            entry = load_atlas_entry(lsx, game_dir, 'mod_project' if game_dir else 'standalone')
+            if entry is None:
+                raise ServiceError(-32602, f'cannot parse atlas {lsx}')
+            if not entry['atlas_path'] or not os.path.exists(entry['atlas_path']):
+                raise ServiceError(-32602, f'cannot resolve the atlas DDS for {lsx}')
+            entry['stamp'] = atlas_file_stamp(entry['lsx_path'], entry['atlas_path'])
+            self.atlases.put(key, entry)
+        if decode and entry['atlas_im'] is None:
+            with self.decode_lock:
+                decode_atlas_entry(entry)
+            self.atlases.resize(key)
+        return entry
+
+    def ping(self):
+        with self.lock:
+            states = [job['state'] for job in self.jobs.values()]
+        return {'version': VERSION, 'pid': os.getpid(), 'uptime_s': round(time.time() - self.started, 1), 'calls': self.calls, 'texconv': get_texconv_path(), 'atlases': len(self.atlases), 'queued': states.count('queued'), 'running': states.count('running')}
+
+    def cache_stats(self):
+        with self.atlases.lock:
+            entries = [{'lsx': entry['lsx_path'], 'icons': len(entry['icons']), 'decoded': entry['atlas_im'] is not None, 'bytes': self.atlases.sizes[key]} for key, entry in self.atlases.entries.items()]
+        return {'atlases': entries, 'bytes': self.atlases.current_bytes, 'max_bytes': self.atlases.max_bytes, 'hits': self.atlases.hits, 'misses': self.atlases.misses, 'evictions': self.atlases.evictions}
+
+    def cache_drop(self, lsx=None):
+        if lsx:
+            return int(self.atlases.pop(atlas_workspace_key(lsx)) is not None)
+        count = len(self.atlases)
+        self.atlases.clear()
+        return count
+
+    def atlas_info(self, lsx, game_dir=None):
+        with self.atlas_lock(lsx):
+            entry = self.atlas_entry(lsx, game_dir, decode=False)
+            return {'lsx': entry['lsx_path'], 'atlas_path': entry['atlas_path'], 'atlas_size': entry['atlas_size'], 'tile_size': entry['tile_size'], 'icons': len(entry['icons']), 'decoded': entry['atlas_im'] is not None}
+
+    def atlas_icons(self, lsx, game_dir=None, names=(), globs=(), regex=None):
+        with self.atlas_lock(lsx):
+            icons = self.atlas_entry(lsx, game_dir, decode=False)['icons']
+            if not (names or globs or regex):
+                return list(icons)
+            selected = set(select_mapkeys([icon['mapkey'] for icon in icons], names, globs, regex)[0])
+            return [icon for icon in icons if icon['mapkey'] in selected]
+
+    def atlas_tile(self, lsx, mapkey, game_dir=None, size=None, output=None):
+        import base64
+        import io
+        with self.atlas_lock(lsx):
+            entry = self.atlas_entry(lsx, game_dir)
+            icon = next((icon for icon in entry['icons'] if icon['mapkey'] == mapkey), None)
+            if icon is None:
+                raise ServiceError(-32602, f'{mapkey} is not in {lsx}')
+            x, y = (int(round(icon['u1'] * entry['atlas_size'])), int(round(icon['v1'] * entry['atlas_size'])))
+            tile = entry['atlas_im'].crop((x, y, x + entry['tile_size'], y + entry['tile_size']))
+        if size and size != tile.size[0]:
+            tile = resize_with_alpha(tile, (size, size), Image.BICUBIC)
+        if output:
+            tile.save(output, 'PNG')
+            return {'path': output, 'size': tile.size[0]}
+        buffer = io.BytesIO()
+        tile.save(buffer, 'PNG')
+        return {'png': base64.b64encode(buffer.getvalue()).decode('ascii'), 'size': tile.size[0]}
+
+    def job_atlas_load(self, progress, lsx, game_dir=None):
+        progress(0, 1, f'decoding {os.path.basename(lsx)}')
+        info = self.atlas_info(lsx, game_dir)
+        with self.atlas_lock(lsx):
+            self.atlas_entry(lsx, game_dir)
+        return dict(info, decoded=True)
+
+    def job_atlas_delete(self, progress, lsx, keys=(), globs=(), regex=None, tier_roots=(), game_dir=None, dry_run=False):
+        key = atlas_workspace_key(lsx)
+        with self.atlas_lock(lsx):
+            entry = self.atlas_entry(lsx, game_dir, decode=not dry_run)
+            selected, missing = select_mapkeys([icon['mapkey'] for icon in entry['icons']], keys, globs, regex)
+            if dry_run or not selected:
+                return {'selected': selected, 'missing': missing, 'written': False}
+            progress(0, 2, f'deleting {len(selected)} icon(s)')
+            try:
+                report = bulk_delete_icons(entry['dom'], entry['icons'], entry['atlas_im'], selected, entry['atlas_size'] // entry['tile_size'], entry['tile_size'], tier_roots=tier_roots)
+                entry['icons'][:] = [icon for icon in entry['icons'] if icon['mapkey'] not in set(report['removed'])]
+                progress(1, 2, 'writing atlas')
+                write_atlas_pair(entry['dom'], entry['atlas_im'], entry['lsx_path'], entry['atlas_path'], entry['tile_size'], 'delete')
+            except Exception:
+                self.atlases.pop(key)
+                raise
+            entry['stamp'] = atlas_file_stamp(entry['lsx_path'], entry['atlas_path'])
+            self.atlases.resize(key)
+        progress(2, 2, 'done')
+        return {'selected': selected, 'missing': missing, 'written': True, 'cleared': len(report['cleared']), 'files': report['files'], 'errors': report['errors']}
+
+    def job_resize(self, progress, png, dest_dir, output_name=None, profile=None, skill=False, mipmaps=True):
+        pngs = [png] if isinstance(png, str) else list(png)
+        if output_name and len(pngs) > 1:
+            raise ValueError('output_name only applies to a single PNG')
+        for done, path in enumerate(pngs):
+            progress(done, len(pngs), os.path.basename(path))
+            resize_png(path, skill_mode=skill, dest_dir=dest_dir, output_name=output_name, mipmaps=mipmaps, profile=profile)
+        progress(len(pngs), len(pngs), 'done')
+        return {'resized': len(pngs), 'dest_dir': dest_dir}
+
+    def job_lint(self, progress, roots=(), game_dir=None, mod=None, profile=None, repair=False, png_dir=None, prune_orphans=False):
+        roots, tier_root, mode = lint_targets(roots, game_dir, mod)
+        progress(0, 2 if repair else 1, 'linting')
+        report = lint_mod(roots, game_dir, mode, profile, tier_root)
+        if repair and (report['tiers'] or (prune_orphans and report['orphans'])):
+            progress(1, 2, f"repairing {len(report['tiers'])} tier issue(s)")
+            result = repair_lint_issues(report, png_dir, prune_orphans)
+            report = lint_mod(roots, game_dir, mode, profile, tier_root)
+            report['repair'] = result
+        return report
+
+def make_service_server(service, host='127.0.0.1', port=SERVICE_DEFAULT_PORT, token=None):
+    import hmac
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+    events_re = re.compile('^/v1/jobs/([0-9]+)/events$')
+
+    class ServiceRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def authorized(self):
+            origin = self.headers.get('Origin')
+            if origin and urlsplit(origin).hostname not in SERVICE_LOCAL_HOSTS:
+                self.reply(403, {'error': 'cross-origin requests are not accepted'})
+                return False
+            if not token and urlsplit(f"http://{self.headers.get('Host', '')}").hostname not in SERVICE_LOCAL_HOSTS:
+                self.reply(403, {'error': 'Host must be localhost when the service runs without a token'})
+                return False
+            if token and (not hmac.compare_digest(self.headers.get('Authorization', '').encode('utf-8'), f'Bearer {token}'.encode('utf-8'))):
+                self.reply(401, {'error': 'missing or wrong service token'})
+                return False
+            return True
+
+        def reply(self, status, payload=None):
+            body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            if status >= 400:
+                self.send_header('Connection', 'close')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def write_chunk(self, payload):
+            data = (json.dumps(payload) + '\n').encode('utf-8')
+            self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+
+        def do_POST(self):
+            if not self.authorized():
+                return
+            if urlsplit(self.path).path != '/rpc':
+                self.reply(404, {'error': 'POST JSON-RPC requests to /rpc'})
+                return
+            if self.headers.get('Content-Type', '').split(';')[0].strip().lower() != 'application/json':
+                self.reply(415, {'error': 'Content-Type must be application/json'})
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0 or length > SERVICE_MAX_REQUEST:
+                self.reply(413 if length > 0 else 411, {'error': 'request body missing or too large'})
+                return
+            try:
+                request = json.loads(self.rfile.read(length))
+            except ValueError:
+                self.reply(200, {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'parse error'}})
+                return
+            if isinstance(request, list):
+                response = [reply for reply in map(service.handle_rpc, request) if reply is not None] or None
+            else:
+                response = service.handle_rpc(request)
+            if response is None:
+                self.reply(204)
+            else:
+                self.reply(200, response)
+
+        def do_GET(self):
+            if not self.authorized():
+                return
+            parts = urlsplit(self.path)
+            if parts.path == '/v1/health':
+                self.reply(200, service.ping())
+                return
+            match = events_re.match(parts.path)
+            if match is None or match.group(1) not in service.jobs:
+                self.reply(404, {'error': 'unknown job'})
+                return
+            since = int(parse_qs(parts.query).get('since', ['0'])[0])
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                finished = False
+                while not finished:
+                    events, finished = service.job_events(match.group(1), since)
+                    for event in events:
+                        self.write_chunk(event)
+                    since += len(events)
+                    if not events and (not finished):
+                        self.write_chunk({'event': 'heartbeat'})
+                self.wfile.write(b'0\r\n\r\n')
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            print(Fore.GREEN + f'[SERVICE] {self.address_string()} {format % args}')
+    return ThreadingHTTPServer((host, port), ServiceRequestHandler)
+
+class ServiceClient:
+
+    def __init__(self, url=None, token=None, timeout=60.0):
+        self.url = (url or f'http://127.0.0.1:{SERVICE_DEFAULT_PORT}').rstrip('/')
+        self.token = token or os.environ.get(SERVICE_TOKEN_ENV)
+        self.timeout = timeout
+        self.next_id = 0
+
+    def _open(self, path, data=None):
+        import urllib.request
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return urllib.request.urlopen(urllib.request.Request(self.url + path, data=data, headers=headers), timeout=self.timeout)
+
+    def call(self, method, **params):
+        self.next_id += 1
+        body = json.dumps({'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params}).encode('utf-8')
+        with self._open('/rpc', body) as response:
+            reply = json.loads(response.read())
+        if 'error' in reply:
+            raise ServiceError(reply['error']['code'], reply['error']['message'])
+        return reply['result']
+
+    def events(self, job_id, since=0):
+        with self._open(f'/v1/jobs/{job_id}/events?since={since}') as response:
+            for line in response:
+                event = json.loads(line) if line.strip() else None
+                if event and event['event'] != 'heartbeat':
+                    yield event
+
+    def run(self, method, priority=0, on_event=None, **params):
+        job = self.call(method, priority=priority, **params)
+        for event in self.events(job['id']):
+            if on_event:
+                on_event(event)
+        status = self.call('jobs.status', job_id=job['id'])
+        if status['state'] != 'done':
+            raise ServiceError(-32000, status['error'] or f"job {job['id']} was {status['state']}")
+        return status['result']
+
+def run_serve_command(args):
+    token = args.token or os.environ.get(SERVICE_TOKEN_ENV)
+    if args.host not in SERVICE_LOCAL_HOSTS and (not token):
+        print(Fore.RED + f'[ERROR] Refusing to listen on {args.host} without --token (or ${SERVICE_TOKEN_ENV})')
+        return 1
+    get_texconv_path()
+    service = IconService(args.atlas_cache_mb, args.workers)
+    try:
+        server = make_service_server(service, args.host, args.port, token)
+    except OSError as e:
+        print(Fore.RED + f'[ERROR] Cannot listen on {args.host}:{args.port}: {e}')
+        service.close()
+        return 1
+    for lsx in args.preload or []:
+        service.submit('atlas.load', {'lsx': lsx, 'game_dir': args.game_dir}, priority=-1)
+    print(Fore.CYAN + f'[SERVICE] JSON-RPC on http://{args.host}:{server.server_address[1]}/rpc, job progress at /v1/jobs/<id>/events ({args.workers} job worker(s)) - press Ctrl+C to stop')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+def run_rpc_command(args):
+    try:
+        params = json.loads(args.params) if args.params else {}
+    except ValueError as e:
+        print(Fore.RED + f'[ERROR] params is not valid JSON: {e}')
+        return 1
+    client = ServiceClient(args.url, args.token, args.timeout)
+    try:
+        if args.follow:
+            result = client.run(args.method, args.priority, lambda event: print(Fore.CYAN + f"[RPC] {event['event']}" + (f" {event['done']}/{event['total']} {event['message']}" if event['event'] == 'progress' else '')), **params)
+        else:
+            result = client.call(args.method, priority=args.priority, **params)
+    except ServiceError as e:
+        print(Fore.RED + f'[ERROR] {args.method}: {e} (code {e.code})')
+        return 1
+    except OSError as e:
+        print(Fore.RED + f'[ERROR] Cannot reach the service at {client.url}: {e}')
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+def load_prefs_file():
+    prefs_file = os.path.join(os.path.dirname(__file__), 'preferences.json')
+    if os.path.exists(prefs_file):
+        with open(prefs_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def build_arg_parser():
+    import argparse
+    parser = argparse.ArgumentParser(description=f'BG3 Icon Tool v{VERSION}. Run without a command to start the GUI.')
+    parser.add_argument('--cache-url', help='Shared build cache server (GET/PUT /v1/artifacts/<key>), overrides build_cache_url in preferences')
+    parser.add_argument('--profiling', action='store_true', help='Write cProfile .pstats and tracemalloc .alloc.txt reports for the command next to the session log')
+    parser.add_argument('--no-build-cache', action='store_true', help='Encode everything from scratch without reading or writing the build cache')
+    subparsers = parser.add_subparsers(dest='command')
+    watch = subparsers.add_parser('watch', help='Watch an import folder and keep tiers and an atlas in sync')
+    watch.add_argument('folder', help='Folder with source PNGs (e.g. 1000x1000 artwork)')
+    watch.add_argument('--lsx', help='Atlas .lsx to update; new MapKeys are added to free slots')
+    watch.add_argument('--dest', help='Mod GUI folder receiving the resized tier DDS files')
+    watch.add_argument('--game-dir', help='BG3 Data folder, used to resolve the atlas DDS in mod project layout')
+    watch.add_argument('--skill', action='store_true', help='Export skill tiers instead of item tiers')
+    watch.add_argument('--prefix', default='', help='MapKey prefix applied to file names')
+    watch.add_argument('--debounce', type=float, default=1.5, help='Seconds a file must be quiet before it is processed')
+    watch.add_argument('--interval', type=float, default=0.5, help='Polling interval in seconds')
+    watch.add_argument('--backend', choices=['auto', 'native', 'polling'], default='auto', help='native uses watchdog (inotify/ReadDirectoryChanges) when installed')
+    watch.set_defaults(func=run_watch_command)
+    build = subparsers.add_parser('build', help='Build a new atlas from a folder of PNGs after a header-only preflight scan')
+    build.add_argument('folder', help='Folder with source PNGs; file names become MapKeys')
+    build.add_argument('--output', help='Output atlas .dds (the .lsx is written next to it); defaults to <folder>/New_Atlas.dds')
+    build.add_argument('--atlas-size', type=int, help='Atlas size in pixels; defaults to the smallest power of two (min 512) that fits')
+    build.add_argument('--tile-size', type=int, default=64, help='Icon tile size in pixels')
+    build.add_argument('--no-dedupe', action='store_true', help='Give every file its own slot even when pixels are identical')
+    build.add_argument('--dry-run', action='store_true', help='Only run the preflight scan; exit 1 when files are unreadable, collide or do not fit')
+    build.add_argument('--strict', action='store_true', help='Also treat non-square and undersized PNGs as errors')
+    build.set_defaults(func=run_build_command)
+    delete = subparsers.add_parser('delete', help='Remove many icons from an atlas in one pass (by name, list file, glob or regex)')
+    delete.add_argument('lsx', help='Atlas .lsx/.lsf to edit in place')
+    delete.add_argument('keys', nargs='*', help='MapKeys to remove')
+    delete.add_argument('--from-file', help='Text file with one MapKey per line (# comments allowed)')
+    delete.add_argument('--glob', action='append', default=[], help="Shell-style MapKey pattern, e.g. 'Old_*' (repeatable)")
+    delete.add_argument('--regex', help='Remove every MapKey this regular expression matches (re.search)')
+    delete.add_argument('--tiers-root', action='append', help='Mod GUI folder whose tier DDS files for the removed MapKeys are deleted too (repeatable)')
+    delete.add_argument('--game-dir', help='BG3 Data folder, used to resolve the atlas DDS in mod project layout')
+    delete.add_argument('--dry-run', action='store_true', help='Only list the selected MapKeys')
+    delete.set_defaults(func=run_delete_command)
+    lint = subparsers.add_parser('lint', help='Check every atlas MapKey for complete, correctly sized and encoded tiers (DDS headers only) and a sane UV layout')
+    lint.add_argument('roots', nargs='*', help='Mod GUI folder(s) holding atlas .lsx files and tier folders')
+    lint.add_argument('--game-dir', help='BG3 Data folder; with --mod, lints Public/<mod>/GUI and Mods/<mod>/GUI')
+    lint.add_argument('--mod', help='Mod folder name under --game-dir')
+    lint.add_argument('--profile', help='Check every MapKey against this export profile (default: pick items/skills per MapKey from the tiers present)')
+    lint.add_argument('--repair', action='store_true', help='Regenerate only the missing or mismatched tiers, then lint again')
+    lint.add_argument('--png-dir', help='Source PNGs named <MapKey>.png for --repair; otherwise the largest healthy tier or the atlas tile is used')
+    lint.add_argument('--prune-orphans', action='store_true', help='With --repair, delete tier DDS files no atlas references')
+    lint.add_argument('--report', help='Write the findings as JSON')
+    lint.set_defaults(func=run_lint_command)
+    compact = subparsers.add_parser('compact', help='Repack an atlas into contiguous slots and shrink it to the smallest power-of-two size')
+    compact.add_argument('lsx', nargs='+', help='Atlas .lsx file(s) to compact in place')
+    compact.add_argument('--game-dir', help='BG3 Data folder, used to resolve the atlas DDS in mod project layout')
+    compact.add_argument('--min-size', type=int, help='Never shrink below this atlas size (pixels)')
+    compact.add_argument('--dry-run', action='store_true', help='Report the new layout without writing anything')
+    compact.set_defaults(func=run_compact_command)
+    diff = subparsers.add_parser('diff', help='Report added, removed, moved and pixel-changed icons between two atlas versions')
+    diff.add_argument('old', help='Old atlas .lsx')
+    diff.add_argument('new', help='New atlas .lsx')
+    diff.add_argument('--old-dds', help='Override the DDS resolved from the old .lsx')
+    diff.add_argument('--new-dds', help='Override the DDS resolved from the new .lsx')
+    diff.add_argument('--game-dir', help='BG3 Data folder, used to resolve the atlas DDS in mod project layout')
+    diff.add_argument('--sheet', help='Write a side-by-side PNG contact sheet (old | new) of the changed tiles')
+    diff.add_argument('--report', help='Write the diff as JSON')
+    diff.add_argument('--fail-on-change', action='store_true', help='Exit with status 1 when anything differs')
+    diff.set_defaults(func=run_diff_command)
+    pak = subparsers.add_parser('pak', help='List and extract entries from BG3 .pak archives without unpacking them')
+    pak.add_argument('paks', nargs='+', help='.pak file(s); higher-priority packages win when entries overlap')
+    pak.add_argument('--list', metavar='PATTERN', help='List entries matching a glob, e.g. "public/*/gui/*.lsx"')
+    pak.add_argument('--extract', action='append', metavar='ENTRY', help='Extract one entry (repeatable)')
+    pak.add_argument('--atlas', action='append', metavar='LSX', help='Extract an atlas .lsx entry together with the DDS it references (repeatable)')
+    pak.add_argument('--dest', help='Extraction folder, mirrors the package layout (default: temp/pak_cache)')
+    pak.set_defaults(func=run_pak_command)
+    convert = subparsers.add_parser('convert', help='Convert atlas resources between XML .lsx and binary .lsf')
+    convert.add_argument('files', nargs='+', help='.lsx files become .lsf and .lsf files become .lsx, next to the source')
+    convert.add_argument('--output-dir', help='Write the converted files here instead')
+    convert.add_argument('--compression', choices=('zlib', 'none'), default='zlib', help='Section compression for written .lsf files')
+    convert.set_defaults(func=run_convert_command)
+    quality = subparsers.add_parser('quality', help='Compare a resize/encode engine against the reference output of a golden icon set')
+    quality.add_argument('golden', help='Folder with source/*.png; reference images are kept in <golden>/reference')
+    quality.add_argument('--record', action='store_true', help='Write the reference images with the chosen engines instead of checking')
+    quality.add_argument('--resize', choices=sorted(RESIZE_ENGINES), default='reference', help='reference is resize_with_alpha (bicubic, multi-stage)')
+    quality.add_argument('--encode', choices=sorted(ENCODE_ENGINES), default='texconv', help='texconv (BC7 tiers, BC3 atlas), the Pillow DXT5 fallback, or none')
+    quality.add_argument('--min-psnr', type=float, default=38.0, help='Minimum PSNR in dB on alpha-premultiplied RGB')
+    quality.add_argument('--min-ssim', type=float, default=0.97, help='Minimum mean SSIM on premultiplied luma')
+    quality.add_argument('--max-alpha-error', type=float, default=2.0, help='Maximum mean absolute alpha error (0-255)')
+    quality.add_argument('--report', help='Write per-image metrics to this JSON file')
+    quality.set_defaults(func=run_quality_command)
+    dist_build = subparsers.add_parser('dist-build', help='Coordinate an atlas, tier and packaging build across local and remote worker processes')
+    dist_build.add_argument('folder', help='Folder with source PNGs; file names become MapKeys')
+    dist_build.add_argument('--output-dir', required=True, help='Mod GUI folder that gathered atlases (.lsx + Assets/Textures/Icons/*.dds) and tier DDS files are written to')
+    dist_build.add_argument('--listen', default=f'127.0.0.1:{DIST_DEFAULT_PORT}', help='host:port the coordinator listens on; use 0.0.0.0 to accept workers from other hosts')
+    dist_build.add_argument('--authkey', help=f'Shared secret workers must present (default: ${DIST_AUTHKEY_ENV}, or a generated one)')
+    dist_build.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Local worker processes to start (0 = wait for remote workers only)')
+    dist_build.add_argument('--atlas-name', default='Icons', help='Atlas name; shards are suffixed _1, _2, ...')
+    dist_build.add_argument('--icons-per-atlas', type=int, default=1024, help='Icons per atlas shard')
+    dist_build.add_argument('--tile-size', type=int, default=64, help='Atlas tile size in pixels')
+    dist_build.add_argument('--batch', type=int, default=8, help='PNGs per tier generation unit')
+    dist_build.add_argument('--skill', action='store_true', help='Export skill tiers instead of item tiers')
+    dist_build.add_argument('--profile', help='Export profile for the tiers (default: items, or skills with --skill); see the profiles command')
+    dist_build.add_argument('--no-dedupe', action='store_true', help='Give every file its own atlas slot even when pixels are identical')
+    dist_build.add_argument('--no-mipmaps', action='store_true', help='Write tier DDS files without mip chains')
+    dist_build.add_argument('--zip', help='Also package the gathered output into this zip archive')
+    dist_build.add_argument('--strict', action='store_true', help='Abort on any preflight issue')
+    dist_build.add_argument('--verbose', action='store_true', help='Show the console output of local workers')
+    dist_build.set_defaults(func=run_dist_build_command)
+    dist_worker = subparsers.add_parser('dist-worker', help='Process build units for a dist-build coordinator')
+    dist_worker.add_argument('coordinator', help='Coordinator address as host:port')
+    dist_worker.add_argument('--authkey', help=f'Shared secret (default: ${DIST_AUTHKEY_ENV})')
+    dist_worker.add_argument('--name', help='Worker name shown in the coordinator summary (default: host:pid)')
+    dist_worker.add_argument('--connect-timeout', type=float, default=30.0, help='Seconds to keep retrying while the coordinator starts')
+    dist_worker.set_defaults(func=run_dist_worker_command)
+    rarity = subparsers.add_parser('rarity', help='Composite item_blue/purple/green/gold rarity variants for a folder of base icons')
+    rarity.add_argument('folder', help='Folder with square base icon PNGs (transparent background)')
+    rarity.add_argument('--output-dir', required=True, help='Export folder; gets Original/ and GUI/<size> PNG folders like ItemSetExport.jsx')
+    rarity.add_argument('--rarities', help=f"Comma-separated subset of {','.join(RARITY_STYLES)}")
+    rarity.add_argument('--styles', help='JSON file with extra or overriding styles: {name: {top, bottom, glow, border: [r, g, b], ...}}')
+    rarity.add_argument('--tiers', help='Also run the largest variant of each rarity through the tier export into this mod GUI folder')
+    rarity.add_argument('--profile', help='Export profile for --tiers (default: items)')
+    rarity.add_argument('--atlas', help='Also build an atlas .dds (+ .lsx) from the smallest variants')
+    rarity.add_argument('--tile-size', type=int, default=64, help='Atlas tile size in pixels')
+    rarity.add_argument('--workers', type=int, help='Icons processed in parallel (default: CPU count, max 8)')
+    rarity.set_defaults(func=run_rarity_command)
+    profiles = subparsers.add_parser('profiles', help='List export profiles (built-in and from export_profiles in preferences.json)')
+    profiles.add_argument('names', nargs='*', help='Only show these profiles')
+    profiles.add_argument('--json', action='store_true', help='Print the resolved profiles as a preferences.json snippet to start a custom profile from')
+    profiles.set_defaults(func=run_profiles_command)
+    cache_server = subparsers.add_parser('cache-server', help='Serve a build cache directory to teammates and CI over HTTP')
+    cache_server.add_argument('--dir', help='Artifact store (default: temp/build_cache_server)')
+    cache_server.add_argument('--host', default='127.0.0.1', help='Interface to bind, use 0.0.0.0 to share on the network')
+    cache_server.add_argument('--port', type=int, default=8765)
+    cache_server.add_argument('--read-only', action='store_true', help='Reject uploads')
+    cache_server.add_argument('--max-mb', type=int, default=BUILD_CACHE_MAX_BYTES // (1024 * 1024), help='Evict least recently used artifacts above this size')
+    cache_server.set_defaults(func=run_cache_server_command)
+    serve = subparsers.add_parser('serve', help='Run a local JSON-RPC service that keeps parsed atlases, decoded images and texconv warm between requests')
+    serve.add_argument('--host', default='127.0.0.1', help='Interface to bind; anything but localhost requires --token')
+    serve.add_argument('--port', type=int, default=SERVICE_DEFAULT_PORT)
+    serve.add_argument('--token', help=f'Bearer token clients must send (default: ${SERVICE_TOKEN_ENV})')
+    serve.add_argument('--workers', type=int, default=1, help='Job queue workers; resize/lint/delete jobs run by priority, then submission order')
+    serve.add_argument('--atlas-cache-mb', type=int, default=512, help='Memory budget for parsed and decoded atlases')
+    serve.add_argument('--preload', action='append', metavar='LSX', help='Decode this atlas in the background at startup (repeatable)')
+    serve.add_argument('--game-dir', help='BG3 Data folder used to resolve --preload atlases in mod project layout')
+    serve.set_defaults(func=run_serve_command)
+    rpc = subparsers.add_parser('rpc', help='Call a method on a running serve instance and print the JSON result')
+    rpc.add_argument('method', help='e.g. ping, atlas.info, atlas.tile, atlas.delete, resize, lint, jobs.status, cache.stats')
+    rpc.add_argument('params', nargs='?', help='Method parameters as a JSON object, e.g. \'{"lsx": "Icons.lsx"}\'')
+    rpc.add_argument('--url', help=f'Service URL (default: http://127.0.0.1:{SERVICE_DEFAULT_PORT})')
+    rpc.add_argument('--token', help=f'Bearer token (default: ${SERVICE_TOKEN_ENV})')
+    rpc.add_argument('--priority', type=int, default=0, help='Queue priority for job methods; higher runs first')
+    rpc.add_argument('--follow', action='store_true', help='For job methods, stream progress until the job ends and print its result')
+    rpc.add_argument('--timeout', type=float, default=60.0, help='Socket timeout in seconds')
+    rpc.set_defaults(func=run_rpc_command)
+    bench = subparsers.add_parser('bench-import', help='Measure the cost of importing this module and check that heavy dependencies stay lazy')
+    bench.add_argument('--runs', type=int, default=5, help='Fresh interpreters to measure')
+    bench.add_argument('--budget-ms', type=float, default=100.0, help='Fail when the median import time exceeds this')
+    bench.set_defaults(func=run_bench_import_command)
+    return parser
+
+def run_watch_command(args):
+    if not os.path.isdir(args.folder):
+        print(Fore.RED + f'[ERROR] Not a folder: {args.folder}')
+        return 1
+    if not args.lsx and not args.dest:
+        print(Fore.RED + '[ERROR] Nothing to sync: pass --lsx and/or --dest')
+        return 1
+    mode = 'mod_project' if args.game_dir else 'standalone'
+    watcher = FolderWatcher(args.folder, debounce=args.debounce, backend=args.backend)
+    print(Fore.CYAN + '[WATCH] Press Ctrl+C to stop')
+
+    def sync(batch):
+        with profile_operation('watch_sync'):
+            return sync_watched_pngs(args.folder, batch, lsx_path=args.lsx, dest_dir=args.dest, skill_mode=args.skill, prefix=args.prefix, game_dir=args.game_dir, mode=mode)
+    watcher.run(sync, interval=args.interval)
+    return 0
+
+HEAVY_MODULES = ('PIL', 'numpy', 'PyQt6', 'urllib.request', 'zipfile', 'xml.dom.minidom')
+IMPORT_PROBE = 'import json, sys, time\nstart = time.perf_counter()\nimport iconmanager\nelapsed = time.perf_counter() - start\nprint(json.dumps({"ms": elapsed * 1000, "heavy": [m for m in iconmanager.HEAVY_MODULES if m in sys.modules], "texconv_probed": iconmanager._texconv_resolved}))'
+
+def measure_import(runs=5):
+    results = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip() or 'import probe failed')
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+def run_bench_import_command(args):
+    try:
+        results = measure_import(max(1, args.runs))
+    except RuntimeError as e:
+        print(Fore.RED + f'[BENCH] Import failed: {e}')
+        return 1
+    times = sorted(r['ms'] for r in results)
+    median = times[len(times) // 2]
+    print(Fore.GREEN + f"[BENCH] import iconmanager: median {median:.1f} ms, min {times[0]:.1f} ms, max {times[-1]:.1f} ms over {len(times)} run(s)")
+    failed = False
+    heavy = sorted(set(m for r in results for m in r['heavy']))
+    if heavy:
+        print(Fore.RED + f"[BENCH] Heavy modules loaded at import time: {', '.join(heavy)}")
+        failed = True
+    if any(r['texconv_probed'] for r in results):
+        print(Fore.RED + '[BENCH] texconv discovery ran at import time')
+        failed = True
+    if median > args.budget_ms:
+        print(Fore.RED + f'[BENCH] Median import time exceeds budget of {args.budget_ms:.0f} ms')
+        failed = True
+    if not failed:
+        print(Fore.GREEN + '[BENCH] ✓ Import stays lazy and within budget')
+    return 1 if failed else 0
+
+LONG_RUNNING_COMMANDS = ('watch', 'serve', 'cache-server', 'dist-worker')
+
+def run_cli(args, prefs):
+    texconv_path = prefs.get('texconv_path')
+    if texconv_path and os.path.isfile(texconv_path):
+        set_texconv_path(texconv_path)
+    configure_export_profiles(prefs.get('export_profiles'), prefs.get('atlas_format'))
+    configure_build_cache(prefs.get('build_cache_dir') or None, args.cache_url or prefs.get('build_cache_url') or None, enabled=prefs.get('build_cache_enabled', True) and (not args.no_build_cache), max_bytes=int(prefs.get('build_cache_mb', 2048)) * 1024 * 1024)
+    configure_profiling(args.profiling or prefs.get('profiling_enabled', False), prefs.get('log_directory'))
+    try:
+        if args.command in LONG_RUNNING_COMMANDS:
+            return args.func(args)
+        with profile_operation(args.command.replace('-', '_')):
+            return args.func(args)
+    finally:
+        if BUILD_CACHE is not None and any(BUILD_CACHE.stats.values()):
+            print(Fore.CYAN + f'[BUILD CACHE] {BUILD_CACHE.describe()}')
+
+def main(argv=None):
+    global CONSOLE_CAPTURE
+    colorama.init(autoreset=True)
+    args = build_arg_parser().parse_args(argv)
+    gui = None
+    if args.command is None:
+        try:
+            import iconmanager_gui as gui
+        except ImportError:
+            gui = None
+    if gui is not None:
+        try:
+            import console_viewer_widget
+            CONSOLE_CAPTURE = console_viewer_widget.ConsoleCapture()
+            print(Fore.CYAN + '=' * 60)
+            print(Fore.CYAN + 'BG3 Icon Manager v6.1 - Console Capture Active')
+            print(Fore.CYAN + "Click 'Show Console' button to view logs")
+            print(Fore.CYAN + '=' * 60)
+        except Exception as e:
+            print(Fore.YELLOW + f'[WARNING] Console capture initialization failed: {e}')
+            print(Fore.YELLOW + '[INFO] Console viewer will not be available')
+    prefs = load_prefs_file()
+    log_enabled = prefs.get('log_enabled', True)
+    log_directory = prefs.get('log_directory', os.path.join(os.path.dirname(__file__), 'logs'))
+    log_level = prefs.get('log_level', 'DEBUG')
+    max_log_files = prefs.get('max_log_files', 10)
+    setup_logging(log_dir=log_directory, log_level=log_level, enabled=log_enabled)
+    atexit.register(cleanup_logging)
+    if log_enabled:
+        cleanup_old_logs(log_dir=log_directory, max_files=max_log_files)
+    if args.command is not None:
+        sys.exit(run_cli(args, prefs))
+    if gui is None:
+        print(Fore.RED + 'PyQt6 not installed. Exiting.')
+        sys.exit(1)
+    sys.exit(gui.run_gui())
+
+@profiled('resize_png')
+def resize_png(png_path, skill_mode=False, dest_dir='', output_name=None, mipmaps=True, profile=None):
+    print(Fore.CYAN + f'\n=== RESIZE PNG OPERATION START ===')
+    print(Fore.GREEN + f'[DEBUG] Input PNG: {png_path}')
+    print(Fore.GREEN + f'[DEBUG] Skill Mode: {skill_mode}')
+    print(Fore.GREEN + f'[DEBUG] Destination Directory: {dest_dir}')
+    print(Fore.GREEN + f"[DEBUG] Output Name Override: {(output_name if output_name else '(auto-detect)')}")
+    profile = get_export_profile(profile, skill_mode)
+    header = read_png_header(png_path)
+    if header['error'] is None and header['width'] != header['height']:
+        print(Fore.YELLOW + f'[WARNING] Skipping non-square image: {png_path}')
+        return
+    source_digest = file_sha256(png_path) if BUILD_CACHE is not None else None
+    im = None
+    if output_name:
+        base_name = output_name
+        print(Fore.GREEN + f'✓ Base name from override: {base_name}')
+    else:
+        base_name = os.path.basename(png_path).rsplit('.', 1)[0]
+        print(Fore.GREEN + f'✓ Base name auto-extracted from filename: {base_name}')
+        print(Fore.CYAN + f'[INFO] This will be used as the icon name (no manual input required)')
+    if profile['suffix']:
+        base_name += profile['suffix']
+        print(Fore.GREEN + f'[DEBUG] Profile suffix added: {base_name}')
+    export_order = profile['tiers']
+    print(Fore.GREEN + f"[DEBUG] Export profile selected: {profile['name']} ({len(export_order)} sizes)")
+    for idx, exp in enumerate(export_order):
+        folder = exp['folder']
+        size = exp['size']
+        print(Fore.CYAN + f'[STEP {idx + 1}/{len(export_order)}] Processing size {size}x{size} for folder: {folder}')
+        full_folder = os.path.join(dest_dir, folder)
+        print(Fore.GREEN + f'[DEBUG] Full folder path: {full_folder}')
+        os.makedirs(full_folder, exist_ok=True)
+        print(Fore.GREEN + f'[DEBUG] Directory created/verified')
+        out_path = os.path.join(full_folder, f'{base_name}.dds')
+        tier_mips = mipmaps and exp['mipmaps']
+        key = build_cache_key('tier', source_digest, size, exp['format'], exp['alpha_format'], exp['resample'], tier_mips) if source_digest else None
+        if key and fetch_cached_artifact(key, out_path):
+            print(Fore.GREEN + f'[BUILD CACHE] ✓ Reused encoded {size}x{size} DDS: {out_path}')
+            continue
+        if im is None:
+            im = Image.open(png_path)
+            if im.size[0] != im.size[1]:
+                print(Fore.YELLOW + f'[WARNING] Skipping non-square image: {png_path}')
+                return
+        resized = resize_with_alpha(im, (size, size), getattr(Image, RESAMPLE_FILTERS[exp['resample']]))
+        print(Fore.GREEN + f"[DEBUG] Image resized to {size}x{size} ({exp['resample']}) with alpha preservation")
+        format = select_dds_format(resized, exp['format'], exp['alpha_format'])
+        print(Fore.GREEN + f'[DEBUG] Converting to DDS ({format}): {out_path}')
+        write_dds_with_mips(resized, out_path, format=format, mipmaps=tier_mips)
+        if key:
+            store_cached_artifact(key, out_path)
+        print(Fore.GREEN + f'✓ Saved resized DDS to {out_path}')
+    print(Fore.GREEN + f'=== RESIZE PNG OPERATION COMPLETE ===\n')
+
+def dds_to_png(dds_path, png_path):
+    print(Fore.CYAN + f'\n--- DDS to PNG Conversion Start ---')
+    print(Fore.GREEN + f'[DEBUG] Input DDS: {dds_path}')
+    print(Fore.GREEN + f'[DEBUG] Output PNG: {png_path}')
+    print(Fore.GREEN + f'[DEBUG] DDS file exists: {os.path.exists(dds_path)}')
+    try:
+        output_dir = os.path.normpath(os.path.dirname(png_path))
+        input_dds = os.path.normpath(dds_path)
+        texconv_path = get_texconv_path()
+        if not texconv_path:
+            raise FileNotFoundError('texconv not found')
+        cmd = [texconv_path, '-ft', 'PNG', '-o', output_dir, '-y', input_dds]
+        print(Fore.CYAN + f"[TEXCONV] Running command: {' '.join(cmd)}")
+        print(Fore.GREEN + f'[DEBUG] Output directory: {output_dir}')
+        subprocess.check_call(cmd)
+        print(Fore.GREEN + f'[DEBUG] texconv completed successfully')
+        output_file = os.path.join(os.path.dirname(png_path), os.path.basename(dds_path).replace('.dds', '.PNG').replace('.DDS', '.PNG'))
+        print(Fore.GREEN + f'[DEBUG] Expected texconv output: {output_file}')
+        print(Fore.GREEN + f'[DEBUG] Output file exists: {os.path.exists(output_file)}')
+        if os.path.exists(png_path):
+            print(Fore.GREEN + f'[DEBUG] Removing existing PNG at destination')
+            os.remove(png_path)
+        if os.path.exists(output_file):
+            print(Fore.GREEN + f'[DEBUG] Renaming {output_file} to {png_path}')
+            os.rename(output_file, png_path)
+        print(Fore.GREEN + f'✓ Converted DDS to PNG: {dds_path} -> {png_path}')
+    except FileNotFoundError:
+        print(Fore.RED + "[ERROR] texconv.exe not found. Ensure it's downloaded and in PATH/script dir.")
+        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion (basic support)')
+        try:
+            im = Image.open(dds_path)
+            print(Fore.GREEN + f'[DEBUG] PIL opened DDS successfully')
+            im.save(png_path, 'PNG')
+            print(Fore.GREEN + f'✓ Pillow fallback conversion successful')
+        except Exception as pil_e:
+            print(Fore.RED + f'[ERROR] Pillow conversion failed: {pil_e}')
+    except subprocess.CalledProcessError as e:
+        print(Fore.RED + f'[ERROR] Texconv DDS to PNG failed with error code {e.returncode}')
+        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion')
+        try:
+            im = Image.open(dds_path)
+            print(Fore.GREEN + f'[DEBUG] PIL opened DDS successfully')
+            im.save(png_path, 'PNG')
+            print(Fore.GREEN + f'✓ Fallback converted DDS to PNG: {dds_path} -> {png_path}')
+        except Exception as fallback_e:
+            print(Fore.RED + f'[ERROR] PIL fallback also failed: {fallback_e}')
+    print(Fore.CYAN + f'--- DDS to PNG Conversion End ---\n')
+
+def png_to_dds(png_path, dds_path, format='BC3_UNORM', mipmaps=None):
+    print(Fore.CYAN + f'\n--- PNG to DDS Conversion Start ---')
+    print(Fore.GREEN + f'[DEBUG] Input PNG: {png_path}')
+    print(Fore.GREEN + f'[DEBUG] Output DDS: {dds_path}')
+    print(Fore.GREEN + f'[DEBUG] PNG file exists: {os.path.exists(png_path)}')
+    try:
+        with Image.open(png_path) as img:
+            width, height = img.size
+        if mipmaps is None:
+            max_dimension = max(width, height)
+            mipmaps = math.floor(math.log2(max_dimension)) + 1
+        print(Fore.GREEN + f'[DEBUG] Image dimensions: {width}x{height}')
+        print(Fore.GREEN + f'[DEBUG] Mipmap levels: {mipmaps}')
+        output_dir = os.path.normpath(os.path.dirname(dds_path))
+        input_png = os.path.normpath(png_path)
+        format_label = 'BC3_UNORM (DXT5)' if format == 'BC3_UNORM' else f'{format}'
+        texconv_path = get_texconv_path()
+        if not texconv_path:
+            raise FileNotFoundError('texconv not found')
+        cmd = [texconv_path, '-f', format, '-m', str(mipmaps), '-o', output_dir, '-y', input_png]
+        print(Fore.CYAN + f"[TEXCONV] Running command: {' '.join(cmd)}")
+        print(Fore.GREEN + f'[DEBUG] Output directory: {output_dir}')
+        print(Fore.GREEN + f'[DEBUG] Compression format: {format_label}')
+        print(Fore.GREEN + f'[DEBUG] Mipmap levels: {mipmaps}')
+        subprocess.check_call(cmd)
+        print(Fore.GREEN + f'[DEBUG] texconv completed successfully')
+        output_dir = os.path.dirname(dds_path)
+        base_name = os.path.basename(png_path).lower().replace('.png', '')
+        stem = os.path.splitext(os.path.basename(png_path))[0]
+        possible_outputs = [os.path.join(output_dir, stem + '.DDS'), os.path.join(output_dir, stem + '.dds'), os.path.join(output_dir, base_name + '.DDS'), os.path.join(output_dir, base_name + '.dds'), os.path.join(output_dir, os.path.basename(png_path).replace('.png', '.DDS')), os.path.join(output_dir, os.path.basename(png_path).replace('.png', '.dds')), os.path.join(output_dir, os.path.basename(png_path).replace('.PNG', '.DDS')), os.path.join(output_dir, os.path.basename(png_path).replace('.PNG', '.dds'))]
+        output_file = None
+        for candidate in possible_outputs:
+            if os.path.exists(candidate):
+                output_file = candidate
+                print(Fore.GREEN + f'[DEBUG] Found texconv output: {output_file}')
+                break
+        if not output_file:
+            print(Fore.RED + f'[ERROR] Could not find texconv output! Checked:')
+            for candidate in possible_outputs[:3]:
+                print(Fore.RED + f'  - {candidate}')
+            raise FileNotFoundError(f'Texconv output not found in {output_dir}')
+        if os.path.exists(dds_path) and output_file != dds_path:
+            print(Fore.GREEN + f'[DEBUG] Removing existing DDS at destination')
+            os.remove(dds_path)
+        if output_file != dds_path:
+            print(Fore.GREEN + f'[DEBUG] Renaming {output_file} to {dds_path}')
+            os.rename(output_file, dds_path)
+        print(Fore.GREEN + f'✓ Converted PNG to DDS: {png_path} -> {dds_path}')
+    except FileNotFoundError:
+        print(Fore.RED + "[ERROR] texconv.exe not found. Ensure it's downloaded and in PATH/script dir.")
+        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion (basic support)')
+        try:
+            with Image.open(png_path) as img:
+                width, height = img.size
+                im = img.convert('RGBA')
+            if mipmaps is None:
+                max_dimension = max(width, height)
+                mipmaps = math.floor(math.log2(max_dimension)) + 1
+            dxt_format = PILLOW_DDS_FORMATS.get(format, 'DXT5')
+            print(Fore.GREEN + f'[DEBUG] PIL opened PNG and converted to RGBA')
+            print(Fore.GREEN + f'[DEBUG] Image dimensions: {width}x{height}')
+            print(Fore.GREEN + f'[DEBUG] Using {dxt_format} compression (Pillow writes the top mip level only)')
+            im.save(dds_path, 'DDS', pixel_format=dxt_format)
+            print(Fore.GREEN + f'✓ Pillow fallback conversion successful')
+        except Exception as pil_e:
+            print(Fore.RED + f'[ERROR] Pillow conversion failed: {pil_e}')
+    except subprocess.CalledProcessError as e:
+        print(Fore.RED + f'[ERROR] Texconv PNG to DDS failed with error code {e.returncode}')
+        print(Fore.YELLOW + '[FALLBACK] Attempting Pillow conversion')
+        try:
+            with Image.open(png_path) as img:
+                width, height = img.size
+                im = img.convert('RGBA')
+            if mipmaps is None:
+                max_dimension = max(width, height)
+                mipmaps = math.floor(math.log2(max_dimension)) + 1
+            dxt_format = PILLOW_DDS_FORMATS.get(format, 'DXT5')
+            print(Fore.GREEN + f'[DEBUG] PIL opened PNG and converted to RGBA')
+            print(Fore.GREEN + f'[DEBUG] Image dimensions: {width}x{height}')
+            print(Fore.GREEN + f'[DEBUG] Using {dxt_format} compression (Pillow writes the top mip level only)')
+            im.save(dds_path, 'DDS', pixel_format=dxt_format)
+            print(Fore.GREEN + f'✓ Fallback converted PNG to DDS: {png_path} -> {dds_path}')
+        except Exception as fallback_e:
+            print(Fore.RED + f'[ERROR] PIL fallback also failed: {fallback_e}')
+    print(Fore.CYAN + f'--- PNG to DDS Conversion End ---\n')
+
+def resolve_atlas_dds_path(lsx_path, atlas_path, game_dir=None, mode='standalone'):
+    from pathlib import Path
+    print(Fore.GREEN + f'[DEBUG] Resolving DDS path for mode: {mode}')
+    lsx_dir = Path(lsx_path).parent
+    rel_path = Path(atlas_path)
+    print(Fore.GREEN + f'[DEBUG] LSX directory: {lsx_dir}')
+    print(Fore.GREEN + f'[DEBUG] Relative path from LSX: {rel_path}')
+    if mode == 'mod_project':
+        print(Fore.GREEN + f'[DEBUG] Mod project mode - searching for DDS in Public folders')
+        if game_dir:
+            print(Fore.GREEN + f'[DEBUG] Game directory provided: {game_dir}')
+            lsx_path_obj = Path(lsx_path)
+            mod_uuid = None
+            path_parts = lsx_path_obj.parts
+            for i, part in enumerate(path_parts):
+                if part.lower() in ['public', 'mods'] and i + 1 < len(path_parts):
+                    mod_uuid = path_parts[i + 1]
+                    print(Fore.GREEN + f'✓ Extracted mod UUID from path: {mod_uuid}')
+                    break
+            if not mod_uuid:
+                print(Fore.YELLOW + f'[WARNING] Could not extract mod UUID from LSX path')
+                search_roots = [Path(game_dir) / 'Public', Path(game_dir) / 'Generated' / 'Public']
+            else:
+                search_roots = [Path(game_dir) / 'Public' / mod_uuid, Path(game_dir) / 'Generated' / 'Public' / mod_uuid]
+            print(Fore.GREEN + f'[DEBUG] Searching in roots: {[str(r) for r in search_roots]}')
+            for root in search_roots:
+                if root.is_dir():
+                    candidate = root / rel_path
+                    print(Fore.GREEN + f'[DEBUG] Checking candidate: {candidate}')
+                    print(Fore.GREEN + f'[DEBUG] Candidate exists: {candidate.exists()}')
+                    if candidate.exists():
+                        full_dds = candidate
+                        print(Fore.GREEN + f'✓ Found DDS at: {full_dds}')
+                        break
+            else:
+                print(Fore.YELLOW + f'[WARNING] DDS not found in any search location')
+                full_dds = None
+        else:
+            print(Fore.YELLOW + f'[WARNING] No game directory provided for mod project mode')
+            full_dds = None
+    else:
+        print(Fore.GREEN + f'[DEBUG] Standalone mode - resolving path relative to LSX')
+        if rel_path.is_absolute():
+            print(Fore.GREEN + f'[DEBUG] Path is absolute: {rel_path}')
+            full_dds = rel_path
+        else:
+            print(Fore.GREEN + f'[DEBUG] Path is relative, resolving from LSX directory')
+            full_dds = (lsx_dir / rel_path).resolve()
+            print(Fore.GREEN + f'[DEBUG] Resolved to: {full_dds}')
+    return str(full_dds) if full_dds else None
+
+def parse_lsx(lsx_path, game_dir=None, mode='standalone'):
+    print(Fore.CYAN + f'\n=== PARSING LSX FILE ===')
+    print(Fore.GREEN + f'[DEBUG] LSX Path: {lsx_path}')
+    print(Fore.GREEN + f'[DEBUG] Game Directory: {game_dir}')
+    print(Fore.GREEN + f'[DEBUG] Mode: {mode}')
+    print(Fore.GREEN + f'[DEBUG] LSX file exists: {os.path.exists(lsx_path)}')
+    if is_lsf_path(lsx_path):
+        import lsf
+        try:
+            dom = lsf.resource_to_dom(lsf.read_lsf(lsx_path))
+            print(Fore.GREEN + f'✓ Binary LSF resource loaded')
+        except lsf.LsfError as e:
+            print(Fore.RED + f'[ERROR] LSF read error in {lsx_path}: {e}')
+            return (None, None, None, None, None)
+    else:
+        print(Fore.GREEN + f'[DEBUG] Reading LSX file...')
+        with open(lsx_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        print(Fore.GREEN + f'[DEBUG] LSX file size: {len(content)} bytes')
+        try:
+            print(Fore.GREEN + f'[DEBUG] Parsing XML content...')
+            dom = minidom.parseString(content)
+            print(Fore.GREEN + f'✓ XML parsed successfully')
+        except ExpatError as e:
+            print(Fore.RED + f'[ERROR] XML parse error in {lsx_path}: {e}')
+            return (None, None, None, None, None)
     atlas_path = None
     atlas_size = None
     tile_size = None
@@ -465,54 +2759,7 @@ def parse_lsx(lsx_path, game_dir=None, mode='standalone'):
             print(Fore.GREEN + f'✓ Found atlas path in LSX: {atlas_path}')
             break
     if atlas_path:
-        print(Fore.GREEN + f'[DEBUG] Resolving DDS path for mode: {mode}')
-        lsx_dir = Path(lsx_path).parent
-        rel_path = Path(atlas_path)
-        print(Fore.GREEN + f'[DEBUG] LSX directory: {lsx_dir}')
-        print(Fore.GREEN + f'[DEBUG] Relative path from LSX: {rel_path}')
-        if mode == 'mod_project':
-            print(Fore.GREEN + f'[DEBUG] Mod project mode - searching for DDS in Public folders')
-            if game_dir:
-                print(Fore.GREEN + f'[DEBUG] Game directory provided: {game_dir}')
-                lsx_path_obj = Path(lsx_path)
-                mod_uuid = None
-                path_parts = lsx_path_obj.parts
-                for i, part in enumerate(path_parts):
-                    if part.lower() in ['public', 'mods'] and i + 1 < len(path_parts):
-                        mod_uuid = path_parts[i + 1]
-                        print(Fore.GREEN + f'✓ Extracted mod UUID from path: {mod_uuid}')
-                        break
-                if not mod_uuid:
-                    print(Fore.YELLOW + f'[WARNING] Could not extract mod UUID from LSX path')
-                    search_roots = [Path(game_dir) / 'Public', Path(game_dir) / 'Generated' / 'Public']
-                else:
-                    search_roots = [Path(game_dir) / 'Public' / mod_uuid, Path(game_dir) / 'Generated' / 'Public' / mod_uuid]
-                print(Fore.GREEN + f'[DEBUG] Searching in roots: {[str(r) for r in search_roots]}')
-                for root in search_roots:
-                    if root.is_dir():
-                        candidate = root / rel_path
-                        print(Fore.GREEN + f'[DEBUG] Checking candidate: {candidate}')
-                        print(Fore.GREEN + f'[DEBUG] Candidate exists: {candidate.exists()}')
-                        if candidate.exists():
-                            full_dds = candidate
-                            print(Fore.GREEN + f'✓ Found DDS at: {full_dds}')
-                            break
-                else:
-                    print(Fore.YELLOW + f'[WARNING] DDS not found in any search location')
-                    full_dds = None
-            else:
-                print(Fore.YELLOW + f'[WARNING] No game directory provided for mod project mode')
-                full_dds = None
-        else:
-            print(Fore.GREEN + f'[DEBUG] Standalone mode - resolving path relative to LSX')
-            if rel_path.is_absolute():
-                print(Fore.GREEN + f'[DEBUG] Path is absolute: {rel_path}')
-                full_dds = rel_path
-            else:
-                print(Fore.GREEN + f'[DEBUG] Path is relative, resolving from LSX directory')
-                full_dds = (lsx_dir / rel_path).resolve()
-                print(Fore.GREEN + f'[DEBUG] Resolved to: {full_dds}')
-        atlas_path = str(full_dds) if full_dds else None
+        atlas_path = resolve_atlas_dds_path(lsx_path, atlas_path, game_dir, mode)
         if atlas_path:
             print(Fore.GREEN + f'✓ Final DDS path: {atlas_path}')
             print(Fore.GREEN + f'[DEBUG] DDS file exists: {os.path.exists(atlas_path)}')
@@ -553,8 +2800,8 @@ def get_grid_slot(u1, v1, grid_size):
     row = int(v1 * grid_size)
     return (col, row)
 
-def create_new_atlas(png_folder, output_path, atlas_size, tile_size, grid_size):
-    dom = Document()
+def create_new_atlas(png_folder, output_path, atlas_size, tile_size, grid_size, dedupe=True, png_files=None, format=None):
+    dom = minidom.Document()
     save = dom.createElement('save')
     dom.appendChild(save)
     version = dom.createElement('version')
@@ -619,19 +2866,22 @@ def create_new_atlas(png_folder, output_path, atlas_size, tile_size, grid_size):
     children_uv = dom.createElement('children')
     node_root_uv.appendChild(children_uv)
     im = Image.new('RGBA', (atlas_size, atlas_size), (0, 0, 0, 0))
-    png_files = sorted([f for f in os.listdir(png_folder) if f.lower().endswith('.png')])
-    for idx, png_file in enumerate(png_files):
-        mapkey = os.path.splitext(png_file)[0]
-        row = idx // grid_size
-        col = idx % grid_size
-        if row >= grid_size:
+    if png_files is None:
+        png_files = sorted([f for f in os.listdir(png_folder) if f.lower().endswith('.png')])
+    png_entries, skipped = unique_png_mapkeys(png_files)
+    index = TileSlotIndex(grid_size)
+    for png_file, mapkey in png_entries:
+        png_path = os.path.join(png_folder, png_file)
+        tile = render_icon_tile(png_path, tile_size)
+        placement = index.assign(mapkey, tile_digest(tile) if dedupe else None)
+        if placement is None:
             print(Fore.YELLOW + f'Skipping {png_file}: Atlas full.')
             continue
-        x = col * tile_size
-        y = row * tile_size
-        png_path = os.path.join(png_folder, png_file)
-        new_im = resize_with_alpha(Image.open(png_path), (tile_size, tile_size), Image.BICUBIC)
-        im.paste(new_im, (x, y), new_im if new_im.mode == 'RGBA' else None)
+        col, row = placement['slot']
+        if placement['paste']:
+            im.paste(tile, (col * tile_size, row * tile_size))
+        else:
+            print(Fore.GREEN + f'{mapkey} shares slot ({col}, {row}) with an identical icon')
         u1 = col / grid_size
         v1 = row / grid_size
         u2 = u1 + 1 / grid_size
@@ -664,19 +2914,323 @@ def create_new_atlas(png_folder, output_path, atlas_size, tile_size, grid_size):
         attr_v2.setAttribute('value', str(v2))
         node_uv.appendChild(attr_v2)
         children_uv.appendChild(node_uv)
-    temp_png = os.path.join(TEMP_DIR, 'temp_new.png')
-    dithered = apply_alpha_dither(im, strength=0.5)
-    dithered.save(temp_png, 'PNG')
+    if index.shared_count():
+        print(Fore.GREEN + f'Deduplicated {index.shared_count()} identical icon(s): {len(index.slots)} icons in {len(index.refs)} slots')
     output_dds = output_path if output_path else os.path.join(png_folder, 'New_Atlas.dds')
-    png_to_dds(temp_png, output_dds, format='BC3_UNORM', mipmaps=1)
+    os.makedirs(os.path.dirname(output_dds) or '.', exist_ok=True)
+    write_atlas_dds(im, output_dds, tile_size=tile_size, format=format)
+    save_tile_digests(output_dds, tile_size, index.digests)
     output_lsx = os.path.splitext(output_dds)[0] + '.lsx'
-    with open(output_lsx, 'w', encoding='utf-8') as f:
-        dom.writexml(f, indent='    ', addindent='    ', newl='\n', encoding='UTF-8')
-    if os.path.exists(temp_png):
-        os.remove(temp_png)
+    write_lsx(dom, output_lsx)
     print(Fore.GREEN + f'Created new atlas: {output_dds}, {output_lsx}')
 
-def update_atlas(lsx_path, png_folder, icon_key=None, output_path=None, atlas_size=None, tile_size=None, grid_size=None, game_dir=None, mode='standalone'):
+def find_free_slot(icons, grid_size):
+    used_slots = {get_grid_slot(icon['u1'], icon['v1'], grid_size) for icon in icons}
+    for r in range(grid_size):
+        for c in range(grid_size):
+            if (c, r) not in used_slots:
+                return (c, r)
+    return (None, None)
+
+def render_icon_tile(png_path, tile_size):
+    with Image.open(png_path) as src:
+        new_im = resize_with_alpha(src, (tile_size, tile_size), Image.BICUBIC)
+    tile = Image.new('RGBA', (tile_size, tile_size), (0, 0, 0, 0))
+    tile.paste(new_im, (0, 0), new_im if 'A' in new_im.getbands() else None)
+    return tile
+
+def tile_digest(tile_im):
+    return hashlib.blake2b(tile_im.convert('RGBA').tobytes(), digest_size=16).digest()
+
+class TileSlotIndex:
+
+    def __init__(self, grid_size):
+        self.grid_size = grid_size
+        self.slots = {}
+        self.refs = {}
+        self.digests = {}
+        self.by_digest = {}
+        self.cursor = 0
+
+    @classmethod
+    def from_atlas(cls, atlas_im, icons, grid_size, tile_size, dedupe=True, known=None):
+        index = cls(grid_size)
+        for icon in icons:
+            slot = get_grid_slot(icon['u1'], icon['v1'], grid_size)
+            digest = None
+            if dedupe and slot not in index.digests:
+                if known and slot in known:
+                    digest = known[slot]
+                else:
+                    col, row = slot
+                    digest = tile_digest(atlas_im.crop((col * tile_size, row * tile_size, (col + 1) * tile_size, (row + 1) * tile_size)))
+            index.add(icon['mapkey'], slot, digest)
+        return index
+
+    def add(self, mapkey, slot, digest=None):
+        self.slots[mapkey] = slot
+        self.refs.setdefault(slot, set()).add(mapkey)
+        if digest is not None:
+            self.set_digest(slot, digest)
+
+    def set_digest(self, slot, digest):
+        previous = self.digests.pop(slot, None)
+        if previous is not None and self.by_digest.get(previous) == slot:
+            del self.by_digest[previous]
+        if digest is not None:
+            self.digests[slot] = digest
+            self.by_digest.setdefault(digest, slot)
+
+    def find(self, digest):
+        return self.by_digest.get(digest) if digest is not None else None
+
+    def refcount(self, slot):
+        return len(self.refs.get(slot, ()))
+
+    def release(self, mapkey):
+        slot = self.slots.pop(mapkey, None)
+        if slot is None:
+            return (None, 0)
+        refs = self.refs[slot]
+        refs.discard(mapkey)
+        if refs:
+            return (slot, len(refs))
+        del self.refs[slot]
+        self.set_digest(slot, None)
+        self.cursor = min(self.cursor, slot[1] * self.grid_size + slot[0])
+        return (slot, 0)
+
+    def free_slot(self):
+        while self.cursor < self.grid_size * self.grid_size:
+            slot = (self.cursor % self.grid_size, self.cursor // self.grid_size)
+            if slot not in self.refs:
+                return slot
+            self.cursor += 1
+        return (None, None)
+
+    def assign(self, mapkey, digest=None):
+        current = self.slots.get(mapkey)
+        existing = self.find(digest)
+        if existing is not None:
+            freed = None
+            if existing != current:
+                if current is not None:
+                    slot, remaining = self.release(mapkey)
+                    freed = slot if remaining == 0 else None
+                self.add(mapkey, existing)
+            return {'slot': existing, 'paste': False, 'freed': freed, 'shared': self.refcount(existing) > 1}
+        if current is not None and self.refcount(current) == 1:
+            self.set_digest(current, digest)
+            return {'slot': current, 'paste': True, 'freed': None, 'shared': False}
+        slot = self.free_slot()
+        if slot[0] is None:
+            return None
+        if current is not None:
+            self.release(mapkey)
+        self.add(mapkey, slot, digest)
+        return {'slot': slot, 'paste': True, 'freed': None, 'shared': False}
+
+    def shared_count(self):
+        return len(self.slots) - len(self.refs)
+
+def tile_digest_cache_path(dds_path):
+    key = hashlib.blake2b(os.path.normcase(os.path.abspath(dds_path)).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(ensure_temp_dir(), 'tile_digests', f'{key}.json')
+
+def load_tile_digests(dds_path, tile_size):
+    if not dds_path:
+        return {}
+    try:
+        with open(tile_digest_cache_path(dds_path), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    stamp = atlas_file_stamp(dds_path)[0]
+    if stamp is None or data.get('tile_size') != tile_size or data.get('stamp') != list(stamp):
+        return {}
+    return {tuple((int(v) for v in slot.split(','))): bytes.fromhex(digest) for slot, digest in data.get('digests', {}).items()}
+
+def save_tile_digests(dds_path, tile_size, digests):
+    stamp = atlas_file_stamp(dds_path)[0]
+    if stamp is None or not digests:
+        return
+    path = tile_digest_cache_path(dds_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'dds_path': os.path.abspath(dds_path), 'stamp': list(stamp), 'tile_size': tile_size, 'digests': {f'{col},{row}': digest.hex() for (col, row), digest in digests.items()}}, f)
+
+def find_icon_uv_node(dom, mapkey):
+    for node in dom.getElementsByTagName('node'):
+        if node.getAttribute('id') != 'IconUV':
+            continue
+        for attr in node.getElementsByTagName('attribute'):
+            if attr.getAttribute('id') == 'MapKey' and attr.getAttribute('value') == mapkey:
+                return node
+    return None
+
+def set_icon_uv_slot(node, slot, grid_size):
+    col, row = slot
+    uv = {'U1': col / grid_size, 'V1': row / grid_size, 'U2': (col + 1) / grid_size, 'V2': (row + 1) / grid_size}
+    attrs = [attr for attr in node.getElementsByTagName('attribute') if attr.getAttribute('id') in uv]
+    for attr in attrs:
+        attr.setAttribute('value', str(uv[attr.getAttribute('id')]))
+    return {'u1': uv['U1'], 'v1': uv['V1'], 'u2': uv['U2'], 'v2': uv['V2']}
+
+def append_icon_uv(dom, mapkey, u1, v1, u2, v2):
+    node_uv = dom.createElement('node')
+    node_uv.setAttribute('id', 'IconUV')
+    for aid, atype, value in (('MapKey', 'FixedString', mapkey), ('U1', 'float', str(u1)), ('U2', 'float', str(u2)), ('V1', 'float', str(v1)), ('V2', 'float', str(v2))):
+        attr = dom.createElement('attribute')
+        attr.setAttribute('id', aid)
+        attr.setAttribute('type', atype)
+        attr.setAttribute('value', value)
+        node_uv.appendChild(attr)
+    for region in dom.getElementsByTagName('region'):
+        if region.getAttribute('id') == 'IconUVList':
+            root = region.getElementsByTagName('node')[0]
+            children = root.getElementsByTagName('children')[0]
+            children.appendChild(node_uv)
+            break
+    return node_uv
+
+def select_mapkeys(mapkeys, names=(), patterns=(), regex=None):
+    import fnmatch
+    known = set(mapkeys)
+    selected = {name for name in names if name in known}
+    missing = sorted({name for name in names if name not in known})
+    for pattern in patterns:
+        selected.update(fnmatch.filter(mapkeys, pattern))
+    if regex:
+        compiled = re.compile(regex)
+        selected.update((key for key in mapkeys if compiled.search(key)))
+    return (sorted(selected), missing)
+
+def remove_icon_uv_nodes(dom, mapkeys, journal=None):
+    removed = []
+    for region in dom.getElementsByTagName('region'):
+        if region.getAttribute('id') != 'IconUVList':
+            continue
+        for node in region.getElementsByTagName('node'):
+            if node.getAttribute('id') != 'IconUV':
+                continue
+            for attr in node.childNodes:
+                if attr.nodeType == attr.ELEMENT_NODE and attr.tagName == 'attribute' and attr.getAttribute('id') == 'MapKey':
+                    if attr.getAttribute('value') in mapkeys:
+                        removed.append(node)
+                    break
+    for node in removed:
+        parent = node.parentNode
+        if journal is not None:
+            journal.record_remove(parent, node)
+        parent.removeChild(node)
+    return len(removed)
+
+def clear_atlas_tiles(atlas_im, slots, tile_size):
+    if not slots:
+        return None
+    cols = np.array([col for col, _ in slots])
+    rows = np.array([row for _, row in slots])
+    c0, r0 = cols.min(), rows.min()
+    mask = np.zeros((rows.max() - r0 + 1, cols.max() - c0 + 1), dtype=np.uint8)
+    mask[rows - r0, cols - c0] = 255
+    mask = mask.repeat(tile_size, axis=0).repeat(tile_size, axis=1)
+    box = (int(c0) * tile_size, int(r0) * tile_size, (int(cols.max()) + 1) * tile_size, (int(rows.max()) + 1) * tile_size)
+    atlas_im.paste((0, 0, 0, 0), box, Image.fromarray(mask, 'L'))
+    return box
+
+def tier_folders():
+    if not EXPORT_PROFILES:
+        configure_export_profiles()
+    return sorted({tier['folder'] for profile in EXPORT_PROFILES.values() for tier in profile['tiers']})
+
+TIER_LISTING_CACHE = {}
+_tier_listing_lock = threading.Lock()
+
+def list_tier_folder(root, folder):
+    path = os.path.join(root, *folder.replace('\\', '/').split('/'))
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    with _tier_listing_lock:
+        cached = TIER_LISTING_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    listing = {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.lower().endswith('.dds') and entry.is_file():
+                    listing[entry.name.lower()] = entry.path
+    except OSError:
+        return {}
+    with _tier_listing_lock:
+        TIER_LISTING_CACHE[path] = (stamp, listing)
+    return listing
+
+def tier_listings(roots, folders):
+    listings = {}
+    for folder in folders:
+        listing = listings.setdefault(folder, {})
+        for root in roots:
+            for name, path in list_tier_folder(root, folder).items():
+                listing.setdefault(name, (root, path))
+    return listings
+
+def find_icon_tier_files(mapkeys, roots):
+    wanted = {f'{key}.dds'.lower(): key for key in mapkeys}
+    found = []
+    for root in roots:
+        for folder in tier_folders():
+            listing = list_tier_folder(root, folder)
+            found.extend(((key, listing[name]) for name, key in wanted.items() if name in listing))
+    return found
+
+def remove_files_concurrently(paths, remove=os.remove, max_workers=8):
+    deleted = []
+    errors = []
+    if not paths:
+        return (deleted, errors)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths)), thread_name_prefix='tier-delete') as executor:
+        futures = [(path, executor.submit(remove, path)) for path in paths]
+        for path, future in futures:
+            try:
+                future.result()
+                deleted.append(path)
+            except OSError as e:
+                errors.append((path, str(e)))
+    return (deleted, errors)
+
+def bulk_delete_icons(dom, icons, atlas_im, mapkeys, grid_size, tile_size, tier_roots=(), journal=None, trash_dir=None, tile_digests=None):
+    started = time.perf_counter()
+    targets = set(mapkeys) & {icon['mapkey'] for icon in icons}
+    index = TileSlotIndex.from_atlas(atlas_im, icons, grid_size, tile_size, dedupe=False)
+    freed = []
+    for mapkey in sorted(targets):
+        slot, remaining = index.release(mapkey)
+        if slot is not None and remaining == 0:
+            freed.append(slot)
+    for col, row in freed:
+        if journal is not None:
+            journal.capture_tile(atlas_im, (col * tile_size, row * tile_size, (col + 1) * tile_size, (row + 1) * tile_size))
+        if tile_digests is not None:
+            tile_digests.pop((col, row), None)
+    clear_atlas_tiles(atlas_im, freed, tile_size)
+    nodes = remove_icon_uv_nodes(dom, targets, journal)
+    if journal is not None:
+        trash_dir = trash_dir or os.path.join(ensure_temp_dir(), 'undo_trash')
+        remove = lambda path: journal.move_file(path, trash_dir)
+    else:
+        remove = os.remove
+    files, errors = remove_files_concurrently([path for _, path in find_icon_tier_files(targets, tier_roots)], remove)
+    for path, error in errors:
+        print(Fore.RED + f'[DELETE] Failed to delete {path}: {error}')
+    report = {'removed': sorted(targets), 'missing': sorted(set(mapkeys) - targets), 'cleared': freed, 'shared': len(targets) - len(freed), 'nodes': nodes, 'files': files, 'errors': errors, 'elapsed_ms': (time.perf_counter() - started) * 1000}
+    print(Fore.GREEN + f"[DELETE] {nodes} IconUV node(s) removed, {len(freed)} tile(s) cleared, {len(files)} tier file(s) deleted in {report['elapsed_ms']:.1f} ms")
+    return report
+
+@profiled('update_atlas')
+def update_atlas(lsx_path, png_folder, icon_key=None, output_path=None, atlas_size=None, tile_size=None, grid_size=None, game_dir=None, mode='standalone', png_files=None, prefix='', add_missing=False, dedupe=True):
     dom, atlas_path, icons, parsed_atlas_size, parsed_tile_size = parse_lsx(lsx_path, game_dir, mode)
     if dom is None:
         return
@@ -690,1961 +3244,1402 @@ def update_atlas(lsx_path, png_folder, icon_key=None, output_path=None, atlas_si
         print(Fore.RED + f'Invalid atlas: atlas_size {atlas_size} not divisible by tile_size {tile_size}.')
         return
     full_dds = atlas_path
-    temp_png = os.path.join(TEMP_DIR, 'temp_update.png')
+    temp_png = os.path.join(ensure_temp_dir(), 'temp_update.png')
     dds_to_png(full_dds, temp_png)
-    im = Image.open(temp_png)
-    png_files = [f for f in os.listdir(png_folder) if f.endswith('.png')]
+    with Image.open(temp_png) as decoded:
+        im = decoded.convert('RGBA')
+    if png_files is None:
+        png_files = [f for f in os.listdir(png_folder) if f.endswith('.png')]
+    index = TileSlotIndex.from_atlas(im, icons, grid_size, tile_size, dedupe, known=load_tile_digests(full_dds, tile_size) if dedupe else None)
+    icons_by_key = {icon['mapkey']: icon for icon in icons}
+    updated = []
+    added = []
     for png_file in png_files:
-        mapkey = icon_key or os.path.splitext(png_file)[0]
-        matching_icons = [icon for icon in icons if icon['mapkey'] == mapkey]
-        if not matching_icons:
+        base_mapkey = os.path.splitext(png_file)[0]
+        mapkey = icon_key or (f'{prefix}_{base_mapkey}' if prefix else base_mapkey)
+        icon = icons_by_key.get(mapkey)
+        if icon is None and not add_missing:
             print(Fore.YELLOW + f"Skipping {png_file}: MapKey '{mapkey}' not found.")
             continue
-        icon = matching_icons[0]
-        col, row = get_grid_slot(icon['u1'], icon['v1'], grid_size)
-        x = col * tile_size
-        y = row * tile_size
         png_path = os.path.join(png_folder, png_file)
-        clear_im = Image.new('RGBA', (tile_size, tile_size), (0, 0, 0, 0))
-        im.paste(clear_im, (x, y))
-        new_im = resize_with_alpha(Image.open(png_path), (tile_size, tile_size), Image.BICUBIC)
-        im.paste(new_im, (x, y), new_im if 'A' in new_im.getbands() else None)
+        tile = render_icon_tile(png_path, tile_size)
+        previous_slot = index.slots.get(mapkey)
+        placement = index.assign(mapkey, tile_digest(tile) if dedupe else None)
+        if placement is None:
+            print(Fore.YELLOW + f"Skipping {png_file}: no free slot for MapKey '{mapkey}'.")
+            continue
+        col, row = placement['slot']
+        if placement['freed'] is not None:
+            im.paste((0, 0, 0, 0), (placement['freed'][0] * tile_size, placement['freed'][1] * tile_size, (placement['freed'][0] + 1) * tile_size, (placement['freed'][1] + 1) * tile_size))
+        if placement['paste']:
+            im.paste(tile, (col * tile_size, row * tile_size))
+        if icon is None:
+            u1, v1 = (col / grid_size, row / grid_size)
+            u2, v2 = (u1 + 1 / grid_size, v1 + 1 / grid_size)
+            append_icon_uv(dom, mapkey, u1, v1, u2, v2)
+            icon = {'mapkey': mapkey, 'u1': u1, 'u2': u2, 'v1': v1, 'v2': v2}
+            icons.append(icon)
+            icons_by_key[mapkey] = icon
+            added.append(mapkey)
+            print(Fore.GREEN + f'Added {mapkey} at slot ({col}, {row})' + (' (shared with an identical icon)' if placement['shared'] else ''))
+            continue
+        if placement['slot'] != previous_slot:
+            icon.update(set_icon_uv_slot(find_icon_uv_node(dom, mapkey), placement['slot'], grid_size))
+            print(Fore.GREEN + f'{mapkey} moved from slot {previous_slot} to ({col}, {row})' + (' (shared with an identical icon)' if placement['shared'] else ' (its old slot was shared)'))
+        updated.append(mapkey)
         print(Fore.GREEN + f'Updated {mapkey}')
-    dithered = apply_alpha_dither(im, strength=0.5)
-    dithered.save(temp_png, 'PNG')
+    if index.shared_count():
+        print(Fore.GREEN + f'[DEDUPE] {len(index.slots)} icons share {len(index.refs)} slots')
     output_dds = output_path if output_path else full_dds
-    png_to_dds(temp_png, output_dds, format='BC3_UNORM', mipmaps=1)
-    output_lsx = os.path.splitext(output_dds)[0] + '.lsx'
-    with open(output_lsx, 'w', encoding='utf-8') as f:
-        dom.writexml(f, indent='    ', addindent='    ', newl='\n', encoding='UTF-8')
+    write_atlas_dds(im, output_dds, tile_size=tile_size)
+    save_tile_digests(output_dds, tile_size, index.digests)
+    output_lsx = os.path.splitext(output_dds)[0] + os.path.splitext(lsx_path)[1] if output_path else lsx_path
+    write_lsx(dom, output_lsx)
     if os.path.exists(temp_png):
         os.remove(temp_png)
     print(Fore.GREEN + f'Updated atlas: {output_dds}, {output_lsx}')
+    return {'updated': updated, 'added': added, 'lsx_path': output_lsx, 'dds_path': output_dds}
+
+def set_atlas_texture_size(dom, atlas_size):
+    for node in dom.getElementsByTagName('node'):
+        if node.getAttribute('id') == 'TextureAtlasTextureSize':
+            for attr in node.getElementsByTagName('attribute'):
+                if attr.getAttribute('id') in ('Width', 'Height'):
+                    attr.setAttribute('value', str(atlas_size))
+
+def is_lsf_path(path):
+    return path.lower().endswith('.lsf')
+
+def write_lsx(dom, lsx_path):
+    if is_lsf_path(lsx_path):
+        import lsf
+        lsf.write_lsf(lsf.resource_from_dom(dom), lsx_path)
+        return
+    xml_str = dom.toprettyxml(indent='    ', newl='\n', encoding='UTF-8').decode('utf-8')
+    lines = [line for line in xml_str.split('\n') if line.strip()]
+    with open(lsx_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def compact_atlas_layout(atlas_im, dom, atlas_size, tile_size, min_size=None):
+    grid_size = atlas_size // tile_size
+    nodes = []
+    for node in dom.getElementsByTagName('node'):
+        if node.getAttribute('id') != 'IconUV':
+            continue
+        attrs = {attr.getAttribute('id'): attr for attr in node.getElementsByTagName('attribute')}
+        if not all((aid in attrs for aid in ('MapKey', 'U1', 'V1', 'U2', 'V2'))):
+            continue
+        col, row = get_grid_slot(float(attrs['U1'].getAttribute('value')), float(attrs['V1'].getAttribute('value')), grid_size)
+        if not (0 <= col < grid_size and 0 <= row < grid_size):
+            raise ValueError(f"IconUV '{attrs['MapKey'].getAttribute('value')}' lies outside the {grid_size}x{grid_size} grid")
+        nodes.append((attrs, (col, row)))
+    order = sorted(set((slot for _, slot in nodes)), key=lambda slot: (slot[1], slot[0]))
+    new_size = min(smallest_atlas_size(len(order), tile_size, min_size), atlas_size)
+    new_grid = new_size // tile_size
+    new_slots = {slot: (idx % new_grid, idx // new_grid) for idx, slot in enumerate(order)}
+    moved = sum((1 for slot in order if new_slots[slot] != slot))
+    if new_size == atlas_size and moved == 0:
+        return None
+    arr = np.asarray(atlas_im.convert('RGBA'))
+    tiles = arr.reshape(grid_size, tile_size, grid_size, tile_size, 4).swapaxes(1, 2)
+    packed = np.zeros((new_grid * new_grid, tile_size, tile_size, 4), dtype=np.uint8)
+    if order:
+        packed[:len(order)] = tiles[[slot[1] for slot in order], [slot[0] for slot in order]]
+    new_arr = packed.reshape(new_grid, new_grid, tile_size, tile_size, 4).swapaxes(1, 2).reshape(new_size, new_size, 4)
+    icons = []
+    for attrs, slot in nodes:
+        col, row = new_slots[slot]
+        uv = {'u1': col / new_grid, 'v1': row / new_grid, 'u2': (col + 1) / new_grid, 'v2': (row + 1) / new_grid}
+        for key, value in uv.items():
+            attrs[key.upper()].setAttribute('value', str(value))
+        icons.append(dict(mapkey=attrs['MapKey'].getAttribute('value'), **uv))
+    set_atlas_texture_size(dom, new_size)
+    return {'atlas_im': Image.fromarray(new_arr, 'RGBA'), 'atlas_size': new_size, 'grid_size': new_grid, 'icons': icons, 'slots': len(order), 'moved': moved}
+
+def compact_atlas(lsx_path, game_dir=None, mode='standalone', min_size=None, dry_run=False):
+    print(Fore.CYAN + f'\n=== COMPACT ATLAS: {lsx_path} ===')
+    dom, atlas_path, icons, atlas_size, tile_size = parse_lsx(lsx_path, game_dir, mode)
+    if dom is None or not atlas_path or not os.path.exists(atlas_path):
+        print(Fore.RED + f'[ERROR] Could not resolve the atlas DDS for {lsx_path}')
+        return None
+    atlas_im = decode_dds_image(atlas_path)
+    if atlas_im.size != (atlas_size, atlas_size):
+        atlas_im = atlas_im.resize((atlas_size, atlas_size), Image.BICUBIC)
+    result = compact_atlas_layout(atlas_im, dom, atlas_size, tile_size, min_size)
+    if result is None:
+        print(Fore.GREEN + f'✓ Already compact: {len(icons)} icon(s) in {atlas_size}x{atlas_size}')
+        return {'changed': False, 'atlas_size': atlas_size, 'lsx_path': lsx_path, 'dds_path': atlas_path}
+    print(Fore.GREEN + f"[COMPACT] {result['slots']} used slot(s), {result['moved']} moved, {atlas_size}x{atlas_size} -> {result['atlas_size']}x{result['atlas_size']}")
+    if dry_run:
+        print(Fore.YELLOW + '[COMPACT] Dry run - nothing written')
+    else:
+        stem = os.path.splitext(atlas_path)[0]
+        temp_dds = stem + '.compact.dds'
+        lsx_stem, lsx_ext = os.path.splitext(lsx_path)
+        temp_lsx = f'{lsx_stem}.compact{lsx_ext}'
+        try:
+            write_atlas_dds(result['atlas_im'], temp_dds, tile_size=tile_size)
+            if not os.path.exists(temp_dds):
+                raise RuntimeError('DDS encoding produced no output')
+            write_lsx(dom, temp_lsx)
+            os.replace(temp_dds, atlas_path)
+            os.replace(temp_lsx, lsx_path)
+        finally:
+            for path in (temp_dds, temp_lsx):
+                if os.path.exists(path):
+                    os.remove(path)
+        print(Fore.GREEN + f'✓ Compacted atlas written: {atlas_path}, {lsx_path}')
+    return {'changed': True, 'atlas_size': result['atlas_size'], 'previous_size': atlas_size, 'moved': result['moved'], 'lsx_path': lsx_path, 'dds_path': atlas_path}
+
+def scan_lsf_atlas(lsf_path):
+    import lsf
+    info = {'icons': [], 'atlas_size': None, 'tile_size': None, 'path': None}
+    stack = list(lsf.read_lsf(lsf_path)['regions'])
+    while stack:
+        node = stack.pop()
+        values = {attr['id']: attr['value'] for attr in node['attributes']}
+        if node['id'] == 'IconUV':
+            if values.get('MapKey') and all((aid in values for aid in ('U1', 'U2', 'V1', 'V2'))):
+                info['icons'].append({'mapkey': values['MapKey'], 'u1': float(values['U1']), 'u2': float(values['U2']), 'v1': float(values['V1']), 'v2': float(values['V2'])})
+        elif node['id'] == 'TextureAtlasTextureSize' and 'Width' in values:
+            info['atlas_size'] = int(values['Width'])
+        elif node['id'] == 'TextureAtlasIconSize' and 'Width' in values:
+            info['tile_size'] = int(values['Width'])
+        elif 'Path' in values and info['path'] is None:
+            info['path'] = values['Path']
+        stack.extend(reversed(node['children']))
+    return info
+
+def scan_lsx_atlas(lsx_path):
+    if is_lsf_path(lsx_path):
+        return scan_lsf_atlas(lsx_path)
+    from xml.parsers import expat
+    info = {'icons': [], 'atlas_size': None, 'tile_size': None, 'path': None}
+    nodes = []
+    current = {}
+
+    def start(name, attrs):
+        if name == 'node':
+            nodes.append(attrs.get('id'))
+            if attrs.get('id') == 'IconUV':
+                current.clear()
+        elif name == 'attribute' and nodes:
+            aid = attrs.get('id')
+            if nodes[-1] == 'IconUV':
+                current[aid] = attrs.get('value')
+            elif nodes[-1] == 'TextureAtlasTextureSize' and aid == 'Width':
+                info['atlas_size'] = int(attrs.get('value'))
+            elif nodes[-1] == 'TextureAtlasIconSize' and aid == 'Width':
+                info['tile_size'] = int(attrs.get('value'))
+            elif aid == 'Path' and info['path'] is None:
+                info['path'] = attrs.get('value')
+
+    def end(name):
+        if name == 'node' and nodes.pop() == 'IconUV' and current.get('MapKey') and all((aid in current for aid in ('U1', 'U2', 'V1', 'V2'))):
+            info['icons'].append({'mapkey': current['MapKey'], 'u1': float(current['U1']), 'u2': float(current['U2']), 'v1': float(current['V1']), 'v2': float(current['V2'])})
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    with open(lsx_path, 'rb') as f:
+        parser.ParseFile(f)
+    return info
+
+def pak_mod_folder(entry_name):
+    parts = entry_name.replace('\\', '/').split('/')
+    for i, part in enumerate(parts):
+        if part.lower() in ('public', 'mods') and i + 1 < len(parts):
+            return parts[i + 1]
+    return None
+
+def pak_atlas_dds_entry(paks, lsx_entry, atlas_path):
+    atlas_path = atlas_path.replace('\\', '/').lstrip('/')
+    mod = pak_mod_folder(lsx_entry)
+    candidates = [f'Public/{mod}/{atlas_path}', f'Generated/Public/{mod}/{atlas_path}'] if mod else []
+    candidates.append(atlas_path)
+    for candidate in candidates:
+        if paks.locate(candidate) is not None:
+            return candidate
+    return None
+
+def extract_pak_entry(paks, name, dest_dir):
+    import lspk
+    reader = paks.locate(name)
+    if reader is None:
+        raise FileNotFoundError(f'{name} is not in any of the loaded .pak files')
+    entry = reader.find(name)
+    dest_path = lspk.entry_dest_path(dest_dir, entry['name'])
+    if os.path.exists(dest_path) and os.path.getsize(dest_path) == entry['uncompressed_size'] and os.path.getmtime(dest_path) >= os.path.getmtime(reader.path):
+        return dest_path
+    return reader.extract(name, dest_path)
 
-class InteractivePreviewLabel(QLabel):
-
-    def __init__(self, icons, preview_size, atlas_size, tile_size, parent=None):
-        super().__init__(parent)
-        self.icons = icons
-        self.preview_size = preview_size
-        self.atlas_size = atlas_size
-        self.tile_size = tile_size
-        self.setMouseTracking(True)
-        self.tile_regions = self._compute_tile_regions()
-        self.selected_icon = None
-        self.parent_window = parent
-        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.customContextMenuRequested.connect(self.show_context_menu)
-
-    def _compute_tile_regions(self):
-        regions = {}
-        for icon in self.icons:
-            x_start = int(icon['u1'] * self.atlas_size)
-            y_start = int(icon['v1'] * self.atlas_size)
-            x_end = int(icon['u2'] * self.atlas_size)
-            y_end = int(icon['v2'] * self.atlas_size)
-            regions[icon['mapkey']] = (x_start, y_start, x_end, y_end)
-        return regions
-
-    def get_icon_at_position(self, mouse_x, mouse_y):
-        atlas_x = mouse_x / self.preview_size * self.atlas_size
-        atlas_y = mouse_y / self.preview_size * self.atlas_size
-        for icon in self.icons:
-            x_start = int(icon['u1'] * self.atlas_size)
-            y_start = int(icon['v1'] * self.atlas_size)
-            x_end = int(icon['u2'] * self.atlas_size)
-            y_end = int(icon['v2'] * self.atlas_size)
-            if x_start <= atlas_x < x_end and y_start <= atlas_y < y_end:
-                return icon
+def extract_pak_atlas(paks, lsx_entry, dest_dir=None):
+    dest_dir = dest_dir or os.path.join(ensure_temp_dir(), 'pak_cache')
+    lsx_path = extract_pak_entry(paks, lsx_entry, dest_dir)
+    try:
+        info = scan_lsx_atlas(lsx_path)
+    except ExpatError as e:
+        raise RuntimeError(f'XML parse error in {lsx_entry}: {e}')
+    dds_entry = pak_atlas_dds_entry(paks, lsx_entry, info['path']) if info['path'] else None
+    if dds_entry is None:
+        raise FileNotFoundError(f"Atlas texture {info['path']} referenced by {lsx_entry} is not in the loaded .pak files")
+    dds_path = extract_pak_entry(paks, dds_entry, dest_dir)
+    return {'lsx_path': lsx_path, 'dds_path': dds_path, 'game_dir': dest_dir, 'lsx_entry': lsx_entry, 'dds_entry': dds_entry, 'icons': len(info['icons'])}
+
+TILE_HASH_SEED = 1469598103934665603
+
+def tile_hashes(atlas_im, tile_size):
+    arr = np.asarray(atlas_im.convert('RGBA'), dtype=np.uint8)
+    rows, cols = (arr.shape[0] // tile_size, arr.shape[1] // tile_size)
+    arr = np.ascontiguousarray(arr[:rows * tile_size, :cols * tile_size]).reshape(rows * tile_size, -1)
+    if tile_size % 2:
+        words = arr.view(np.uint32).astype(np.uint64).reshape(rows, tile_size, cols, tile_size)
+    else:
+        words = arr.view(np.uint64).reshape(rows, tile_size, cols, tile_size // 2)
+    weights = (np.arange(1, words.shape[1] * words.shape[3] + 1, dtype=np.uint64) * np.uint64(11400714819323198485) | np.uint64(1)).reshape(words.shape[1], words.shape[3])
+    hashes = np.einsum('rtcw,tw->rc', words, weights)
+    with np.errstate(over='ignore'):
+        hashes ^= hashes >> np.uint64(29)
+        hashes *= np.uint64(TILE_HASH_SEED)
+    return hashes
+
+def load_diff_side(lsx_path, game_dir=None, mode='standalone', dds_path=None):
+    try:
+        info = scan_lsx_atlas(lsx_path)
+    except ExpatError as e:
+        raise RuntimeError(f'XML parse error in {lsx_path}: {e}')
+    atlas_size, tile_size = (info['atlas_size'], info['tile_size'])
+    if not atlas_size or not tile_size:
+        raise RuntimeError(f'Could not parse atlas_size or tile_size from {lsx_path}')
+    if not dds_path and info['path']:
+        dds_path = resolve_atlas_dds_path(lsx_path, info['path'], game_dir, mode)
+    if not dds_path or not os.path.exists(dds_path):
+        raise FileNotFoundError(f'Could not resolve the atlas DDS for {lsx_path}')
+    atlas_im = decode_dds_image(dds_path)
+    if atlas_im.size != (atlas_size, atlas_size):
+        atlas_im = atlas_im.resize((atlas_size, atlas_size), Image.BICUBIC)
+    grid_size = atlas_size // tile_size
+    slots = {icon['mapkey']: get_grid_slot(icon['u1'], icon['v1'], grid_size) for icon in info['icons']}
+    return {'lsx_path': lsx_path, 'dds_path': dds_path, 'atlas_im': atlas_im, 'atlas_size': atlas_size, 'tile_size': tile_size, 'grid_size': grid_size, 'slots': slots, 'hashes': tile_hashes(atlas_im, tile_size)}
+
+def tile_hash_at(side, slot):
+    col, row = slot
+    if 0 <= col < side['grid_size'] and 0 <= row < side['grid_size']:
+        return int(side['hashes'][row, col])
+    return None
+
+def diff_atlases(old, new):
+    comparable = old['tile_size'] == new['tile_size']
+    old_keys = set(old['slots'])
+    new_keys = set(new['slots'])
+    result = {'added': sorted(new_keys - old_keys), 'removed': sorted(old_keys - new_keys), 'moved': [], 'changed': [], 'unchanged': 0, 'rescaled': not comparable}
+    for mapkey in sorted(old_keys & new_keys):
+        old_slot = old['slots'][mapkey]
+        new_slot = new['slots'][mapkey]
+        changed = not comparable or tile_hash_at(old, old_slot) != tile_hash_at(new, new_slot)
+        if old_slot != new_slot:
+            result['moved'].append({'mapkey': mapkey, 'from': list(old_slot), 'to': list(new_slot), 'changed': changed})
+        if changed:
+            result['changed'].append(mapkey)
+        elif old_slot == new_slot:
+            result['unchanged'] += 1
+    return result
+
+def atlas_diff_has_changes(result):
+    return bool(result['added'] or result['removed'] or result['moved'] or result['changed'])
+
+def crop_tile(side, slot, tile_size):
+    col, row = slot
+    tile = side['tile_size']
+    im = side['atlas_im'].crop((col * tile, row * tile, (col + 1) * tile, (row + 1) * tile))
+    return im if tile == tile_size else im.resize((tile_size, tile_size), Image.BICUBIC)
+
+def render_diff_sheet(old, new, result, sheet_path, columns=4, label_height=14):
+    from PIL import ImageDraw
+    tile_size = max(old['tile_size'], new['tile_size'])
+    entries = [(key, old['slots'].get(key), new['slots'].get(key)) for key in result['removed'] + result['added'] + result['changed']]
+    entries += [(m['mapkey'], tuple(m['from']), tuple(m['to'])) for m in result['moved'] if not m['changed']]
+    if not entries:
         return None
+    cell_w = tile_size * 2 + 4
+    cell_h = tile_size + label_height
+    cols = min(columns, len(entries))
+    rows = (len(entries) + cols - 1) // cols
+    sheet = Image.new('RGBA', (cols * (cell_w + 8), rows * (cell_h + 8)), (40, 40, 40, 255))
+    draw = ImageDraw.Draw(sheet)
+    for idx, (mapkey, old_slot, new_slot) in enumerate(entries):
+        x = idx % cols * (cell_w + 8) + 4
+        y = idx // cols * (cell_h + 8) + 4
+        for offset, side, slot in ((0, old, old_slot), (tile_size + 4, new, new_slot)):
+            draw.rectangle((x + offset, y, x + offset + tile_size - 1, y + tile_size - 1), fill=(70, 70, 70, 255))
+            if slot is not None:
+                tile = crop_tile(side, slot, tile_size)
+                sheet.paste(tile, (x + offset, y), tile)
+            else:
+                draw.line((x + offset, y, x + offset + tile_size - 1, y + tile_size - 1), fill=(200, 60, 60, 255), width=2)
+        draw.text((x, y + tile_size + 1), mapkey[:cell_w // 6], fill=(230, 230, 230, 255))
+    sheet.save(sheet_path, 'PNG')
+    return sheet_path
 
-    def mouseMoveEvent(self, event):
-        super().mouseMoveEvent(event)
-        mouse_x = event.pos().x()
-        mouse_y = event.pos().y()
-        atlas_x = mouse_x / self.preview_size * self.atlas_size
-        atlas_y = mouse_y / self.preview_size * self.atlas_size
-        for mapkey, (x_start, y_start, x_end, y_end) in self.tile_regions.items():
-            if x_start <= atlas_x < x_end and y_start <= atlas_y < y_end:
-                QToolTip.showText(QCursor.pos(), mapkey)
-                return
-        QToolTip.hideText()
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            icon = self.get_icon_at_position(event.pos().x(), event.pos().y())
-            if icon:
-                self.selected_icon = icon
-                print(Fore.GREEN + f"[DEBUG] Selected icon: {icon['mapkey']}")
-                self.update()
-
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        if self.selected_icon and self.pixmap():
-            painter = QPainter(self)
-            pen = QPen(QColor(255, 140, 0), 3)
-            painter.setPen(pen)
-            x_start = int(self.selected_icon['u1'] * self.preview_size)
-            y_start = int(self.selected_icon['v1'] * self.preview_size)
-            x_end = int(self.selected_icon['u2'] * self.preview_size)
-            y_end = int(self.selected_icon['v2'] * self.preview_size)
-            width = x_end - x_start
-            height = y_end - y_start
-            painter.drawRect(x_start, y_start, width, height)
-            painter.end()
-
-    def show_context_menu(self, position):
-        icon = self.get_icon_at_position(position.x(), position.y())
-        if not icon:
-            return
-        self.selected_icon = icon
-        self.update()
-        print(Fore.CYAN + f"[USER] Right-clicked on icon: {icon['mapkey']}")
-        menu = QMenu(self)
-        menu.setStyleSheet('QMenu { background-color: #2a2a2a; color: white; } QMenu::item:selected { background-color: #3a3a3a; }')
-        preview_action = QAction('🔍 Preview Full Size', self)
-        preview_action.triggered.connect(lambda: self.parent_window.preview_full_size(icon['mapkey']))
-        menu.addAction(preview_action)
-        replace_action = QAction('📝 Replace Icon', self)
-        replace_action.triggered.connect(lambda: self.parent_window.replace_icon_from_context(icon['mapkey']))
-        menu.addAction(replace_action)
-        menu.addSeparator()
-        copy_action = QAction('📋 Copy MapKey Name', self)
-        copy_action.triggered.connect(lambda: self.parent_window.copy_mapkey(icon['mapkey']))
-        menu.addAction(copy_action)
-        delete_action = QAction('🗑️ Delete from Atlas', self)
-        delete_action.triggered.connect(lambda: self.parent_window.delete_icon_from_atlas(icon['mapkey']))
-        menu.addAction(delete_action)
-        menu.exec(self.mapToGlobal(position))
-
-class GuiWindow(QMainWindow):
-
-    def __init__(self):
-        super().__init__()
-        self.strings = STRINGS_EN
-        self.setWindowTitle(self.strings['window_title'])
-        self.setGeometry(100, 100, 1200, 800)
-        toolbar = self.addToolBar('Tools')
-        toolbar.setMovable(False)
-        spacer = QWidget()
-        spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        toolbar.addWidget(spacer)
-        console_action = QAction('📋 Show Console', self)
-        console_action.setToolTip('View real-time console output, logs, and debug information')
-        console_action.triggered.connect(self.show_console_viewer)
-        toolbar.addAction(console_action)
-        self.atlas_im = None
-        self.dom = None
-        self.icons = []
-        self.atlas_path = None
-        self.preview_label = None
-        self.preview_size = 1024
-        self.mode = 'mod_project'
-        self.dom_modified = False
-        self.prefs = self.load_preferences()
-        self.bg3_data = self.prefs.get('bg3_data', DEFAULT_BG3_PATHS[0])
-        self.temp_dir = self.prefs.get('temp_dir', TEMP_DIR)
-        self.output_path = self.prefs.get('output_path', '')
-        self.zip_output_path = self.prefs.get('zip_output_path', '')
-        self.preview_size_option = self.prefs.get('preview_size', 'Full Atlas Size')
-        central = QWidget()
-        layout = QHBoxLayout()
-        central.setLayout(layout)
-        self.tabs = QTabWidget()
-        layout.addWidget(self.tabs)
-        main_tab = QWidget()
-        self.tabs.addTab(main_tab, 'Main')
-        main_layout = QVBoxLayout()
-        main_tab.setLayout(main_layout)
-        bg3_layout = QHBoxLayout()
-        bg3_layout.addWidget(QLabel('BG3 Data Path:'))
-        self.bg3_edit = QLineEdit(self.bg3_data)
-        bg3_layout.addWidget(self.bg3_edit)
-        btn_browse_bg3 = QPushButton('Browse')
-        btn_browse_bg3.clicked.connect(self.browse_bg3)
-        bg3_layout.addWidget(btn_browse_bg3)
-        main_layout.addLayout(bg3_layout)
-        mod_layout = QHBoxLayout()
-        mod_layout.addWidget(QLabel('Mod Project:'))
-        self.mod_combo = QComboBox()
-        self.mod_combo.setStyleSheet('QComboBox { text-align: left; padding-left: 10px; }')
-        self.mod_combo.currentIndexChanged.connect(self.on_mod_selection_changed)
-        mod_layout.addWidget(self.mod_combo)
-        main_layout.addLayout(mod_layout)
-        mode_group = QGroupBox('Mode')
-        mode_layout = QVBoxLayout()
-        self.mode_standalone = QRadioButton('Standalone Mode')
-        self.mode_standalone.toggled.connect(self.toggle_mode)
-        mode_layout.addWidget(self.mode_standalone)
-        self.mode_project = QRadioButton('Mod Project Mode')
-        self.mode_project.setChecked(True)
-        self.mode_project.toggled.connect(self.toggle_mode)
-        mode_layout.addWidget(self.mode_project)
-        mode_group.setLayout(mode_layout)
-        main_layout.addWidget(mode_group)
-        self.standalone_group = QGroupBox('Standalone Paths')
-        standalone_layout = QVBoxLayout()
-        standalone_layout.addWidget(QLabel('Atlas .lsx Path:'))
-        self.standalone_lsx_edit = QLineEdit()
-        standalone_layout.addWidget(self.standalone_lsx_edit)
-        btn_browse_lsx = QPushButton('Browse')
-        btn_browse_lsx.clicked.connect(lambda: self.browse_path(self.standalone_lsx_edit, 'Select .lsx', '*.lsx'))
-        standalone_layout.addWidget(btn_browse_lsx)
-        standalone_layout.addWidget(QLabel('Atlas DDS Path:'))
-        self.standalone_dds_edit = QLineEdit()
-        standalone_layout.addWidget(self.standalone_dds_edit)
-        btn_browse_dds = QPushButton('Browse')
-        btn_browse_dds.clicked.connect(lambda: self.browse_path(self.standalone_dds_edit, 'Select DDS', '*.dds'))
-        standalone_layout.addWidget(btn_browse_dds)
-        self.standalone_group.setLayout(standalone_layout)
-        self.standalone_group.setVisible(False)
-        main_layout.addWidget(self.standalone_group)
-        self.project_group = QGroupBox('Mod Project')
-        project_layout = QVBoxLayout()
-        self.atlas_status_label = QLabel('No Atlas Loaded')
-        self.atlas_status_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
-        project_layout.addWidget(self.atlas_status_label)
-        project_layout.addWidget(QLabel('Current Atlas:'))
-        self.project_lsx_edit = QLineEdit()
-        self.project_lsx_edit.setReadOnly(True)
-        self.project_lsx_edit.setPlaceholderText('No atlas loaded')
-        self.project_lsx_edit.setStyleSheet('QLineEdit { background-color: #2a2a2a; }')
-        project_layout.addWidget(self.project_lsx_edit)
-        self.btn_load_project_atlas = QPushButton('Load Atlas from Project')
-        self.btn_load_project_atlas.clicked.connect(self.load_atlas_from_project)
-        self.btn_load_project_atlas.setEnabled(False)
-        self.btn_load_project_atlas.setStyleSheet('QPushButton:disabled { color: #555; }')
-        project_layout.addWidget(self.btn_load_project_atlas)
-        btn_browse_project_lsx = QPushButton('Browse Manually (Advanced)')
-        btn_browse_project_lsx.clicked.connect(lambda: self.browse_path(self.project_lsx_edit, 'Select .lsx', '*.lsx'))
-        btn_browse_project_lsx.setStyleSheet('QPushButton { font-size: 9pt; color: #888; }')
-        project_layout.addWidget(btn_browse_project_lsx)
-        self.project_group.setLayout(project_layout)
-        self.project_group.setVisible(True)
-        main_layout.addWidget(self.project_group)
-        btn_load = QPushButton(self.strings['load_atlas'])
-        btn_load.clicked.connect(self.load_atlas)
-        main_layout.addWidget(btn_load)
-        self.combo_icons = QComboBox()
-        main_layout.addWidget(self.combo_icons)
-        btn_replace = QPushButton(self.strings['replace_icon'])
-        btn_replace.clicked.connect(self.replace_icon)
-        main_layout.addWidget(btn_replace)
-        btn_add = QPushButton(self.strings['add_icon'])
-        btn_add.clicked.connect(self.add_icon)
-        main_layout.addWidget(btn_add)
-        btn_save = QPushButton(self.strings['save_atlas'])
-        btn_save.clicked.connect(self.save_atlas)
-        main_layout.addWidget(btn_save)
-        btn_resize_item = QPushButton(self.strings['resize_item'])
-        btn_resize_item.clicked.connect(self.resize_item_png_gui)
-        main_layout.addWidget(btn_resize_item)
-        btn_resize_skill = QPushButton(self.strings['resize_skill'])
-        btn_resize_skill.clicked.connect(self.resize_skill_png_gui)
-        main_layout.addWidget(btn_resize_skill)
-        self.preview_placeholder = QLabel('Load an atlas to see preview')
-        self.preview_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.preview_placeholder)
-        self.setCentralWidget(central)
-        create_tab = QWidget()
-        self.tabs.addTab(create_tab, 'Create Atlas')
-        create_layout = QVBoxLayout()
-        create_tab.setLayout(create_layout)
-        header_label = QLabel('Generate New Atlas')
-        header_label.setStyleSheet('QLabel { font-size: 14pt; font-weight: bold; margin-bottom: 10px; }')
-        create_layout.addWidget(header_label)
-        mod_select_group = QGroupBox('Mod Project')
-        mod_select_layout = QVBoxLayout()
-        mod_row = QHBoxLayout()
-        mod_row.addWidget(QLabel('Select Mod:'))
-        self.create_mod_combo = QComboBox()
-        self.create_mod_combo.setStyleSheet('QComboBox { text-align: left; padding-left: 10px; }')
-        self.create_mod_combo.currentIndexChanged.connect(self.on_create_mod_changed)
-        mod_row.addWidget(self.create_mod_combo)
-        mod_select_layout.addLayout(mod_row)
-        mod_select_group.setLayout(mod_select_layout)
-        create_layout.addWidget(mod_select_group)
-        template_group = QGroupBox('1. Atlas Configuration')
-        template_layout = QVBoxLayout()
-        canvas_layout = QHBoxLayout()
-        canvas_layout.addWidget(QLabel('Canvas Size:'))
-        self.canvas_size_group = QButtonGroup(self)
-        self.canvas_512 = QRadioButton('512 x 512 (Standard)')
-        self.canvas_512.setChecked(True)
-        self.canvas_1024 = QRadioButton('1024 x 1024 (Large)')
-        self.canvas_size_group.addButton(self.canvas_512)
-        self.canvas_size_group.addButton(self.canvas_1024)
-        canvas_layout.addWidget(self.canvas_512)
-        canvas_layout.addWidget(self.canvas_1024)
-        canvas_layout.addStretch()
-        template_layout.addLayout(canvas_layout)
-        self.grid_info_label = QLabel('Grid: 64x64 icons | Total slots: 64 (8x8)')
-        self.grid_info_label.setStyleSheet('QLabel { color: #888; font-style: italic; margin-left: 20px; }')
-        template_layout.addWidget(self.grid_info_label)
-        self.canvas_512.toggled.connect(self.update_create_atlas_grid_info)
-        self.canvas_1024.toggled.connect(self.update_create_atlas_grid_info)
-        template_group.setLayout(template_layout)
-        create_layout.addWidget(template_group)
-        location_group = QGroupBox('2. Destination')
-        location_layout = QVBoxLayout()
-        location_info = QLabel("Atlas will be created in the selected mod's GUI folder:")
-        location_info.setWordWrap(True)
-        location_layout.addWidget(location_info)
-        self.create_atlas_path_label = QLabel('No mod selected')
-        self.create_atlas_path_label.setStyleSheet('QLabel { color: #888; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
-        self.create_atlas_path_label.setWordWrap(True)
-        location_layout.addWidget(self.create_atlas_path_label)
-        name_layout = QHBoxLayout()
-        name_layout.addWidget(QLabel('Atlas Name:'))
-        self.atlas_name_edit = QLineEdit('IconAtlas')
-        self.atlas_name_edit.setPlaceholderText('e.g., IconAtlas, SkillAtlas')
-        self.atlas_name_edit.textChanged.connect(self.update_create_atlas_status)
-        name_layout.addWidget(self.atlas_name_edit)
-        location_layout.addLayout(name_layout)
-        location_group.setLayout(location_layout)
-        create_layout.addWidget(location_group)
-        icons_group = QGroupBox('3. Initial Icons (Optional)')
-        icons_layout = QVBoxLayout()
-        self.start_empty_radio = QRadioButton('Start with empty atlas')
-        self.start_empty_radio.setChecked(True)
-        self.start_empty_radio.toggled.connect(self.toggle_import_options)
-        icons_layout.addWidget(self.start_empty_radio)
-        self.import_folder_radio = QRadioButton('Import icons from folder')
-        self.import_folder_radio.toggled.connect(self.toggle_import_options)
-        icons_layout.addWidget(self.import_folder_radio)
-        self.import_controls_widget = QWidget()
-        import_controls_layout = QVBoxLayout()
-        import_controls_layout.setContentsMargins(20, 0, 0, 0)
-        folder_select_layout = QHBoxLayout()
-        folder_select_layout.addWidget(QLabel('Folder:'))
-        self.import_folder_edit = QLineEdit()
-        self.import_folder_edit.setPlaceholderText('Select folder containing PNG images')
-        self.import_folder_edit.textChanged.connect(self.scan_import_folder)
-        folder_select_layout.addWidget(self.import_folder_edit)
-        btn_browse_import = QPushButton('Browse')
-        btn_browse_import.clicked.connect(self.browse_import_folder)
-        folder_select_layout.addWidget(btn_browse_import)
-        import_controls_layout.addLayout(folder_select_layout)
-        self.import_count_label = QLabel('No folder selected')
-        self.import_count_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
-        import_controls_layout.addWidget(self.import_count_label)
-        prefix_layout = QHBoxLayout()
-        prefix_layout.addWidget(QLabel('MapKey Prefix (optional):'))
-        self.mapkey_prefix_edit = QLineEdit()
-        self.mapkey_prefix_edit.setPlaceholderText('e.g., MOD, CUSTOM')
-        self.mapkey_prefix_edit.setMaximumWidth(200)
-        prefix_layout.addWidget(self.mapkey_prefix_edit)
-        prefix_layout.addStretch()
-        import_controls_layout.addLayout(prefix_layout)
-        self.prefix_example_label = QLabel('Example: sword.png → MapKey: sword')
-        self.prefix_example_label.setStyleSheet('QLabel { color: #666; font-size: 9pt; margin-left: 20px; }')
-        self.mapkey_prefix_edit.textChanged.connect(self.update_prefix_example)
-        import_controls_layout.addWidget(self.prefix_example_label)
-        import_controls_layout.addWidget(QLabel(''))
-        self.auto_resize_checkbox = QCheckBox('Auto-generate resized versions (72, 144, 192, 380px)')
-        self.auto_resize_checkbox.setChecked(True)
-        self.auto_resize_checkbox.setToolTip('Creates multiple DDS sizes for game UI compatibility')
-        self.auto_resize_checkbox.toggled.connect(self.toggle_resize_type_selection)
-        import_controls_layout.addWidget(self.auto_resize_checkbox)
-        self.resize_type_widget = QWidget()
-        resize_type_layout = QHBoxLayout()
-        resize_type_layout.setContentsMargins(20, 0, 0, 0)
-        resize_type_layout.addWidget(QLabel('Icon Type:'))
-        self.resize_type_group = QButtonGroup(self)
-        self.resize_type_item = QRadioButton('Items')
-        self.resize_type_item.setChecked(True)
-        self.resize_type_skill = QRadioButton('Skills')
-        self.resize_type_group.addButton(self.resize_type_item)
-        self.resize_type_group.addButton(self.resize_type_skill)
-        resize_type_layout.addWidget(self.resize_type_item)
-        resize_type_layout.addWidget(self.resize_type_skill)
-        resize_type_layout.addStretch()
-        self.resize_type_widget.setLayout(resize_type_layout)
-        import_controls_layout.addWidget(self.resize_type_widget)
-        self.import_controls_widget.setLayout(import_controls_layout)
-        self.import_controls_widget.setEnabled(False)
-        icons_layout.addWidget(self.import_controls_widget)
-        icons_group.setLayout(icons_layout)
-        create_layout.addWidget(icons_group)
-        create_layout.addStretch()
-        self.btn_generate_atlas = QPushButton('Generate Atlas')
-        self.btn_generate_atlas.setStyleSheet('QPushButton { font-size: 12pt; font-weight: bold; padding: 10px; background-color: #2a5a8a; } QPushButton:hover { background-color: #3a6a9a; } QPushButton:disabled { background-color: #444; color: #666; }')
-        self.btn_generate_atlas.clicked.connect(self.generate_new_atlas)
-        self.btn_generate_atlas.setEnabled(False)
-        create_layout.addWidget(self.btn_generate_atlas)
-        self.create_status_label = QLabel('')
-        self.create_status_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
-        self.create_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        create_layout.addWidget(self.create_status_label)
-        prefs_tab = QWidget()
-        self.tabs.addTab(prefs_tab, 'Preferences')
-        prefs_layout = QVBoxLayout()
-        prefs_tab.setLayout(prefs_layout)
-        prefs_layout.addWidget(QLabel('BG3 Data Path:'))
-        bg3_prefs_layout = QHBoxLayout()
-        self.bg3_prefs_edit = QLineEdit(self.bg3_data)
-        bg3_prefs_layout.addWidget(self.bg3_prefs_edit)
-        btn_browse_bg3_prefs = QPushButton('Browse')
-        btn_browse_bg3_prefs.clicked.connect(lambda: self.browse_path(self.bg3_prefs_edit, 'Select BG3 Data Directory'))
-        bg3_prefs_layout.addWidget(btn_browse_bg3_prefs)
-        prefs_layout.addLayout(bg3_prefs_layout)
-        prefs_layout.addWidget(QLabel('Temp Directory:'))
-        temp_layout = QHBoxLayout()
-        self.temp_edit = QLineEdit(self.temp_dir)
-        temp_layout.addWidget(self.temp_edit)
-        btn_browse_temp = QPushButton('Browse')
-        btn_browse_temp.clicked.connect(lambda: self.browse_path(self.temp_edit, 'Select Temp Directory'))
-        temp_layout.addWidget(btn_browse_temp)
-        prefs_layout.addLayout(temp_layout)
-        prefs_layout.addWidget(QLabel('Output Path:'))
-        output_layout = QHBoxLayout()
-        self.output_edit = QLineEdit(self.output_path)
-        output_layout.addWidget(self.output_edit)
-        btn_browse_output = QPushButton('Browse')
-        btn_browse_output.clicked.connect(lambda: self.browse_path(self.output_edit, 'Select Output Directory'))
-        output_layout.addWidget(btn_browse_output)
-        prefs_layout.addLayout(output_layout)
-        prefs_layout.addWidget(QLabel('Zip Output Path:'))
-        zip_layout = QHBoxLayout()
-        self.zip_edit = QLineEdit(self.zip_output_path)
-        zip_layout.addWidget(self.zip_edit)
-        btn_browse_zip = QPushButton('Browse')
-        btn_browse_zip.clicked.connect(lambda: self.browse_path(self.zip_edit, 'Select Zip Output Directory'))
-        zip_layout.addWidget(btn_browse_zip)
-        prefs_layout.addLayout(zip_layout)
-        prefs_layout.addWidget(QLabel('Preview Size:'))
-        self.preview_combo = QComboBox()
-        self.preview_combo.addItems(['512x512', 'Full Atlas Size'])
-        self.preview_combo.setCurrentText(self.preview_size_option)
-        self.preview_combo.currentTextChanged.connect(self.update_preview_size)
-        prefs_layout.addWidget(self.preview_combo)
-        prefs_layout.addWidget(QLabel(''))
-        logging_label = QLabel('Logging Settings')
-        logging_label.setStyleSheet('QLabel { font-weight: bold; font-size: 12pt; color: #66ff66; }')
-        prefs_layout.addWidget(logging_label)
-        self.log_enabled_checkbox = QCheckBox('Enable session logging to file')
-        self.log_enabled_checkbox.setChecked(self.prefs.get('log_enabled', True))
-        self.log_enabled_checkbox.setToolTip('When enabled, creates a timestamped log file for each session')
-        prefs_layout.addWidget(self.log_enabled_checkbox)
-        prefs_layout.addWidget(QLabel('Log Directory:'))
-        log_dir_layout = QHBoxLayout()
-        default_log_dir = self.prefs.get('log_directory', os.path.join(os.path.dirname(__file__), 'logs'))
-        self.log_dir_edit = QLineEdit(default_log_dir)
-        self.log_dir_edit.setToolTip('Directory where log files will be saved')
-        log_dir_layout.addWidget(self.log_dir_edit)
-        btn_browse_log_dir = QPushButton('Browse')
-        btn_browse_log_dir.clicked.connect(lambda: self.browse_path(self.log_dir_edit, 'Select Log Directory'))
-        log_dir_layout.addWidget(btn_browse_log_dir)
-        prefs_layout.addLayout(log_dir_layout)
-        log_level_layout = QHBoxLayout()
-        log_level_layout.addWidget(QLabel('Console Display Level:'))
-        self.log_level_combo = QComboBox()
-        self.log_level_combo.addItems(['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])
-        self.log_level_combo.setCurrentText(self.prefs.get('log_level', 'DEBUG'))
-        self.log_level_combo.setToolTip('Controls console output verbosity. File log ALWAYS captures everything at DEBUG level.\nDEBUG: Show all | INFO: General info | WARNING/ERROR: Issues only')
-        log_level_layout.addWidget(self.log_level_combo)
-        log_level_layout.addStretch()
-        prefs_layout.addLayout(log_level_layout)
-        log_level_note = QLabel('Note: Log file always captures everything (DEBUG), this setting only affects console display')
-        log_level_note.setStyleSheet('QLabel { color: #88aaff; font-style: italic; font-size: 9pt; margin-left: 20px; }')
-        prefs_layout.addWidget(log_level_note)
-        max_log_layout = QHBoxLayout()
-        max_log_layout.addWidget(QLabel('Keep last N log files:'))
-        self.max_log_files_spinbox = QSpinBox()
-        self.max_log_files_spinbox.setMinimum(1)
-        self.max_log_files_spinbox.setMaximum(100)
-        self.max_log_files_spinbox.setValue(self.prefs.get('max_log_files', 10))
-        self.max_log_files_spinbox.setToolTip('Automatically deletes older log files, keeping only the most recent N files')
-        max_log_layout.addWidget(self.max_log_files_spinbox)
-        max_log_layout.addStretch()
-        prefs_layout.addLayout(max_log_layout)
-        log_note = QLabel('Note: Logging changes take effect on next application start')
-        log_note.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; font-size: 9pt; }')
-        prefs_layout.addWidget(log_note)
-        prefs_layout.addWidget(QLabel(''))
-        texconv_label = QLabel('Texconv Settings (DDS Conversion Tool)')
-        texconv_label.setStyleSheet('QLabel { font-weight: bold; font-size: 12pt; color: #66ff66; }')
-        prefs_layout.addWidget(texconv_label)
-        self.texconv_status_label = QLabel('Checking texconv...')
-        self.texconv_status_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; }')
-        prefs_layout.addWidget(self.texconv_status_label)
-        prefs_layout.addWidget(QLabel('Texconv Path (optional - leave blank for auto-detect):'))
-        texconv_path_layout = QHBoxLayout()
-        texconv_path_default = self.prefs.get('texconv_path', '')
-        self.texconv_path_edit = QLineEdit(texconv_path_default)
-        self.texconv_path_edit.setPlaceholderText('Auto-detect from: script_dir/texconv/, system PATH')
-        self.texconv_path_edit.setToolTip('Leave blank to auto-detect, or specify full path to texconv.exe')
-        texconv_path_layout.addWidget(self.texconv_path_edit)
-        btn_browse_texconv = QPushButton('Browse')
-        btn_browse_texconv.clicked.connect(self.browse_texconv)
-        texconv_path_layout.addWidget(btn_browse_texconv)
-        prefs_layout.addLayout(texconv_path_layout)
-        texconv_buttons_layout = QHBoxLayout()
-        self.btn_download_texconv = QPushButton('Download Texconv')
-        self.btn_download_texconv.setToolTip('Download texconv.exe from Microsoft DirectXTex (official source)')
-        self.btn_download_texconv.clicked.connect(self.download_texconv_clicked)
-        texconv_buttons_layout.addWidget(self.btn_download_texconv)
-        btn_check_texconv = QPushButton('Check Status')
-        btn_check_texconv.setToolTip('Verify texconv.exe is found and working')
-        btn_check_texconv.clicked.connect(self.update_texconv_status)
-        texconv_buttons_layout.addWidget(btn_check_texconv)
-        texconv_buttons_layout.addStretch()
-        prefs_layout.addLayout(texconv_buttons_layout)
-        texconv_info = QLabel('Texconv is used for PNG↔DDS conversion. Will be downloaded to script_dir/texconv/')
-        texconv_info.setStyleSheet('QLabel { color: #88aaff; font-style: italic; font-size: 9pt; }')
-        prefs_layout.addWidget(texconv_info)
-        self.update_texconv_status()
-        prefs_layout.addStretch()
-        btn_save_prefs = QPushButton('Save Preferences')
-        btn_save_prefs.clicked.connect(self.save_preferences)
-        prefs_layout.addWidget(btn_save_prefs)
-        self.refresh_mods()
-        self.update_create_atlas_status()
-
-    def browse_bg3(self):
-        dir_ = QFileDialog.getExistingDirectory(self, 'Select BG3 Data folder', self.bg3_edit.text())
-        if dir_:
-            self.bg3_edit.setText(dir_)
-            self.refresh_mods()
-
-    def refresh_mods(self):
-        bg3 = self.bg3_edit.text().strip()
-        if not bg3 or not os.path.isdir(bg3):
-            self.mod_combo.clear()
-            self.create_mod_combo.clear()
+def snapshot_png_folder(folder):
+    snapshot = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.lower().endswith('.png'):
+                st = entry.stat()
+                snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+class FolderWatcher:
+
+    def __init__(self, folder, debounce=1.5, backend='auto'):
+        self.folder = folder
+        self.debounce = debounce
+        self.snapshot = snapshot_png_folder(folder)
+        self.dirty = {}
+        self.removed = set()
+        self.lock = threading.Lock()
+        self.event_seen = False
+        self.observer = None
+        self.backend = 'polling'
+        if backend in ('auto', 'native'):
+            self._start_native()
+            if backend == 'native' and self.observer is None:
+                print(Fore.YELLOW + '[WATCH] watchdog is not installed - falling back to polling')
+        print(Fore.CYAN + f'[WATCH] Watching {folder} ({self.backend} backend, {len(self.snapshot)} PNGs, debounce {debounce:.1f}s)')
+
+    def _start_native(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
             return
-        public = os.path.join(bg3, 'Public')
-        generated = os.path.join(bg3, 'Generated', 'Public')
-        mods = set()
-        if os.path.isdir(public):
-            mods.update([d for d in os.listdir(public) if os.path.isdir(os.path.join(public, d))])
-        if os.path.isdir(generated):
-            mods.update([d for d in os.listdir(generated) if os.path.isdir(os.path.join(generated, d))])
-        mods = sorted(mods)
-        current = self.mod_combo.currentText()
-        self.mod_combo.blockSignals(True)
-        self.mod_combo.clear()
-        self.mod_combo.addItems(mods)
-        self.mod_combo.blockSignals(False)
-        if current in mods:
-            self.mod_combo.setCurrentText(current)
-        self.create_mod_combo.blockSignals(True)
-        self.create_mod_combo.clear()
-        self.create_mod_combo.addItems(mods)
-        self.create_mod_combo.blockSignals(False)
-        if current in mods:
-            self.create_mod_combo.setCurrentText(current)
-
-    def toggle_mode(self):
-        print(Fore.CYAN + f'\n--- MODE CHANGE ---')
-        if self.mode_standalone.isChecked():
-            self.mode = 'standalone'
-            print(Fore.GREEN + f'✓ Switched to STANDALONE mode')
-            self.standalone_group.setVisible(True)
-            self.project_group.setVisible(False)
-        else:
-            self.mode = 'mod_project'
-            print(Fore.GREEN + f'✓ Switched to MOD PROJECT mode')
-            self.standalone_group.setVisible(False)
-            self.project_group.setVisible(True)
-        print(Fore.CYAN + f'-------------------\n')
-
-    def on_mod_selection_changed(self):
-        mod = self.mod_combo.currentText()
-        if mod and self.mode == 'mod_project':
-            self.btn_load_project_atlas.setEnabled(True)
-            print(Fore.GREEN + f'[DEBUG] Mod selected: {mod} - Load button enabled')
+        watcher = self
+
+        class _EventHandler(FileSystemEventHandler):
+
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    with watcher.lock:
+                        watcher.event_seen = True
+        self.observer = Observer()
+        self.observer.schedule(_EventHandler(), self.folder, recursive=False)
+        self.observer.daemon = True
+        self.observer.start()
+        self.backend = 'native'
+
+    def _rescan(self, now):
+        current = snapshot_png_folder(self.folder)
+        for name, stamp in current.items():
+            if self.snapshot.get(name) != stamp:
+                self.dirty[name] = now
+                self.removed.discard(name)
+        for name in self.snapshot:
+            if name not in current:
+                self.dirty.pop(name, None)
+                self.removed.add(name)
+        self.snapshot = current
+
+    def poll(self):
+        now = time.monotonic()
+        if self.observer is None:
+            self._rescan(now)
         else:
-            self.btn_load_project_atlas.setEnabled(False)
-            print(Fore.GREEN + f'[DEBUG] No mod selected - Load button disabled')
-        if mod and mod != self.create_mod_combo.currentText():
-            self.create_mod_combo.blockSignals(True)
-            self.create_mod_combo.setCurrentText(mod)
-            self.create_mod_combo.blockSignals(False)
-        self.update_create_atlas_status()
-
-    def load_atlas_from_project(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Load Atlas from Project')
-        print(Fore.CYAN + f"{'=' * 60}")
-        bg3_data = self.bg3_edit.text().strip()
-        mod = self.mod_combo.currentText()
-        if not mod:
-            print(Fore.RED + f'[ERROR] No mod selected')
-            print(Fore.RED + f'[POPUP] Showing error: Please select a mod from the dropdown first.')
-            QMessageBox.warning(self, 'Error', 'Please select a mod from the dropdown first.')
-            return
-        if not bg3_data or not os.path.exists(bg3_data):
-            print(Fore.RED + f'[ERROR] Invalid BG3 Data path: {bg3_data}')
-            print(Fore.RED + f'[POPUP] Showing error: Invalid BG3 Data path.')
-            QMessageBox.warning(self, 'Error', 'Invalid BG3 Data path. Please set it in preferences.')
-            return
-        print(Fore.GREEN + f'[DEBUG] Selected mod: {mod}')
-        print(Fore.GREEN + f'[DEBUG] BG3 Data path: {bg3_data}')
-        scan_paths = [os.path.join(bg3_data, 'Mods', mod, 'GUI'), os.path.join(bg3_data, 'Public', mod, 'GUI')]
-        found_lsx_files = []
-        for scan_path in scan_paths:
-            print(Fore.CYAN + f'[SCAN] Searching for .lsx files in: {scan_path}')
-            if os.path.exists(scan_path):
-                for file in os.listdir(scan_path):
-                    if file.endswith('.lsx'):
-                        full_path = os.path.join(scan_path, file)
-                        found_lsx_files.append(full_path)
-                        print(Fore.GREEN + f'✓ Found .lsx file: {full_path}')
-        if not found_lsx_files:
-            print(Fore.RED + f'[ERROR] No .lsx files found in mod GUI folders')
-            error_msg = f'No .lsx files found in:\n{scan_paths[0]}\n{scan_paths[1]}\n\nPlease ensure your mod has atlas files in the GUI folder.'
-            print(Fore.RED + f'[POPUP] Showing error: {error_msg}')
-            QMessageBox.warning(self, 'No Atlas Files Found', error_msg)
-            return
-        lsx_path = None
-        if len(found_lsx_files) == 1:
-            lsx_path = found_lsx_files[0]
-            print(Fore.GREEN + f'✓ Auto-selected single .lsx file: {lsx_path}')
+            with self.lock:
+                event_seen, self.event_seen = (self.event_seen, False)
+            if event_seen:
+                self._rescan(now)
+        ready = sorted([name for name, changed_at in self.dirty.items() if now - changed_at >= self.debounce])
+        removed = sorted(self.removed)
+        if not ready and not removed:
+            return None
+        for name in ready:
+            del self.dirty[name]
+        self.removed.clear()
+        return {'changed': ready, 'removed': removed}
+
+    def run(self, callback, stop_event=None, interval=0.5):
+        stop_event = stop_event or threading.Event()
+        try:
+            while not stop_event.is_set():
+                batch = self.poll()
+                if batch:
+                    callback(batch)
+                stop_event.wait(interval)
+        except KeyboardInterrupt:
+            print(Fore.YELLOW + '\n[WATCH] Stopped by user')
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join(timeout=2)
+            self.observer = None
+
+def sync_watched_pngs(folder, batch, lsx_path=None, dest_dir=None, skill_mode=False, prefix='', game_dir=None, mode='standalone'):
+    started = time.monotonic()
+    changed = batch['changed']
+    for name in batch['removed']:
+        print(Fore.YELLOW + f'[WATCH] {name} was removed - existing atlas entry and tiers are kept')
+    if not changed:
+        return None
+    print(Fore.CYAN + f"[WATCH] Syncing {len(changed)} changed PNG(s): {', '.join(changed)}")
+    for name in changed:
+        png_path = os.path.join(folder, name)
+        base_mapkey = os.path.splitext(name)[0]
+        mapkey = f'{prefix}_{base_mapkey}' if prefix else base_mapkey
+        if dest_dir:
+            try:
+                resize_png(png_path, skill_mode=skill_mode, dest_dir=dest_dir, output_name=mapkey)
+            except Exception as e:
+                print(Fore.RED + f'[WATCH] Failed to resize {name}: {e}')
+    result = None
+    if lsx_path:
+        result = update_atlas(lsx_path, folder, game_dir=game_dir, mode=mode, png_files=changed, prefix=prefix, add_missing=True)
+    print(Fore.GREEN + f'[WATCH] ✓ Synced {len(changed)} file(s) in {time.monotonic() - started:.1f}s')
+    return result
+
+MAPKEY_ATTRIBUTE_RE = re.compile('<attribute\\b[^>]*\\bid="MapKey"[^>]*>')
+ATTRIBUTE_VALUE_RE = re.compile('\\bvalue="([^"]*)"')
+
+def scan_lsx_mapkeys(lsx_path):
+    with open(lsx_path, 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    keys = []
+    for match in MAPKEY_ATTRIBUTE_RE.finditer(content):
+        value = ATTRIBUTE_VALUE_RE.search(match.group(0))
+        if value:
+            keys.append(html.unescape(value.group(1)))
+    return keys
+
+def mod_gui_roots(bg3_data, mod):
+    return [os.path.join(bg3_data, 'Public', mod, 'GUI'), os.path.join(bg3_data, 'Mods', mod, 'GUI')]
+
+def iter_lsx_files(roots):
+    stack = [root for root in roots if os.path.isdir(root)]
+    while stack:
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith('.lsx'):
+                        st = entry.stat()
+                        yield (entry.path, (st.st_mtime_ns, st.st_size))
+        except OSError as e:
+            print(Fore.YELLOW + f'[INDEX] Cannot scan {folder}: {e}')
+
+def unique_png_mapkeys(png_files, prefix='', verbose=True):
+    seen = {}
+    unique = []
+    skipped = []
+    for png_file in png_files:
+        base_mapkey = os.path.splitext(png_file)[0]
+        mapkey = f'{prefix}_{base_mapkey}' if prefix else base_mapkey
+        if mapkey in seen:
+            if verbose:
+                print(Fore.YELLOW + f"[WARNING] Skipping {png_file}: MapKey '{mapkey}' already used by {seen[mapkey]}")
+            skipped.append((png_file, mapkey))
+            continue
+        seen[mapkey] = png_file
+        unique.append((png_file, mapkey))
+    return (unique, skipped)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_COLOR_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+def read_png_header(path):
+    record = {'name': os.path.basename(path), 'path': path, 'width': None, 'height': None, 'bit_depth': None, 'mode': None, 'interlaced': False, 'error': None}
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(33)
+    except OSError as e:
+        record['error'] = str(e)
+        return record
+    if len(head) < 33 or head[:8] != PNG_SIGNATURE or head[12:16] != b'IHDR':
+        record['error'] = 'not a PNG file (bad signature or missing IHDR)'
+        return record
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', head[16:29])
+    record.update(width=width, height=height, bit_depth=bit_depth, mode=PNG_COLOR_MODES.get(color_type), interlaced=interlace == 1)
+    if record['mode'] is None:
+        record['error'] = f'unknown PNG color type {color_type}'
+    elif width == 0 or height == 0:
+        record['error'] = f'empty image ({width}x{height})'
+    return record
+
+def scan_png_headers(folder, max_workers=8):
+    with os.scandir(folder) as it:
+        paths = [entry.path for entry in sorted(it, key=lambda e: e.name) if entry.name.lower().endswith('.png') and entry.is_file()]
+    if len(paths) < 64:
+        return [read_png_header(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return list(executor.map(read_png_header, paths))
+
+DDS_HEADER = struct.Struct('<4s7I44x2I4s5I5I')
+DDS_DX10_HEADER = struct.Struct('<5I')
+DXGI_FORMATS = {28: 'R8G8B8A8_UNORM', 29: 'R8G8B8A8_UNORM_SRGB', 71: 'BC1_UNORM', 72: 'BC1_UNORM_SRGB', 74: 'BC2_UNORM', 75: 'BC2_UNORM_SRGB', 77: 'BC3_UNORM', 78: 'BC3_UNORM_SRGB', 80: 'BC4_UNORM', 81: 'BC4_SNORM', 83: 'BC5_UNORM', 84: 'BC5_SNORM', 87: 'B8G8R8A8_UNORM', 91: 'B8G8R8A8_UNORM_SRGB', 95: 'BC6H_UF16', 96: 'BC6H_SF16', 98: 'BC7_UNORM', 99: 'BC7_UNORM_SRGB'}
+DDS_FOURCC_FORMATS = {b'DXT1': 'BC1_UNORM', b'DXT2': 'BC2_UNORM', b'DXT3': 'BC2_UNORM', b'DXT4': 'BC3_UNORM', b'DXT5': 'BC3_UNORM', b'ATI1': 'BC4_UNORM', b'BC4U': 'BC4_UNORM', b'ATI2': 'BC5_UNORM', b'BC5U': 'BC5_UNORM'}
+
+def dds_payload_size(format, width, height, mipmaps, bit_count=32):
+    total = 0
+    for level in range(max(mipmaps, 1)):
+        w, h = (max(width >> level, 1), max(height >> level, 1))
+        if format.startswith(('BC1', 'BC4')):
+            total += (w + 3) // 4 * ((h + 3) // 4) * 8
+        elif format.startswith('BC'):
+            total += (w + 3) // 4 * ((h + 3) // 4) * 16
         else:
-            print(Fore.CYAN + f'[USER] Multiple .lsx files found ({len(found_lsx_files)}), prompting user to choose...')
-            file_names = [os.path.basename(f) for f in found_lsx_files]
-            print(Fore.GREEN + f'[POPUP] Showing selection dialog with options: {file_names}')
-            chosen_file, ok = QInputDialog.getItem(self, 'Select Atlas File', f'Found {len(found_lsx_files)} atlas files. Choose one:', file_names, 0, False)
-            if ok and chosen_file:
-                lsx_path = found_lsx_files[file_names.index(chosen_file)]
-                print(Fore.GREEN + f'✓ User selected: {lsx_path}')
+            total += w * h * bit_count // 8
+    return total
+
+def read_dds_header(path):
+    import mmap
+    record = {'name': os.path.basename(path), 'path': path, 'width': None, 'height': None, 'mipmaps': None, 'format': None, 'error': None}
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < DDS_HEADER.size or data[:4] != b'DDS ':
+                record['error'] = 'not a DDS file (bad magic or truncated header)'
+                return record
+            magic, size, flags, height, width, pitch, depth, mipmaps, pf_size, pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, a_mask, *caps = DDS_HEADER.unpack_from(data, 0)
+            offset = DDS_HEADER.size
+            if fourcc == b'DX10':
+                if len(data) < offset + DDS_DX10_HEADER.size:
+                    record['error'] = 'truncated DX10 header'
+                    return record
+                dxgi_format = DDS_DX10_HEADER.unpack_from(data, offset)[0]
+                offset += DDS_DX10_HEADER.size
+                format = DXGI_FORMATS.get(dxgi_format, f'DXGI_{dxgi_format}')
+            elif pf_flags & 4:
+                format = DDS_FOURCC_FORMATS.get(fourcc, fourcc.decode('ascii', errors='replace'))
+            elif bit_count == 32:
+                format = 'B8G8R8A8_UNORM' if r_mask == 16711680 else 'R8G8B8A8_UNORM'
             else:
-                print(Fore.YELLOW + f'[WARNING] User cancelled .lsx selection')
-                return
-        self.project_lsx_edit.setText(lsx_path)
-        print(Fore.CYAN + f'[OPERATION] Parsing LSX file in mod project mode...')
-        self.dom, self.atlas_path, self.icons, self.atlas_size, self.tile_size = parse_lsx(lsx_path, bg3_data, 'mod_project')
-        if self.dom is None:
-            print(Fore.RED + f'[ERROR] Failed to parse LSX file')
-            self.atlas_status_label.setText('Failed to load atlas')
-            self.atlas_status_label.setStyleSheet('QLabel { color: #ff4444; font-style: italic; }')
-            return
-        if self.atlas_path is None or not os.path.exists(self.atlas_path):
-            print(Fore.YELLOW + f'[WARNING] DDS not found at resolved path: {self.atlas_path}')
-            print(Fore.YELLOW + f'[POPUP] Prompting user: Could not find DDS. Browse manually?')
-            reply = QMessageBox.question(self, 'DDS Not Found', f'Could not find DDS at {self.atlas_path}.\n\nBrowse manually?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-            if reply == QMessageBox.StandardButton.Yes:
-                print(Fore.CYAN + f'[USER] User chose to browse for DDS manually')
-                default_dir = self.get_default_file_dialog_path()
-                print(Fore.GREEN + f"[DEBUG] Default browse path: {(default_dir if default_dir else '(current directory)')}")
-                dds_path = QFileDialog.getOpenFileName(self, 'Select DDS', default_dir, '*.dds')[0]
-                if dds_path:
-                    self.atlas_path = dds_path
-                    print(Fore.GREEN + f'✓ User selected DDS: {self.atlas_path}')
-                else:
-                    print(Fore.RED + f'[ERROR] User cancelled DDS selection')
-                    print(Fore.RED + f'[POPUP] Showing error: DDS path required.')
-                    QMessageBox.warning(self, 'Error', 'DDS path required.')
-                    return
+                format = f'RGB{bit_count}'
+            record.update(width=width, height=height, mipmaps=max(mipmaps, 1) if flags & 131072 else 1, format=format)
+            if width == 0 or height == 0:
+                record['error'] = f'empty image ({width}x{height})'
+            elif len(data) < offset + dds_payload_size(format, width, height, record['mipmaps'], bit_count):
+                record['error'] = f"truncated payload ({len(data) - offset} bytes for {record['mipmaps']} {format} level(s))"
+    except (OSError, ValueError) as e:
+        record['error'] = str(e) or 'empty file'
+    return record
+
+def scan_dds_headers(paths, max_workers=8):
+    paths = list(paths)
+    if len(paths) < 64:
+        return [read_dds_header(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return list(executor.map(read_dds_header, paths))
+
+def preflight_import_folder(folder, prefix='', capacity=None, min_size=None):
+    started = time.perf_counter()
+    if min_size is None:
+        min_size = max((exp['size'] for exp in EXPORT_ORDER_ITEMS))
+    records = scan_png_headers(folder)
+    readable = [r for r in records if not r['error']]
+    entries, collisions = unique_png_mapkeys([r['name'] for r in readable], prefix, verbose=False)
+    modes = {}
+    for r in readable:
+        key = f"{r['mode']}/{r['bit_depth']}"
+        modes[key] = modes.get(key, 0) + 1
+    overflow = entries[capacity:] if capacity is not None else []
+    return {'folder': folder, 'prefix': prefix, 'capacity': capacity, 'files': records, 'invalid': [r for r in records if r['error']], 'non_square': [r for r in readable if r['width'] != r['height']], 'small': [r for r in readable if min(r['width'], r['height']) < min_size], 'min_size': min_size, 'modes': modes, 'entries': entries[:capacity] if capacity is not None else entries, 'collisions': collisions, 'overflow': overflow, 'elapsed_ms': (time.perf_counter() - started) * 1000}
+
+def preflight_has_errors(report):
+    return bool(report['invalid'] or report['collisions'] or report['overflow'])
+
+def print_preflight_report(report, limit=10):
+    print(Fore.CYAN + f"[PREFLIGHT] {report['folder']}: {len(report['files'])} PNG(s) scanned in {report['elapsed_ms']:.1f} ms")
+    if report['modes']:
+        print(Fore.GREEN + '[PREFLIGHT] Modes: ' + ', '.join((f'{mode} x{count}' for mode, count in sorted(report['modes'].items()))))
+    for r in report['invalid'][:limit]:
+        print(Fore.RED + f"[PREFLIGHT] ✗ {r['name']}: {r['error']}")
+    for r in report['non_square'][:limit]:
+        print(Fore.YELLOW + f"[PREFLIGHT] ⚠ {r['name']}: non-square {r['width']}x{r['height']} - tier export will skip it")
+    for r in report['small'][:limit]:
+        print(Fore.YELLOW + f"[PREFLIGHT] ⚠ {r['name']}: {r['width']}x{r['height']} is smaller than the {report['min_size']}px tier and will be upscaled")
+    for png_file, mapkey in report['collisions'][:limit]:
+        print(Fore.RED + f"[PREFLIGHT] ✗ {png_file}: MapKey '{mapkey}' is already used by another file")
+    if report['overflow']:
+        print(Fore.RED + f"[PREFLIGHT] ✗ {len(report['overflow'])} file(s) exceed the {report['capacity']} slot capacity, starting with {report['overflow'][0][0]}")
+    hidden = sum((max(0, len(report[key]) - limit) for key in ('invalid', 'non_square', 'small', 'collisions')))
+    if hidden:
+        print(Fore.YELLOW + f'[PREFLIGHT] ... {hidden} more issue(s) not shown')
+    color = Fore.RED if preflight_has_errors(report) else Fore.GREEN
+    example = f" (e.g. {report['entries'][0][0]} -> {report['entries'][0][1]})" if report['entries'] else ''
+    print(color + f"[PREFLIGHT] {len(report['entries'])} icon(s) ready{example}, {len(report['invalid'])} unreadable, {len(report['non_square'])} non-square, {len(report['collisions'])} MapKey collision(s), {len(report['overflow'])} over capacity")
+
+def lint_atlas_layout(icons, atlas_size, tile_size):
+    issues = []
+    if not icons or not atlas_size or not tile_size:
+        return issues
+    keys = [icon['mapkey'] for icon in icons]
+    px = np.array([[icon['u1'], icon['v1'], icon['u2'], icon['v2']] for icon in icons], dtype=np.float64) * atlas_size
+    cells = px / tile_size
+    misaligned = np.abs(cells - np.round(cells)).max(axis=1) > 0.001
+    wrong_size = np.abs(px[:, 2:] - px[:, :2] - tile_size).max(axis=1) > 0.5
+    outside = (px.min(axis=1) < -0.5) | (px.max(axis=1) > atlas_size + 0.5)
+    for i in np.flatnonzero(misaligned | wrong_size | outside):
+        kind = 'outside' if outside[i] else 'misaligned' if misaligned[i] else 'tile_size'
+        issues.append({'kind': kind, 'mapkey': keys[i], 'detail': f'pixel rect ({px[i, 0]:.1f}, {px[i, 1]:.1f})-({px[i, 2]:.1f}, {px[i, 3]:.1f}) on a {tile_size}px grid'})
+    names, counts = np.unique(np.array(keys, dtype=str), return_counts=True)
+    for name in names[counts > 1]:
+        issues.append({'kind': 'duplicate', 'mapkey': str(name), 'detail': f'{int(counts[names == name][0])} IconUV entries'})
+    rects, inverse = np.unique(np.round(px, 2), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    first = np.full(len(rects), len(keys))
+    np.minimum.at(first, inverse, np.arange(len(keys)))
+    lo = np.floor(rects[:, :2] / tile_size + 1e-06).astype(np.int64)
+    spans = np.maximum(np.ceil(rects[:, 2:] / tile_size - 1e-06).astype(np.int64) - lo, 1)
+    count = spans[:, 0] * spans[:, 1]
+    rect_id = np.repeat(np.arange(len(rects)), count)
+    offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    cell = (lo[rect_id, 1] + offset // spans[rect_id, 0]) * (1 << 32) + lo[rect_id, 0] + offset % spans[rect_id, 0]
+    order = np.argsort(cell, kind='stable')
+    same = np.flatnonzero(cell[order][1:] == cell[order][:-1])
+    seen = set()
+    for a, b in zip(rect_id[order][same], rect_id[order][same + 1]):
+        if a == b or (a, b) in seen:
+            continue
+        seen.add((a, b))
+        ra, rb = (rects[a], rects[b])
+        if ra[0] < rb[2] - 0.01 and rb[0] < ra[2] - 0.01 and (ra[1] < rb[3] - 0.01) and (rb[1] < ra[3] - 0.01):
+            issues.append({'kind': 'overlap', 'mapkey': keys[first[a]], 'detail': f'overlaps {keys[first[b]]} without sharing its slot'})
+    return issues
+
+def lint_tier_profile(mapkey, listings, profiles):
+    scores = []
+    for name, profile in profiles.items():
+        found = sum((1 for tier in profile['tiers'] if f'{mapkey}.dds'.lower() in listings.get(tier['folder'], {})))
+        suffix = profile['suffix'] and mapkey.endswith(profile['suffix'])
+        scores.append((found, bool(suffix), name == 'items', name))
+    return max(scores)[3]
+
+def lint_tier_header(header, tier, fallback=False):
+    if header['error']:
+        return ('unreadable', header['error'])
+    if (header['width'], header['height']) != (tier['size'], tier['size']):
+        return ('size', f"{header['width']}x{header['height']}, expected {tier['size']}x{tier['size']}")
+    allowed = {tier['format']} if tier['format'] != 'auto' else {'BC1_UNORM', tier['alpha_format']}
+    problem = None
+    if header['format'] not in allowed:
+        problem = ('format', f"{header['format']}, expected {' or '.join(sorted(allowed))}")
+    elif tier['mipmaps'] and header['mipmaps'] <= 1 and tier['size'] > 1:
+        problem = ('mips', 'no mip chain')
+    elif not tier['mipmaps'] and header['mipmaps'] > 1:
+        problem = ('mips', f"{header['mipmaps']} mip levels, expected 1")
+    if problem and fallback and header['format'] in PILLOW_DDS_FORMATS and header['mipmaps'] == 1:
+        return ('fallback', f"{header['format']} without mips from the Pillow fallback ({problem[1]})")
+    return problem
+
+def lint_targets(roots=(), game_dir=None, mod=None):
+    roots = list(roots)
+    if mod and not game_dir:
+        raise ValueError('--mod needs --game-dir')
+    if mod:
+        roots.extend(mod_gui_roots(game_dir, mod))
+    if not roots:
+        raise ValueError('Nothing to lint: pass mod GUI folder(s) or --game-dir with --mod')
+    return (roots, os.path.join(game_dir, 'Mods', mod, 'GUI') if mod else None, 'mod_project' if mod else 'standalone')
+
+def lint_mod(roots, game_dir=None, mode='standalone', profile=None, tier_root=None):
+    started = time.perf_counter()
+    if not EXPORT_PROFILES:
+        configure_export_profiles()
+    profiles = {profile: get_export_profile(profile)} if profile else dict(EXPORT_PROFILES)
+    tier_root = tier_root or roots[0]
+    fallback = not get_texconv_path()
+    report = {'roots': list(roots), 'tier_root': tier_root, 'atlases': [], 'layout': [], 'tiers': [], 'warnings': [], 'orphans': [], 'sources': {}, 'headers': 0, 'mapkeys': 0, 'elapsed_ms': 0.0}
+    placements = {}
+    for lsx_path, _ in sorted(iter_lsx_files(roots)):
+        try:
+            info = scan_lsx_atlas(lsx_path)
+        except (OSError, ExpatError) as e:
+            report['layout'].append({'kind': 'unreadable', 'mapkey': None, 'lsx': lsx_path, 'detail': str(e)})
+            continue
+        if not info['icons']:
+            continue
+        dds_path = resolve_atlas_dds_path(lsx_path, info['path'], game_dir, mode) if info['path'] else None
+        atlas = {'lsx': lsx_path, 'dds': dds_path, 'icons': len(info['icons']), 'atlas_size': info['atlas_size'], 'tile_size': info['tile_size']}
+        report['atlases'].append(atlas)
+        for issue in lint_atlas_layout(info['icons'], info['atlas_size'], info['tile_size']):
+            report['layout'].append(dict(issue, lsx=lsx_path))
+        header = read_dds_header(dds_path) if dds_path else {'error': 'atlas DDS not found'}
+        if header['error'] or (header['width'], header['height']) != (info['atlas_size'], info['atlas_size']):
+            detail = header['error'] or f"{header['width']}x{header['height']}, LSX says {info['atlas_size']}x{info['atlas_size']}"
+            report['layout'].append({'kind': 'atlas', 'mapkey': None, 'lsx': lsx_path, 'detail': detail})
+            dds_path = None
+        for icon in info['icons']:
+            if dds_path:
+                placements.setdefault(icon['mapkey'], {'dds': dds_path, 'atlas_size': info['atlas_size'], 'tile_size': info['tile_size'], 'u1': icon['u1'], 'v1': icon['v1']})
             else:
-                print(Fore.RED + f'[ERROR] User declined to browse for DDS')
-                print(Fore.RED + f'[POPUP] Showing error: Cannot load atlas without DDS.')
-                QMessageBox.warning(self, 'Error', 'Cannot load atlas without DDS.')
-                return
-        self.grid_size = self.atlas_size // self.tile_size
-        print(Fore.GREEN + f'[DEBUG] Calculated grid size: {self.grid_size}x{self.grid_size}')
-        if self.atlas_size % self.tile_size != 0:
-            print(Fore.RED + f'[ERROR] Atlas size not divisible by tile size: {self.atlas_size} % {self.tile_size} != 0')
-            error_msg = f'Invalid atlas: atlas_size {self.atlas_size} not divisible by tile_size {self.tile_size}.'
-            print(Fore.RED + f'[POPUP] Showing error: {error_msg}')
-            QMessageBox.warning(self, 'Error', error_msg)
-            return
-        print(Fore.CYAN + f'[OPERATION] Converting DDS to PNG for preview...')
-        temp_png = os.path.join(TEMP_DIR, 'temp_gui.png')
-        dds_to_png(self.atlas_path, temp_png)
-        print(Fore.GREEN + f'[DEBUG] Loading and resizing atlas image...')
-        self.atlas_im = resize_with_alpha(Image.open(temp_png), (self.atlas_size, self.atlas_size), Image.BICUBIC)
-        print(Fore.GREEN + f'✓ Atlas image loaded: {self.atlas_im.size}')
-        print(Fore.CYAN + f'[OPERATION] Updating preview...')
-        self.update_preview()
-        print(Fore.CYAN + f'[OPERATION] Populating icon combo box...')
-        self.combo_icons.clear()
-        for icon in sorted(self.icons, key=lambda i: i['mapkey']):
-            self.combo_icons.addItem(icon['mapkey'])
-        print(Fore.GREEN + f'✓ Added {self.combo_icons.count()} icons to dropdown')
-        self.dom_modified = False
-        atlas_name = os.path.basename(lsx_path)
-        self.atlas_status_label.setText(f'Loaded: {atlas_name}')
-        self.atlas_status_label.setStyleSheet('QLabel { color: #44ff44; font-weight: bold; }')
-        self.btn_load_project_atlas.setText('Reload Atlas')
-        print(Fore.GREEN + f"\n{'=' * 60}")
-        print(Fore.GREEN + f'ATLAS LOADED SUCCESSFULLY FROM PROJECT')
-        print(Fore.GREEN + f"{'=' * 60}\n")
-
-    def get_default_file_dialog_path(self):
-        if self.mode == 'mod_project':
-            bg3_data = self.bg3_edit.text().strip()
-            mod = self.mod_combo.currentText()
-            if mod and bg3_data and os.path.exists(bg3_data):
-                public_path = os.path.join(bg3_data, 'Public', mod)
-                if os.path.exists(public_path):
-                    return public_path
-                mods_path = os.path.join(bg3_data, 'Mods', mod)
-                if os.path.exists(mods_path):
-                    return mods_path
-        return ''
-
-    def browse_path(self, edit, title, filter='*'):
-        default_path = self.get_default_file_dialog_path()
-        if 'Directory' in title:
-            path = QFileDialog.getExistingDirectory(self, title, default_path)
-        else:
-            path = QFileDialog.getOpenFileName(self, title, default_path, filter)[0]
-        if path:
-            edit.setText(path)
-
-    def browse_texconv(self):
-        default_path = self.get_default_file_dialog_path()
-        file_path, _ = QFileDialog.getOpenFileName(self, 'Select texconv.exe', default_path, 'Executable Files (*.exe);;All Files (*.*)')
-        if file_path:
-            self.texconv_path_edit.setText(file_path)
-            self.update_texconv_status()
-
-    def download_texconv_clicked(self):
-        print(Fore.CYAN + '\n[USER ACTION] Download Texconv')
-        reply = QMessageBox.question(self, 'Download Texconv', 'Download texconv.exe from Microsoft DirectXTex (official source)?\n\nWill be saved to: script_dir/texconv/texconv.exe\nSize: ~2-3 MB', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-        if reply == QMessageBox.StandardButton.No:
-            print(Fore.YELLOW + '[CANCELLED] User cancelled download')
-            return
-        script_dir = os.path.dirname(__file__)
-        dest_dir = os.path.join(script_dir, 'texconv')
-        print(Fore.CYAN + f'[OPERATION] Downloading texconv to: {dest_dir}')
-        texconv_path = download_texconv(dest_dir)
-        if texconv_path:
-            global TEXCONV_PATH
-            TEXCONV_PATH = texconv_path
-            self.texconv_path_edit.setText(texconv_path)
-            self.update_texconv_status()
-            QMessageBox.information(self, 'Success', f'Texconv downloaded successfully!\n\nPath: {texconv_path}\n\nYou can now use DDS conversion features.')
-        else:
-            QMessageBox.warning(self, 'Download Failed', 'Failed to download texconv.exe\n\nYou can manually download from:\nhttps://github.com/microsoft/DirectXTex/releases\n\nExtract texconv.exe and select it using the Browse button.')
-
-    def update_texconv_status(self):
-        global TEXCONV_PATH
-        custom_path = self.texconv_path_edit.text().strip()
-        TEXCONV_PATH = find_texconv(custom_path if custom_path else None)
-        if TEXCONV_PATH:
-            self.texconv_status_label.setText(f'✓ Found: {TEXCONV_PATH}')
-            self.texconv_status_label.setStyleSheet('QLabel { color: #66ff66; font-weight: bold; }')
-            self.btn_download_texconv.setText('Re-download Texconv')
-        else:
-            self.texconv_status_label.setText("✗ Not found - Click 'Download Texconv' to install")
-            self.texconv_status_label.setStyleSheet('QLabel { color: #ff6666; font-weight: bold; }')
-            self.btn_download_texconv.setText('Download Texconv')
-
-    def load_atlas(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Load Atlas')
-        print(Fore.CYAN + f"{'=' * 60}")
-        bg3_data = self.bg3_edit.text().strip()
-        print(Fore.GREEN + f'[DEBUG] BG3 Data path: {bg3_data}')
-        print(Fore.GREEN + f'[DEBUG] Current mode: {self.mode}')
-        if self.mode == 'standalone':
-            print(Fore.CYAN + f'[MODE] Standalone mode selected')
-            lsx_path = self.standalone_lsx_edit.text()
-            print(Fore.GREEN + f'[DEBUG] LSX path from input: {lsx_path}')
-            if not lsx_path or not os.path.exists(lsx_path):
-                print(Fore.RED + f'[ERROR] Invalid standalone .lsx path: {lsx_path}')
-                print(Fore.RED + f'[POPUP] Showing error: Invalid standalone .lsx path.')
-                QMessageBox.warning(self, 'Error', 'Invalid standalone .lsx path.')
-                return
-            dds_path = self.standalone_dds_edit.text()
-            print(Fore.GREEN + f'[DEBUG] DDS path from input: {dds_path}')
-            if not dds_path or not os.path.exists(dds_path):
-                print(Fore.RED + f'[ERROR] Invalid standalone DDS path: {dds_path}')
-                print(Fore.RED + f'[POPUP] Showing error: Invalid standalone DDS path.')
-                QMessageBox.warning(self, 'Error', 'Invalid standalone DDS path.')
-                return
-            print(Fore.CYAN + f'[OPERATION] Parsing LSX file...')
-            self.dom, self.atlas_path, self.icons, self.atlas_size, self.tile_size = parse_lsx(lsx_path, None, 'standalone')
-            if self.dom is None:
-                print(Fore.RED + f'[ERROR] Failed to parse LSX file')
-                return
-            self.atlas_path = dds_path
-            print(Fore.GREEN + f'[DEBUG] Using manual DDS path: {self.atlas_path}')
-        else:
-            print(Fore.CYAN + f'[MODE] Mod project mode selected')
-            lsx_path = self.project_lsx_edit.text()
-            print(Fore.GREEN + f'[DEBUG] Project LSX path from input: {lsx_path}')
-            if not lsx_path or not os.path.isfile(lsx_path):
-                if lsx_path:
-                    print(Fore.YELLOW + f'[WARNING] LSX path does not exist or is not a file: {lsx_path}')
-                else:
-                    print(Fore.YELLOW + f'[WARNING] No LSX path provided')
-                print(Fore.YELLOW + f'[WARNING] Attempting to scan for .lsx files...')
-                mod = self.mod_combo.currentText()
-                if mod and bg3_data:
-                    scan_paths = [os.path.join(bg3_data, 'Mods', mod, 'GUI'), os.path.join(bg3_data, 'Public', mod, 'GUI')]
-                    found_lsx_files = []
-                    for scan_path in scan_paths:
-                        print(Fore.GREEN + f'[DEBUG] Scanning for .lsx files in: {scan_path}')
-                        if os.path.exists(scan_path):
-                            for file in os.listdir(scan_path):
-                                if file.endswith('.lsx'):
-                                    full_path = os.path.join(scan_path, file)
-                                    found_lsx_files.append(full_path)
-                                    print(Fore.GREEN + f'✓ Found .lsx file: {full_path}')
-                    if not found_lsx_files:
-                        print(Fore.RED + f'[ERROR] No .lsx files found in mod GUI folders')
-                        print(Fore.RED + f'[POPUP] Showing error: No .lsx files found in mod GUI folders. Please select manually.')
-                        QMessageBox.warning(self, 'Error', 'No .lsx files found in mod GUI folders. Please select manually.')
-                        return
-                    elif len(found_lsx_files) == 1:
-                        lsx_path = found_lsx_files[0]
-                        print(Fore.GREEN + f'✓ Auto-selected single .lsx file: {lsx_path}')
-                        self.project_lsx_edit.setText(lsx_path)
-                    else:
-                        print(Fore.CYAN + f'[USER] Multiple .lsx files found, prompting user to choose...')
-                        file_names = [os.path.basename(f) for f in found_lsx_files]
-                        chosen_file, ok = QInputDialog.getItem(self, 'Select LSX File', f'Found {len(found_lsx_files)} .lsx files. Choose one:', file_names, 0, False)
-                        if ok and chosen_file:
-                            lsx_path = found_lsx_files[file_names.index(chosen_file)]
-                            print(Fore.GREEN + f'✓ User selected: {lsx_path}')
-                            self.project_lsx_edit.setText(lsx_path)
-                        else:
-                            print(Fore.YELLOW + f'[WARNING] User cancelled LSX selection')
-                            return
-                else:
-                    print(Fore.RED + f'[ERROR] Invalid project .lsx path and cannot auto-scan without mod selection')
-                    print(Fore.RED + f'[POPUP] Showing error: Invalid project .lsx path.')
-                    QMessageBox.warning(self, 'Error', 'Invalid project .lsx path.')
-                    return
-            print(Fore.CYAN + f'[OPERATION] Parsing LSX file in mod project mode...')
-            self.dom, self.atlas_path, self.icons, self.atlas_size, self.tile_size = parse_lsx(lsx_path, bg3_data, 'mod_project')
-            if self.dom is None:
-                print(Fore.RED + f'[ERROR] Failed to parse LSX file')
-                return
-            if self.atlas_path is None or not os.path.exists(self.atlas_path):
-                print(Fore.YELLOW + f'[WARNING] DDS not found at resolved path: {self.atlas_path}')
-                print(Fore.YELLOW + f'[POPUP] Prompting user: Could not find DDS at {self.atlas_path}. Browse manually?')
-                reply = QMessageBox.question(self, 'DDS Not Found', f'Could not find DDS at {self.atlas_path}. Browse manually?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-                if reply == QMessageBox.StandardButton.Yes:
-                    print(Fore.CYAN + f'[USER] User chose to browse for DDS manually')
-                    default_path = self.get_default_file_dialog_path()
-                    print(Fore.GREEN + f"[DEBUG] Default browse path: {(default_path if default_path else '(current directory)')}")
-                    dds_path = QFileDialog.getOpenFileName(self, 'Select DDS', default_path, '*.dds')[0]
-                    if dds_path:
-                        self.atlas_path = dds_path
-                        print(Fore.GREEN + f'✓ User selected DDS: {self.atlas_path}')
-                    else:
-                        print(Fore.RED + f'[ERROR] User cancelled DDS selection')
-                        print(Fore.RED + f'[POPUP] Showing error: DDS path required.')
-                        QMessageBox.warning(self, 'Error', 'DDS path required.')
-                        return
-                else:
-                    print(Fore.RED + f'[ERROR] User declined to browse for DDS')
-                    print(Fore.RED + f'[POPUP] Showing error: Cannot load atlas without DDS.')
-                    QMessageBox.warning(self, 'Error', 'Cannot load atlas without DDS.')
-                    return
-        self.grid_size = self.atlas_size // self.tile_size
-        print(Fore.GREEN + f'[DEBUG] Calculated grid size: {self.grid_size}x{self.grid_size}')
-        if self.atlas_size % self.tile_size != 0:
-            print(Fore.RED + f'[ERROR] Atlas size not divisible by tile size: {self.atlas_size} % {self.tile_size} != 0')
-            error_msg = f'Invalid atlas: atlas_size {self.atlas_size} not divisible by tile_size {self.tile_size}.'
-            print(Fore.RED + f'[POPUP] Showing error: {error_msg}')
-            QMessageBox.warning(self, 'Error', error_msg)
-            return
-        print(Fore.CYAN + f'[OPERATION] Converting DDS to PNG for preview...')
-        temp_png = os.path.join(TEMP_DIR, 'temp_gui.png')
-        dds_to_png(self.atlas_path, temp_png)
-        print(Fore.GREEN + f'[DEBUG] Loading and resizing atlas image...')
-        self.atlas_im = resize_with_alpha(Image.open(temp_png), (self.atlas_size, self.atlas_size), Image.BICUBIC)
-        print(Fore.GREEN + f'✓ Atlas image loaded: {self.atlas_im.size}')
-        print(Fore.CYAN + f'[OPERATION] Updating preview...')
-        self.update_preview()
-        print(Fore.CYAN + f'[OPERATION] Populating icon combo box...')
-        self.combo_icons.clear()
-        for icon in sorted(self.icons, key=lambda i: i['mapkey']):
-            self.combo_icons.addItem(icon['mapkey'])
-        print(Fore.GREEN + f'✓ Added {self.combo_icons.count()} icons to dropdown')
-        self.dom_modified = False
-        if self.mode == 'standalone':
-            atlas_name = os.path.basename(self.standalone_lsx_edit.text())
-        else:
-            atlas_name = os.path.basename(self.project_lsx_edit.text())
-        self.atlas_status_label.setText(f'Loaded: {atlas_name}')
-        self.atlas_status_label.setStyleSheet('QLabel { color: #44ff44; font-weight: bold; }')
-        print(Fore.GREEN + f'✓ Status updated: {atlas_name}')
-        print(Fore.GREEN + f"\n{'=' * 60}")
-        print(Fore.GREEN + f'ATLAS LOADED SUCCESSFULLY')
-        print(Fore.GREEN + f"{'=' * 60}\n")
-
-    def update_preview(self):
-        if self.atlas_im:
-            self.preview_label = InteractivePreviewLabel(self.icons, min(self.preview_size, self.atlas_size), self.atlas_size, self.tile_size, self)
-            self.preview_label.setFixedSize(min(self.preview_size, self.atlas_size), min(self.preview_size, self.atlas_size))
-            preview = resize_with_alpha(self.atlas_im, (min(self.preview_size, self.atlas_size), min(self.preview_size, self.atlas_size)), Image.BICUBIC)
-            qim = self.pil_to_qimage(preview)
-            pix = QPixmap.fromImage(qim)
-            self.preview_label.setPixmap(pix)
-            central_layout = self.centralWidget().layout()
-            if central_layout.itemAt(1).widget() != self.preview_label:
-                if central_layout.itemAt(1).widget():
-                    central_layout.itemAt(1).widget().deleteLater()
-                central_layout.addWidget(self.preview_label)
-
-    def update_preview_size(self):
-        self.preview_size = 512 if self.preview_combo.currentText() == '512x512' else self.atlas_size if self.atlas_size else 1024
-        self.update_preview()
-
-    def pil_to_qimage(self, pil_im):
-        pil_im = pil_im.convert('RGBA')
-        data = pil_im.tobytes('raw', 'RGBA')
-        qim = QImage(data, pil_im.size[0], pil_im.size[1], QImage.Format.Format_RGBA8888)
-        return qim
-
-    def replace_icon(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Replace Icon')
-        print(Fore.CYAN + f"{'=' * 60}")
-        if not self.atlas_im:
-            print(Fore.RED + f'[ERROR] No atlas loaded')
-            print(Fore.RED + f"[POPUP] Showing error: {self.strings['error_load']}")
-            QMessageBox.warning(self, 'Error', self.strings['error_load'])
-            return
-        selected_key = self.combo_icons.currentText()
-        print(Fore.GREEN + f'[DEBUG] Selected icon: {selected_key}')
-        if not selected_key:
-            print(Fore.YELLOW + f'[WARNING] No icon selected')
+                placements.setdefault(icon['mapkey'], None)
+    folders = sorted({tier['folder'] for p in profiles.values() for tier in p['tiers']} | set(tier_folders()))
+    listings = tier_listings([tier_root] + [r for r in roots if r != tier_root], folders)
+    expected = []
+    for mapkey in sorted(placements):
+        name = lint_tier_profile(mapkey, listings, profiles)
+        for tier in profiles[name]['tiers']:
+            expected.append((mapkey, name, tier, listings[tier['folder']].get(f'{mapkey}.dds'.lower())))
+    headers = scan_dds_headers([found[1] for _, _, _, found in expected if found])
+    report['headers'] = len(headers)
+    report['mapkeys'] = len(placements)
+    headers = iter(headers)
+    healthy = {}
+    for mapkey, name, tier, found in expected:
+        problem = ('missing', 'no tier file') if found is None else lint_tier_header(next(headers), tier, fallback)
+        if problem is None or problem[0] == 'fallback':
+            healthy.setdefault(mapkey, []).append((tier['size'], found[1]))
+            if problem is not None:
+                report['warnings'].append({'kind': problem[0], 'mapkey': mapkey, 'profile': name, 'folder': tier['folder'], 'size': tier['size'], 'root': found[0], 'path': found[1], 'detail': problem[1]})
+            continue
+        report['tiers'].append({'kind': problem[0], 'mapkey': mapkey, 'profile': name, 'folder': tier['folder'], 'size': tier['size'], 'root': found[0] if found else tier_root, 'path': found[1] if found else None, 'detail': problem[1]})
+    for mapkey in {issue['mapkey'] for issue in report['tiers']}:
+        report['sources'][mapkey] = {'tiers': sorted(healthy.get(mapkey, []), reverse=True), 'atlas': placements[mapkey]}
+    known = {f'{mapkey}.dds'.lower() for mapkey in placements}
+    for folder, listing in sorted(listings.items()):
+        report['orphans'].extend((path for name, (_, path) in sorted(listing.items()) if name not in known))
+    report['elapsed_ms'] = (time.perf_counter() - started) * 1000
+    return report
+
+def print_lint_report(report, limit=10):
+    print(Fore.CYAN + f"[LINT] {len(report['atlases'])} atlas(es), {report['mapkeys']} MapKey(s), {report['headers']} tier header(s) checked in {report['elapsed_ms']:.1f} ms")
+    for key in ('layout', 'tiers'):
+        kinds = {}
+        for issue in report[key]:
+            kinds.setdefault(issue['kind'], []).append(issue)
+        for kind, issues in sorted(kinds.items()):
+            print(Fore.RED + f'[LINT] ✗ {len(issues)} {kind} issue(s)')
+            for issue in issues[:limit]:
+                where = f"{issue['folder']}: " if key == 'tiers' else f"{os.path.basename(issue['lsx'])}: "
+                print(Fore.YELLOW + f"[LINT]   {where}{issue['mapkey'] or ''} {issue['detail']}")
+            if len(issues) > limit:
+                print(Fore.YELLOW + f'[LINT]   ... {len(issues) - limit} more')
+    if report['orphans']:
+        print(Fore.YELLOW + f"[LINT] ⚠ {len(report['orphans'])} orphaned tier file(s) no atlas references, e.g. {report['orphans'][0]}")
+    if report['warnings']:
+        print(Fore.YELLOW + f"[LINT] ⚠ {len(report['warnings'])} tier file(s) use the Pillow fallback encoding because texconv was not found, e.g. {report['warnings'][0]['folder']}: {report['warnings'][0]['mapkey']} {report['warnings'][0]['detail']}")
+        print(Fore.YELLOW + '[LINT]   Install texconv and run --repair to re-encode them with the profile format and mip chain')
+    color = Fore.RED if report['layout'] or report['tiers'] else Fore.GREEN
+    print(color + f"[LINT] {len(report['layout'])} layout issue(s), {len(report['tiers'])} tier issue(s), {len(report['warnings'])} fallback warning(s), {len(report['orphans'])} orphan(s)")
+
+def repair_lint_issues(report, png_dir=None, prune_orphans=False):
+    pngs = {}
+    if png_dir:
+        with os.scandir(png_dir) as it:
+            pngs = {entry.name[:-4].lower(): entry.path for entry in it if entry.name.lower().endswith('.png') and entry.is_file()}
+    work = {}
+    for issue in report['tiers']:
+        work.setdefault((issue['mapkey'], issue['profile'], issue['root']), []).append(issue)
+    atlases = {}
+    temp_dir = tempfile.mkdtemp(prefix='lint_', dir=ensure_temp_dir())
+    repaired = 0
+    failed = []
+    try:
+        for (mapkey, name, root), issues in sorted(work.items()):
+            source = report['sources'].get(mapkey) or {'tiers': [], 'atlas': None}
+            src = pngs.get(mapkey.lower())
+            if src is None and source['tiers']:
+                src = os.path.join(temp_dir, f'{uuid.uuid4().hex}.png')
+                decode_dds_image(source['tiers'][0][1]).save(src)
+                print(Fore.GREEN + f"[LINT] {mapkey}: regenerating from the {source['tiers'][0][0]}px tier")
+            elif src is None and source['atlas']:
+                placement = source['atlas']
+                if placement['dds'] not in atlases:
+                    atlases[placement['dds']] = decode_dds_image(placement['dds'])
+                x, y = (int(round(placement['u1'] * placement['atlas_size'])), int(round(placement['v1'] * placement['atlas_size'])))
+                src = os.path.join(temp_dir, f'{uuid.uuid4().hex}.png')
+                atlases[placement['dds']].crop((x, y, x + placement['tile_size'], y + placement['tile_size'])).save(src)
+                print(Fore.YELLOW + f"[LINT] {mapkey}: no source PNG or healthy tier - upscaling the {placement['tile_size']}px atlas tile")
+            if src is None:
+                failed.append(mapkey)
+                print(Fore.RED + f'[LINT] ✗ {mapkey}: no source to regenerate from (pass --png-dir)')
+                continue
+            tiers = [dict(tier, folder=os.path.join(*tier['folder'].replace('\\', '/').split('/'))) for tier in get_export_profile(name)['tiers'] if tier['folder'] in {issue['folder'] for issue in issues}]
+            resize_png(src, dest_dir=root, output_name=mapkey, profile=dict(get_export_profile(name), tiers=tiers, suffix=''))
+            repaired += len(tiers)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    pruned = []
+    if prune_orphans and report['orphans']:
+        pruned, errors = remove_files_concurrently(report['orphans'])
+        for path, error in errors:
+            print(Fore.RED + f'[LINT] Failed to delete {path}: {error}')
+    print(Fore.GREEN + f'[LINT] ✓ {repaired} tier file(s) regenerated for {len(work) - len(failed)} MapKey(s), {len(pruned)} orphan(s) removed')
+    return {'repaired': repaired, 'failed': failed, 'pruned': pruned}
+
+class MapKeyIndex:
+
+    def __init__(self, roots, cache_path=None):
+        self.roots = list(roots)
+        self.cache_path = cache_path
+        self.files = {}
+        self.locations = {}
+        self.counts = {}
+        self.collisions = set()
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    def _add_file(self, path, stamp, keys):
+        self.files[path] = {'stamp': list(stamp) if stamp else None, 'keys': keys}
+        for key in keys:
+            per_file = self.locations.setdefault(key, {})
+            per_file[path] = per_file.get(path, 0) + 1
+            self.counts[key] = self.counts.get(key, 0) + 1
+            if self.counts[key] > 1:
+                self.collisions.add(key)
+
+    def _remove_file(self, path):
+        record = self.files.pop(path, None)
+        if record is None:
             return
-        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
-        default_path = self.get_default_file_dialog_path()
-        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
-        png_path = QFileDialog.getOpenFileName(self, self.strings['select_png_replace'], default_path, 'PNG (*.png)')[0]
-        if not png_path:
-            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
+        for key in record['keys']:
+            per_file = self.locations[key]
+            per_file[path] -= 1
+            if per_file[path] == 0:
+                del per_file[path]
+            self.counts[key] -= 1
+            if self.counts[key] <= 1:
+                self.collisions.discard(key)
+            if self.counts[key] == 0:
+                del self.counts[key]
+                del self.locations[key]
+
+    def update(self):
+        seen = set()
+        changed = 0
+        for path, stamp in iter_lsx_files(self.roots):
+            seen.add(path)
+            record = self.files.get(path)
+            if record is not None and record['stamp'] == list(stamp):
+                continue
+            self._remove_file(path)
+            try:
+                self._add_file(path, stamp, scan_lsx_mapkeys(path))
+                changed += 1
+            except OSError as e:
+                print(Fore.YELLOW + f'[INDEX] Cannot read {path}: {e}')
+        removed = [path for path in self.files if path not in seen]
+        for path in removed:
+            self._remove_file(path)
+        print(Fore.GREEN + f'[INDEX] {len(self.files)} atlases, {len(self.counts)} MapKeys ({changed} rescanned, {len(removed)} removed, {len(self.collisions)} collisions)')
+        if changed or removed:
+            self.save()
+        return (changed, len(removed))
+
+    def update_file(self, path, keys=None):
+        self._remove_file(path)
+        if os.path.exists(path):
+            stamp = atlas_file_stamp(path)[0]
+            self._add_file(path, stamp, keys if keys is not None else scan_lsx_mapkeys(path))
+        self.save()
+
+    def where(self, mapkey):
+        return sorted(self.locations.get(mapkey, {}))
+
+    def is_collision(self, mapkey):
+        return mapkey in self.collisions
+
+    def colliding_keys(self):
+        return {key: dict(self.locations[key]) for key in sorted(self.collisions)}
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(Fore.YELLOW + f'[INDEX] Ignoring unreadable index cache {self.cache_path}: {e}')
             return
-        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
-        print(Fore.GREEN + f'[DEBUG] PNG file exists: {os.path.exists(png_path)}')
-        for icon in self.icons:
-            if icon['mapkey'] == selected_key:
-                print(Fore.CYAN + f"[OPERATION] Replacing icon '{selected_key}'")
-                print(Fore.GREEN + f"[DEBUG] Icon UV: u1={icon['u1']:.3f}, v1={icon['v1']:.3f}, u2={icon['u2']:.3f}, v2={icon['v2']:.3f}")
-                col, row = get_grid_slot(icon['u1'], icon['v1'], self.grid_size)
-                print(Fore.GREEN + f'[DEBUG] Grid position: col={col}, row={row}')
-                x = col * self.tile_size
-                y = row * self.tile_size
-                print(Fore.GREEN + f'[DEBUG] Pixel position: x={x}, y={y}')
-                print(Fore.GREEN + f'[DEBUG] Clearing existing tile area...')
-                clear_im = Image.new('RGBA', (self.tile_size, self.tile_size), (0, 0, 0, 0))
-                self.atlas_im.paste(clear_im, (x, y))
-                print(Fore.GREEN + f'[DEBUG] Loading and resizing new icon to {self.tile_size}x{self.tile_size}...')
-                new_im = resize_with_alpha(Image.open(png_path), (self.tile_size, self.tile_size), Image.BICUBIC)
-                print(Fore.GREEN + f'[DEBUG] New icon size: {new_im.size}, mode: {new_im.mode}')
-                print(Fore.GREEN + f'[DEBUG] Pasting new icon into atlas...')
-                self.atlas_im.paste(new_im, (x, y), new_im if 'A' in new_im.getbands() else None)
-                print(Fore.CYAN + f'[OPERATION] Updating preview...')
-                self.update_preview()
-                print(Fore.GREEN + f"✓ Successfully replaced icon '{selected_key}'")
-                success_msg = self.strings['success_replace'].format(key=selected_key)
-                print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-                QMessageBox.information(self, 'Success', success_msg)
-                return
+        for path, record in data.get('files', {}).items():
+            self._add_file(path, record['stamp'], record['keys'])
 
-    def add_icon(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Add New Icon')
-        print(Fore.CYAN + f"{'=' * 60}")
-        if not self.atlas_im:
-            print(Fore.RED + f'[ERROR] No atlas loaded')
-            print(Fore.RED + f"[POPUP] Showing error: {self.strings['error_load']}")
-            QMessageBox.warning(self, 'Error', self.strings['error_load'])
+    def save(self):
+        if not self.cache_path:
             return
-        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
-        default_path = self.get_default_file_dialog_path()
-        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
-        png_path = QFileDialog.getOpenFileName(self, self.strings['select_png_add'], default_path, 'PNG (*.png)')[0]
-        if not png_path:
-            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'roots': self.roots, 'files': self.files}, f)
+
+MAPKEY_SEARCH_PAGE = 500
+MAPKEY_SEARCH_DEBOUNCE_MS = 150
+
+class MapKeySearchIndex:
+
+    def __init__(self, keys=()):
+        self.counts = {}
+        self.lowered = {}
+        self.trigrams = {}
+        for key in keys:
+            self._index(key)
+        self.ordered = sorted(((lowered, key) for key, lowered in self.lowered.items()))
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _index(self, key):
+        if key in self.counts:
+            self.counts[key] += 1
+            return False
+        self.counts[key] = 1
+        lowered = self.lowered[key] = key.lower()
+        for i in range(len(lowered) - 2):
+            self.trigrams.setdefault(lowered[i:i + 3], set()).add(key)
+        return True
+
+    def add(self, key):
+        if self._index(key):
+            bisect.insort(self.ordered, (key.lower(), key))
+
+    def remove(self, key):
+        count = self.counts.get(key)
+        if count is None:
             return
-        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
-        mapkey = os.path.basename(png_path).rsplit('.', 1)[0]
-        print(Fore.GREEN + f"✓ Auto-extracted MapKey from filename: '{mapkey}'")
-        print(Fore.CYAN + f'[INFO] MapKey will be used for atlas UV mapping and must match resize filenames!')
-        info_msg = f"Using filename '{mapkey}' as MapKey.\n\nIMPORTANT: When resizing, ensure all icon files have the exact same filename:\n{mapkey}.png"
-        print(Fore.GREEN + f'[POPUP] Showing info: {info_msg}')
-        QMessageBox.information(self, 'MapKey Confirmed', info_msg)
-        print(Fore.CYAN + f'[OPERATION] Searching for free slot in atlas...')
-        used_slots = {get_grid_slot(icon['u1'], icon['v1'], self.grid_size) for icon in self.icons}
-        print(Fore.GREEN + f'[DEBUG] Used slots: {len(used_slots)}/{self.grid_size * self.grid_size}')
-        free_col, free_row = (None, None)
-        for r in range(self.grid_size):
-            for c in range(self.grid_size):
-                if (c, r) not in used_slots:
-                    free_col, free_row = (c, r)
-                    print(Fore.GREEN + f'✓ Found free slot at grid position: col={free_col}, row={free_row}')
-                    break
-            if free_col is not None:
-                break
-        if free_col is None:
-            print(Fore.RED + f'[ERROR] No free slots available in atlas')
-            print(Fore.RED + f"[POPUP] Showing error: {self.strings['error_no_slots']}")
-            QMessageBox.warning(self, 'Error', self.strings['error_no_slots'])
+        if count > 1:
+            self.counts[key] = count - 1
             return
-        x = free_col * self.tile_size
-        y = free_row * self.tile_size
-        print(Fore.GREEN + f'[DEBUG] Pixel position: x={x}, y={y}')
-        print(Fore.GREEN + f'[DEBUG] Clearing tile area...')
-        clear_im = Image.new('RGBA', (self.tile_size, self.tile_size), (0, 0, 0, 0))
-        self.atlas_im.paste(clear_im, (x, y))
-        print(Fore.GREEN + f'[DEBUG] Loading and resizing new icon to {self.tile_size}x{self.tile_size}...')
-        new_im = resize_with_alpha(Image.open(png_path), (self.tile_size, self.tile_size), Image.BICUBIC)
-        print(Fore.GREEN + f'[DEBUG] New icon size: {new_im.size}, mode: {new_im.mode}')
-        print(Fore.GREEN + f'[DEBUG] Pasting new icon into atlas...')
-        self.atlas_im.paste(new_im, (x, y), new_im if 'A' in new_im.getbands() else None)
-        u1 = free_col / float(self.grid_size)
-        u2 = (free_col + 1) / float(self.grid_size)
-        v1 = free_row / float(self.grid_size)
-        v2 = (free_row + 1) / float(self.grid_size)
-        print(Fore.GREEN + f'[DEBUG] Calculated UV coordinates: u1={u1:.3f}, v1={v1:.3f}, u2={u2:.3f}, v2={v2:.3f}')
-        print(Fore.CYAN + f'[OPERATION] Creating XML node for new icon...')
-        node_uv = self.dom.createElement('node')
-        node_uv.setAttribute('id', 'IconUV')
-        attr_k = self.dom.createElement('attribute')
-        attr_k.setAttribute('id', 'MapKey')
-        attr_k.setAttribute('type', 'FixedString')
-        attr_k.setAttribute('value', mapkey)
-        node_uv.appendChild(attr_k)
-        attr_u1 = self.dom.createElement('attribute')
-        attr_u1.setAttribute('id', 'U1')
-        attr_u1.setAttribute('type', 'float')
-        attr_u1.setAttribute('value', str(u1))
-        node_uv.appendChild(attr_u1)
-        attr_u2 = self.dom.createElement('attribute')
-        attr_u2.setAttribute('id', 'U2')
-        attr_u2.setAttribute('type', 'float')
-        attr_u2.setAttribute('value', str(u2))
-        node_uv.appendChild(attr_u2)
-        attr_v1 = self.dom.createElement('attribute')
-        attr_v1.setAttribute('id', 'V1')
-        attr_v1.setAttribute('type', 'float')
-        attr_v1.setAttribute('value', str(v1))
-        node_uv.appendChild(attr_v1)
-        attr_v2 = self.dom.createElement('attribute')
-        attr_v2.setAttribute('id', 'V2')
-        attr_v2.setAttribute('type', 'float')
-        attr_v2.setAttribute('value', str(v2))
-        node_uv.appendChild(attr_v2)
-        print(Fore.GREEN + f'✓ Created XML node with all attributes')
-        print(Fore.CYAN + f'[OPERATION] Adding node to IconUVList...')
-        for region in self.dom.getElementsByTagName('region'):
-            if region.getAttribute('id') == 'IconUVList':
-                root = region.getElementsByTagName('node')[0]
-                children = root.getElementsByTagName('children')[0]
-                children.appendChild(node_uv)
-                print(Fore.GREEN + f'✓ Node added to DOM')
+        del self.counts[key]
+        lowered = self.lowered.pop(key)
+        for i in range(len(lowered) - 2):
+            postings = self.trigrams.get(lowered[i:i + 3])
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self.trigrams[lowered[i:i + 3]]
+        pos = bisect.bisect_left(self.ordered, (lowered, key))
+        if pos < len(self.ordered) and self.ordered[pos] == (lowered, key):
+            del self.ordered[pos]
+
+    def prefix_matches(self, prefix, limit=None):
+        start = bisect.bisect_left(self.ordered, (prefix,))
+        stop = bisect.bisect_left(self.ordered, (prefix + '\U0010ffff',), start)
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return [key for _, key in self.ordered[start:stop]]
+
+    def search(self, query, limit=None):
+        query = query.strip().lower()
+        if not query:
+            return []
+        matches = self.prefix_matches(query, limit)
+        if len(query) < 3 or (limit is not None and len(matches) >= limit):
+            return matches
+        postings = sorted((self.trigrams.get(query[i:i + 3], ()) for i in range(len(query) - 2)), key=len)
+        if not postings[0]:
+            return matches
+        candidates = set(postings[0]).intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+        lowered = self.lowered
+        ranked = [(lowered[key], key) for key in candidates if query in lowered[key] and (not lowered[key].startswith(query))]
+        ranked = heapq.nsmallest(limit - len(matches), ranked) if limit is not None else sorted(ranked)
+        return matches + [key for _, key in ranked]
+
+def mod_mapkey_index(bg3_data, mod, cache_dir=None):
+    cache_dir = cache_dir or ensure_temp_dir()
+    safe_mod = re.sub('[^A-Za-z0-9_.-]', '_', mod)
+    index = MapKeyIndex(mod_gui_roots(bg3_data, mod), os.path.join(cache_dir, f'mapkey_index_{safe_mod}.json'))
+    index.update()
+    return index
+
+class LRUCache:
+
+    def __init__(self, max_bytes, sizeof=None, name='cache'):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof if sizeof else lambda value: 1
+        self.name = name
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.pinned = set()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def get(self, key, default=None, validate=None):
+        with self.lock:
+            if key in self.entries:
+                value = self.entries[key]
+                if validate is None or validate(value):
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self.pop(key)
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        with self.lock:
+            return self.entries.get(key, default)
+
+    def put(self, key, value, pin=False):
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.sizes.pop(key)
+            if pin:
+                self.pinned.add(key)
+            size = self.sizeof(value)
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            self.sizes[key] = size
+            self.current_bytes += size
+            self._evict(keep=key)
+            return value
+
+    def resize(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.sizes[key]
+                self.sizes[key] = self.sizeof(self.entries[key])
+                self.current_bytes += self.sizes[key]
+                self._evict(keep=key)
+
+    def pop(self, key, default=None):
+        with self.lock:
+            self.pinned.discard(key)
+            if key not in self.entries:
+                return default
+            self.current_bytes -= self.sizes.pop(key)
+            return self.entries.pop(key)
+
+    def pin(self, key):
+        with self.lock:
+            self.pinned.add(key)
+
+    def unpin(self, key):
+        with self.lock:
+            self.pinned.discard(key)
+            self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.pinned.clear()
+            self.current_bytes = 0
+
+    def _evict(self, keep=None):
+        for key in list(self.entries):
+            if self.current_bytes <= self.max_bytes:
                 break
-        print(Fore.GREEN + f'[DEBUG] Updating internal icon list...')
-        self.icons.append({'mapkey': mapkey, 'u1': u1, 'u2': u2, 'v1': v1, 'v2': v2})
-        print(Fore.GREEN + f'[DEBUG] Total icons now: {len(self.icons)}')
-        print(Fore.GREEN + f'[DEBUG] Adding icon to dropdown...')
-        self.combo_icons.addItem(mapkey)
-        print(Fore.CYAN + f'[OPERATION] Updating preview...')
-        self.update_preview()
-        self.dom_modified = True
-        print(Fore.GREEN + f'[DEBUG] DOM marked as modified')
-        print(Fore.GREEN + f"✓ Successfully added new icon '{mapkey}'")
-        success_msg = self.strings['success_add'].format(key=mapkey)
-        print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-        QMessageBox.information(self, 'Success', success_msg)
-        print(Fore.CYAN + f'[USER] Prompting for auto-resize...')
-        resize_prompt = f"Would you like to automatically resize '{os.path.basename(png_path)}' to all required sizes (72, 144, 192, 380) now?\n\nThis will save you from manually running 'Resize Item PNG' and ensures the filenames match."
-        print(Fore.GREEN + f'[POPUP] Showing resize prompt')
-        reply = QMessageBox.question(self, 'Auto-Resize Icon?', resize_prompt, QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes)
-        if reply == QMessageBox.StandardButton.Yes:
-            print(Fore.GREEN + f'✓ User selected YES - auto-resizing icon')
-            print(Fore.CYAN + f'[OPERATION] Starting automatic resize operation...')
-            if self.mode == 'mod_project':
-                mod = self.mod_combo.currentText()
-                base_dest = os.path.join(self.bg3_edit.text(), 'Mods', mod, 'GUI')
-                print(Fore.GREEN + f'[DEBUG] Mod project mode - using mod: {mod}')
-            else:
-                base_dest = self.output_edit.text() or os.path.dirname(png_path)
-                print(Fore.GREEN + f'[DEBUG] Standalone mode')
-            print(Fore.GREEN + f'[DEBUG] Destination directory: {base_dest}')
-            resize_png(png_path, skill_mode=False, dest_dir=base_dest)
-            print(Fore.GREEN + f"\n{'=' * 60}")
-            print(Fore.GREEN + f'AUTO-RESIZE COMPLETE')
-            print(Fore.GREEN + f"{'=' * 60}\n")
-            complete_msg = f"Icon '{mapkey}' added to atlas and resized to all required sizes!"
-            print(Fore.GREEN + f'[POPUP] Showing completion: {complete_msg}')
-            QMessageBox.information(self, 'Complete', complete_msg)
-        else:
-            print(Fore.YELLOW + f'[WARNING] User selected NO - skipping auto-resize')
-            print(Fore.CYAN + f"[INFO] User can manually resize later using 'Resize Item PNG' button")
-
-    def save_atlas(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Save Atlas')
-        print(Fore.CYAN + f"{'=' * 60}")
-        if not self.atlas_im:
-            print(Fore.RED + f'[ERROR] No atlas loaded')
-            return
-        print(Fore.GREEN + f'[DEBUG] Current mode: {self.mode}')
-        if self.mode == 'mod_project':
-            print(Fore.CYAN + f'[USER] Prompting for save options...')
-            msg_box = QMessageBox(self)
-            msg_box.setWindowTitle('Save Options')
-            msg_box.setText('Choose how to save your atlas:')
-            msg_box.setIcon(QMessageBox.Icon.Question)
-            zip_button = msg_box.addButton('Zip Only', QMessageBox.ButtonRole.YesRole)
-            direct_button = msg_box.addButton('Direct Write', QMessageBox.ButtonRole.NoRole)
-            both_button = msg_box.addButton('Both', QMessageBox.ButtonRole.AcceptRole)
-            cancel_button = msg_box.addButton('Cancel', QMessageBox.ButtonRole.RejectRole)
-            msg_box.exec()
-            clicked_button = msg_box.clickedButton()
-            if clicked_button == cancel_button:
-                print(Fore.YELLOW + f'[WARNING] User cancelled save operation')
-                return
-            zip_only = clicked_button == zip_button
-            direct_only = clicked_button == direct_button
-            do_both = clicked_button == both_button
-            print(Fore.GREEN + f'[DEBUG] Save mode: zip_only={zip_only}, direct_only={direct_only}, both={do_both}')
-        else:
-            print(Fore.GREEN + f'[DEBUG] Standalone mode - defaulting to zip save')
-            zip_only = True
-            direct_only = False
-            do_both = False
-        base_name = None
-        timestamp = None
-        zip_path = None
-        if zip_only or do_both:
-            print(Fore.CYAN + f'[USER] Prompting for base name...')
-            base_name, ok = QInputDialog.getText(self, 'Save As', 'Enter base name for output (e.g., MyModUpdate):')
-            if not ok or not base_name:
-                print(Fore.YELLOW + f'[WARNING] User cancelled base name input')
-                return
-            timestamp = datetime.now().strftime('%d%m%y_%H%M')
-            print(Fore.GREEN + f'[DEBUG] Base name: {base_name}')
-            print(Fore.GREEN + f'[DEBUG] Timestamp: {timestamp}')
-            zip_path = os.path.join(self.zip_edit.text() or os.path.dirname(__file__), f'{base_name}_{timestamp}.zip')
-            print(Fore.GREEN + f'[DEBUG] Zip output path: {zip_path}')
-        if direct_only or do_both:
-            print(Fore.CYAN + f'[OPERATION] Direct write mode')
-            if self.mode == 'standalone':
-                dds_path = self.standalone_dds_edit.text()
-                lsx_path = self.standalone_lsx_edit.text()
-            else:
-                dds_path = self.atlas_path
-                lsx_path = self.project_lsx_edit.text()
-            print(Fore.GREEN + f'[DEBUG] DDS output path: {dds_path}')
-            print(Fore.GREEN + f'[DEBUG] LSX output path: {lsx_path}')
-            temp_png = os.path.join(TEMP_DIR, 'temp_gui.png')
-            print(Fore.GREEN + f'[DEBUG] Saving atlas to temporary PNG: {temp_png}')
-            dithered = apply_alpha_dither(self.atlas_im, strength=0.5)
-            dithered.save(temp_png, 'PNG')
-            print(Fore.CYAN + f'[OPERATION] Converting PNG to DDS...')
-            png_to_dds(temp_png, dds_path, format='BC3_UNORM', mipmaps=1)
-            print(Fore.CYAN + f'[OPERATION] Writing LSX file...')
-            with open(lsx_path, 'w', encoding='utf-8') as f:
-                xml_str = self.dom.toprettyxml(indent='    ', newl='\n', encoding='UTF-8').decode('utf-8')
-                lines = [line for line in xml_str.split('\n') if line.strip()]
-                f.write('\n'.join(lines) + '\n')
-            print(Fore.GREEN + f'✓ LSX file written')
-            if os.path.exists(temp_png):
-                os.remove(temp_png)
-                print(Fore.GREEN + f'[DEBUG] Cleaned up temporary PNG')
-            print(Fore.GREEN + f"\n{'=' * 60}")
-            print(Fore.GREEN + f'ATLAS SAVED SUCCESSFULLY (DIRECT WRITE)')
-            print(Fore.GREEN + f"{'=' * 60}\n")
-            if direct_only:
-                success_msg = self.strings['success_save'].format(lsx=lsx_path, dds=dds_path)
-                print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-                QMessageBox.information(self, 'Success', success_msg)
-                return
-            else:
-                print(Fore.CYAN + f'[OPERATION] Continuing to zip creation (Both mode)...')
-        if not (zip_only or do_both):
-            return
-        print(Fore.CYAN + f'[OPERATION] Creating zip archive: {zip_path}')
-        from zipfile import ZipFile
-        with ZipFile(zip_path, 'w') as zipf:
-            print(Fore.GREEN + f'[DEBUG] Zip file created')
-            temp_png = os.path.join(TEMP_DIR, 'temp_gui.png')
-            print(Fore.GREEN + f'[DEBUG] Saving atlas to temporary PNG: {temp_png}')
-            dithered = apply_alpha_dither(self.atlas_im, strength=0.5)
-            dithered.save(temp_png, 'PNG')
-            print(Fore.GREEN + f'[DEBUG] Extracting DDS relative path from DOM...')
-            for attr in self.dom.getElementsByTagName('attribute'):
-                if attr.getAttribute('id') == 'Path':
-                    dds_rel_path = attr.getAttribute('value')
-                    print(Fore.GREEN + f'✓ Found DDS relative path: {dds_rel_path}')
-                    break
-            dds_name = os.path.basename(dds_rel_path)
-            dds_full_path = os.path.join(os.path.dirname(zip_path), dds_name)
-            print(Fore.GREEN + f'[DEBUG] Temporary DDS path: {dds_full_path}')
-            print(Fore.CYAN + f'[OPERATION] Converting PNG to DDS...')
-            png_to_dds(temp_png, dds_full_path, format='BC3_UNORM', mipmaps=1)
-            print(Fore.GREEN + f'[DEBUG] Adding DDS to zip as: {dds_rel_path}')
-            zipf.write(dds_full_path, dds_rel_path)
-            print(Fore.GREEN + f'✓ DDS added to zip')
-            os.remove(dds_full_path)
-            print(Fore.GREEN + f'[DEBUG] Cleaned up temporary DDS')
-            lsx_rel_path = os.path.splitext(os.path.basename(self.atlas_path))[0] + '.lsx'
-            print(Fore.GREEN + f'[DEBUG] LSX relative path for zip: {lsx_rel_path}')
-            print(Fore.GREEN + f'[DEBUG] DOM modified: {self.dom_modified}')
-            if self.dom_modified:
-                print(Fore.CYAN + f'[OPERATION] Writing modified LSX to temporary file...')
-                temp_lsx = os.path.join(TEMP_DIR, 'temp.lsx')
-                with open(temp_lsx, 'w', encoding='utf-8') as f:
-                    xml_str = self.dom.toprettyxml(indent='    ', newl='\n', encoding='UTF-8').decode('utf-8')
-                    lines = [line for line in xml_str.split('\n') if line.strip()]
-                    f.write('\n'.join(lines) + '\n')
-                print(Fore.GREEN + f'✓ Temporary LSX written')
-                print(Fore.GREEN + f'[DEBUG] Adding LSX to zip as: {lsx_rel_path}')
-                zipf.write(temp_lsx, lsx_rel_path)
-                print(Fore.GREEN + f'✓ LSX added to zip')
-                os.remove(temp_lsx)
-                print(Fore.GREEN + f'[DEBUG] Cleaned up temporary LSX')
+            if key in self.pinned or key == keep:
+                continue
+            self.current_bytes -= self.sizes.pop(key)
+            del self.entries[key]
+            self.evictions += 1
+            print(Fore.YELLOW + f'[CACHE] {self.name}: evicted {key}')
+
+    def describe(self):
+        with self.lock:
+            return f'{self.name}: {self.hits} hits / {self.misses} misses | {len(self.entries)} cached ({len(self.pinned)} pinned) | {self.current_bytes / 1024 / 1024:.1f} of {self.max_bytes / 1024 / 1024:.0f} MB'
+
+def icons_from_dom(dom):
+    icons = []
+    for node in dom.getElementsByTagName('node'):
+        if node.getAttribute('id') != 'IconUV':
+            continue
+        values = {attr.getAttribute('id'): attr.getAttribute('value') for attr in node.getElementsByTagName('attribute')}
+        if values.get('MapKey') and all((aid in values for aid in ('U1', 'U2', 'V1', 'V2'))):
+            icons.append({'mapkey': values['MapKey'], 'u1': float(values['U1']), 'u2': float(values['U2']), 'v1': float(values['V1']), 'v2': float(values['V2'])})
+    return icons
+
+class EditJournal:
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.undo_stack = []
+        self.redo_stack = []
+        self.current_bytes = 0
+        self.pending = None
+        self.clean_edit = None
+        self.trimmed = False
+
+    def begin(self, label):
+        self.pending = {'label': label, 'tiles': {}, 'dom_ops': [], 'attributes': {}, 'files': [], 'image': None, 'state': None, 'nbytes': 0}
+        return self.pending
+
+    def capture_tile(self, atlas_im, box):
+        if self.pending is not None and box not in self.pending['tiles']:
+            self.pending['tiles'][box] = [atlas_im.crop(box), None]
+
+    def capture_image(self, atlas_im, state=None):
+        if self.pending is not None:
+            self.pending['image'] = [atlas_im, None]
+            self.pending['state'] = [state, None]
+
+    def capture_attributes(self, elements, name='value'):
+        if self.pending is not None:
+            for element in elements:
+                self.pending['attributes'].setdefault((element, name), [element.getAttribute(name), None])
+
+    def record_insert(self, parent, node):
+        if self.pending is not None:
+            self.pending['dom_ops'].append(('insert', parent, node, node.nextSibling))
+
+    def record_remove(self, parent, node):
+        if self.pending is not None:
+            self.pending['dom_ops'].append(('remove', parent, node, node.nextSibling))
+
+    def move_file(self, path, trash_dir):
+        os.makedirs(trash_dir, exist_ok=True)
+        dest = os.path.join(trash_dir, f'{uuid.uuid4().hex}_{os.path.basename(path)}')
+        shutil.move(path, dest)
+        if self.pending is not None:
+            self.pending['files'].append((path, dest))
+        return dest
+
+    def cancel(self):
+        self.pending = None
+
+    def commit(self, atlas_im, state=None):
+        edit = self.pending
+        self.pending = None
+        if edit is None:
+            return None
+        for box, pair in edit['tiles'].items():
+            pair[1] = atlas_im.crop(box)
+        if edit['image'] is not None:
+            edit['image'][1] = atlas_im
+            edit['state'][1] = state
+        for (element, name), pair in list(edit['attributes'].items()):
+            pair[1] = element.getAttribute(name)
+            if pair[0] == pair[1]:
+                del edit['attributes'][element, name]
+        nbytes = sum((im.size[0] * im.size[1] * 4 for pair in edit['tiles'].values() for im in pair))
+        if edit['image'] is not None:
+            nbytes += sum((im.size[0] * im.size[1] * 4 for im in edit['image']))
+        edit['nbytes'] = nbytes + 256 * (len(edit['dom_ops']) + len(edit['attributes']) + len(edit['files']))
+        for dropped in self.redo_stack:
+            self.current_bytes -= dropped['nbytes']
+            self.discard_files(dropped)
+        self.redo_stack.clear()
+        self.undo_stack.append(edit)
+        self.current_bytes += edit['nbytes']
+        while self.current_bytes > self.max_bytes and len(self.undo_stack) > 1:
+            dropped = self.undo_stack.pop(0)
+            self.current_bytes -= dropped['nbytes']
+            self.discard_files(dropped)
+            self.trimmed = True
+            print(Fore.YELLOW + f"[UNDO] Dropped oldest step '{dropped['label']}' to stay within {self.max_bytes / 1048576:.0f} MB")
+        return edit
+
+    def discard_files(self, edit):
+        for _, trash_path in edit['files']:
+            if os.path.exists(trash_path):
+                os.remove(trash_path)
+
+    def apply(self, edit, atlas_im, side):
+        if edit['image'] is not None:
+            atlas_im = edit['image'][side]
+        for box, pair in edit['tiles'].items():
+            atlas_im.paste(pair[side], box[:2])
+        ops = edit['dom_ops'] if side == 1 else reversed(edit['dom_ops'])
+        for kind, parent, node, next_sibling in ops:
+            if (kind == 'insert') == (side == 1):
+                parent.insertBefore(node, next_sibling if next_sibling is None or next_sibling.parentNode is parent else None)
             else:
-                print(Fore.GREEN + f'[DEBUG] DOM not modified, copying original LSX')
-                original_lsx = os.path.splitext(self.atlas_path)[0] + '.lsx'
-                print(Fore.GREEN + f'[DEBUG] Original LSX path: {original_lsx}')
-                zipf.write(original_lsx, lsx_rel_path)
-                print(Fore.GREEN + f'✓ Original LSX added to zip')
-        if os.path.exists(temp_png):
-            os.remove(temp_png)
-            print(Fore.GREEN + f'[DEBUG] Cleaned up temporary PNG')
-        print(Fore.GREEN + f"\n{'=' * 60}")
-        if do_both:
-            print(Fore.GREEN + f'ATLAS SAVED SUCCESSFULLY (BOTH DIRECT WRITE + ZIP)')
-            print(Fore.GREEN + f'Zip output: {zip_path}')
-            success_msg = f'Saved to both direct location and zip:\n{zip_path}'
-            print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-            QMessageBox.information(self, 'Success', success_msg)
-        else:
-            print(Fore.GREEN + f'ATLAS SAVED SUCCESSFULLY (ZIP)')
-            print(Fore.GREEN + f'Output: {zip_path}')
-            success_msg = f'Saved to {zip_path}'
-            print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-            QMessageBox.information(self, 'Success', success_msg)
-        print(Fore.GREEN + f"{'=' * 60}\n")
-
-    def resize_item_png_gui(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Resize Item PNG')
-        print(Fore.CYAN + f"{'=' * 60}")
-        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
-        default_path = self.get_default_file_dialog_path()
-        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
-        png_path = QFileDialog.getOpenFileName(self, self.strings['select_item_png'], default_path, 'PNG (*.png)')[0]
-        if not png_path:
-            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
-            return
-        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
-        if self.mode == 'mod_project':
-            mod = self.mod_combo.currentText()
-            base_dest = os.path.join(self.bg3_edit.text(), 'Mods', mod, 'GUI')
-            print(Fore.GREEN + f'[DEBUG] Mod project mode - using mod: {mod}')
-        else:
-            base_dest = self.output_edit.text() or os.path.dirname(png_path)
-            print(Fore.GREEN + f'[DEBUG] Standalone mode')
-        print(Fore.GREEN + f'[DEBUG] Destination directory: {base_dest}')
-        print(Fore.CYAN + f'[OPERATION] Starting item resize operation...')
-        resize_png(png_path, skill_mode=False, dest_dir=base_dest)
-        print(Fore.GREEN + f"\n{'=' * 60}")
-        print(Fore.GREEN + f'ITEM RESIZE COMPLETE')
-        print(Fore.GREEN + f"{'=' * 60}\n")
-        success_msg = self.strings['success_resize'].format(type='item')
-        print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-        QMessageBox.information(self, 'Success', success_msg)
-
-    def resize_skill_png_gui(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Resize Skill PNG')
-        print(Fore.CYAN + f"{'=' * 60}")
-        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
-        default_path = self.get_default_file_dialog_path()
-        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
-        png_path = QFileDialog.getOpenFileName(self, self.strings['select_skill_png'], default_path, 'PNG (*.png)')[0]
-        if not png_path:
-            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
-            return
-        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
-        if self.mode == 'mod_project':
-            mod = self.mod_combo.currentText()
-            base_dest = os.path.join(self.bg3_edit.text(), 'Mods', mod, 'GUI')
-            print(Fore.GREEN + f'[DEBUG] Mod project mode - using mod: {mod}')
-        else:
-            base_dest = self.output_edit.text() or os.path.dirname(png_path)
-            print(Fore.GREEN + f'[DEBUG] Standalone mode')
-        print(Fore.GREEN + f'[DEBUG] Destination directory: {base_dest}')
-        print(Fore.CYAN + f'[OPERATION] Starting skill resize operation...')
-        resize_png(png_path, skill_mode=True, dest_dir=base_dest)
-        print(Fore.GREEN + f"\n{'=' * 60}")
-        print(Fore.GREEN + f'SKILL RESIZE COMPLETE')
-        print(Fore.GREEN + f"{'=' * 60}\n")
-        success_msg = self.strings['success_resize'].format(type='skill')
-        print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-        QMessageBox.information(self, 'Success', success_msg)
-
-    def on_create_mod_changed(self):
-        create_mod = self.create_mod_combo.currentText()
-        if create_mod and create_mod != self.mod_combo.currentText():
-            self.mod_combo.blockSignals(True)
-            self.mod_combo.setCurrentText(create_mod)
-            self.mod_combo.blockSignals(False)
-        print(Fore.GREEN + f'[DEBUG] Create Atlas mod changed: {create_mod}')
-        self.update_create_atlas_status()
-
-    def update_create_atlas_grid_info(self):
-        if self.canvas_512.isChecked():
-            atlas_size = 512
-        else:
-            atlas_size = 1024
-        tile_size = 64
-        grid_size = atlas_size // tile_size
-        total_slots = grid_size * grid_size
-        self.grid_info_label.setText(f'Grid: {tile_size}x{tile_size} icons | Total slots: {total_slots} ({grid_size}x{grid_size})')
-        self.update_create_atlas_status()
-
-    def toggle_import_options(self):
-        is_import = self.import_folder_radio.isChecked()
-        self.import_controls_widget.setEnabled(is_import)
-        if not is_import:
-            self.import_folder_edit.clear()
-            self.import_count_label.setText('No folder selected')
-        self.update_create_atlas_status()
-
-    def toggle_resize_type_selection(self):
-        is_enabled = self.auto_resize_checkbox.isChecked()
-        self.resize_type_widget.setVisible(is_enabled)
-
-    def browse_import_folder(self):
-        print(Fore.CYAN + f'\n[USER] Browsing for import folder...')
-        default_path = self.get_default_file_dialog_path()
-        print(Fore.GREEN + f"[DEBUG] Default browse path: {(default_path if default_path else '(current directory)')}")
-        folder = QFileDialog.getExistingDirectory(self, 'Select Folder with PNG Icons', default_path)
-        if folder:
-            self.import_folder_edit.setText(folder)
-            print(Fore.GREEN + f'✓ Selected folder: {folder}')
-
-    def scan_import_folder(self):
-        folder = self.import_folder_edit.text().strip()
-        if not folder or not os.path.isdir(folder):
-            self.import_count_label.setText('No folder selected')
-            self.import_count_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
-            self.update_create_atlas_status()
-            return
-        png_files = [f for f in os.listdir(folder) if f.lower().endswith('.png')]
-        count = len(png_files)
-        atlas_size = 512 if self.canvas_512.isChecked() else 1024
-        grid_size = atlas_size // 64
-        max_slots = grid_size * grid_size
-        if count == 0:
-            self.import_count_label.setText('No PNG files found in folder')
-            self.import_count_label.setStyleSheet('QLabel { color: #ff6666; font-style: italic; }')
-        elif count > max_slots:
-            self.import_count_label.setText(f'Found {count} PNGs (WARNING: {count - max_slots} will be skipped, atlas has {max_slots} slots)')
-            self.import_count_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; }')
-        else:
-            self.import_count_label.setText(f'Found {count} PNG file(s) - will use {count} of {max_slots} slots')
-            self.import_count_label.setStyleSheet('QLabel { color: #66ff66; font-style: italic; }')
-        print(Fore.GREEN + f'[DEBUG] Found {count} PNG files in {folder}')
-        self.update_create_atlas_status()
-
-    def update_prefix_example(self):
-        prefix = self.mapkey_prefix_edit.text().strip()
-        if prefix:
-            self.prefix_example_label.setText(f'Example: sword.png → MapKey: {prefix}_sword')
-        else:
-            self.prefix_example_label.setText('Example: sword.png → MapKey: sword')
-
-    def update_create_atlas_status(self):
-        mod = self.create_mod_combo.currentText()
-        if not mod:
-            self.create_atlas_path_label.setText('Please select a mod from the dropdown above')
-            self.create_atlas_path_label.setStyleSheet('QLabel { color: #ff6666; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
-            self.btn_generate_atlas.setEnabled(False)
-            self.create_status_label.setText('Select a mod to continue')
-            return
-        bg3_data = self.bg3_edit.text().strip()
-        atlas_name = self.atlas_name_edit.text().strip() or 'IconAtlas'
-        public_base = os.path.join(bg3_data, 'Public', mod)
-        mods_base = os.path.join(bg3_data, 'Mods', mod)
-        if os.path.exists(public_base):
-            base_path = public_base
-        elif os.path.exists(mods_base):
-            base_path = mods_base
-        else:
-            base_path = public_base
-        gui_path = os.path.join(base_path, 'GUI')
-        textures_path = os.path.join(base_path, 'Assets', 'Textures', 'Icons')
-        lsx_path = os.path.join(gui_path, f'{atlas_name}.lsx')
-        dds_path = os.path.join(textures_path, f'{atlas_name}.dds')
-        exists = os.path.exists(lsx_path) or os.path.exists(dds_path)
-        if exists:
-            self.create_atlas_path_label.setText(f'LSX: {gui_path}\nDDS: {textures_path}\n(WARNING: Files exist - will be overwritten)')
-            self.create_atlas_path_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
-        else:
-            self.create_atlas_path_label.setText(f'LSX: {gui_path}\nDDS: {textures_path}')
-            self.create_atlas_path_label.setStyleSheet('QLabel { color: #66ff66; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
-        self.btn_generate_atlas.setEnabled(True)
-        self.create_status_label.setText('Ready to generate')
-
-    def generate_new_atlas(self):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'USER ACTION: Generate New Atlas')
-        print(Fore.CYAN + f"{'=' * 60}")
-        mod = self.create_mod_combo.currentText()
-        if not mod:
-            print(Fore.RED + f'[ERROR] No mod selected')
-            QMessageBox.warning(self, 'Error', 'Please select a mod from the dropdown.')
-            return
-        bg3_data = self.bg3_edit.text().strip()
-        atlas_size = 512 if self.canvas_512.isChecked() else 1024
-        tile_size = 64
-        grid_size = atlas_size // tile_size
-        atlas_name = self.atlas_name_edit.text().strip() or 'IconAtlas'
-        print(Fore.GREEN + f'[DEBUG] Atlas size: {atlas_size}x{atlas_size}')
-        print(Fore.GREEN + f'[DEBUG] Tile size: {tile_size}x{tile_size}')
-        print(Fore.GREEN + f'[DEBUG] Grid size: {grid_size}x{grid_size}')
-        print(Fore.GREEN + f'[DEBUG] Atlas name: {atlas_name}')
-        public_base = os.path.join(bg3_data, 'Public', mod)
-        mods_base = os.path.join(bg3_data, 'Mods', mod)
-        if os.path.exists(public_base):
-            base_path = public_base
-        elif os.path.exists(mods_base):
-            base_path = mods_base
-        else:
-            base_path = public_base
-        gui_path = os.path.join(base_path, 'GUI')
-        textures_path = os.path.join(base_path, 'Assets', 'Textures', 'Icons')
-        os.makedirs(gui_path, exist_ok=True)
-        os.makedirs(textures_path, exist_ok=True)
-        print(Fore.GREEN + f'[DEBUG] GUI path: {gui_path}')
-        print(Fore.GREEN + f'[DEBUG] Textures path: {textures_path}')
-        lsx_path = os.path.join(gui_path, f'{atlas_name}.lsx')
-        dds_path = os.path.join(textures_path, f'{atlas_name}.dds')
-        if os.path.exists(lsx_path) or os.path.exists(dds_path):
-            print(Fore.YELLOW + f'[WARNING] Atlas files already exist')
-            reply = QMessageBox.question(self, 'Overwrite Existing Atlas?', f'Atlas files already exist at:\n{gui_path}\n\nOverwrite?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-            if reply == QMessageBox.StandardButton.No:
-                print(Fore.YELLOW + f'[WARNING] User cancelled overwrite')
-                return
-        import_icons = self.import_folder_radio.isChecked()
-        prefix = self.mapkey_prefix_edit.text().strip()
-        auto_resize = self.auto_resize_checkbox.isChecked()
-        skill_mode = self.resize_type_skill.isChecked()
-        if import_icons:
-            import_folder = self.import_folder_edit.text().strip()
-            if not import_folder or not os.path.isdir(import_folder):
-                print(Fore.RED + f'[ERROR] Invalid import folder')
-                QMessageBox.warning(self, 'Error', 'Please select a valid import folder.')
-                return
-            print(Fore.GREEN + f'[DEBUG] Import folder: {import_folder}')
-            print(Fore.GREEN + f"[DEBUG] MapKey prefix: {(prefix if prefix else '(none)')}")
-            print(Fore.GREEN + f'[DEBUG] Auto-resize: {auto_resize}')
-            if auto_resize:
-                print(Fore.GREEN + f"[DEBUG] Icon type: {('Skills' if skill_mode else 'Items')}")
-        else:
-            import_folder = None
-            print(Fore.GREEN + f'[DEBUG] Creating empty atlas')
+                parent.removeChild(node)
+        for (element, name), pair in edit['attributes'].items():
+            element.setAttribute(name, pair[side])
+        for original, trash_path in edit['files'] if side == 1 else reversed(edit['files']):
+            src, dest = (original, trash_path) if side == 1 else (trash_path, original)
+            if os.path.exists(src):
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                shutil.move(src, dest)
+        return atlas_im
+
+    def undo(self, atlas_im):
+        if not self.undo_stack:
+            return (None, atlas_im, None)
+        edit = self.undo_stack.pop()
+        atlas_im = self.apply(edit, atlas_im, 0)
+        self.redo_stack.append(edit)
+        return (edit, atlas_im, edit['state'][0] if edit['state'] else None)
+
+    def redo(self, atlas_im):
+        if not self.redo_stack:
+            return (None, atlas_im, None)
+        edit = self.redo_stack.pop()
+        atlas_im = self.apply(edit, atlas_im, 1)
+        self.undo_stack.append(edit)
+        return (edit, atlas_im, edit['state'][1] if edit['state'] else None)
+
+    def clear(self):
+        for edit in self.undo_stack:
+            self.discard_files(edit)
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.current_bytes = 0
+        self.pending = None
+        self.clean_edit = None
+        self.trimmed = False
+
+    def mark_clean(self):
+        self.clean_edit = self.undo_stack[-1] if self.undo_stack else None
+        self.trimmed = False
+
+    def is_clean(self):
+        top = self.undo_stack[-1] if self.undo_stack else None
+        return top is self.clean_edit and (not self.trimmed or top is not None)
+
+    def describe(self):
+        return f'{len(self.undo_stack)} undo / {len(self.redo_stack)} redo step(s), {self.current_bytes / 1048576:.1f}/{self.max_bytes / 1048576:.0f} MB'
+
+def atlas_file_stamp(*paths):
+    stamp = []
+    for path in paths:
         try:
-            self.create_status_label.setText('Generating atlas...')
-            self.create_status_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; }')
-            QApplication.processEvents()
-            if import_folder:
-                self.generate_atlas_with_icons(import_folder, dds_path, atlas_size, tile_size, grid_size, prefix, auto_resize, skill_mode, base_path)
-            else:
-                self.generate_empty_atlas(dds_path, atlas_size, tile_size, base_path)
-            print(Fore.GREEN + f'✓ Atlas created successfully')
-            print(Fore.GREEN + f'  LSX: {lsx_path}')
-            print(Fore.GREEN + f'  DDS: {dds_path}')
-            self.create_status_label.setText('Atlas created successfully!')
-            self.create_status_label.setStyleSheet('QLabel { color: #66ff66; font-style: italic; }')
-            reply = QMessageBox.question(self, 'Atlas Created', f'New atlas created successfully!\n\nFiles created:\n  {atlas_name}.lsx\n  {atlas_name}.dds\n\nLoad this atlas in the Main tab?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-            if reply == QMessageBox.StandardButton.Yes:
-                self.tabs.setCurrentIndex(0)
-                self.project_lsx_edit.setText(lsx_path)
-                self.load_atlas()
-                print(Fore.GREEN + f'✓ Auto-loaded new atlas in Main tab')
-        except Exception as e:
-            print(Fore.RED + f'[ERROR] Failed to create atlas: {e}')
-            self.create_status_label.setText('Failed to create atlas')
-            self.create_status_label.setStyleSheet('QLabel { color: #ff6666; font-style: italic; }')
-            QMessageBox.critical(self, 'Error', f'Failed to create atlas:\n{str(e)}')
-
-    def generate_empty_atlas(self, dds_path, atlas_size, tile_size, base_path=''):
-        print(Fore.CYAN + f'[OPERATION] Generating empty atlas...')
-        dom = Document()
-        save = dom.createElement('save')
-        dom.appendChild(save)
-        version = dom.createElement('version')
-        version.setAttribute('major', '4')
-        version.setAttribute('minor', '0')
-        version.setAttribute('revision', '9')
-        version.setAttribute('build', '320')
-        save.appendChild(version)
-        region_tex = dom.createElement('region')
-        region_tex.setAttribute('id', 'TextureAtlasInfo')
-        save.appendChild(region_tex)
-        node_root_tex = dom.createElement('node')
-        node_root_tex.setAttribute('id', 'root')
-        region_tex.appendChild(node_root_tex)
-        children_tex = dom.createElement('children')
-        node_root_tex.appendChild(children_tex)
-        node_tex_size = dom.createElement('node')
-        node_tex_size.setAttribute('id', 'TextureAtlasTextureSize')
-        attr_height = dom.createElement('attribute')
-        attr_height.setAttribute('id', 'Height')
-        attr_height.setAttribute('type', 'int32')
-        attr_height.setAttribute('value', str(atlas_size))
-        node_tex_size.appendChild(attr_height)
-        attr_width = dom.createElement('attribute')
-        attr_width.setAttribute('id', 'Width')
-        attr_width.setAttribute('type', 'int32')
-        attr_width.setAttribute('value', str(atlas_size))
-        node_tex_size.appendChild(attr_width)
-        children_tex.appendChild(node_tex_size)
-        node_icon_size = dom.createElement('node')
-        node_icon_size.setAttribute('id', 'TextureAtlasIconSize')
-        attr_height = dom.createElement('attribute')
-        attr_height.setAttribute('id', 'Height')
-        attr_height.setAttribute('type', 'int32')
-        attr_height.setAttribute('value', str(tile_size))
-        node_icon_size.appendChild(attr_height)
-        attr_width = dom.createElement('attribute')
-        attr_width.setAttribute('id', 'Width')
-        attr_width.setAttribute('type', 'int32')
-        attr_width.setAttribute('value', str(tile_size))
-        node_icon_size.appendChild(attr_width)
-        children_tex.appendChild(node_icon_size)
-        node_path = dom.createElement('node')
-        node_path.setAttribute('id', 'TextureAtlasPath')
-        attr_path = dom.createElement('attribute')
-        attr_path.setAttribute('id', 'Path')
-        attr_path.setAttribute('type', 'string')
-        attr_path.setAttribute('value', f'Assets/Textures/Icons/{os.path.basename(dds_path)}')
-        node_path.appendChild(attr_path)
-        attr_uuid = dom.createElement('attribute')
-        attr_uuid.setAttribute('id', 'UUID')
-        attr_uuid.setAttribute('type', 'FixedString')
-        attr_uuid.setAttribute('value', str(uuid.uuid4()))
-        node_path.appendChild(attr_uuid)
-        children_tex.appendChild(node_path)
-        region_uv = dom.createElement('region')
-        region_uv.setAttribute('id', 'IconUVList')
-        save.appendChild(region_uv)
-        node_root_uv = dom.createElement('node')
-        node_root_uv.setAttribute('id', 'root')
-        region_uv.appendChild(node_root_uv)
-        children_uv = dom.createElement('children')
-        node_root_uv.appendChild(children_uv)
-        im = Image.new('RGBA', (atlas_size, atlas_size), (0, 0, 0, 0))
-        temp_png = os.path.join(TEMP_DIR, 'temp_empty_atlas.png')
-        dithered = apply_alpha_dither(im, strength=0.5)
-        dithered.save(temp_png, 'PNG')
-        png_to_dds(temp_png, dds_path, format='BC3_UNORM', mipmaps=1)
-        base_name = os.path.splitext(os.path.basename(dds_path))[0]
-        if base_path:
-            lsx_dir = os.path.join(base_path, 'GUI')
-        else:
-            lsx_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(dds_path))), 'GUI')
-        os.makedirs(lsx_dir, exist_ok=True)
-        lsx_path = os.path.join(lsx_dir, f'{base_name}.lsx')
-        with open(lsx_path, 'w', encoding='utf-8') as f:
-            dom.writexml(f, indent='    ', addindent='    ', newl='\n', encoding='UTF-8')
-        if os.path.exists(temp_png):
-            os.remove(temp_png)
-        print(Fore.GREEN + f'✓ Empty atlas created')
-
-    def generate_atlas_with_icons(self, import_folder, dds_path, atlas_size, tile_size, grid_size, prefix='', auto_resize=False, skill_mode=False, base_path=''):
-        print(Fore.CYAN + f'[OPERATION] Generating atlas with icons from: {import_folder}')
-        if auto_resize:
-            print(Fore.GREEN + f"[DEBUG] Auto-resize enabled ({('Skills' if skill_mode else 'Items')})")
-        dom = Document()
-        save = dom.createElement('save')
-        dom.appendChild(save)
-        version = dom.createElement('version')
-        version.setAttribute('major', '4')
-        version.setAttribute('minor', '0')
-        version.setAttribute('revision', '9')
-        version.setAttribute('build', '320')
-        save.appendChild(version)
-        region_tex = dom.createElement('region')
-        region_tex.setAttribute('id', 'TextureAtlasInfo')
-        save.appendChild(region_tex)
-        node_root_tex = dom.createElement('node')
-        node_root_tex.setAttribute('id', 'root')
-        region_tex.appendChild(node_root_tex)
-        children_tex = dom.createElement('children')
-        node_root_tex.appendChild(children_tex)
-        node_tex_size = dom.createElement('node')
-        node_tex_size.setAttribute('id', 'TextureAtlasTextureSize')
-        attr_height = dom.createElement('attribute')
-        attr_height.setAttribute('id', 'Height')
-        attr_height.setAttribute('type', 'int32')
-        attr_height.setAttribute('value', str(atlas_size))
-        node_tex_size.appendChild(attr_height)
-        attr_width = dom.createElement('attribute')
-        attr_width.setAttribute('id', 'Width')
-        attr_width.setAttribute('type', 'int32')
-        attr_width.setAttribute('value', str(atlas_size))
-        node_tex_size.appendChild(attr_width)
-        children_tex.appendChild(node_tex_size)
-        node_icon_size = dom.createElement('node')
-        node_icon_size.setAttribute('id', 'TextureAtlasIconSize')
-        attr_height = dom.createElement('attribute')
-        attr_height.setAttribute('id', 'Height')
-        attr_height.setAttribute('type', 'int32')
-        attr_height.setAttribute('value', str(tile_size))
-        node_icon_size.appendChild(attr_height)
-        attr_width = dom.createElement('attribute')
-        attr_width.setAttribute('id', 'Width')
-        attr_width.setAttribute('type', 'int32')
-        attr_width.setAttribute('value', str(tile_size))
-        node_icon_size.appendChild(attr_width)
-        children_tex.appendChild(node_icon_size)
-        node_path = dom.createElement('node')
-        node_path.setAttribute('id', 'TextureAtlasPath')
-        attr_path = dom.createElement('attribute')
-        attr_path.setAttribute('id', 'Path')
-        attr_path.setAttribute('type', 'string')
-        attr_path.setAttribute('value', f'Assets/Textures/Icons/{os.path.basename(dds_path)}')
-        node_path.appendChild(attr_path)
-        attr_uuid = dom.createElement('attribute')
-        attr_uuid.setAttribute('id', 'UUID')
-        attr_uuid.setAttribute('type', 'FixedString')
-        attr_uuid.setAttribute('value', str(uuid.uuid4()))
-        node_path.appendChild(attr_uuid)
-        children_tex.appendChild(node_path)
-        region_uv = dom.createElement('region')
-        region_uv.setAttribute('id', 'IconUVList')
-        save.appendChild(region_uv)
-        node_root_uv = dom.createElement('node')
-        node_root_uv.setAttribute('id', 'root')
-        region_uv.appendChild(node_root_uv)
-        children_uv = dom.createElement('children')
-        node_root_uv.appendChild(children_uv)
-        im = Image.new('RGBA', (atlas_size, atlas_size), (0, 0, 0, 0))
-        png_files = sorted([f for f in os.listdir(import_folder) if f.lower().endswith('.png')])
-        max_icons = grid_size * grid_size
-        print(Fore.GREEN + f'[DEBUG] Found {len(png_files)} PNG files')
-        print(Fore.GREEN + f'[DEBUG] Atlas capacity: {max_icons} icons')
-        for idx, png_file in enumerate(png_files):
-            if idx >= max_icons:
-                print(Fore.YELLOW + f'[WARNING] Atlas full, skipping remaining {len(png_files) - idx} files')
-                break
-            base_mapkey = os.path.splitext(png_file)[0]
-            if prefix:
-                mapkey = f'{prefix}_{base_mapkey}'
-            else:
-                mapkey = base_mapkey
-            row = idx // grid_size
-            col = idx % grid_size
-            x = col * tile_size
-            y = row * tile_size
-            png_path = os.path.join(import_folder, png_file)
-            new_im = resize_with_alpha(Image.open(png_path), (tile_size, tile_size), Image.BICUBIC)
-            im.paste(new_im, (x, y), new_im if new_im.mode == 'RGBA' else None)
-            u1 = col / grid_size
-            v1 = row / grid_size
-            u2 = u1 + 1 / grid_size
-            v2 = v1 + 1 / grid_size
-            node_uv = dom.createElement('node')
-            node_uv.setAttribute('id', 'IconUV')
-            attr_mapkey = dom.createElement('attribute')
-            attr_mapkey.setAttribute('id', 'MapKey')
-            attr_mapkey.setAttribute('type', 'FixedString')
-            attr_mapkey.setAttribute('value', mapkey)
-            node_uv.appendChild(attr_mapkey)
-            attr_u1 = dom.createElement('attribute')
-            attr_u1.setAttribute('id', 'U1')
-            attr_u1.setAttribute('type', 'float')
-            attr_u1.setAttribute('value', str(u1))
-            node_uv.appendChild(attr_u1)
-            attr_v1 = dom.createElement('attribute')
-            attr_v1.setAttribute('id', 'V1')
-            attr_v1.setAttribute('type', 'float')
-            attr_v1.setAttribute('value', str(v1))
-            node_uv.appendChild(attr_v1)
-            attr_u2 = dom.createElement('attribute')
-            attr_u2.setAttribute('id', 'U2')
-            attr_u2.setAttribute('type', 'float')
-            attr_u2.setAttribute('value', str(u2))
-            node_uv.appendChild(attr_u2)
-            attr_v2 = dom.createElement('attribute')
-            attr_v2.setAttribute('id', 'V2')
-            attr_v2.setAttribute('type', 'float')
-            attr_v2.setAttribute('value', str(v2))
-            node_uv.appendChild(attr_v2)
-            children_uv.appendChild(node_uv)
-            print(Fore.GREEN + f'  ✓ Added icon {idx + 1}/{min(len(png_files), max_icons)}: {mapkey}')
-        temp_png = os.path.join(TEMP_DIR, 'temp_new_atlas.png')
-        dithered = apply_alpha_dither(im, strength=0.5)
-        dithered.save(temp_png, 'PNG')
-        png_to_dds(temp_png, dds_path, format='BC3_UNORM', mipmaps=1)
-        base_name = os.path.splitext(os.path.basename(dds_path))[0]
-        lsx_dir = os.path.join(base_path, 'GUI')
-        lsx_path = os.path.join(lsx_dir, f'{base_name}.lsx')
-        with open(lsx_path, 'w', encoding='utf-8') as f:
-            dom.writexml(f, indent='    ', addindent='    ', newl='\n', encoding='UTF-8')
-        if os.path.exists(temp_png):
-            os.remove(temp_png)
-        print(Fore.GREEN + f'✓ Atlas created with {min(len(png_files), max_icons)} icons')
-        if auto_resize and png_files:
-            print(Fore.CYAN + f'[OPERATION] Auto-resizing {min(len(png_files), max_icons)} icons...')
-            for idx, png_file in enumerate(png_files):
-                if idx >= max_icons:
-                    break
-                base_mapkey = os.path.splitext(png_file)[0]
-                if prefix:
-                    mapkey = f'{prefix}_{base_mapkey}'
-                else:
-                    mapkey = base_mapkey
-                png_path = os.path.join(import_folder, png_file)
-                try:
-                    resize_png(png_path, skill_mode=skill_mode, dest_dir=base_path, output_name=mapkey)
-                    print(Fore.GREEN + f'  ✓ Resized {idx + 1}/{min(len(png_files), max_icons)}: {mapkey}')
-                except Exception as e:
-                    print(Fore.YELLOW + f'  ⚠ Failed to resize {png_file}: {e}')
-            print(Fore.GREEN + f'✓ Completed resizing {min(len(png_files), max_icons)} icons')
-
-    def find_icon_all_sizes(self, mapkey):
-        icon_paths = {}
-        icon_type = None
-        bg3_data = self.bg3_edit.text().strip()
-        mod = self.mod_combo.currentText()
-        size_configs = {72: {'item': 'AssetsLowRes\\ControllerUIIcons\\items_png', 'skill': 'AssetsLowRes\\ControllerUIIcons\\skills_png'}, 144: {'item': 'Assets\\ControllerUIIcons\\items_png', 'skill': 'Assets\\ControllerUIIcons\\skills_png'}, 192: {'item': 'AssetsLowRes\\Tooltips\\ItemIcons', 'skill': 'AssetsLowRes\\Tooltips\\SkillIcons'}, 380: {'item': 'Assets\\Tooltips\\ItemIcons', 'skill': 'Assets\\Tooltips\\SkillIcons'}}
-        for size, paths in size_configs.items():
-            found = False
-            if self.mode == 'mod_project' and mod and bg3_data:
-                for type_name, rel_path in paths.items():
-                    search_paths = [os.path.join(bg3_data, 'Mods', mod, 'GUI', rel_path, f'{mapkey}.dds'), os.path.join(bg3_data, 'Public', mod, rel_path, f'{mapkey}.dds')]
-                    for path in search_paths:
-                        if os.path.exists(path):
-                            icon_paths[size] = path
-                            if icon_type is None:
-                                icon_type = type_name
-                            found = True
-                            break
-                    if found:
-                        break
-            elif self.atlas_path:
-                atlas_dir = os.path.dirname(self.atlas_path)
-                for type_name, rel_path in paths.items():
-                    path = os.path.join(atlas_dir, rel_path, f'{mapkey}.dds')
-                    if os.path.exists(path):
-                        icon_paths[size] = path
-                        if icon_type is None:
-                            icon_type = type_name
-                        found = True
-                        break
-        icon_paths['icon_type'] = icon_type if icon_type else 'item'
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except (OSError, TypeError, ValueError):
+            stamp.append(None)
+    return tuple(stamp)
+
+def atlas_workspace_key(lsx_path):
+    return os.path.normcase(os.path.abspath(lsx_path))
+
+def atlas_entry_nbytes(entry):
+    im = entry.get('atlas_im')
+    pixel_bytes = im.size[0] * im.size[1] * len(im.getbands()) if im is not None else 0
+    journal = entry.get('journal')
+    return pixel_bytes + entry.get('dom_bytes', 0) + len(entry.get('icons') or []) * 512 + (journal.current_bytes if journal else 0)
+
+def load_atlas_entry(lsx_path, game_dir=None, mode='standalone', dds_path=None):
+    dom, atlas_path, icons, atlas_size, tile_size = parse_lsx(lsx_path, game_dir, mode)
+    if dom is None:
+        return None
+    if dds_path:
+        atlas_path = dds_path
+    try:
+        dom_bytes = os.path.getsize(lsx_path) * 10
+    except OSError:
+        dom_bytes = 0
+    return {'key': atlas_workspace_key(lsx_path), 'lsx_path': lsx_path, 'atlas_path': atlas_path, 'mode': mode, 'game_dir': game_dir, 'dom': dom, 'icons': icons, 'atlas_size': atlas_size, 'tile_size': tile_size, 'atlas_im': None, 'dom_bytes': dom_bytes, 'dom_modified': False, 'image_modified': False, 'stamp': None}
+
+def decode_atlas_entry(entry):
+    print(Fore.CYAN + f'[OPERATION] Converting DDS to PNG for preview...')
+    temp_png = os.path.join(ensure_temp_dir(), 'temp_gui.png')
+    dds_to_png(entry['atlas_path'], temp_png)
+    print(Fore.GREEN + f'[DEBUG] Loading and resizing atlas image...')
+    with Image.open(temp_png) as decoded:
+        decoded.load()
+        entry['atlas_im'] = resize_with_alpha(decoded, (entry['atlas_size'], entry['atlas_size']), Image.BICUBIC)
+    entry['stamp'] = atlas_file_stamp(entry['lsx_path'], entry['atlas_path'])
+    print(Fore.GREEN + f"✓ Atlas image loaded: {entry['atlas_im'].size}")
+    return entry
+
+def atlas_entry_is_current(entry):
+    if entry.get('dom_modified') or entry.get('image_modified'):
+        return True
+    return entry.get('stamp') == atlas_file_stamp(entry['lsx_path'], entry['atlas_path'])
+
+def find_icon_tier_paths(mapkey, mode, bg3_data, mod, atlas_path=None):
+    if mode == 'mod_project' and mod and bg3_data:
+        roots = [os.path.join(bg3_data, 'Mods', mod, 'GUI'), os.path.join(bg3_data, 'Public', mod)]
+    elif atlas_path:
+        roots = [os.path.dirname(atlas_path)]
+    else:
+        roots = []
+    listings = tier_listings(roots, tier_folders())
+    name = lint_tier_profile(mapkey, listings, EXPORT_PROFILES)
+    icon_paths = {}
+    for tier in EXPORT_PROFILES[name]['tiers']:
+        found = listings[tier['folder']].get(f'{mapkey}.dds'.lower())
+        if found:
+            icon_paths.setdefault(tier['size'], found[1])
+    icon_paths['icon_type'] = {'items': 'item', 'skills': 'skill'}.get(name, name)
+    return icon_paths
+
+def decode_dds_image(dds_path):
+    try:
+        with Image.open(dds_path) as im:
+            im.load()
+            return im.convert('RGBA')
+    except Exception as e:
+        print(Fore.YELLOW + f'[DECODE] Pillow could not read {os.path.basename(dds_path)} ({e}), falling back to texconv')
+    work_dir = tempfile.mkdtemp(prefix='decode_', dir=ensure_temp_dir())
+    try:
+        temp_png = os.path.join(work_dir, os.path.splitext(os.path.basename(dds_path))[0] + '.png')
+        dds_to_png(dds_path, temp_png)
+        with Image.open(temp_png) as im:
+            im.load()
+            return im.convert('RGBA')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+class TierPrefetcher:
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_workers=2):
+        self.cache = LRUCache(max_bytes, lambda im: im.size[0] * im.size[1] * 4, 'Tier cache')
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tier-prefetch')
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def cache_key(self, dds_path):
+        return (os.path.normcase(os.path.abspath(dds_path)), atlas_file_stamp(dds_path))
+
+    def prefetch_icon(self, mapkey, mode, bg3_data, mod, atlas_path=None):
+        with self.lock:
+            if ('paths', mapkey) in self.pending:
+                return
+            future = self.executor.submit(self._prefetch_icon, mapkey, mode, bg3_data, mod, atlas_path)
+            self.pending['paths', mapkey] = future
+        future.add_done_callback(lambda f: self._finish(('paths', mapkey)))
+
+    def _prefetch_icon(self, mapkey, mode, bg3_data, mod, atlas_path):
+        icon_paths = find_icon_tier_paths(mapkey, mode, bg3_data, mod, atlas_path)
+        icon_paths.pop('icon_type', None)
+        for dds_path in icon_paths.values():
+            self.prefetch(dds_path)
         return icon_paths
 
-    def preview_full_size(self, mapkey):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'CONTEXT MENU: Preview Full Size (Multi-Size Tabs)')
-        print(Fore.CYAN + f"{'=' * 60}")
-        print(Fore.GREEN + f'[DEBUG] MapKey: {mapkey}')
-        icon_paths = self.find_icon_all_sizes(mapkey)
-        icon_type = icon_paths.pop('icon_type', 'item')
-        if not icon_paths:
-            print(Fore.YELLOW + f"[WARNING] No icon sizes found for '{mapkey}'")
-            QMessageBox.warning(self, 'Preview Not Available', f"Could not find any icon sizes for '{mapkey}'.")
-            return
-        print(Fore.GREEN + f'[DEBUG] Found {len(icon_paths)} icon sizes: {sorted(icon_paths.keys())}')
-        dialog = QDialog(self)
-        dialog.setWindowTitle(f'Preview: {mapkey}')
-        dialog.setModal(True)
-        dialog_layout = QVBoxLayout()
-        tab_widget = QTabWidget()
-        tab_widget.setStyleSheet('\n            QTabWidget::pane {\n                border: 2px solid #555;\n                background-color: #2a2a2a;\n            }\n            QTabBar::tab {\n                background-color: #3a3a3a;\n                color: white;\n                padding: 8px 16px;\n                margin-right: 2px;\n                border: 1px solid #555;\n                border-bottom: none;\n                border-top-left-radius: 4px;\n                border-top-right-radius: 4px;\n            }\n            QTabBar::tab:selected {\n                background-color: #2a2a2a;\n                border-bottom: 2px solid #ff8c00;\n            }\n            QTabBar::tab:hover {\n                background-color: #4a4a4a;\n            }\n        ')
-        temp_files = []
-        sizes_order = [72, 144, 192, 380]
-        for size in sizes_order:
-            if size not in icon_paths:
-                continue
-            dds_path = icon_paths[size]
-            temp_png = os.path.join(TEMP_DIR, f'preview_{mapkey}_{size}.png')
-            temp_files.append(temp_png)
+    def prefetch(self, dds_path):
+        key = self.cache_key(dds_path)
+        with self.lock:
+            if key in self.pending or self.cache.peek(key) is not None:
+                return
+            future = self.executor.submit(self._decode, key, dds_path)
+            self.pending[key] = future
+        future.add_done_callback(lambda f: self._finish(key))
+
+    def _decode(self, key, dds_path):
+        im = decode_dds_image(dds_path)
+        self.cache.put(key, im)
+        return im
+
+    def _finish(self, key):
+        with self.lock:
+            self.pending.pop(key, None)
+
+    def get(self, dds_path):
+        key = self.cache_key(dds_path)
+        im = self.cache.get(key)
+        if im is not None:
+            return im
+        with self.lock:
+            future = self.pending.get(key)
+        if future is not None:
             try:
-                print(Fore.CYAN + f'[OPERATION] Converting {size}px DDS to PNG for preview...')
-                dds_to_png(dds_path, temp_png)
-                pixmap = QPixmap(temp_png)
-                if pixmap.isNull():
-                    print(Fore.RED + f'[ERROR] Failed to load {size}px preview image')
-                    continue
-                tab_content = QWidget()
-                tab_layout = QVBoxLayout()
-                image_label = QLabel()
-                image_label.setPixmap(pixmap)
-                image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                image_label.setStyleSheet('QLabel { border: 2px solid #555; background-color: #2a2a2a; padding: 10px; }')
-                tab_layout.addWidget(image_label)
-                size_info = QLabel(f'<b>Dimensions:</b> {pixmap.width()}×{pixmap.height()}px')
-                size_info.setStyleSheet('QLabel { padding: 5px; font-size: 11pt; color: #ccc; }')
-                size_info.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                size_info.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-                tab_layout.addWidget(size_info)
-                tab_content.setLayout(tab_layout)
-                tab_widget.addTab(tab_content, f'{size}×{size}px')
-                print(Fore.GREEN + f'✓ Added {size}px tab to preview')
+                return future.result()
             except Exception as e:
-                print(Fore.RED + f'[ERROR] Failed to create {size}px preview: {e}')
-                continue
-        dialog_layout.addWidget(tab_widget)
-        available_sizes = ', '.join([f'{s}×{s}' for s in sorted(icon_paths.keys())])
-        primary_path = icon_paths.get(380) or icon_paths.get(192) or icon_paths.get(144) or icon_paths.get(72)
-        info_label = QLabel(f'<b>MapKey:</b> {mapkey}<br><b>Type:</b> {icon_type.capitalize()}<br><b>Path:</b> {primary_path}<br><b>Available Sizes:</b> {available_sizes}px')
-        info_label.setStyleSheet('QLabel { padding: 10px; font-size: 12pt; }')
-        info_label.setWordWrap(True)
-        info_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-        dialog_layout.addWidget(info_label)
-        close_btn = QPushButton('Close')
-        close_btn.setStyleSheet('QPushButton { font-size: 12pt; padding: 5px; }')
-        close_btn.clicked.connect(dialog.close)
-        dialog_layout.addWidget(close_btn)
-        dialog.setLayout(dialog_layout)
-        dialog.adjustSize()
-        dialog.setMinimumWidth(420)
-        print(Fore.GREEN + f'[POPUP] Showing multi-size preview dialog with {tab_widget.count()} tabs')
-        dialog.exec()
-        for temp_file in temp_files:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-        print(Fore.GREEN + f'[DEBUG] Cleaned up {len(temp_files)} temporary preview files')
-
-    def replace_icon_from_context(self, mapkey):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'CONTEXT MENU: Replace Icon')
-        print(Fore.CYAN + f"{'=' * 60}")
-        print(Fore.GREEN + f'[DEBUG] MapKey: {mapkey}')
-        index = self.combo_icons.findText(mapkey)
-        if index >= 0:
-            self.combo_icons.setCurrentIndex(index)
-            print(Fore.GREEN + f"✓ Selected '{mapkey}' in dropdown")
-        self.replace_icon()
-
-    def copy_mapkey(self, mapkey):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'CONTEXT MENU: Copy MapKey')
-        print(Fore.CYAN + f"{'=' * 60}")
-        print(Fore.GREEN + f'[DEBUG] Copying to clipboard: {mapkey}')
-        clipboard = QApplication.clipboard()
-        clipboard.setText(mapkey)
-        print(Fore.GREEN + f"✓ MapKey '{mapkey}' copied to clipboard")
-        print(Fore.GREEN + f'[POPUP] Showing info toast')
-        msg = QMessageBox(self)
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.setWindowTitle('Copied')
-        msg.setText(f'MapKey copied: {mapkey}')
-        msg.setStandardButtons(QMessageBox.StandardButton.Ok)
-        msg.setDefaultButton(QMessageBox.StandardButton.Ok)
-        QTimer.singleShot(1500, msg.close)
-        msg.exec()
-
-    def delete_icon_from_atlas(self, mapkey):
-        print(Fore.CYAN + f"\n{'=' * 60}")
-        print(Fore.CYAN + f'CONTEXT MENU: Delete from Atlas')
-        print(Fore.CYAN + f"{'=' * 60}")
-        print(Fore.GREEN + f'[DEBUG] MapKey: {mapkey}')
-        print(Fore.YELLOW + f'[POPUP] Showing deletion confirmation')
-        msg_box = QMessageBox(self)
-        msg_box.setIcon(QMessageBox.Icon.Warning)
-        msg_box.setWindowTitle('Confirm Deletion')
-        msg_box.setText(f"Delete icon '{mapkey}' from atlas?")
-        msg_box.setInformativeText('This will:\n• Remove icon from the atlas\n• Delete all resized versions (72, 144, 192, 380 px)\n• Clear the tile in the atlas image\n\nThis action cannot be undone!')
-        msg_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-        msg_box.setDefaultButton(QMessageBox.StandardButton.No)
-        reply = msg_box.exec()
-        if reply != QMessageBox.StandardButton.Yes:
-            print(Fore.YELLOW + f'[WARNING] User cancelled deletion')
-            return
-        print(Fore.GREEN + f'✓ User confirmed deletion')
-        icon_to_delete = None
-        for icon in self.icons:
-            if icon['mapkey'] == mapkey:
-                icon_to_delete = icon
-                break
-        if not icon_to_delete:
-            print(Fore.RED + f'[ERROR] Icon not found: {mapkey}')
-            return
-        print(Fore.CYAN + f'[OPERATION] Deleting icon from atlas...')
-        col, row = get_grid_slot(icon_to_delete['u1'], icon_to_delete['v1'], self.grid_size)
-        x = col * self.tile_size
-        y = row * self.tile_size
-        print(Fore.GREEN + f'[DEBUG] Clearing tile at pixel position: x={x}, y={y}')
-        clear_im = Image.new('RGBA', (self.tile_size, self.tile_size), (0, 0, 0, 0))
-        self.atlas_im.paste(clear_im, (x, y))
-        print(Fore.CYAN + f'[OPERATION] Removing from LSX...')
-        for region in self.dom.getElementsByTagName('region'):
-            if region.getAttribute('id') == 'IconUVList':
-                root = region.getElementsByTagName('node')[0]
-                children = root.getElementsByTagName('children')[0]
-                for node in children.getElementsByTagName('node'):
-                    if node.getAttribute('id') == 'IconUV':
-                        for attr in node.getElementsByTagName('attribute'):
-                            if attr.getAttribute('id') == 'MapKey' and attr.getAttribute('value') == mapkey:
-                                children.removeChild(node)
-                                print(Fore.GREEN + f'✓ Removed from LSX')
-                                break
-        self.icons = [icon for icon in self.icons if icon['mapkey'] != mapkey]
-        print(Fore.GREEN + f'[DEBUG] Removed from internal list. Total icons now: {len(self.icons)}')
-        index = self.combo_icons.findText(mapkey)
-        if index >= 0:
-            self.combo_icons.removeItem(index)
-            print(Fore.GREEN + f'✓ Removed from dropdown')
-        if self.mode == 'mod_project':
-            bg3_data = self.bg3_edit.text().strip()
-            mod = self.mod_combo.currentText()
-            if mod and bg3_data:
-                print(Fore.CYAN + f'[OPERATION] Deleting resized DDS files...')
-                delete_paths = [os.path.join(bg3_data, 'Mods', mod, 'GUI', 'AssetsLowRes', 'ControllerUIIcons', 'items_png', f'{mapkey}.dds'), os.path.join(bg3_data, 'Mods', mod, 'GUI', 'Assets', 'ControllerUIIcons', 'items_png', f'{mapkey}.dds'), os.path.join(bg3_data, 'Mods', mod, 'GUI', 'AssetsLowRes', 'Tooltips', 'ItemIcons', f'{mapkey}.dds'), os.path.join(bg3_data, 'Mods', mod, 'GUI', 'Assets', 'Tooltips', 'ItemIcons', f'{mapkey}.dds'), os.path.join(bg3_data, 'Mods', mod, 'GUI', 'AssetsLowRes', 'ControllerUIIcons', 'skills_png', f'{mapkey}.dds'), os.path.join(bg3_data, 'Mods', mod, 'GUI', 'Assets', 'ControllerUIIcons', 'skills_png', f'{mapkey}.dds'), os.path.join(bg3_data, 'Mods', mod, 'GUI', 'AssetsLowRes', 'Tooltips', 'SkillIcons', f'{mapkey}.dds'), os.path.join(bg3_data, 'Mods', mod, 'GUI', 'Assets', 'Tooltips', 'SkillIcons', f'{mapkey}.dds')]
-                deleted_count = 0
-                for path in delete_paths:
-                    if os.path.exists(path):
-                        try:
-                            os.remove(path)
-                            print(Fore.GREEN + f'✓ Deleted: {path}')
-                            deleted_count += 1
-                        except Exception as e:
-                            print(Fore.RED + f'[ERROR] Failed to delete {path}: {e}')
-                print(Fore.GREEN + f'✓ Deleted {deleted_count} resized DDS file(s)')
-        self.dom_modified = True
-        self.update_preview()
-        print(Fore.GREEN + f"\n{'=' * 60}")
-        print(Fore.GREEN + f'ICON DELETED SUCCESSFULLY')
-        print(Fore.GREEN + f"{'=' * 60}\n")
-        success_msg = f"Icon '{mapkey}' has been deleted from the atlas and all resized versions removed."
-        print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
-        QMessageBox.information(self, 'Deleted', success_msg)
-
-    def load_preferences(self):
-        prefs_file = os.path.join(os.path.dirname(__file__), 'preferences.json')
-        if os.path.exists(prefs_file):
-            with open(prefs_file, 'r', encoding='utf-8') as f:
-                prefs = json.load(f)
-                prefs.setdefault('log_enabled', True)
-                prefs.setdefault('log_directory', os.path.join(os.path.dirname(__file__), 'logs'))
-                prefs.setdefault('log_level', 'DEBUG')
-                prefs.setdefault('max_log_files', 10)
-                prefs.setdefault('texconv_path', '')
-                return prefs
-        return {'log_enabled': True, 'log_directory': os.path.join(os.path.dirname(__file__), 'logs'), 'log_level': 'DEBUG', 'max_log_files': 10, 'texconv_path': ''}
-
-    def save_preferences(self):
-        global TEXCONV_PATH
-        prefs = {'bg3_data': self.bg3_prefs_edit.text(), 'temp_dir': self.temp_edit.text(), 'output_path': self.output_edit.text(), 'zip_output_path': self.zip_edit.text(), 'preview_size': self.preview_combo.currentText(), 'log_enabled': self.log_enabled_checkbox.isChecked(), 'log_directory': self.log_dir_edit.text(), 'log_level': self.log_level_combo.currentText(), 'max_log_files': self.max_log_files_spinbox.value(), 'texconv_path': self.texconv_path_edit.text()}
-        prefs_file = os.path.join(os.path.dirname(__file__), 'preferences.json')
-        with open(prefs_file, 'w', encoding='utf-8') as f:
-            json.dump(prefs, f, indent=2)
-        TEXCONV_PATH = find_texconv(prefs['texconv_path'])
-        self.update_texconv_status()
-        QMessageBox.information(self, 'Success', 'Preferences saved.\n\nNote: Logging changes will take effect on next application start.')
-
-    def show_console_viewer(self):
-        global CONSOLE_CAPTURE
-        if CONSOLE_CAPTURE is None:
-            QMessageBox.warning(self, 'Console Unavailable', "Console capture is not initialized.\n\nThis is likely because the application started in a mode that doesn't support console capture.\n\nTry running the application from the command line to see output.")
-            return
-        try:
-            dialog = ConsoleViewerDialog(CONSOLE_CAPTURE, self)
-            dialog.show()
-        except Exception as e:
-            QMessageBox.critical(self, 'Console Viewer Error', f'Failed to open console viewer:\n\n{str(e)}')
+                print(Fore.RED + f'[ERROR] Prefetch of {dds_path} failed: {e}')
+        return self._decode(key, dds_path)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 if __name__ == '__main__':
+    sys.modules.setdefault('iconmanager', sys.modules[__name__])
     main()
\ No newline at end of file
@@ -0,0 +1,2690 @@
+import os
+import sys
+import json
+import re
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from colorama import Fore, Style
+from PyQt6.QtWidgets import QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QFileDialog, QComboBox, QMessageBox, QInputDialog, QToolTip, QTabWidget, QLineEdit, QRadioButton, QButtonGroup, QGroupBox, QMenu, QDialog, QCheckBox, QSpinBox, QSizePolicy, QListView, QAbstractItemView
+from PyQt6.QtGui import QPixmap, QImage, QColor, QPalette, QCursor, QPainter, QPen, QAction, QKeySequence
+from PyQt6.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, QSize
+from console_viewer_widget import ConsoleViewerDialog
+import iconmanager
+from iconmanager import DEFAULT_BG3_PATHS, EditJournal, FolderWatcher, Image, LRUCache, MAPKEY_SEARCH_DEBOUNCE_MS, MAPKEY_SEARCH_PAGE, MapKeySearchIndex, STRINGS_EN, TEMP_DIR, TierPrefetcher, TileSlotIndex, append_icon_uv, atlas_entry_is_current, atlas_entry_nbytes, atlas_workspace_key, bulk_delete_icons, compact_atlas_layout, configure_build_cache, configure_export_profiles, configure_profiling, decode_atlas_entry, download_texconv, ensure_temp_dir, find_icon_tier_paths, find_icon_uv_node, find_texconv, get_grid_slot, icons_from_dom, load_atlas_entry, load_tile_digests, minidom, mod_mapkey_index, preflight_import_folder, print_preflight_report, profiled, render_icon_tile, resize_png, resize_with_alpha, save_tile_digests, select_mapkeys, set_icon_uv_slot, set_texconv_path, sync_watched_pngs, tile_digest, unique_png_mapkeys, write_atlas_dds, write_lsx
+
+class InteractivePreviewLabel(QLabel):
+
+    def __init__(self, icons, preview_size, atlas_size, tile_size, parent=None):
+        super().__init__(parent)
+        self.icons = icons
+        self.preview_size = preview_size
+        self.atlas_size = atlas_size
+        self.tile_size = tile_size
+        self.setMouseTracking(True)
+        self.tile_regions = self._compute_tile_regions()
+        self.selected_icon = None
+        self.hovered_mapkey = None
+        self.highlighted = []
+        self.parent_window = parent
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+
+    def _compute_tile_regions(self):
+        regions = {}
+        for icon in self.icons:
+            x_start = int(icon['u1'] * self.atlas_size)
+            y_start = int(icon['v1'] * self.atlas_size)
+            x_end = int(icon['u2'] * self.atlas_size)
+            y_end = int(icon['v2'] * self.atlas_size)
+            regions[icon['mapkey']] = (x_start, y_start, x_end, y_end)
+        return regions
+
+    def get_icon_at_position(self, mouse_x, mouse_y):
+        atlas_x = mouse_x / self.preview_size * self.atlas_size
+        atlas_y = mouse_y / self.preview_size * self.atlas_size
+        for icon in self.icons:
+            x_start = int(icon['u1'] * self.atlas_size)
+            y_start = int(icon['v1'] * self.atlas_size)
+            x_end = int(icon['u2'] * self.atlas_size)
+            y_end = int(icon['v2'] * self.atlas_size)
+            if x_start <= atlas_x < x_end and y_start <= atlas_y < y_end:
+                return icon
+        return None
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        mouse_x = event.pos().x()
+        mouse_y = event.pos().y()
+        atlas_x = mouse_x / self.preview_size * self.atlas_size
+        atlas_y = mouse_y / self.preview_size * self.atlas_size
+        for mapkey, (x_start, y_start, x_end, y_end) in self.tile_regions.items():
+            if x_start <= atlas_x < x_end and y_start <= atlas_y < y_end:
+                QToolTip.showText(QCursor.pos(), mapkey)
+                if mapkey != self.hovered_mapkey:
+                    self.hovered_mapkey = mapkey
+                    self.parent_window.prefetch_icon_tiers(mapkey)
+                return
+        self.hovered_mapkey = None
+        QToolTip.hideText()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            icon = self.get_icon_at_position(event.pos().x(), event.pos().y())
+            if icon:
+                self.selected_icon = icon
+                print(Fore.GREEN + f"[DEBUG] Selected icon: {icon['mapkey']}")
+                self.parent_window.prefetch_icon_tiers(icon['mapkey'])
+                self.update()
+
+    def set_highlighted(self, mapkeys):
+        self.highlighted = [self.tile_regions[key] for key in mapkeys or () if key in self.tile_regions]
+        self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.highlighted and self.pixmap():
+            painter = QPainter(self)
+            painter.setPen(QPen(QColor(0, 200, 255), 2))
+            scale = self.preview_size / self.atlas_size
+            for x_start, y_start, x_end, y_end in self.highlighted:
+                painter.drawRect(int(x_start * scale), int(y_start * scale), int((x_end - x_start) * scale), int((y_end - y_start) * scale))
+            painter.end()
+        if self.selected_icon and self.pixmap():
+            painter = QPainter(self)
+            pen = QPen(QColor(255, 140, 0), 3)
+            painter.setPen(pen)
+            x_start = int(self.selected_icon['u1'] * self.preview_size)
+            y_start = int(self.selected_icon['v1'] * self.preview_size)
+            x_end = int(self.selected_icon['u2'] * self.preview_size)
+            y_end = int(self.selected_icon['v2'] * self.preview_size)
+            width = x_end - x_start
+            height = y_end - y_start
+            painter.drawRect(x_start, y_start, width, height)
+            painter.end()
+
+    def show_context_menu(self, position):
+        icon = self.get_icon_at_position(position.x(), position.y())
+        if not icon:
+            return
+        self.selected_icon = icon
+        self.update()
+        print(Fore.CYAN + f"[USER] Right-clicked on icon: {icon['mapkey']}")
+        menu = QMenu(self)
+        menu.setStyleSheet('QMenu { background-color: #2a2a2a; color: white; } QMenu::item:selected { background-color: #3a3a3a; }')
+        preview_action = QAction('🔍 Preview Full Size', self)
+        preview_action.triggered.connect(lambda: self.parent_window.preview_full_size(icon['mapkey']))
+        menu.addAction(preview_action)
+        replace_action = QAction('📝 Replace Icon', self)
+        replace_action.triggered.connect(lambda: self.parent_window.replace_icon_from_context(icon['mapkey']))
+        menu.addAction(replace_action)
+        menu.addSeparator()
+        copy_action = QAction('📋 Copy MapKey Name', self)
+        copy_action.triggered.connect(lambda: self.parent_window.copy_mapkey(icon['mapkey']))
+        menu.addAction(copy_action)
+        where_action = QAction('🔎 Find MapKey in Mod', self)
+        where_action.triggered.connect(lambda: self.parent_window.show_mapkey_locations(icon['mapkey']))
+        menu.addAction(where_action)
+        delete_action = QAction('🗑️ Delete from Atlas', self)
+        delete_action.triggered.connect(lambda: self.parent_window.delete_icon_from_atlas(icon['mapkey']))
+        menu.addAction(delete_action)
+        menu.exec(self.mapToGlobal(position))
+
+class IconListModel(QAbstractListModel):
+    MapKeyRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, thumb_size=32, max_thumbs=512, parent=None):
+        super().__init__(parent)
+        self.thumb_size = thumb_size
+        self.max_thumbs = max_thumbs
+        self.icons = []
+        self.atlas_im = None
+        self.atlas_size = None
+        self.tile_size = None
+        self.thumbs = OrderedDict()
+        self.rows = None
+        self.source_rows = None
+        self.shown = None
+
+    def set_atlas(self, icons, atlas_im, atlas_size, tile_size):
+        self.beginResetModel()
+        self.icons = icons
+        self.atlas_im = atlas_im
+        self.atlas_size = atlas_size
+        self.tile_size = tile_size
+        self.thumbs.clear()
+        self.rows = None
+        self.source_rows = None
+        self.shown = None
+        self.endResetModel()
+
+    def set_filter(self, mapkeys):
+        self.beginResetModel()
+        if mapkeys is None:
+            self.shown = None
+        else:
+            rows = [self.source_row(key) for key in mapkeys]
+            self.shown = [self.icons[row] for row in rows if row >= 0]
+        self.rows = None
+        self.endResetModel()
+
+    def extend_filter(self, mapkeys):
+        if self.shown is None:
+            return
+        rows = [self.source_row(key) for key in mapkeys]
+        icons = [self.icons[row] for row in rows if row >= 0]
+        if not icons:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.shown), len(self.shown) + len(icons) - 1)
+        self.shown.extend(icons)
+        self.rows = None
+        self.endInsertRows()
+
+    def visible_icons(self):
+        return self.icons if self.shown is None else self.shown
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.visible_icons())
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        icons = self.visible_icons()
+        if not index.isValid() or index.row() >= len(icons):
+            return None
+        icon = icons[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, self.MapKeyRole):
+            return icon['mapkey']
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.thumbnail(icon)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            col, row = get_grid_slot(icon['u1'], icon['v1'], self.atlas_size // self.tile_size)
+            return f"{icon['mapkey']}\nslot col={col}, row={row}"
+        return None
+
+    def thumbnail(self, icon):
+        if self.atlas_im is None:
+            return None
+        x, y = (int(round(icon['u1'] * self.atlas_size)), int(round(icon['v1'] * self.atlas_size)))
+        key = (icon['mapkey'], x, y)
+        pixmap = self.thumbs.get(key)
+        if pixmap is not None:
+            self.thumbs.move_to_end(key)
+            return pixmap
+        tile = self.atlas_im.crop((x, y, x + self.tile_size, y + self.tile_size)).convert('RGBA').resize((self.thumb_size, self.thumb_size), Image.BILINEAR)
+        pixmap = QPixmap.fromImage(QImage(tile.tobytes('raw', 'RGBA'), self.thumb_size, self.thumb_size, QImage.Format.Format_RGBA8888))
+        self.thumbs[key] = pixmap
+        if len(self.thumbs) > self.max_thumbs:
+            self.thumbs.popitem(last=False)
+        return pixmap
+
+    def source_row(self, mapkey):
+        if self.source_rows is None:
+            self.source_rows = {icon['mapkey']: row for row, icon in enumerate(self.icons)}
+        return self.source_rows.get(mapkey, -1)
+
+    def row_of(self, mapkey):
+        if self.shown is None:
+            return self.source_row(mapkey)
+        if self.rows is None:
+            self.rows = {icon['mapkey']: row for row, icon in enumerate(self.shown)}
+        return self.rows.get(mapkey, -1)
+
+    def append_icon(self, icon):
+        if self.shown is not None:
+            self.icons.append(icon)
+            self.source_rows = None
+            return
+        row = len(self.icons)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.icons.append(icon)
+        if self.source_rows is not None:
+            self.source_rows[icon['mapkey']] = row
+        self.endInsertRows()
+
+    def remove_icon(self, mapkey):
+        source_row = self.source_row(mapkey)
+        if source_row < 0:
+            return False
+        row = self.row_of(mapkey)
+        if row >= 0:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del self.icons[source_row]
+        if self.shown is not None and row >= 0:
+            del self.shown[row]
+        self.rows = None
+        self.source_rows = None
+        if row >= 0:
+            self.endRemoveRows()
+        return True
+
+    def remove_icons(self, mapkeys):
+        mapkeys = set(mapkeys)
+        self.beginResetModel()
+        self.icons[:] = [icon for icon in self.icons if icon['mapkey'] not in mapkeys]
+        if self.shown is not None:
+            self.shown = [icon for icon in self.shown if icon['mapkey'] not in mapkeys]
+        for key in [key for key in self.thumbs if key[0] in mapkeys]:
+            del self.thumbs[key]
+        self.rows = None
+        self.source_rows = None
+        self.endResetModel()
+
+    def refresh_icon(self, mapkey):
+        row = self.row_of(mapkey)
+        if row < 0:
+            return
+        for key in [key for key in self.thumbs if key[0] == mapkey]:
+            del self.thumbs[key]
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ToolTipRole])
+
+    def refresh_tiles(self):
+        self.thumbs.clear()
+        if self.visible_icons():
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.visible_icons()) - 1, 0), [Qt.ItemDataRole.DecorationRole])
+
+class GuiWindow(QMainWindow):
+
+    def __init__(self):
+        super().__init__()
+        self.strings = STRINGS_EN
+        self.setWindowTitle(self.strings['window_title'])
+        self.setGeometry(100, 100, 1200, 800)
+        toolbar = self.addToolBar('Tools')
+        toolbar.setMovable(False)
+        self.undo_action = QAction('↶ Undo', self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.triggered.connect(self.undo_edit)
+        toolbar.addAction(self.undo_action)
+        self.redo_action = QAction('↷ Redo', self)
+        self.redo_action.setShortcuts([QKeySequence.StandardKey.Redo, QKeySequence('Ctrl+Y')])
+        self.redo_action.triggered.connect(self.redo_edit)
+        toolbar.addAction(self.redo_action)
+        spacer = QWidget()
+        spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        toolbar.addWidget(spacer)
+        console_action = QAction('📋 Show Console', self)
+        console_action.setToolTip('View real-time console output, logs, and debug information')
+        console_action.triggered.connect(self.show_console_viewer)
+        toolbar.addAction(console_action)
+        self.atlas_im = None
+        self.dom = None
+        self.icons = []
+        self.atlas_path = None
+        self.preview_label = None
+        self.preview_size = 1024
+        self.mode = 'mod_project'
+        self.dom_modified = False
+        self.image_modified = False
+        self.atlas_size = None
+        self.tile_size = None
+        self.journal = None
+        self.tile_digests = {}
+        self.slot_index = None
+        self.slot_mapkeys = None
+        self.current_atlas_key = None
+        self.workspace = OrderedDict()
+        self.mapkey_indexes = {}
+        self.folder_watcher = None
+        self.watch_target = None
+        self.watch_future = None
+        self.watch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='folder-watch')
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(500)
+        self.watch_timer.timeout.connect(self.poll_watch_folder)
+        self.prefs = self.load_preferences()
+        self.atlas_cache = LRUCache(int(self.prefs.get('atlas_cache_mb', 512)) * 1024 * 1024, atlas_entry_nbytes, 'Atlas cache')
+        self.tier_prefetcher = TierPrefetcher(int(self.prefs.get('tier_cache_mb', 64)) * 1024 * 1024)
+        configure_export_profiles(self.prefs.get('export_profiles'), self.prefs.get('atlas_format'))
+        configure_profiling(self.prefs.get('profiling_enabled', False), self.prefs.get('log_directory'))
+        configure_build_cache(self.prefs.get('build_cache_dir') or None, self.prefs.get('build_cache_url') or None, self.prefs.get('build_cache_enabled', True), int(self.prefs.get('build_cache_mb', 2048)) * 1024 * 1024)
+        self.bg3_data = self.prefs.get('bg3_data', DEFAULT_BG3_PATHS[0])
+        self.temp_dir = self.prefs.get('temp_dir', TEMP_DIR)
+        self.output_path = self.prefs.get('output_path', '')
+        self.zip_output_path = self.prefs.get('zip_output_path', '')
+        self.preview_size_option = self.prefs.get('preview_size', 'Full Atlas Size')
+        central = QWidget()
+        layout = QHBoxLayout()
+        central.setLayout(layout)
+        self.tabs = QTabWidget()
+        layout.addWidget(self.tabs)
+        main_tab = QWidget()
+        self.tabs.addTab(main_tab, 'Main')
+        main_layout = QVBoxLayout()
+        main_tab.setLayout(main_layout)
+        bg3_layout = QHBoxLayout()
+        bg3_layout.addWidget(QLabel('BG3 Data Path:'))
+        self.bg3_edit = QLineEdit(self.bg3_data)
+        bg3_layout.addWidget(self.bg3_edit)
+        btn_browse_bg3 = QPushButton('Browse')
+        btn_browse_bg3.clicked.connect(self.browse_bg3)
+        bg3_layout.addWidget(btn_browse_bg3)
+        main_layout.addLayout(bg3_layout)
+        mod_layout = QHBoxLayout()
+        mod_layout.addWidget(QLabel('Mod Project:'))
+        self.mod_combo = QComboBox()
+        self.mod_combo.setStyleSheet('QComboBox { text-align: left; padding-left: 10px; }')
+        self.mod_combo.currentIndexChanged.connect(self.on_mod_selection_changed)
+        mod_layout.addWidget(self.mod_combo)
+        main_layout.addLayout(mod_layout)
+        mode_group = QGroupBox('Mode')
+        mode_layout = QVBoxLayout()
+        self.mode_standalone = QRadioButton('Standalone Mode')
+        self.mode_standalone.toggled.connect(self.toggle_mode)
+        mode_layout.addWidget(self.mode_standalone)
+        self.mode_project = QRadioButton('Mod Project Mode')
+        self.mode_project.setChecked(True)
+        self.mode_project.toggled.connect(self.toggle_mode)
+        mode_layout.addWidget(self.mode_project)
+        mode_group.setLayout(mode_layout)
+        main_layout.addWidget(mode_group)
+        self.standalone_group = QGroupBox('Standalone Paths')
+        standalone_layout = QVBoxLayout()
+        standalone_layout.addWidget(QLabel('Atlas .lsx Path:'))
+        self.standalone_lsx_edit = QLineEdit()
+        standalone_layout.addWidget(self.standalone_lsx_edit)
+        btn_browse_lsx = QPushButton('Browse')
+        btn_browse_lsx.clicked.connect(lambda: self.browse_path(self.standalone_lsx_edit, 'Select .lsx', 'Atlas resources (*.lsx *.lsf)'))
+        standalone_layout.addWidget(btn_browse_lsx)
+        standalone_layout.addWidget(QLabel('Atlas DDS Path:'))
+        self.standalone_dds_edit = QLineEdit()
+        standalone_layout.addWidget(self.standalone_dds_edit)
+        btn_browse_dds = QPushButton('Browse')
+        btn_browse_dds.clicked.connect(lambda: self.browse_path(self.standalone_dds_edit, 'Select DDS', '*.dds'))
+        standalone_layout.addWidget(btn_browse_dds)
+        self.standalone_group.setLayout(standalone_layout)
+        self.standalone_group.setVisible(False)
+        main_layout.addWidget(self.standalone_group)
+        self.project_group = QGroupBox('Mod Project')
+        project_layout = QVBoxLayout()
+        self.atlas_status_label = QLabel('No Atlas Loaded')
+        self.atlas_status_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
+        project_layout.addWidget(self.atlas_status_label)
+        project_layout.addWidget(QLabel('Current Atlas:'))
+        self.project_lsx_edit = QLineEdit()
+        self.project_lsx_edit.setReadOnly(True)
+        self.project_lsx_edit.setPlaceholderText('No atlas loaded')
+        self.project_lsx_edit.setStyleSheet('QLineEdit { background-color: #2a2a2a; }')
+        project_layout.addWidget(self.project_lsx_edit)
+        self.btn_load_project_atlas = QPushButton('Load Atlas from Project')
+        self.btn_load_project_atlas.clicked.connect(self.load_atlas_from_project)
+        self.btn_load_project_atlas.setEnabled(False)
+        self.btn_load_project_atlas.setStyleSheet('QPushButton:disabled { color: #555; }')
+        project_layout.addWidget(self.btn_load_project_atlas)
+        btn_browse_project_lsx = QPushButton('Browse Manually (Advanced)')
+        btn_browse_project_lsx.clicked.connect(lambda: self.browse_path(self.project_lsx_edit, 'Select .lsx', 'Atlas resources (*.lsx *.lsf)'))
+        btn_browse_project_lsx.setStyleSheet('QPushButton { font-size: 9pt; color: #888; }')
+        project_layout.addWidget(btn_browse_project_lsx)
+        btn_collisions = QPushButton('Show MapKey Collisions')
+        btn_collisions.setToolTip('List MapKeys defined more than once across all atlases of the selected mod')
+        btn_collisions.clicked.connect(self.show_mapkey_collisions)
+        project_layout.addWidget(btn_collisions)
+        self.project_group.setLayout(project_layout)
+        self.project_group.setVisible(True)
+        main_layout.addWidget(self.project_group)
+        btn_load = QPushButton(self.strings['load_atlas'])
+        btn_load.clicked.connect(lambda: self.load_atlas())
+        main_layout.addWidget(btn_load)
+        workspace_layout = QHBoxLayout()
+        workspace_layout.addWidget(QLabel('Open Atlases:'))
+        self.workspace_combo = QComboBox()
+        self.workspace_combo.setToolTip('Atlases kept open in this session. Switching uses the in-memory atlas cache.')
+        self.workspace_combo.currentIndexChanged.connect(self.on_workspace_atlas_changed)
+        workspace_layout.addWidget(self.workspace_combo, 1)
+        btn_close_atlas = QPushButton('Close')
+        btn_close_atlas.setToolTip('Close the current atlas and drop it from the cache')
+        btn_close_atlas.clicked.connect(self.close_workspace_atlas)
+        workspace_layout.addWidget(btn_close_atlas)
+        main_layout.addLayout(workspace_layout)
+        self.icon_filter_edit = QLineEdit()
+        self.icon_filter_edit.setPlaceholderText('Search MapKeys (prefix or any 3+ characters)...')
+        self.icon_filter_edit.setClearButtonEnabled(True)
+        self.icon_filter_edit.textChanged.connect(self.schedule_search)
+        main_layout.addWidget(self.icon_filter_edit)
+        self.icon_model = IconListModel(parent=self)
+        self.search_index = None
+        self.search_matches = None
+        self.search_limit = MAPKEY_SEARCH_PAGE
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(MAPKEY_SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(lambda: self.search_mapkeys(self.icon_filter_edit.text()))
+        self.icon_list = QListView()
+        self.icon_list.setModel(self.icon_model)
+        self.icon_list.setUniformItemSizes(True)
+        self.icon_list.setIconSize(QSize(self.icon_model.thumb_size, self.icon_model.thumb_size))
+        self.icon_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.icon_list.setMinimumHeight(160)
+        self.icon_list.selectionModel().currentChanged.connect(lambda current, previous: self.prefetch_icon_tiers(current.data(IconListModel.MapKeyRole) if current.isValid() else ''))
+        self.icon_list.verticalScrollBar().valueChanged.connect(self.load_more_search_results)
+        self.icon_list.doubleClicked.connect(lambda index: self.preview_full_size(index.data(IconListModel.MapKeyRole)))
+        main_layout.addWidget(self.icon_list)
+        btn_replace = QPushButton(self.strings['replace_icon'])
+        btn_replace.clicked.connect(self.replace_icon)
+        main_layout.addWidget(btn_replace)
+        btn_add = QPushButton(self.strings['add_icon'])
+        btn_add.clicked.connect(self.add_icon)
+        main_layout.addWidget(btn_add)
+        btn_bulk_delete = QPushButton('Bulk Delete...')
+        btn_bulk_delete.setToolTip('Delete the selected icons, or MapKeys matching a list, glob patterns or a regex, in one pass')
+        btn_bulk_delete.clicked.connect(self.bulk_delete_icons_gui)
+        main_layout.addWidget(btn_bulk_delete)
+        btn_compact = QPushButton('Compact Atlas')
+        btn_compact.setToolTip('Repack icons into contiguous slots and shrink to the smallest power-of-two atlas that fits')
+        btn_compact.clicked.connect(self.compact_current_atlas)
+        main_layout.addWidget(btn_compact)
+        btn_save = QPushButton(self.strings['save_atlas'])
+        btn_save.clicked.connect(lambda: self.save_atlas())
+        main_layout.addWidget(btn_save)
+        btn_resize_item = QPushButton(self.strings['resize_item'])
+        btn_resize_item.clicked.connect(self.resize_item_png_gui)
+        main_layout.addWidget(btn_resize_item)
+        btn_resize_skill = QPushButton(self.strings['resize_skill'])
+        btn_resize_skill.clicked.connect(self.resize_skill_png_gui)
+        main_layout.addWidget(btn_resize_skill)
+        self.preview_placeholder = QLabel('Load an atlas to see preview')
+        self.preview_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.preview_placeholder)
+        self.setCentralWidget(central)
+        create_tab = QWidget()
+        self.tabs.addTab(create_tab, 'Create Atlas')
+        create_layout = QVBoxLayout()
+        create_tab.setLayout(create_layout)
+        header_label = QLabel('Generate New Atlas')
+        header_label.setStyleSheet('QLabel { font-size: 14pt; font-weight: bold; margin-bottom: 10px; }')
+        create_layout.addWidget(header_label)
+        mod_select_group = QGroupBox('Mod Project')
+        mod_select_layout = QVBoxLayout()
+        mod_row = QHBoxLayout()
+        mod_row.addWidget(QLabel('Select Mod:'))
+        self.create_mod_combo = QComboBox()
+        self.create_mod_combo.setStyleSheet('QComboBox { text-align: left; padding-left: 10px; }')
+        self.create_mod_combo.currentIndexChanged.connect(self.on_create_mod_changed)
+        mod_row.addWidget(self.create_mod_combo)
+        mod_select_layout.addLayout(mod_row)
+        mod_select_group.setLayout(mod_select_layout)
+        create_layout.addWidget(mod_select_group)
+        template_group = QGroupBox('1. Atlas Configuration')
+        template_layout = QVBoxLayout()
+        canvas_layout = QHBoxLayout()
+        canvas_layout.addWidget(QLabel('Canvas Size:'))
+        self.canvas_size_group = QButtonGroup(self)
+        self.canvas_512 = QRadioButton('512 x 512 (Standard)')
+        self.canvas_512.setChecked(True)
+        self.canvas_1024 = QRadioButton('1024 x 1024 (Large)')
+        self.canvas_size_group.addButton(self.canvas_512)
+        self.canvas_size_group.addButton(self.canvas_1024)
+        canvas_layout.addWidget(self.canvas_512)
+        canvas_layout.addWidget(self.canvas_1024)
+        canvas_layout.addStretch()
+        template_layout.addLayout(canvas_layout)
+        self.grid_info_label = QLabel('Grid: 64x64 icons | Total slots: 64 (8x8)')
+        self.grid_info_label.setStyleSheet('QLabel { color: #888; font-style: italic; margin-left: 20px; }')
+        template_layout.addWidget(self.grid_info_label)
+        self.canvas_512.toggled.connect(self.update_create_atlas_grid_info)
+        self.canvas_1024.toggled.connect(self.update_create_atlas_grid_info)
+        self.canvas_1024.toggled.connect(self.scan_import_folder)
+        template_group.setLayout(template_layout)
+        create_layout.addWidget(template_group)
+        location_group = QGroupBox('2. Destination')
+        location_layout = QVBoxLayout()
+        location_info = QLabel("Atlas will be created in the selected mod's GUI folder:")
+        location_info.setWordWrap(True)
+        location_layout.addWidget(location_info)
+        self.create_atlas_path_label = QLabel('No mod selected')
+        self.create_atlas_path_label.setStyleSheet('QLabel { color: #888; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
+        self.create_atlas_path_label.setWordWrap(True)
+        location_layout.addWidget(self.create_atlas_path_label)
+        name_layout = QHBoxLayout()
+        name_layout.addWidget(QLabel('Atlas Name:'))
+        self.atlas_name_edit = QLineEdit('IconAtlas')
+        self.atlas_name_edit.setPlaceholderText('e.g., IconAtlas, SkillAtlas')
+        self.atlas_name_edit.textChanged.connect(self.update_create_atlas_status)
+        name_layout.addWidget(self.atlas_name_edit)
+        location_layout.addLayout(name_layout)
+        location_group.setLayout(location_layout)
+        create_layout.addWidget(location_group)
+        icons_group = QGroupBox('3. Initial Icons (Optional)')
+        icons_layout = QVBoxLayout()
+        self.start_empty_radio = QRadioButton('Start with empty atlas')
+        self.start_empty_radio.setChecked(True)
+        self.start_empty_radio.toggled.connect(self.toggle_import_options)
+        icons_layout.addWidget(self.start_empty_radio)
+        self.import_folder_radio = QRadioButton('Import icons from folder')
+        self.import_folder_radio.toggled.connect(self.toggle_import_options)
+        icons_layout.addWidget(self.import_folder_radio)
+        self.import_controls_widget = QWidget()
+        import_controls_layout = QVBoxLayout()
+        import_controls_layout.setContentsMargins(20, 0, 0, 0)
+        folder_select_layout = QHBoxLayout()
+        folder_select_layout.addWidget(QLabel('Folder:'))
+        self.import_folder_edit = QLineEdit()
+        self.import_folder_edit.setPlaceholderText('Select folder containing PNG images')
+        self.import_folder_edit.textChanged.connect(self.scan_import_folder)
+        folder_select_layout.addWidget(self.import_folder_edit)
+        btn_browse_import = QPushButton('Browse')
+        btn_browse_import.clicked.connect(self.browse_import_folder)
+        folder_select_layout.addWidget(btn_browse_import)
+        import_controls_layout.addLayout(folder_select_layout)
+        self.import_count_label = QLabel('No folder selected')
+        self.import_count_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
+        import_controls_layout.addWidget(self.import_count_label)
+        prefix_layout = QHBoxLayout()
+        prefix_layout.addWidget(QLabel('MapKey Prefix (optional):'))
+        self.mapkey_prefix_edit = QLineEdit()
+        self.mapkey_prefix_edit.setPlaceholderText('e.g., MOD, CUSTOM')
+        self.mapkey_prefix_edit.setMaximumWidth(200)
+        prefix_layout.addWidget(self.mapkey_prefix_edit)
+        prefix_layout.addStretch()
+        import_controls_layout.addLayout(prefix_layout)
+        self.prefix_example_label = QLabel('Example: sword.png → MapKey: sword')
+        self.prefix_example_label.setStyleSheet('QLabel { color: #666; font-size: 9pt; margin-left: 20px; }')
+        self.mapkey_prefix_edit.textChanged.connect(self.update_prefix_example)
+        self.mapkey_prefix_edit.textChanged.connect(self.scan_import_folder)
+        import_controls_layout.addWidget(self.prefix_example_label)
+        import_controls_layout.addWidget(QLabel(''))
+        self.auto_resize_checkbox = QCheckBox('Auto-generate resized versions (72, 144, 192, 380px)')
+        self.auto_resize_checkbox.setChecked(True)
+        self.auto_resize_checkbox.setToolTip('Creates multiple DDS sizes for game UI compatibility')
+        self.auto_resize_checkbox.toggled.connect(self.toggle_resize_type_selection)
+        import_controls_layout.addWidget(self.auto_resize_checkbox)
+        self.resize_type_widget = QWidget()
+        resize_type_layout = QHBoxLayout()
+        resize_type_layout.setContentsMargins(20, 0, 0, 0)
+        resize_type_layout.addWidget(QLabel('Icon Type:'))
+        self.resize_type_group = QButtonGroup(self)
+        self.resize_type_item = QRadioButton('Items')
+        self.resize_type_item.setChecked(True)
+        self.resize_type_skill = QRadioButton('Skills')
+        self.resize_type_group.addButton(self.resize_type_item)
+        self.resize_type_group.addButton(self.resize_type_skill)
+        resize_type_layout.addWidget(self.resize_type_item)
+        resize_type_layout.addWidget(self.resize_type_skill)
+        resize_type_layout.addStretch()
+        self.resize_type_widget.setLayout(resize_type_layout)
+        import_controls_layout.addWidget(self.resize_type_widget)
+        self.watch_folder_checkbox = QCheckBox('Watch folder and keep the generated atlas and tiers in sync')
+        self.watch_folder_checkbox.setToolTip('After generating the atlas, changed or new PNGs in the import folder are resized and written into the atlas automatically')
+        self.watch_folder_checkbox.toggled.connect(self.toggle_watch_folder)
+        import_controls_layout.addWidget(self.watch_folder_checkbox)
+        self.import_controls_widget.setLayout(import_controls_layout)
+        self.import_controls_widget.setEnabled(False)
+        icons_layout.addWidget(self.import_controls_widget)
+        icons_group.setLayout(icons_layout)
+        create_layout.addWidget(icons_group)
+        create_layout.addStretch()
+        self.btn_generate_atlas = QPushButton('Generate Atlas')
+        self.btn_generate_atlas.setStyleSheet('QPushButton { font-size: 12pt; font-weight: bold; padding: 10px; background-color: #2a5a8a; } QPushButton:hover { background-color: #3a6a9a; } QPushButton:disabled { background-color: #444; color: #666; }')
+        self.btn_generate_atlas.clicked.connect(lambda: self.generate_new_atlas())
+        self.btn_generate_atlas.setEnabled(False)
+        create_layout.addWidget(self.btn_generate_atlas)
+        self.create_status_label = QLabel('')
+        self.create_status_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
+        self.create_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        create_layout.addWidget(self.create_status_label)
+        prefs_tab = QWidget()
+        self.tabs.addTab(prefs_tab, 'Preferences')
+        prefs_layout = QVBoxLayout()
+        prefs_tab.setLayout(prefs_layout)
+        prefs_layout.addWidget(QLabel('BG3 Data Path:'))
+        bg3_prefs_layout = QHBoxLayout()
+        self.bg3_prefs_edit = QLineEdit(self.bg3_data)
+        bg3_prefs_layout.addWidget(self.bg3_prefs_edit)
+        btn_browse_bg3_prefs = QPushButton('Browse')
+        btn_browse_bg3_prefs.clicked.connect(lambda: self.browse_path(self.bg3_prefs_edit, 'Select BG3 Data Directory'))
+        bg3_prefs_layout.addWidget(btn_browse_bg3_prefs)
+        prefs_layout.addLayout(bg3_prefs_layout)
+        prefs_layout.addWidget(QLabel('Temp Directory:'))
+        temp_layout = QHBoxLayout()
+        self.temp_edit = QLineEdit(self.temp_dir)
+        temp_layout.addWidget(self.temp_edit)
+        btn_browse_temp = QPushButton('Browse')
+        btn_browse_temp.clicked.connect(lambda: self.browse_path(self.temp_edit, 'Select Temp Directory'))
+        temp_layout.addWidget(btn_browse_temp)
+        prefs_layout.addLayout(temp_layout)
+        prefs_layout.addWidget(QLabel('Output Path:'))
+        output_layout = QHBoxLayout()
+        self.output_edit = QLineEdit(self.output_path)
+        output_layout.addWidget(self.output_edit)
+        btn_browse_output = QPushButton('Browse')
+        btn_browse_output.clicked.connect(lambda: self.browse_path(self.output_edit, 'Select Output Directory'))
+        output_layout.addWidget(btn_browse_output)
+        prefs_layout.addLayout(output_layout)
+        prefs_layout.addWidget(QLabel('Zip Output Path:'))
+        zip_layout = QHBoxLayout()
+        self.zip_edit = QLineEdit(self.zip_output_path)
+        zip_layout.addWidget(self.zip_edit)
+        btn_browse_zip = QPushButton('Browse')
+        btn_browse_zip.clicked.connect(lambda: self.browse_path(self.zip_edit, 'Select Zip Output Directory'))
+        zip_layout.addWidget(btn_browse_zip)
+        prefs_layout.addLayout(zip_layout)
+        prefs_layout.addWidget(QLabel('Preview Size:'))
+        self.preview_combo = QComboBox()
+        self.preview_combo.addItems(['512x512', 'Full Atlas Size'])
+        self.preview_combo.setCurrentText(self.preview_size_option)
+        self.preview_combo.currentTextChanged.connect(self.update_preview_size)
+        prefs_layout.addWidget(self.preview_combo)
+        cache_layout = QHBoxLayout()
+        cache_layout.addWidget(QLabel('Atlas cache size (MB):'))
+        self.atlas_cache_spinbox = QSpinBox()
+        self.atlas_cache_spinbox.setMinimum(64)
+        self.atlas_cache_spinbox.setMaximum(16384)
+        self.atlas_cache_spinbox.setSingleStep(64)
+        self.atlas_cache_spinbox.setValue(int(self.prefs.get('atlas_cache_mb', 512)))
+        self.atlas_cache_spinbox.setToolTip('Memory budget for decoded atlases kept open in the workspace. Atlases with unsaved changes are never evicted.')
+        cache_layout.addWidget(self.atlas_cache_spinbox)
+        cache_layout.addWidget(QLabel('Undo memory per atlas (MB):'))
+        self.undo_budget_spinbox = QSpinBox()
+        self.undo_budget_spinbox.setMinimum(8)
+        self.undo_budget_spinbox.setMaximum(4096)
+        self.undo_budget_spinbox.setSingleStep(8)
+        self.undo_budget_spinbox.setValue(int(self.prefs.get('undo_budget_mb', 64)))
+        self.undo_budget_spinbox.setToolTip('Undo history keeps only the changed tiles per step; the oldest steps are dropped beyond this budget.')
+        cache_layout.addWidget(self.undo_budget_spinbox)
+        cache_layout.addStretch()
+        prefs_layout.addLayout(cache_layout)
+        prefs_layout.addWidget(QLabel(''))
+        logging_label = QLabel('Logging Settings')
+        logging_label.setStyleSheet('QLabel { font-weight: bold; font-size: 12pt; color: #66ff66; }')
+        prefs_layout.addWidget(logging_label)
+        self.log_enabled_checkbox = QCheckBox('Enable session logging to file')
+        self.log_enabled_checkbox.setChecked(self.prefs.get('log_enabled', True))
+        self.log_enabled_checkbox.setToolTip('When enabled, creates a timestamped log file for each session')
+        prefs_layout.addWidget(self.log_enabled_checkbox)
+        prefs_layout.addWidget(QLabel('Log Directory:'))
+        log_dir_layout = QHBoxLayout()
+        default_log_dir = self.prefs.get('log_directory', os.path.join(os.path.dirname(__file__), 'logs'))
+        self.log_dir_edit = QLineEdit(default_log_dir)
+        self.log_dir_edit.setToolTip('Directory where log files will be saved')
+        log_dir_layout.addWidget(self.log_dir_edit)
+        btn_browse_log_dir = QPushButton('Browse')
+        btn_browse_log_dir.clicked.connect(lambda: self.browse_path(self.log_dir_edit, 'Select Log Directory'))
+        log_dir_layout.addWidget(btn_browse_log_dir)
+        prefs_layout.addLayout(log_dir_layout)
+        log_level_layout = QHBoxLayout()
+        log_level_layout.addWidget(QLabel('Console Display Level:'))
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItems(['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])
+        self.log_level_combo.setCurrentText(self.prefs.get('log_level', 'DEBUG'))
+        self.log_level_combo.setToolTip('Controls console output verbosity. File log ALWAYS captures everything at DEBUG level.\nDEBUG: Show all | INFO: General info | WARNING/ERROR: Issues only')
+        log_level_layout.addWidget(self.log_level_combo)
+        log_level_layout.addStretch()
+        prefs_layout.addLayout(log_level_layout)
+        log_level_note = QLabel('Note: Log file always captures everything (DEBUG), this setting only affects console display')
+        log_level_note.setStyleSheet('QLabel { color: #88aaff; font-style: italic; font-size: 9pt; margin-left: 20px; }')
+        prefs_layout.addWidget(log_level_note)
+        max_log_layout = QHBoxLayout()
+        max_log_layout.addWidget(QLabel('Keep last N log files:'))
+        self.max_log_files_spinbox = QSpinBox()
+        self.max_log_files_spinbox.setMinimum(1)
+        self.max_log_files_spinbox.setMaximum(100)
+        self.max_log_files_spinbox.setValue(self.prefs.get('max_log_files', 10))
+        self.max_log_files_spinbox.setToolTip('Automatically deletes older log files, keeping only the most recent N files')
+        max_log_layout.addWidget(self.max_log_files_spinbox)
+        max_log_layout.addStretch()
+        prefs_layout.addLayout(max_log_layout)
+        self.profiling_checkbox = QCheckBox('Profile operations (cProfile + tracemalloc)')
+        self.profiling_checkbox.setChecked(self.prefs.get('profiling_enabled', False))
+        self.profiling_checkbox.setToolTip('Writes a .pstats file and a top-allocation summary next to the session log for every load, save, generate, resize and update. Slows operations down - attach the files to bug reports.')
+        prefs_layout.addWidget(self.profiling_checkbox)
+        log_note = QLabel('Note: Logging changes take effect on next application start')
+        log_note.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; font-size: 9pt; }')
+        prefs_layout.addWidget(log_note)
+        prefs_layout.addWidget(QLabel(''))
+        texconv_label = QLabel('Texconv Settings (DDS Conversion Tool)')
+        texconv_label.setStyleSheet('QLabel { font-weight: bold; font-size: 12pt; color: #66ff66; }')
+        prefs_layout.addWidget(texconv_label)
+        self.texconv_status_label = QLabel('Checking texconv...')
+        self.texconv_status_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; }')
+        prefs_layout.addWidget(self.texconv_status_label)
+        prefs_layout.addWidget(QLabel('Texconv Path (optional - leave blank for auto-detect):'))
+        texconv_path_layout = QHBoxLayout()
+        texconv_path_default = self.prefs.get('texconv_path', '')
+        self.texconv_path_edit = QLineEdit(texconv_path_default)
+        self.texconv_path_edit.setPlaceholderText('Auto-detect from: script_dir/texconv/, system PATH')
+        self.texconv_path_edit.setToolTip('Leave blank to auto-detect, or specify full path to texconv.exe')
+        texconv_path_layout.addWidget(self.texconv_path_edit)
+        btn_browse_texconv = QPushButton('Browse')
+        btn_browse_texconv.clicked.connect(self.browse_texconv)
+        texconv_path_layout.addWidget(btn_browse_texconv)
+        prefs_layout.addLayout(texconv_path_layout)
+        texconv_buttons_layout = QHBoxLayout()
+        self.btn_download_texconv = QPushButton('Download Texconv')
+        self.btn_download_texconv.setToolTip('Download texconv.exe from Microsoft DirectXTex (official source)')
+        self.btn_download_texconv.clicked.connect(self.download_texconv_clicked)
+        texconv_buttons_layout.addWidget(self.btn_download_texconv)
+        btn_check_texconv = QPushButton('Check Status')
+        btn_check_texconv.setToolTip('Verify texconv.exe is found and working')
+        btn_check_texconv.clicked.connect(self.update_texconv_status)
+        texconv_buttons_layout.addWidget(btn_check_texconv)
+        texconv_buttons_layout.addStretch()
+        prefs_layout.addLayout(texconv_buttons_layout)
+        texconv_info = QLabel('Texconv is used for PNG↔DDS conversion. Will be downloaded to script_dir/texconv/')
+        texconv_info.setStyleSheet('QLabel { color: #88aaff; font-style: italic; font-size: 9pt; }')
+        prefs_layout.addWidget(texconv_info)
+        self.update_texconv_status()
+        prefs_layout.addWidget(QLabel('Shared Build Cache URL (optional - reuse encoded DDS across the team):'))
+        self.build_cache_url_edit = QLineEdit(self.prefs.get('build_cache_url', ''))
+        self.build_cache_url_edit.setPlaceholderText('e.g. http://buildbox:8765 (started with: iconmanager.py cache-server)')
+        self.build_cache_url_edit.setToolTip('Leave blank to use only the local build cache in the temp folder')
+        prefs_layout.addWidget(self.build_cache_url_edit)
+        prefs_layout.addStretch()
+        btn_save_prefs = QPushButton('Save Preferences')
+        btn_save_prefs.clicked.connect(self.save_preferences)
+        prefs_layout.addWidget(btn_save_prefs)
+        self.refresh_mods()
+        self.update_create_atlas_status()
+        self.statusBar().showMessage(self.atlas_cache.describe())
+
+    def browse_bg3(self):
+        dir_ = QFileDialog.getExistingDirectory(self, 'Select BG3 Data folder', self.bg3_edit.text())
+        if dir_:
+            self.bg3_edit.setText(dir_)
+            self.refresh_mods()
+
+    def refresh_mods(self):
+        bg3 = self.bg3_edit.text().strip()
+        if not bg3 or not os.path.isdir(bg3):
+            self.mod_combo.clear()
+            self.create_mod_combo.clear()
+            return
+        public = os.path.join(bg3, 'Public')
+        generated = os.path.join(bg3, 'Generated', 'Public')
+        mods = set()
+        if os.path.isdir(public):
+            mods.update([d for d in os.listdir(public) if os.path.isdir(os.path.join(public, d))])
+        if os.path.isdir(generated):
+            mods.update([d for d in os.listdir(generated) if os.path.isdir(os.path.join(generated, d))])
+        mods = sorted(mods)
+        current = self.mod_combo.currentText()
+        self.mod_combo.blockSignals(True)
+        self.mod_combo.clear()
+        self.mod_combo.addItems(mods)
+        self.mod_combo.blockSignals(False)
+        if current in mods:
+            self.mod_combo.setCurrentText(current)
+        self.create_mod_combo.blockSignals(True)
+        self.create_mod_combo.clear()
+        self.create_mod_combo.addItems(mods)
+        self.create_mod_combo.blockSignals(False)
+        if current in mods:
+            self.create_mod_combo.setCurrentText(current)
+
+    def toggle_mode(self):
+        print(Fore.CYAN + f'\n--- MODE CHANGE ---')
+        if self.mode_standalone.isChecked():
+            self.mode = 'standalone'
+            print(Fore.GREEN + f'✓ Switched to STANDALONE mode')
+            self.standalone_group.setVisible(True)
+            self.project_group.setVisible(False)
+        else:
+            self.mode = 'mod_project'
+            print(Fore.GREEN + f'✓ Switched to MOD PROJECT mode')
+            self.standalone_group.setVisible(False)
+            self.project_group.setVisible(True)
+        print(Fore.CYAN + f'-------------------\n')
+
+    def on_mod_selection_changed(self):
+        mod = self.mod_combo.currentText()
+        if mod and self.mode == 'mod_project':
+            self.btn_load_project_atlas.setEnabled(True)
+            print(Fore.GREEN + f'[DEBUG] Mod selected: {mod} - Load button enabled')
+        else:
+            self.btn_load_project_atlas.setEnabled(False)
+            print(Fore.GREEN + f'[DEBUG] No mod selected - Load button disabled')
+        if mod and mod != self.create_mod_combo.currentText():
+            self.create_mod_combo.blockSignals(True)
+            self.create_mod_combo.setCurrentText(mod)
+            self.create_mod_combo.blockSignals(False)
+        self.update_create_atlas_status()
+
+    def load_atlas_from_project(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Load Atlas from Project')
+        print(Fore.CYAN + f"{'=' * 60}")
+        bg3_data = self.bg3_edit.text().strip()
+        mod = self.mod_combo.currentText()
+        if not mod:
+            print(Fore.RED + f'[ERROR] No mod selected')
+            print(Fore.RED + f'[POPUP] Showing error: Please select a mod from the dropdown first.')
+            QMessageBox.warning(self, 'Error', 'Please select a mod from the dropdown first.')
+            return
+        if not bg3_data or not os.path.exists(bg3_data):
+            print(Fore.RED + f'[ERROR] Invalid BG3 Data path: {bg3_data}')
+            print(Fore.RED + f'[POPUP] Showing error: Invalid BG3 Data path.')
+            QMessageBox.warning(self, 'Error', 'Invalid BG3 Data path. Please set it in preferences.')
+            return
+        print(Fore.GREEN + f'[DEBUG] Selected mod: {mod}')
+        print(Fore.GREEN + f'[DEBUG] BG3 Data path: {bg3_data}')
+        scan_paths = [os.path.join(bg3_data, 'Mods', mod, 'GUI'), os.path.join(bg3_data, 'Public', mod, 'GUI')]
+        found_lsx_files = []
+        for scan_path in scan_paths:
+            print(Fore.CYAN + f'[SCAN] Searching for .lsx files in: {scan_path}')
+            if os.path.exists(scan_path):
+                for file in os.listdir(scan_path):
+                    if file.endswith('.lsx'):
+                        full_path = os.path.join(scan_path, file)
+                        found_lsx_files.append(full_path)
+                        print(Fore.GREEN + f'✓ Found .lsx file: {full_path}')
+        if not found_lsx_files:
+            print(Fore.RED + f'[ERROR] No .lsx files found in mod GUI folders')
+            error_msg = f'No .lsx files found in:\n{scan_paths[0]}\n{scan_paths[1]}\n\nPlease ensure your mod has atlas files in the GUI folder.'
+            print(Fore.RED + f'[POPUP] Showing error: {error_msg}')
+            QMessageBox.warning(self, 'No Atlas Files Found', error_msg)
+            return
+        lsx_path = None
+        if len(found_lsx_files) == 1:
+            lsx_path = found_lsx_files[0]
+            print(Fore.GREEN + f'✓ Auto-selected single .lsx file: {lsx_path}')
+        else:
+            print(Fore.CYAN + f'[USER] Multiple .lsx files found ({len(found_lsx_files)}), prompting user to choose...')
+            file_names = [os.path.basename(f) for f in found_lsx_files]
+            print(Fore.GREEN + f'[POPUP] Showing selection dialog with options: {file_names}')
+            chosen_file, ok = QInputDialog.getItem(self, 'Select Atlas File', f'Found {len(found_lsx_files)} atlas files. Choose one:', file_names, 0, False)
+            if ok and chosen_file:
+                lsx_path = found_lsx_files[file_names.index(chosen_file)]
+                print(Fore.GREEN + f'✓ User selected: {lsx_path}')
+            else:
+                print(Fore.YELLOW + f'[WARNING] User cancelled .lsx selection')
+                return
+        self.project_lsx_edit.setText(lsx_path)
+        if self.activate_cached_atlas(lsx_path):
+            self.btn_load_project_atlas.setText('Reload Atlas')
+            return
+        print(Fore.CYAN + f'[OPERATION] Parsing LSX file in mod project mode...')
+        entry = load_atlas_entry(lsx_path, bg3_data, 'mod_project')
+        if entry is None:
+            print(Fore.RED + f'[ERROR] Failed to parse LSX file')
+            self.atlas_status_label.setText('Failed to load atlas')
+            self.atlas_status_label.setStyleSheet('QLabel { color: #ff4444; font-style: italic; }')
+            return
+        if entry['atlas_path'] is None or not os.path.exists(entry['atlas_path']):
+            print(Fore.YELLOW + f"[WARNING] DDS not found at resolved path: {entry['atlas_path']}")
+            print(Fore.YELLOW + f'[POPUP] Prompting user: Could not find DDS. Browse manually?')
+            reply = QMessageBox.question(self, 'DDS Not Found', f"Could not find DDS at {entry['atlas_path']}.\n\nBrowse manually?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                print(Fore.CYAN + f'[USER] User chose to browse for DDS manually')
+                default_dir = self.get_default_file_dialog_path()
+                print(Fore.GREEN + f"[DEBUG] Default browse path: {(default_dir if default_dir else '(current directory)')}")
+                dds_path = QFileDialog.getOpenFileName(self, 'Select DDS', default_dir, '*.dds')[0]
+                if dds_path:
+                    entry['atlas_path'] = dds_path
+                    print(Fore.GREEN + f"✓ User selected DDS: {entry['atlas_path']}")
+                else:
+                    print(Fore.RED + f'[ERROR] User cancelled DDS selection')
+                    print(Fore.RED + f'[POPUP] Showing error: DDS path required.')
+                    QMessageBox.warning(self, 'Error', 'DDS path required.')
+                    return
+            else:
+                print(Fore.RED + f'[ERROR] User declined to browse for DDS')
+                print(Fore.RED + f'[POPUP] Showing error: Cannot load atlas without DDS.')
+                QMessageBox.warning(self, 'Error', 'Cannot load atlas without DDS.')
+                return
+        if not self.finish_atlas_load(entry):
+            return
+        self.btn_load_project_atlas.setText('Reload Atlas')
+        print(Fore.GREEN + f"\n{'=' * 60}")
+        print(Fore.GREEN + f'ATLAS LOADED SUCCESSFULLY FROM PROJECT')
+        print(Fore.GREEN + f"{'=' * 60}\n")
+
+    def activate_cached_atlas(self, lsx_path, dds_path=None):
+        key = atlas_workspace_key(lsx_path)
+        if key == self.current_atlas_key and self.atlas_im is not None:
+            if self.dom_modified or self.image_modified:
+                print(Fore.YELLOW + f'[CACHE] Reloading current atlas from disk - discarding unsaved changes')
+                if self.journal is not None:
+                    self.journal.clear()
+                self.atlas_cache.pop(key)
+                self.current_atlas_key = None
+            else:
+                self.stash_current_atlas()
+        entry = self.atlas_cache.get(key, validate=lambda e: atlas_entry_is_current(e) and (dds_path is None or os.path.normcase(os.path.abspath(dds_path)) == os.path.normcase(os.path.abspath(e['atlas_path']))))
+        if entry is None:
+            print(Fore.CYAN + f'[CACHE] Miss: {os.path.basename(lsx_path)} - decoding from disk')
+            self.statusBar().showMessage(f'Cache miss: {os.path.basename(lsx_path)} | {self.atlas_cache.describe()}')
+            return False
+        print(Fore.GREEN + f'[CACHE] Hit: {os.path.basename(lsx_path)} - reusing decoded atlas')
+        self.open_atlas_entry(entry, cache_hit=True)
+        return True
+
+    def finish_atlas_load(self, entry):
+        grid_size = entry['atlas_size'] // entry['tile_size']
+        print(Fore.GREEN + f'[DEBUG] Calculated grid size: {grid_size}x{grid_size}')
+        if entry['atlas_size'] % entry['tile_size'] != 0:
+            print(Fore.RED + f"[ERROR] Atlas size not divisible by tile size: {entry['atlas_size']} % {entry['tile_size']} != 0")
+            error_msg = f"Invalid atlas: atlas_size {entry['atlas_size']} not divisible by tile_size {entry['tile_size']}."
+            print(Fore.RED + f'[POPUP] Showing error: {error_msg}')
+            QMessageBox.warning(self, 'Error', error_msg)
+            return False
+        decode_atlas_entry(entry)
+        self.open_atlas_entry(entry, cache_hit=False)
+        return True
+
+    def stash_current_atlas(self):
+        key = self.current_atlas_key
+        if key is None:
+            return
+        entry = self.atlas_cache.peek(key)
+        if entry is None:
+            return
+        entry.update({'dom': self.dom, 'icons': self.icons, 'atlas_im': self.atlas_im, 'atlas_path': self.atlas_path, 'atlas_size': self.atlas_size, 'tile_size': self.tile_size, 'dom_modified': self.dom_modified, 'image_modified': self.image_modified, 'tile_digests': self.tile_digests})
+        if self.dom_modified or self.image_modified:
+            self.atlas_cache.pin(key)
+            self.atlas_cache.resize(key)
+        else:
+            self.atlas_cache.resize(key)
+            self.atlas_cache.unpin(key)
+
+    def open_atlas_entry(self, entry, cache_hit=False):
+        key = entry['key']
+        if key != self.current_atlas_key:
+            self.stash_current_atlas()
+        self.atlas_cache.put(key, entry, pin=True)
+        self.current_atlas_key = key
+        self.workspace[key] = {'lsx_path': entry['lsx_path'], 'atlas_path': entry['atlas_path'], 'mode': entry['mode'], 'game_dir': entry['game_dir']}
+        self.dom = entry['dom']
+        self.icons = entry['icons']
+        self.atlas_im = entry['atlas_im']
+        self.atlas_path = entry['atlas_path']
+        self.atlas_size = entry['atlas_size']
+        self.tile_size = entry['tile_size']
+        self.grid_size = self.atlas_size // self.tile_size
+        self.dom_modified = entry['dom_modified']
+        self.image_modified = entry['image_modified']
+        self.tile_digests = entry.setdefault('tile_digests', load_tile_digests(entry['atlas_path'], entry['tile_size']))
+        self.slot_index = None
+        self.slot_mapkeys = None
+        self.journal = entry.setdefault('journal', EditJournal(int(self.prefs.get('undo_budget_mb', 64)) * 1024 * 1024))
+        self.update_undo_actions()
+        if entry['mode'] == 'standalone':
+            self.standalone_lsx_edit.setText(entry['lsx_path'])
+            self.standalone_dds_edit.setText(entry['atlas_path'])
+            if not self.mode_standalone.isChecked():
+                self.mode_standalone.setChecked(True)
+        else:
+            self.project_lsx_edit.setText(entry['lsx_path'])
+            if not self.mode_project.isChecked():
+                self.mode_project.setChecked(True)
+        print(Fore.CYAN + f'[OPERATION] Updating preview...')
+        self.update_preview()
+        print(Fore.CYAN + f'[OPERATION] Populating icon browser...')
+        self.populate_icon_browser()
+        print(Fore.GREEN + f'✓ Icon browser shows {self.icon_model.rowCount()} icons')
+        self.refresh_workspace_combo()
+        atlas_name = os.path.basename(entry['lsx_path'])
+        self.atlas_status_label.setText(f'Loaded: {atlas_name}')
+        self.atlas_status_label.setStyleSheet('QLabel { color: #44ff44; font-weight: bold; }')
+        print(Fore.GREEN + f'✓ Status updated: {atlas_name}')
+        source = 'Cache hit' if cache_hit else 'Decoded'
+        self.statusBar().showMessage(f'{source}: {atlas_name} | {self.atlas_cache.describe()}')
+        print(Fore.GREEN + f'[CACHE] {self.atlas_cache.describe()}')
+
+    def populate_icon_browser(self):
+        current = self.selected_mapkey()
+        self.icon_model.set_atlas(self.icons, self.atlas_im, self.atlas_size, self.tile_size)
+        self.search_index = None
+        if self.icon_filter_edit.text().strip():
+            self.search_mapkeys(self.icon_filter_edit.text())
+        if current:
+            self.select_mapkey(current)
+
+    def get_search_index(self):
+        if self.search_index is None:
+            start = time.perf_counter()
+            self.search_index = MapKeySearchIndex((icon['mapkey'] for icon in self.icons))
+            print(Fore.GREEN + f'[SEARCH] Indexed {len(self.search_index)} MapKeys in {(time.perf_counter() - start) * 1000:.1f} ms')
+        return self.search_index
+
+    def index_mapkey(self, mapkey, added):
+        if self.search_index is not None:
+            if added:
+                self.search_index.add(mapkey)
+            else:
+                self.search_index.remove(mapkey)
+        if self.icon_filter_edit.text().strip():
+            self.search_mapkeys(self.icon_filter_edit.text())
+
+    def schedule_search(self, text):
+        self.search_limit = MAPKEY_SEARCH_PAGE
+        self.search_timer.start()
+
+    def search_mapkeys(self, text):
+        self.search_timer.stop()
+        matches = None
+        if text.strip() and self.icons:
+            start = time.perf_counter()
+            matches = self.get_search_index().search(text, self.search_limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            more = ', scroll for more' if len(matches) >= self.search_limit else ''
+            self.statusBar().showMessage(f'{len(matches)} MapKey(s) match "{text.strip()}" ({elapsed:.2f} ms{more})')
+        self.search_matches = matches
+        self.icon_model.set_filter(matches)
+        if self.preview_label is not None:
+            self.preview_label.set_highlighted(matches)
+        if matches:
+            self.icon_list.setCurrentIndex(self.icon_model.index(0, 0))
+
+    def load_more_search_results(self, value):
+        matches = self.search_matches
+        if matches is None or len(matches) < self.search_limit or self.search_timer.isActive():
+            return
+        if value < self.icon_list.verticalScrollBar().maximum():
+            return
+        self.search_limit += MAPKEY_SEARCH_PAGE
+        more = self.get_search_index().search(self.icon_filter_edit.text(), self.search_limit)[len(matches):]
+        self.search_matches = matches + more
+        self.icon_model.extend_filter(more)
+        if self.preview_label is not None:
+            self.preview_label.set_highlighted(self.search_matches)
+
+    def selected_mapkey(self):
+        index = self.icon_list.currentIndex()
+        return index.data(IconListModel.MapKeyRole) if index.isValid() else ''
+
+    def selected_mapkeys(self):
+        return sorted((index.data(IconListModel.MapKeyRole) for index in self.icon_list.selectionModel().selectedIndexes()))
+
+    def select_mapkey(self, mapkey):
+        if self.icon_model.source_row(mapkey) < 0:
+            return False
+        if self.icon_model.row_of(mapkey) < 0:
+            self.icon_filter_edit.clear()
+            self.search_mapkeys('')
+        row = self.icon_model.row_of(mapkey)
+        if row < 0:
+            return False
+        index = self.icon_model.index(row, 0)
+        self.icon_list.setCurrentIndex(index)
+        self.icon_list.scrollTo(index)
+        return True
+
+    def update_undo_actions(self):
+        can_undo = self.journal is not None and bool(self.journal.undo_stack)
+        can_redo = self.journal is not None and bool(self.journal.redo_stack)
+        self.undo_action.setEnabled(can_undo)
+        self.redo_action.setEnabled(can_redo)
+        self.undo_action.setToolTip(f"Undo {self.journal.undo_stack[-1]['label']} (Ctrl+Z)" if can_undo else 'Nothing to undo')
+        self.redo_action.setToolTip(f"Redo {self.journal.redo_stack[-1]['label']} (Ctrl+Y)" if can_redo else 'Nothing to redo')
+
+    def undo_edit(self):
+        self.step_journal(undo=True)
+
+    def redo_edit(self):
+        self.step_journal(undo=False)
+
+    def step_journal(self, undo):
+        if self.journal is None or self.atlas_im is None:
+            return
+        edit, self.atlas_im, state = self.journal.undo(self.atlas_im) if undo else self.journal.redo(self.atlas_im)
+        if edit is None:
+            self.statusBar().showMessage('Nothing to undo' if undo else 'Nothing to redo')
+            return
+        if state:
+            self.atlas_size = state['atlas_size']
+            self.grid_size = self.atlas_size // self.tile_size
+        self.icons = icons_from_dom(self.dom)
+        if edit['image'] is not None:
+            self.tile_digests = {}
+        for box in edit['tiles']:
+            self.tile_digests.pop((box[0] // self.tile_size, box[1] // self.tile_size), None)
+        self.slot_index = None
+        self.slot_mapkeys = None
+        self.dom_modified = self.image_modified = not self.journal.is_clean()
+        self.populate_icon_browser()
+        self.refresh_workspace_combo()
+        self.update_preview()
+        self.update_undo_actions()
+        action = 'Undid' if undo else 'Redid'
+        print(Fore.CYAN + f"[UNDO] {action} {edit['label']} ({self.journal.describe()})")
+        self.statusBar().showMessage(f"{action} {edit['label']} | {self.journal.describe()}")
+
+    def refresh_workspace_combo(self):
+        self.workspace_combo.blockSignals(True)
+        self.workspace_combo.clear()
+        for key, meta in self.workspace.items():
+            label = os.path.basename(meta['lsx_path'])
+            if key == self.current_atlas_key and (self.dom_modified or self.image_modified):
+                label += ' *'
+            elif key != self.current_atlas_key:
+                cached = self.atlas_cache.peek(key)
+                if cached and (cached['dom_modified'] or cached['image_modified']):
+                    label += ' *'
+            self.workspace_combo.addItem(label, key)
+            self.workspace_combo.setItemData(self.workspace_combo.count() - 1, meta['lsx_path'], Qt.ItemDataRole.ToolTipRole)
+        index = self.workspace_combo.findData(self.current_atlas_key)
+        if index >= 0:
+            self.workspace_combo.setCurrentIndex(index)
+        self.workspace_combo.blockSignals(False)
+
+    def on_workspace_atlas_changed(self, index):
+        key = self.workspace_combo.itemData(index)
+        if key is None or key == self.current_atlas_key:
+            return
+        meta = self.workspace[key]
+        print(Fore.CYAN + f"\n[USER] Switching workspace atlas: {os.path.basename(meta['lsx_path'])}")
+        self.stash_current_atlas()
+        entry = self.atlas_cache.get(key, validate=atlas_entry_is_current)
+        if entry is not None:
+            print(Fore.GREEN + f"[CACHE] Hit: {os.path.basename(meta['lsx_path'])}")
+            self.open_atlas_entry(entry, cache_hit=True)
+            return
+        print(Fore.CYAN + f"[CACHE] Miss: {os.path.basename(meta['lsx_path'])} - reloading from disk")
+        entry = load_atlas_entry(meta['lsx_path'], meta['game_dir'], meta['mode'], meta['atlas_path'])
+        if entry is None or not entry['atlas_path'] or not os.path.exists(entry['atlas_path']):
+            print(Fore.RED + f"[ERROR] Could not reload {meta['lsx_path']}")
+            QMessageBox.warning(self, 'Error', f"Could not reload atlas:\n{meta['lsx_path']}")
+            del self.workspace[key]
+            self.refresh_workspace_combo()
+            return
+        self.finish_atlas_load(entry)
+
+    def close_workspace_atlas(self):
+        key = self.current_atlas_key
+        if key is None:
+            return
+        if self.dom_modified or self.image_modified:
+            reply = QMessageBox.question(self, 'Discard Changes?', f"'{os.path.basename(self.workspace[key]['lsx_path'])}' has unsaved changes.\n\nClose it anyway?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        print(Fore.CYAN + f"[WORKSPACE] Closing {self.workspace[key]['lsx_path']}")
+        if self.journal is not None:
+            self.journal.clear()
+            self.journal = None
+        self.atlas_cache.pop(key)
+        del self.workspace[key]
+        self.current_atlas_key = None
+        self.dom = None
+        self.icons = []
+        self.atlas_im = None
+        self.atlas_path = None
+        self.tile_digests = {}
+        self.slot_index = None
+        self.slot_mapkeys = None
+        self.dom_modified = False
+        self.image_modified = False
+        self.icon_model.set_atlas([], None, None, None)
+        self.update_undo_actions()
+        if self.workspace:
+            next_key = next(reversed(self.workspace))
+            self.refresh_workspace_combo()
+            self.on_workspace_atlas_changed(self.workspace_combo.findData(next_key))
+            return
+        self.refresh_workspace_combo()
+        self.atlas_status_label.setText('No Atlas Loaded')
+        self.atlas_status_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
+        central_layout = self.centralWidget().layout()
+        if central_layout.count() > 1 and central_layout.itemAt(1).widget():
+            old_preview = central_layout.itemAt(1).widget()
+            central_layout.removeWidget(old_preview)
+            old_preview.deleteLater()
+        self.preview_label = None
+        self.preview_placeholder = QLabel('Load an atlas to see preview')
+        self.preview_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        central_layout.addWidget(self.preview_placeholder)
+        self.statusBar().showMessage(self.atlas_cache.describe())
+
+    def get_mapkey_index(self, mod=None):
+        bg3_data = self.bg3_edit.text().strip()
+        mod = mod or self.mod_combo.currentText()
+        key = (bg3_data, mod)
+        index = self.mapkey_indexes.get(key)
+        if index is None:
+            index = mod_mapkey_index(bg3_data, mod)
+            self.mapkey_indexes[key] = index
+        else:
+            index.update()
+        return index
+
+    def show_mapkey_locations(self, mapkey):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'CONTEXT MENU: Find MapKey in Mod')
+        print(Fore.CYAN + f"{'=' * 60}")
+        mod = self.mod_combo.currentText()
+        if not mod:
+            QMessageBox.warning(self, 'Error', 'Please select a mod from the dropdown first.')
+            return
+        paths = self.get_mapkey_index(mod).where(mapkey)
+        print(Fore.GREEN + f"[INDEX] '{mapkey}' found in {len(paths)} atlas(es)")
+        text = '\n'.join(paths) if paths else 'Not found in any saved atlas of this mod.'
+        QMessageBox.information(self, f'MapKey: {mapkey}', f"'{mapkey}' is defined in:\n\n{text}")
+
+    def show_mapkey_collisions(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Show MapKey Collisions')
+        print(Fore.CYAN + f"{'=' * 60}")
+        mod = self.mod_combo.currentText()
+        if not mod:
+            QMessageBox.warning(self, 'Error', 'Please select a mod from the dropdown first.')
+            return
+        collisions = self.get_mapkey_index(mod).colliding_keys()
+        if not collisions:
+            print(Fore.GREEN + f'✓ No MapKey collisions in {mod}')
+            QMessageBox.information(self, 'MapKey Collisions', f'No MapKey collisions found in {mod}.')
+            return
+        lines = []
+        for mapkey, paths in collisions.items():
+            where = ', '.join([f'{os.path.basename(path)} x{count}' if count > 1 else os.path.basename(path) for path, count in paths.items()])
+            print(Fore.YELLOW + f"[COLLISION] '{mapkey}': {where}")
+            lines.append(f'{mapkey}: {where}')
+        more = f'\n... and {len(lines) - 40} more (see console)' if len(lines) > 40 else ''
+        QMessageBox.warning(self, 'MapKey Collisions', f'{len(collisions)} MapKey(s) are defined more than once in {mod}:\n\n' + '\n'.join(lines[:40]) + more)
+
+    def get_default_file_dialog_path(self):
+        if self.mode == 'mod_project':
+            bg3_data = self.bg3_edit.text().strip()
+            mod = self.mod_combo.currentText()
+            if mod and bg3_data and os.path.exists(bg3_data):
+                public_path = os.path.join(bg3_data, 'Public', mod)
+                if os.path.exists(public_path):
+                    return public_path
+                mods_path = os.path.join(bg3_data, 'Mods', mod)
+                if os.path.exists(mods_path):
+                    return mods_path
+        return ''
+
+    def browse_path(self, edit, title, filter='*'):
+        default_path = self.get_default_file_dialog_path()
+        if 'Directory' in title:
+            path = QFileDialog.getExistingDirectory(self, title, default_path)
+        else:
+            path = QFileDialog.getOpenFileName(self, title, default_path, filter)[0]
+        if path:
+            edit.setText(path)
+
+    def browse_texconv(self):
+        default_path = self.get_default_file_dialog_path()
+        file_path, _ = QFileDialog.getOpenFileName(self, 'Select texconv.exe', default_path, 'Executable Files (*.exe);;All Files (*.*)')
+        if file_path:
+            self.texconv_path_edit.setText(file_path)
+            self.update_texconv_status()
+
+    def download_texconv_clicked(self):
+        print(Fore.CYAN + '\n[USER ACTION] Download Texconv')
+        reply = QMessageBox.question(self, 'Download Texconv', 'Download texconv.exe from Microsoft DirectXTex (official source)?\n\nWill be saved to: script_dir/texconv/texconv.exe\nSize: ~2-3 MB', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.No:
+            print(Fore.YELLOW + '[CANCELLED] User cancelled download')
+            return
+        script_dir = os.path.dirname(__file__)
+        dest_dir = os.path.join(script_dir, 'texconv')
+        print(Fore.CYAN + f'[OPERATION] Downloading texconv to: {dest_dir}')
+        texconv_path = download_texconv(dest_dir)
+        if texconv_path:
+            set_texconv_path(texconv_path)
+            self.texconv_path_edit.setText(texconv_path)
+            self.update_texconv_status()
+            QMessageBox.information(self, 'Success', f'Texconv downloaded successfully!\n\nPath: {texconv_path}\n\nYou can now use DDS conversion features.')
+        else:
+            QMessageBox.warning(self, 'Download Failed', 'Failed to download texconv.exe\n\nYou can manually download from:\nhttps://github.com/microsoft/DirectXTex/releases\n\nExtract texconv.exe and select it using the Browse button.')
+
+    def update_texconv_status(self):
+        custom_path = self.texconv_path_edit.text().strip()
+        texconv_path = set_texconv_path(find_texconv(custom_path if custom_path else None))
+        if texconv_path:
+            self.texconv_status_label.setText(f'✓ Found: {texconv_path}')
+            self.texconv_status_label.setStyleSheet('QLabel { color: #66ff66; font-weight: bold; }')
+            self.btn_download_texconv.setText('Re-download Texconv')
+        else:
+            self.texconv_status_label.setText("✗ Not found - Click 'Download Texconv' to install")
+            self.texconv_status_label.setStyleSheet('QLabel { color: #ff6666; font-weight: bold; }')
+            self.btn_download_texconv.setText('Download Texconv')
+
+    @profiled('load_atlas')
+    def load_atlas(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Load Atlas')
+        print(Fore.CYAN + f"{'=' * 60}")
+        bg3_data = self.bg3_edit.text().strip()
+        print(Fore.GREEN + f'[DEBUG] BG3 Data path: {bg3_data}')
+        print(Fore.GREEN + f'[DEBUG] Current mode: {self.mode}')
+        if self.mode == 'standalone':
+            print(Fore.CYAN + f'[MODE] Standalone mode selected')
+            lsx_path = self.standalone_lsx_edit.text()
+            print(Fore.GREEN + f'[DEBUG] LSX path from input: {lsx_path}')
+            if not lsx_path or not os.path.exists(lsx_path):
+                print(Fore.RED + f'[ERROR] Invalid standalone .lsx path: {lsx_path}')
+                print(Fore.RED + f'[POPUP] Showing error: Invalid standalone .lsx path.')
+                QMessageBox.warning(self, 'Error', 'Invalid standalone .lsx path.')
+                return
+            dds_path = self.standalone_dds_edit.text()
+            print(Fore.GREEN + f'[DEBUG] DDS path from input: {dds_path}')
+            if not dds_path or not os.path.exists(dds_path):
+                print(Fore.RED + f'[ERROR] Invalid standalone DDS path: {dds_path}')
+                print(Fore.RED + f'[POPUP] Showing error: Invalid standalone DDS path.')
+                QMessageBox.warning(self, 'Error', 'Invalid standalone DDS path.')
+                return
+            if self.activate_cached_atlas(lsx_path, dds_path):
+                return
+            print(Fore.CYAN + f'[OPERATION] Parsing LSX file...')
+            entry = load_atlas_entry(lsx_path, None, 'standalone', dds_path)
+            if entry is None:
+                print(Fore.RED + f'[ERROR] Failed to parse LSX file')
+                return
+            print(Fore.GREEN + f"[DEBUG] Using manual DDS path: {entry['atlas_path']}")
+        else:
+            print(Fore.CYAN + f'[MODE] Mod project mode selected')
+            lsx_path = self.project_lsx_edit.text()
+            print(Fore.GREEN + f'[DEBUG] Project LSX path from input: {lsx_path}')
+            if not lsx_path or not os.path.isfile(lsx_path):
+                if lsx_path:
+                    print(Fore.YELLOW + f'[WARNING] LSX path does not exist or is not a file: {lsx_path}')
+                else:
+                    print(Fore.YELLOW + f'[WARNING] No LSX path provided')
+                print(Fore.YELLOW + f'[WARNING] Attempting to scan for .lsx files...')
+                mod = self.mod_combo.currentText()
+                if mod and bg3_data:
+                    scan_paths = [os.path.join(bg3_data, 'Mods', mod, 'GUI'), os.path.join(bg3_data, 'Public', mod, 'GUI')]
+                    found_lsx_files = []
+                    for scan_path in scan_paths:
+                        print(Fore.GREEN + f'[DEBUG] Scanning for .lsx files in: {scan_path}')
+                        if os.path.exists(scan_path):
+                            for file in os.listdir(scan_path):
+                                if file.endswith('.lsx'):
+                                    full_path = os.path.join(scan_path, file)
+                                    found_lsx_files.append(full_path)
+                                    print(Fore.GREEN + f'✓ Found .lsx file: {full_path}')
+                    if not found_lsx_files:
+                        print(Fore.RED + f'[ERROR] No .lsx files found in mod GUI folders')
+                        print(Fore.RED + f'[POPUP] Showing error: No .lsx files found in mod GUI folders. Please select manually.')
+                        QMessageBox.warning(self, 'Error', 'No .lsx files found in mod GUI folders. Please select manually.')
+                        return
+                    elif len(found_lsx_files) == 1:
+                        lsx_path = found_lsx_files[0]
+                        print(Fore.GREEN + f'✓ Auto-selected single .lsx file: {lsx_path}')
+                        self.project_lsx_edit.setText(lsx_path)
+                    else:
+                        print(Fore.CYAN + f'[USER] Multiple .lsx files found, prompting user to choose...')
+                        file_names = [os.path.basename(f) for f in found_lsx_files]
+                        chosen_file, ok = QInputDialog.getItem(self, 'Select LSX File', f'Found {len(found_lsx_files)} .lsx files. Choose one:', file_names, 0, False)
+                        if ok and chosen_file:
+                            lsx_path = found_lsx_files[file_names.index(chosen_file)]
+                            print(Fore.GREEN + f'✓ User selected: {lsx_path}')
+                            self.project_lsx_edit.setText(lsx_path)
+                        else:
+                            print(Fore.YELLOW + f'[WARNING] User cancelled LSX selection')
+                            return
+                else:
+                    print(Fore.RED + f'[ERROR] Invalid project .lsx path and cannot auto-scan without mod selection')
+                    print(Fore.RED + f'[POPUP] Showing error: Invalid project .lsx path.')
+                    QMessageBox.warning(self, 'Error', 'Invalid project .lsx path.')
+                    return
+            if self.activate_cached_atlas(lsx_path):
+                return
+            print(Fore.CYAN + f'[OPERATION] Parsing LSX file in mod project mode...')
+            entry = load_atlas_entry(lsx_path, bg3_data, 'mod_project')
+            if entry is None:
+                print(Fore.RED + f'[ERROR] Failed to parse LSX file')
+                return
+            if entry['atlas_path'] is None or not os.path.exists(entry['atlas_path']):
+                print(Fore.YELLOW + f"[WARNING] DDS not found at resolved path: {entry['atlas_path']}")
+                print(Fore.YELLOW + f"[POPUP] Prompting user: Could not find DDS at {entry['atlas_path']}. Browse manually?")
+                reply = QMessageBox.question(self, 'DDS Not Found', f"Could not find DDS at {entry['atlas_path']}. Browse manually?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+                if reply == QMessageBox.StandardButton.Yes:
+                    print(Fore.CYAN + f'[USER] User chose to browse for DDS manually')
+                    default_path = self.get_default_file_dialog_path()
+                    print(Fore.GREEN + f"[DEBUG] Default browse path: {(default_path if default_path else '(current directory)')}")
+                    dds_path = QFileDialog.getOpenFileName(self, 'Select DDS', default_path, '*.dds')[0]
+                    if dds_path:
+                        entry['atlas_path'] = dds_path
+                        print(Fore.GREEN + f"✓ User selected DDS: {entry['atlas_path']}")
+                    else:
+                        print(Fore.RED + f'[ERROR] User cancelled DDS selection')
+                        print(Fore.RED + f'[POPUP] Showing error: DDS path required.')
+                        QMessageBox.warning(self, 'Error', 'DDS path required.')
+                        return
+                else:
+                    print(Fore.RED + f'[ERROR] User declined to browse for DDS')
+                    print(Fore.RED + f'[POPUP] Showing error: Cannot load atlas without DDS.')
+                    QMessageBox.warning(self, 'Error', 'Cannot load atlas without DDS.')
+                    return
+        if not self.finish_atlas_load(entry):
+            return
+        print(Fore.GREEN + f"\n{'=' * 60}")
+        print(Fore.GREEN + f'ATLAS LOADED SUCCESSFULLY')
+        print(Fore.GREEN + f"{'=' * 60}\n")
+
+    def update_preview(self):
+        if self.atlas_im:
+            self.preview_label = InteractivePreviewLabel(self.icons, min(self.preview_size, self.atlas_size), self.atlas_size, self.tile_size, self)
+            self.preview_label.setFixedSize(min(self.preview_size, self.atlas_size), min(self.preview_size, self.atlas_size))
+            self.preview_label.set_highlighted(self.search_matches)
+            preview = resize_with_alpha(self.atlas_im, (min(self.preview_size, self.atlas_size), min(self.preview_size, self.atlas_size)), Image.BICUBIC)
+            qim = self.pil_to_qimage(preview)
+            pix = QPixmap.fromImage(qim)
+            self.preview_label.setPixmap(pix)
+            central_layout = self.centralWidget().layout()
+            if central_layout.itemAt(1).widget() != self.preview_label:
+                if central_layout.itemAt(1).widget():
+                    central_layout.itemAt(1).widget().deleteLater()
+                central_layout.addWidget(self.preview_label)
+
+    def update_preview_size(self):
+        self.preview_size = 512 if self.preview_combo.currentText() == '512x512' else self.atlas_size if self.atlas_size else 1024
+        self.update_preview()
+
+    def pil_to_qimage(self, pil_im):
+        pil_im = pil_im.convert('RGBA')
+        data = pil_im.tobytes('raw', 'RGBA')
+        qim = QImage(data, pil_im.size[0], pil_im.size[1], QImage.Format.Format_RGBA8888)
+        return qim
+
+    def replace_icon(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Replace Icon')
+        print(Fore.CYAN + f"{'=' * 60}")
+        if not self.atlas_im:
+            print(Fore.RED + f'[ERROR] No atlas loaded')
+            print(Fore.RED + f"[POPUP] Showing error: {self.strings['error_load']}")
+            QMessageBox.warning(self, 'Error', self.strings['error_load'])
+            return
+        selected_key = self.selected_mapkey()
+        print(Fore.GREEN + f'[DEBUG] Selected icon: {selected_key}')
+        if not selected_key:
+            print(Fore.YELLOW + f'[WARNING] No icon selected')
+            return
+        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
+        default_path = self.get_default_file_dialog_path()
+        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
+        png_path = QFileDialog.getOpenFileName(self, self.strings['select_png_replace'], default_path, 'PNG (*.png)')[0]
+        if not png_path:
+            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
+            return
+        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
+        print(Fore.GREEN + f'[DEBUG] PNG file exists: {os.path.exists(png_path)}')
+        for icon in self.icons:
+            if icon['mapkey'] == selected_key:
+                print(Fore.CYAN + f"[OPERATION] Replacing icon '{selected_key}'")
+                print(Fore.GREEN + f"[DEBUG] Icon UV: u1={icon['u1']:.3f}, v1={icon['v1']:.3f}, u2={icon['u2']:.3f}, v2={icon['v2']:.3f}")
+                col, row = get_grid_slot(icon['u1'], icon['v1'], self.grid_size)
+                print(Fore.GREEN + f'[DEBUG] Grid position: col={col}, row={row}')
+                x = col * self.tile_size
+                y = row * self.tile_size
+                print(Fore.GREEN + f'[DEBUG] Pixel position: x={x}, y={y}')
+                print(Fore.GREEN + f'[DEBUG] Loading and resizing new icon to {self.tile_size}x{self.tile_size}...')
+                tile = render_icon_tile(png_path, self.tile_size)
+                placement = self.get_slot_index().assign(selected_key, tile_digest(tile))
+                if placement is None:
+                    print(Fore.RED + f'[ERROR] Slot is shared with other MapKeys and no free slot is left to split it off')
+                    QMessageBox.warning(self, 'Error', self.strings['error_no_slots'])
+                    return
+                self.journal.begin(f"replace '{selected_key}'")
+                if placement['freed'] is not None:
+                    fx, fy = (placement['freed'][0] * self.tile_size, placement['freed'][1] * self.tile_size)
+                    self.journal.capture_tile(self.atlas_im, (fx, fy, fx + self.tile_size, fy + self.tile_size))
+                    self.atlas_im.paste((0, 0, 0, 0), (fx, fy, fx + self.tile_size, fy + self.tile_size))
+                if placement['paste']:
+                    x, y = (placement['slot'][0] * self.tile_size, placement['slot'][1] * self.tile_size)
+                    self.journal.capture_tile(self.atlas_im, (x, y, x + self.tile_size, y + self.tile_size))
+                    print(Fore.GREEN + f'[DEBUG] Pasting new icon into atlas...')
+                    self.atlas_im.paste(tile, (x, y))
+                if placement['slot'] != (col, row):
+                    node = find_icon_uv_node(self.dom, selected_key)
+                    self.journal.capture_attributes([attr for attr in node.getElementsByTagName('attribute') if attr.getAttribute('id') in ('U1', 'U2', 'V1', 'V2')])
+                    icon.update(set_icon_uv_slot(node, placement['slot'], self.grid_size))
+                    self.slot_mapkeys = None
+                    self.dom_modified = True
+                    print(Fore.GREEN + f"[DEDUPE] '{selected_key}' moved from slot ({col}, {row}) to {placement['slot']}" + (' (identical pixels already there)' if placement['shared'] else ' so icons sharing its old slot keep their pixels'))
+                self.journal.commit(self.atlas_im)
+                self.update_undo_actions()
+                self.image_modified = True
+                self.icon_model.refresh_icon(selected_key)
+                self.refresh_workspace_combo()
+                print(Fore.CYAN + f'[OPERATION] Updating preview...')
+                self.update_preview()
+                print(Fore.GREEN + f"✓ Successfully replaced icon '{selected_key}'")
+                success_msg = self.strings['success_replace'].format(key=selected_key)
+                print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
+                QMessageBox.information(self, 'Success', success_msg)
+                return
+
+    def get_slot_index(self):
+        if self.slot_index is None:
+            self.slot_index = TileSlotIndex.from_atlas(self.atlas_im, self.icons, self.grid_size, self.tile_size, known=self.tile_digests)
+            self.tile_digests = self.slot_index.digests
+        return self.slot_index
+
+    def add_icon(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Add New Icon')
+        print(Fore.CYAN + f"{'=' * 60}")
+        if not self.atlas_im:
+            print(Fore.RED + f'[ERROR] No atlas loaded')
+            print(Fore.RED + f"[POPUP] Showing error: {self.strings['error_load']}")
+            QMessageBox.warning(self, 'Error', self.strings['error_load'])
+            return
+        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
+        default_path = self.get_default_file_dialog_path()
+        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
+        png_path = QFileDialog.getOpenFileName(self, self.strings['select_png_add'], default_path, 'PNG (*.png)')[0]
+        if not png_path:
+            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
+            return
+        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
+        mapkey = os.path.basename(png_path).rsplit('.', 1)[0]
+        print(Fore.GREEN + f"✓ Auto-extracted MapKey from filename: '{mapkey}'")
+        if any(icon['mapkey'] == mapkey for icon in self.icons):
+            print(Fore.RED + f"[ERROR] MapKey '{mapkey}' already exists in this atlas")
+            QMessageBox.warning(self, 'Duplicate MapKey', f"MapKey '{mapkey}' already exists in this atlas.\n\nRename the PNG or use 'Replace Icon' instead.")
+            return
+        if self.mode == 'mod_project' and self.mod_combo.currentText():
+            current_lsx = atlas_workspace_key(self.project_lsx_edit.text()) if self.project_lsx_edit.text() else None
+            other = [path for path in self.get_mapkey_index().where(mapkey) if atlas_workspace_key(path) != current_lsx]
+            if other:
+                print(Fore.YELLOW + f"[WARNING] MapKey '{mapkey}' already exists in: {', '.join(other)}")
+                reply = QMessageBox.question(self, 'MapKey Collision', f"MapKey '{mapkey}' already exists in another atlas of this mod:\n" + '\n'.join(other) + '\n\nThe game will only resolve one of them. Add anyway?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+                if reply != QMessageBox.StandardButton.Yes:
+                    print(Fore.YELLOW + f'[WARNING] User cancelled because of MapKey collision')
+                    return
+        print(Fore.CYAN + f'[INFO] MapKey will be used for atlas UV mapping and must match resize filenames!')
+        info_msg = f"Using filename '{mapkey}' as MapKey.\n\nIMPORTANT: When resizing, ensure all icon files have the exact same filename:\n{mapkey}.png"
+        print(Fore.GREEN + f'[POPUP] Showing info: {info_msg}')
+        QMessageBox.information(self, 'MapKey Confirmed', info_msg)
+        print(Fore.CYAN + f'[OPERATION] Searching for free slot in atlas...')
+        print(Fore.GREEN + f'[DEBUG] Used slots: {len(self.icons)}/{self.grid_size * self.grid_size}')
+        print(Fore.GREEN + f'[DEBUG] Loading and resizing new icon to {self.tile_size}x{self.tile_size}...')
+        tile = render_icon_tile(png_path, self.tile_size)
+        placement = self.get_slot_index().assign(mapkey, tile_digest(tile))
+        if placement is None:
+            print(Fore.RED + f'[ERROR] No free slots available in atlas')
+            print(Fore.RED + f"[POPUP] Showing error: {self.strings['error_no_slots']}")
+            QMessageBox.warning(self, 'Error', self.strings['error_no_slots'])
+            return
+        free_col, free_row = placement['slot']
+        x = free_col * self.tile_size
+        y = free_row * self.tile_size
+        print(Fore.GREEN + f'[DEBUG] Pixel position: x={x}, y={y}')
+        self.journal.begin(f"add '{mapkey}'")
+        if placement['paste']:
+            print(Fore.GREEN + f'✓ Found free slot at grid position: col={free_col}, row={free_row}')
+            self.journal.capture_tile(self.atlas_im, (x, y, x + self.tile_size, y + self.tile_size))
+            print(Fore.GREEN + f'[DEBUG] Pasting new icon into atlas...')
+            self.atlas_im.paste(tile, (x, y))
+        else:
+            print(Fore.GREEN + f'✓ Identical pixels already in slot col={free_col}, row={free_row} - sharing it instead of using a new slot')
+        u1 = free_col / float(self.grid_size)
+        u2 = (free_col + 1) / float(self.grid_size)
+        v1 = free_row / float(self.grid_size)
+        v2 = (free_row + 1) / float(self.grid_size)
+        print(Fore.GREEN + f'[DEBUG] Calculated UV coordinates: u1={u1:.3f}, v1={v1:.3f}, u2={u2:.3f}, v2={v2:.3f}')
+        print(Fore.CYAN + f'[OPERATION] Creating XML node for new icon...')
+        node = append_icon_uv(self.dom, mapkey, u1, v1, u2, v2)
+        self.journal.record_insert(node.parentNode, node)
+        self.journal.commit(self.atlas_im)
+        self.update_undo_actions()
+        print(Fore.GREEN + f'✓ Node added to DOM')
+        print(Fore.GREEN + f'[DEBUG] Updating internal icon list...')
+        self.icon_model.append_icon({'mapkey': mapkey, 'u1': u1, 'u2': u2, 'v1': v1, 'v2': v2})
+        self.slot_mapkeys = None
+        self.index_mapkey(mapkey, added=True)
+        print(Fore.GREEN + f'[DEBUG] Total icons now: {len(self.icons)}')
+        self.select_mapkey(mapkey)
+        print(Fore.CYAN + f'[OPERATION] Updating preview...')
+        self.update_preview()
+        self.dom_modified = True
+        self.image_modified = True
+        self.refresh_workspace_combo()
+        print(Fore.GREEN + f'[DEBUG] DOM marked as modified')
+        print(Fore.GREEN + f"✓ Successfully added new icon '{mapkey}'")
+        success_msg = self.strings['success_add'].format(key=mapkey)
+        print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
+        QMessageBox.information(self, 'Success', success_msg)
+        print(Fore.CYAN + f'[USER] Prompting for auto-resize...')
+        resize_prompt = f"Would you like to automatically resize '{os.path.basename(png_path)}' to all required sizes (72, 144, 192, 380) now?\n\nThis will save you from manually running 'Resize Item PNG' and ensures the filenames match."
+        print(Fore.GREEN + f'[POPUP] Showing resize prompt')
+        reply = QMessageBox.question(self, 'Auto-Resize Icon?', resize_prompt, QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes)
+        if reply == QMessageBox.StandardButton.Yes:
+            print(Fore.GREEN + f'✓ User selected YES - auto-resizing icon')
+            print(Fore.CYAN + f'[OPERATION] Starting automatic resize operation...')
+            if self.mode == 'mod_project':
+                mod = self.mod_combo.currentText()
+                base_dest = os.path.join(self.bg3_edit.text(), 'Mods', mod, 'GUI')
+                print(Fore.GREEN + f'[DEBUG] Mod project mode - using mod: {mod}')
+            else:
+                base_dest = self.output_edit.text() or os.path.dirname(png_path)
+                print(Fore.GREEN + f'[DEBUG] Standalone mode')
+            print(Fore.GREEN + f'[DEBUG] Destination directory: {base_dest}')
+            resize_png(png_path, skill_mode=False, dest_dir=base_dest)
+            print(Fore.GREEN + f"\n{'=' * 60}")
+            print(Fore.GREEN + f'AUTO-RESIZE COMPLETE')
+            print(Fore.GREEN + f"{'=' * 60}\n")
+            complete_msg = f"Icon '{mapkey}' added to atlas and resized to all required sizes!"
+            print(Fore.GREEN + f'[POPUP] Showing completion: {complete_msg}')
+            QMessageBox.information(self, 'Complete', complete_msg)
+        else:
+            print(Fore.YELLOW + f'[WARNING] User selected NO - skipping auto-resize')
+            print(Fore.CYAN + f"[INFO] User can manually resize later using 'Resize Item PNG' button")
+
+    def compact_current_atlas(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Compact Atlas')
+        print(Fore.CYAN + f"{'=' * 60}")
+        if not self.atlas_im or not self.dom:
+            QMessageBox.warning(self, 'Error', self.strings['error_load'])
+            return
+        self.journal.begin('compact atlas')
+        self.journal.capture_image(self.atlas_im, {'atlas_size': self.atlas_size})
+        self.journal.capture_attributes([attr for attr in self.dom.getElementsByTagName('attribute') if attr.getAttribute('id') in ('U1', 'U2', 'V1', 'V2', 'Width', 'Height')])
+        try:
+            result = compact_atlas_layout(self.atlas_im, self.dom, self.atlas_size, self.tile_size)
+        except ValueError as e:
+            self.journal.cancel()
+            print(Fore.RED + f'[ERROR] Compaction failed: {e}')
+            QMessageBox.warning(self, 'Compaction Failed', str(e))
+            return
+        if result is None:
+            self.journal.cancel()
+            print(Fore.GREEN + f'✓ Atlas is already compact')
+            QMessageBox.information(self, 'Compact Atlas', f'Atlas is already compact ({self.atlas_size}x{self.atlas_size}).')
+            return
+        previous_size = self.atlas_size
+        self.journal.commit(result['atlas_im'], {'atlas_size': result['atlas_size']})
+        self.update_undo_actions()
+        self.atlas_im = result['atlas_im']
+        self.atlas_size = result['atlas_size']
+        self.grid_size = result['grid_size']
+        self.icons = result['icons']
+        self.tile_digests = {}
+        self.slot_index = None
+        self.slot_mapkeys = None
+        self.dom_modified = True
+        self.image_modified = True
+        self.populate_icon_browser()
+        self.refresh_workspace_combo()
+        self.update_preview()
+        print(Fore.GREEN + f"✓ Compacted: {result['moved']} slot(s) moved, {previous_size}x{previous_size} -> {self.atlas_size}x{self.atlas_size}")
+        QMessageBox.information(self, 'Compact Atlas', f"Moved {result['moved']} of {result['slots']} used slot(s).\nAtlas size: {previous_size}x{previous_size} -> {self.atlas_size}x{self.atlas_size}\n\nSave the atlas to write the changes.")
+
+    @profiled('save_atlas')
+    def save_atlas(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Save Atlas')
+        print(Fore.CYAN + f"{'=' * 60}")
+        if not self.atlas_im:
+            print(Fore.RED + f'[ERROR] No atlas loaded')
+            return
+        print(Fore.GREEN + f'[DEBUG] Current mode: {self.mode}')
+        if self.mode == 'mod_project':
+            print(Fore.CYAN + f'[USER] Prompting for save options...')
+            msg_box = QMessageBox(self)
+            msg_box.setWindowTitle('Save Options')
+            msg_box.setText('Choose how to save your atlas:')
+            msg_box.setIcon(QMessageBox.Icon.Question)
+            zip_button = msg_box.addButton('Zip Only', QMessageBox.ButtonRole.YesRole)
+            direct_button = msg_box.addButton('Direct Write', QMessageBox.ButtonRole.NoRole)
+            both_button = msg_box.addButton('Both', QMessageBox.ButtonRole.AcceptRole)
+            cancel_button = msg_box.addButton('Cancel', QMessageBox.ButtonRole.RejectRole)
+            msg_box.exec()
+            clicked_button = msg_box.clickedButton()
+            if clicked_button == cancel_button:
+                print(Fore.YELLOW + f'[WARNING] User cancelled save operation')
+                return
+            zip_only = clicked_button == zip_button
+            direct_only = clicked_button == direct_button
+            do_both = clicked_button == both_button
+            print(Fore.GREEN + f'[DEBUG] Save mode: zip_only={zip_only}, direct_only={direct_only}, both={do_both}')
+        else:
+            print(Fore.GREEN + f'[DEBUG] Standalone mode - defaulting to zip save')
+            zip_only = True
+            direct_only = False
+            do_both = False
+        base_name = None
+        timestamp = None
+        zip_path = None
+        if zip_only or do_both:
+            print(Fore.CYAN + f'[USER] Prompting for base name...')
+            base_name, ok = QInputDialog.getText(self, 'Save As', 'Enter base name for output (e.g., MyModUpdate):')
+            if not ok or not base_name:
+                print(Fore.YELLOW + f'[WARNING] User cancelled base name input')
+                return
+            timestamp = datetime.now().strftime('%d%m%y_%H%M')
+            print(Fore.GREEN + f'[DEBUG] Base name: {base_name}')
+            print(Fore.GREEN + f'[DEBUG] Timestamp: {timestamp}')
+            zip_path = os.path.join(self.zip_edit.text() or os.path.dirname(__file__), f'{base_name}_{timestamp}.zip')
+            print(Fore.GREEN + f'[DEBUG] Zip output path: {zip_path}')
+        if direct_only or do_both:
+            print(Fore.CYAN + f'[OPERATION] Direct write mode')
+            if self.mode == 'standalone':
+                dds_path = self.standalone_dds_edit.text()
+                lsx_path = self.standalone_lsx_edit.text()
+            else:
+                dds_path = self.atlas_path
+                lsx_path = self.project_lsx_edit.text()
+            print(Fore.GREEN + f'[DEBUG] DDS output path: {dds_path}')
+            print(Fore.GREEN + f'[DEBUG] LSX output path: {lsx_path}')
+            print(Fore.CYAN + f'[OPERATION] Writing atlas DDS with mip chain...')
+            write_atlas_dds(self.atlas_im, dds_path, tile_size=self.tile_size)
+            save_tile_digests(dds_path, self.tile_size, self.tile_digests)
+            print(Fore.CYAN + f'[OPERATION] Writing LSX file...')
+            write_lsx(self.dom, lsx_path)
+            print(Fore.GREEN + f'✓ LSX file written')
+            if self.mode == 'mod_project' and self.mod_combo.currentText():
+                self.get_mapkey_index().update_file(lsx_path, [icon['mapkey'] for icon in self.icons])
+            print(Fore.GREEN + f"\n{'=' * 60}")
+            print(Fore.GREEN + f'ATLAS SAVED SUCCESSFULLY (DIRECT WRITE)')
+            print(Fore.GREEN + f"{'=' * 60}\n")
+            if direct_only:
+                success_msg = self.strings['success_save'].format(lsx=lsx_path, dds=dds_path)
+                print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
+                QMessageBox.information(self, 'Success', success_msg)
+                return
+            else:
+                print(Fore.CYAN + f'[OPERATION] Continuing to zip creation (Both mode)...')
+        if not (zip_only or do_both):
+            return
+        print(Fore.CYAN + f'[OPERATION] Creating zip archive: {zip_path}')
+        from zipfile import ZipFile
+        with ZipFile(zip_path, 'w') as zipf:
+            print(Fore.GREEN + f'[DEBUG] Zip file created')
+            print(Fore.GREEN + f'[DEBUG] Extracting DDS relative path from DOM...')
+            for attr in self.dom.getElementsByTagName('attribute'):
+                if attr.getAttribute('id') == 'Path':
+                    dds_rel_path = attr.getAttribute('value')
+                    print(Fore.GREEN + f'✓ Found DDS relative path: {dds_rel_path}')
+                    break
+            dds_name = os.path.basename(dds_rel_path)
+            dds_full_path = os.path.join(os.path.dirname(zip_path), dds_name)
+            print(Fore.GREEN + f'[DEBUG] Temporary DDS path: {dds_full_path}')
+            print(Fore.CYAN + f'[OPERATION] Writing atlas DDS with mip chain...')
+            write_atlas_dds(self.atlas_im, dds_full_path, tile_size=self.tile_size)
+            print(Fore.GREEN + f'[DEBUG] Adding DDS to zip as: {dds_rel_path}')
+            zipf.write(dds_full_path, dds_rel_path)
+            print(Fore.GREEN + f'✓ DDS added to zip')
+            os.remove(dds_full_path)
+            print(Fore.GREEN + f'[DEBUG] Cleaned up temporary DDS')
+            lsx_ext = os.path.splitext(self.workspace[self.current_atlas_key]['lsx_path'])[1]
+            lsx_rel_path = os.path.splitext(os.path.basename(self.atlas_path))[0] + lsx_ext
+            print(Fore.GREEN + f'[DEBUG] LSX relative path for zip: {lsx_rel_path}')
+            print(Fore.GREEN + f'[DEBUG] DOM modified: {self.dom_modified}')
+            if self.dom_modified:
+                print(Fore.CYAN + f'[OPERATION] Writing modified LSX to temporary file...')
+                temp_lsx = os.path.join(ensure_temp_dir(), 'temp' + lsx_ext)
+                write_lsx(self.dom, temp_lsx)
+                print(Fore.GREEN + f'✓ Temporary LSX written')
+                print(Fore.GREEN + f'[DEBUG] Adding LSX to zip as: {lsx_rel_path}')
+                zipf.write(temp_lsx, lsx_rel_path)
+                print(Fore.GREEN + f'✓ LSX added to zip')
+                os.remove(temp_lsx)
+                print(Fore.GREEN + f'[DEBUG] Cleaned up temporary LSX')
+            else:
+                print(Fore.GREEN + f'[DEBUG] DOM not modified, copying original LSX')
+                original_lsx = os.path.splitext(self.atlas_path)[0] + lsx_ext
+                print(Fore.GREEN + f'[DEBUG] Original LSX path: {original_lsx}')
+                zipf.write(original_lsx, lsx_rel_path)
+                print(Fore.GREEN + f'✓ Original LSX added to zip')
+        print(Fore.GREEN + f"\n{'=' * 60}")
+        if do_both:
+            print(Fore.GREEN + f'ATLAS SAVED SUCCESSFULLY (BOTH DIRECT WRITE + ZIP)')
+            print(Fore.GREEN + f'Zip output: {zip_path}')
+            success_msg = f'Saved to both direct location and zip:\n{zip_path}'
+            print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
+            QMessageBox.information(self, 'Success', success_msg)
+        else:
+            print(Fore.GREEN + f'ATLAS SAVED SUCCESSFULLY (ZIP)')
+            print(Fore.GREEN + f'Output: {zip_path}')
+            success_msg = f'Saved to {zip_path}'
+            print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
+            QMessageBox.information(self, 'Success', success_msg)
+        print(Fore.GREEN + f"{'=' * 60}\n")
+
+    def resize_item_png_gui(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Resize Item PNG')
+        print(Fore.CYAN + f"{'=' * 60}")
+        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
+        default_path = self.get_default_file_dialog_path()
+        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
+        png_path = QFileDialog.getOpenFileName(self, self.strings['select_item_png'], default_path, 'PNG (*.png)')[0]
+        if not png_path:
+            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
+            return
+        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
+        if self.mode == 'mod_project':
+            mod = self.mod_combo.currentText()
+            base_dest = os.path.join(self.bg3_edit.text(), 'Mods', mod, 'GUI')
+            print(Fore.GREEN + f'[DEBUG] Mod project mode - using mod: {mod}')
+        else:
+            base_dest = self.output_edit.text() or os.path.dirname(png_path)
+            print(Fore.GREEN + f'[DEBUG] Standalone mode')
+        print(Fore.GREEN + f'[DEBUG] Destination directory: {base_dest}')
+        print(Fore.CYAN + f'[OPERATION] Starting item resize operation...')
+        resize_png(png_path, skill_mode=False, dest_dir=base_dest)
+        print(Fore.GREEN + f"\n{'=' * 60}")
+        print(Fore.GREEN + f'ITEM RESIZE COMPLETE')
+        print(Fore.GREEN + f"{'=' * 60}\n")
+        success_msg = self.strings['success_resize'].format(type='item')
+        print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
+        QMessageBox.information(self, 'Success', success_msg)
+
+    def resize_skill_png_gui(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Resize Skill PNG')
+        print(Fore.CYAN + f"{'=' * 60}")
+        print(Fore.CYAN + f'[USER] Opening file dialog for PNG selection...')
+        default_path = self.get_default_file_dialog_path()
+        print(Fore.GREEN + f'[DEBUG] Default file dialog path: {default_path}')
+        png_path = QFileDialog.getOpenFileName(self, self.strings['select_skill_png'], default_path, 'PNG (*.png)')[0]
+        if not png_path:
+            print(Fore.YELLOW + f'[WARNING] User cancelled PNG selection')
+            return
+        print(Fore.GREEN + f'✓ User selected PNG: {png_path}')
+        if self.mode == 'mod_project':
+            mod = self.mod_combo.currentText()
+            base_dest = os.path.join(self.bg3_edit.text(), 'Mods', mod, 'GUI')
+            print(Fore.GREEN + f'[DEBUG] Mod project mode - using mod: {mod}')
+        else:
+            base_dest = self.output_edit.text() or os.path.dirname(png_path)
+            print(Fore.GREEN + f'[DEBUG] Standalone mode')
+        print(Fore.GREEN + f'[DEBUG] Destination directory: {base_dest}')
+        print(Fore.CYAN + f'[OPERATION] Starting skill resize operation...')
+        resize_png(png_path, skill_mode=True, dest_dir=base_dest)
+        print(Fore.GREEN + f"\n{'=' * 60}")
+        print(Fore.GREEN + f'SKILL RESIZE COMPLETE')
+        print(Fore.GREEN + f"{'=' * 60}\n")
+        success_msg = self.strings['success_resize'].format(type='skill')
+        print(Fore.GREEN + f'[POPUP] Showing success: {success_msg}')
+        QMessageBox.information(self, 'Success', success_msg)
+
+    def on_create_mod_changed(self):
+        create_mod = self.create_mod_combo.currentText()
+        if create_mod and create_mod != self.mod_combo.currentText():
+            self.mod_combo.blockSignals(True)
+            self.mod_combo.setCurrentText(create_mod)
+            self.mod_combo.blockSignals(False)
+        print(Fore.GREEN + f'[DEBUG] Create Atlas mod changed: {create_mod}')
+        self.update_create_atlas_status()
+
+    def update_create_atlas_grid_info(self):
+        if self.canvas_512.isChecked():
+            atlas_size = 512
+        else:
+            atlas_size = 1024
+        tile_size = 64
+        grid_size = atlas_size // tile_size
+        total_slots = grid_size * grid_size
+        self.grid_info_label.setText(f'Grid: {tile_size}x{tile_size} icons | Total slots: {total_slots} ({grid_size}x{grid_size})')
+        self.update_create_atlas_status()
+
+    def toggle_import_options(self):
+        is_import = self.import_folder_radio.isChecked()
+        self.import_controls_widget.setEnabled(is_import)
+        if not is_import:
+            self.import_folder_edit.clear()
+            self.import_count_label.setText('No folder selected')
+        self.update_create_atlas_status()
+
+    def toggle_resize_type_selection(self):
+        is_enabled = self.auto_resize_checkbox.isChecked()
+        self.resize_type_widget.setVisible(is_enabled)
+
+    def browse_import_folder(self):
+        print(Fore.CYAN + f'\n[USER] Browsing for import folder...')
+        default_path = self.get_default_file_dialog_path()
+        print(Fore.GREEN + f"[DEBUG] Default browse path: {(default_path if default_path else '(current directory)')}")
+        folder = QFileDialog.getExistingDirectory(self, 'Select Folder with PNG Icons', default_path)
+        if folder:
+            self.import_folder_edit.setText(folder)
+            print(Fore.GREEN + f'✓ Selected folder: {folder}')
+
+    def scan_import_folder(self):
+        folder = self.import_folder_edit.text().strip()
+        if not folder or not os.path.isdir(folder):
+            self.import_count_label.setText('No folder selected')
+            self.import_count_label.setStyleSheet('QLabel { color: #888; font-style: italic; }')
+            self.import_count_label.setToolTip('')
+            self.update_create_atlas_status()
+            return
+        atlas_size = 512 if self.canvas_512.isChecked() else 1024
+        grid_size = atlas_size // 64
+        max_slots = grid_size * grid_size
+        report = preflight_import_folder(folder, self.mapkey_prefix_edit.text().strip(), capacity=max_slots)
+        count = len(report['files'])
+        issues = []
+        if report['invalid']:
+            issues.append(f"{len(report['invalid'])} unreadable")
+        if report['non_square']:
+            issues.append(f"{len(report['non_square'])} non-square")
+        if report['collisions']:
+            issues.append(f"{len(report['collisions'])} MapKey collision(s)")
+        if report['overflow']:
+            issues.append(f"{len(report['overflow'])} will be skipped, atlas has {max_slots} slots")
+        details = [f"{r['name']}: {r['error']}" for r in report['invalid']] + [f"{r['name']}: non-square {r['width']}x{r['height']}" for r in report['non_square']] + [f"{png_file}: MapKey '{mapkey}' already used" for png_file, mapkey in report['collisions']] + [f"{r['name']}: {r['width']}x{r['height']} (upscaled to {report['min_size']}px)" for r in report['small']]
+        self.import_count_label.setToolTip('\n'.join(details[:30] + ([f'... and {len(details) - 30} more'] if len(details) > 30 else [])))
+        if count == 0:
+            self.import_count_label.setText('No PNG files found in folder')
+            self.import_count_label.setStyleSheet('QLabel { color: #ff6666; font-style: italic; }')
+        elif issues:
+            self.import_count_label.setText(f"Found {count} PNGs - will use {len(report['entries'])} of {max_slots} slots (WARNING: {', '.join(issues)})")
+            self.import_count_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; }')
+        else:
+            self.import_count_label.setText(f'Found {count} PNG file(s) - will use {count} of {max_slots} slots')
+            self.import_count_label.setStyleSheet('QLabel { color: #66ff66; font-style: italic; }')
+        print(Fore.GREEN + f"[DEBUG] Preflight: {count} PNG files in {folder} ({report['elapsed_ms']:.1f} ms)")
+        self.update_create_atlas_status()
+
+    def toggle_watch_folder(self, enabled):
+        if not enabled:
+            self.watch_timer.stop()
+            if self.folder_watcher is not None:
+                self.folder_watcher.stop()
+                self.folder_watcher = None
+                print(Fore.YELLOW + '[WATCH] Folder watch stopped')
+                self.statusBar().showMessage('Folder watch stopped')
+            return
+        folder = self.import_folder_edit.text().strip()
+        mod = self.create_mod_combo.currentText()
+        if not folder or not os.path.isdir(folder) or not mod:
+            QMessageBox.warning(self, 'Error', 'Select a mod and a valid import folder before enabling folder watch.')
+            self.watch_folder_checkbox.setChecked(False)
+            return
+        bg3_data = self.bg3_edit.text().strip()
+        base_path, lsx_path, dds_path = self.create_atlas_target_paths()
+        if not os.path.exists(lsx_path):
+            QMessageBox.warning(self, 'Generate Atlas First', f'Folder watch updates an existing atlas.\n\nGenerate {os.path.basename(lsx_path)} first, then enable watching.')
+            self.watch_folder_checkbox.setChecked(False)
+            return
+        self.watch_target = {'folder': folder, 'lsx_path': lsx_path, 'dest_dir': base_path if self.auto_resize_checkbox.isChecked() else None, 'skill_mode': self.resize_type_skill.isChecked(), 'prefix': self.mapkey_prefix_edit.text().strip(), 'game_dir': bg3_data, 'mode': 'mod_project', 'mod': mod}
+        self.folder_watcher = FolderWatcher(folder)
+        self.watch_timer.start()
+        self.statusBar().showMessage(f'Watching {folder} ({self.folder_watcher.backend}) -> {os.path.basename(lsx_path)}')
+
+    def poll_watch_folder(self):
+        if self.folder_watcher is None:
+            return
+        if self.watch_future is not None:
+            if not self.watch_future.done():
+                return
+            try:
+                result = self.watch_future.result()
+                if result:
+                    self.get_mapkey_index(self.watch_target['mod']).update_file(result['lsx_path'])
+                    self.statusBar().showMessage(f"Synced {len(result['updated'])} updated / {len(result['added'])} new icon(s) into {os.path.basename(result['lsx_path'])} - reload the atlas to see them")
+            except Exception as e:
+                print(Fore.RED + f'[WATCH] Sync failed: {e}')
+                self.statusBar().showMessage(f'Folder sync failed: {e}')
+            self.watch_future = None
+        batch = self.folder_watcher.poll()
+        if not batch or not batch['changed']:
+            return
+        target = self.watch_target
+        self.statusBar().showMessage(f"Syncing {len(batch['changed'])} changed PNG(s)...")
+        self.watch_future = self.watch_executor.submit(sync_watched_pngs, target['folder'], batch, target['lsx_path'], target['dest_dir'], target['skill_mode'], target['prefix'], target['game_dir'], target['mode'])
+
+    def create_atlas_target_paths(self):
+        mod = self.create_mod_combo.currentText()
+        bg3_data = self.bg3_edit.text().strip()
+        atlas_name = self.atlas_name_edit.text().strip() or 'IconAtlas'
+        public_base = os.path.join(bg3_data, 'Public', mod)
+        mods_base = os.path.join(bg3_data, 'Mods', mod)
+        if os.path.exists(public_base):
+            base_path = public_base
+        elif os.path.exists(mods_base):
+            base_path = mods_base
+        else:
+            base_path = public_base
+        lsx_path = os.path.join(base_path, 'GUI', f'{atlas_name}.lsx')
+        dds_path = os.path.join(base_path, 'Assets', 'Textures', 'Icons', f'{atlas_name}.dds')
+        return (base_path, lsx_path, dds_path)
+
+    def update_prefix_example(self):
+        prefix = self.mapkey_prefix_edit.text().strip()
+        if prefix:
+            self.prefix_example_label.setText(f'Example: sword.png → MapKey: {prefix}_sword')
+        else:
+            self.prefix_example_label.setText('Example: sword.png → MapKey: sword')
+
+    def update_create_atlas_status(self):
+        mod = self.create_mod_combo.currentText()
+        if not mod:
+            self.create_atlas_path_label.setText('Please select a mod from the dropdown above')
+            self.create_atlas_path_label.setStyleSheet('QLabel { color: #ff6666; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
+            self.btn_generate_atlas.setEnabled(False)
+            self.create_status_label.setText('Select a mod to continue')
+            return
+        bg3_data = self.bg3_edit.text().strip()
+        atlas_name = self.atlas_name_edit.text().strip() or 'IconAtlas'
+        public_base = os.path.join(bg3_data, 'Public', mod)
+        mods_base = os.path.join(bg3_data, 'Mods', mod)
+        if os.path.exists(public_base):
+            base_path = public_base
+        elif os.path.exists(mods_base):
+            base_path = mods_base
+        else:
+            base_path = public_base
+        gui_path = os.path.join(base_path, 'GUI')
+        textures_path = os.path.join(base_path, 'Assets', 'Textures', 'Icons')
+        lsx_path = os.path.join(gui_path, f'{atlas_name}.lsx')
+        dds_path = os.path.join(textures_path, f'{atlas_name}.dds')
+        exists = os.path.exists(lsx_path) or os.path.exists(dds_path)
+        if exists:
+            self.create_atlas_path_label.setText(f'LSX: {gui_path}\nDDS: {textures_path}\n(WARNING: Files exist - will be overwritten)')
+            self.create_atlas_path_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
+        else:
+            self.create_atlas_path_label.setText(f'LSX: {gui_path}\nDDS: {textures_path}')
+            self.create_atlas_path_label.setStyleSheet('QLabel { color: #66ff66; font-style: italic; margin-left: 20px; background-color: #2a2a2a; padding: 5px; }')
+        self.btn_generate_atlas.setEnabled(True)
+        self.create_status_label.setText('Ready to generate')
+
+    @profiled('generate_new_atlas')
+    def generate_new_atlas(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Generate New Atlas')
+        print(Fore.CYAN + f"{'=' * 60}")
+        mod = self.create_mod_combo.currentText()
+        if not mod:
+            print(Fore.RED + f'[ERROR] No mod selected')
+            QMessageBox.warning(self, 'Error', 'Please select a mod from the dropdown.')
+            return
+        bg3_data = self.bg3_edit.text().strip()
+        atlas_size = 512 if self.canvas_512.isChecked() else 1024
+        tile_size = 64
+        grid_size = atlas_size // tile_size
+        atlas_name = self.atlas_name_edit.text().strip() or 'IconAtlas'
+        print(Fore.GREEN + f'[DEBUG] Atlas size: {atlas_size}x{atlas_size}')
+        print(Fore.GREEN + f'[DEBUG] Tile size: {tile_size}x{tile_size}')
+        print(Fore.GREEN + f'[DEBUG] Grid size: {grid_size}x{grid_size}')
+        print(Fore.GREEN + f'[DEBUG] Atlas name: {atlas_name}')
+        public_base = os.path.join(bg3_data, 'Public', mod)
+        mods_base = os.path.join(bg3_data, 'Mods', mod)
+        if os.path.exists(public_base):
+            base_path = public_base
+        elif os.path.exists(mods_base):
+            base_path = mods_base
+        else:
+            base_path = public_base
+        gui_path = os.path.join(base_path, 'GUI')
+        textures_path = os.path.join(base_path, 'Assets', 'Textures', 'Icons')
+        os.makedirs(gui_path, exist_ok=True)
+        os.makedirs(textures_path, exist_ok=True)
+        print(Fore.GREEN + f'[DEBUG] GUI path: {gui_path}')
+        print(Fore.GREEN + f'[DEBUG] Textures path: {textures_path}')
+        lsx_path = os.path.join(gui_path, f'{atlas_name}.lsx')
+        dds_path = os.path.join(textures_path, f'{atlas_name}.dds')
+        if os.path.exists(lsx_path) or os.path.exists(dds_path):
+            print(Fore.YELLOW + f'[WARNING] Atlas files already exist')
+            reply = QMessageBox.question(self, 'Overwrite Existing Atlas?', f'Atlas files already exist at:\n{gui_path}\n\nOverwrite?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.No:
+                print(Fore.YELLOW + f'[WARNING] User cancelled overwrite')
+                return
+        import_icons = self.import_folder_radio.isChecked()
+        prefix = self.mapkey_prefix_edit.text().strip()
+        auto_resize = self.auto_resize_checkbox.isChecked()
+        skill_mode = self.resize_type_skill.isChecked()
+        if import_icons:
+            import_folder = self.import_folder_edit.text().strip()
+            if not import_folder or not os.path.isdir(import_folder):
+                print(Fore.RED + f'[ERROR] Invalid import folder')
+                QMessageBox.warning(self, 'Error', 'Please select a valid import folder.')
+                return
+            print(Fore.GREEN + f'[DEBUG] Import folder: {import_folder}')
+            print(Fore.GREEN + f"[DEBUG] MapKey prefix: {(prefix if prefix else '(none)')}")
+            print(Fore.GREEN + f'[DEBUG] Auto-resize: {auto_resize}')
+            if auto_resize:
+                print(Fore.GREEN + f"[DEBUG] Icon type: {('Skills' if skill_mode else 'Items')}")
+            print(Fore.CYAN + f'[OPERATION] Checking MapKeys against other atlases in {mod}...')
+            index = self.get_mapkey_index(mod)
+            report = preflight_import_folder(import_folder, prefix, capacity=grid_size * grid_size)
+            print_preflight_report(report)
+            png_entries, skipped = (report['entries'], report['collisions'])
+            clashes = {}
+            for png_file, mapkey in png_entries:
+                other = [path for path in index.where(mapkey) if atlas_workspace_key(path) != atlas_workspace_key(lsx_path)]
+                if other:
+                    clashes[mapkey] = other
+            if clashes or skipped or report['invalid']:
+                for mapkey, paths in clashes.items():
+                    print(Fore.YELLOW + f"[WARNING] MapKey '{mapkey}' already exists in: {', '.join(paths)}")
+                listing = '\n'.join([f'  {mapkey} ({os.path.basename(paths[0])})' for mapkey, paths in list(clashes.items())[:15]])
+                more = f'\n  ... and {len(clashes) - 15} more' if len(clashes) > 15 else ''
+                dupes = f'\n\n{len(skipped)} file(s) share a MapKey with another file in the folder and will be skipped.' if skipped else ''
+                unreadable = f"\n\n{len(report['invalid'])} file(s) are not readable PNGs and will be skipped." if report['invalid'] else ''
+                reply = QMessageBox.question(self, 'MapKey Collisions', f'{len(clashes)} MapKey(s) already exist in other atlases of this mod:\n{listing}{more}{dupes}{unreadable}\n\nContinue anyway?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+                if reply != QMessageBox.StandardButton.Yes:
+                    print(Fore.YELLOW + f'[WARNING] User cancelled because of MapKey collisions')
+                    return
+        else:
+            import_folder = None
+            print(Fore.GREEN + f'[DEBUG] Creating empty atlas')
+        try:
+            self.create_status_label.setText('Generating atlas...')
+            self.create_status_label.setStyleSheet('QLabel { color: #ffaa00; font-style: italic; }')
+            QApplication.processEvents()
+            if import_folder:
+                self.generate_atlas_with_icons(import_folder, dds_path, atlas_size, tile_size, grid_size, prefix, auto_resize, skill_mode, base_path, png_entries)
+            else:
+                self.generate_empty_atlas(dds_path, atlas_size, tile_size, base_path)
+            print(Fore.GREEN + f'✓ Atlas created successfully')
+            self.get_mapkey_index(mod).update_file(lsx_path)
+            print(Fore.GREEN + f'  LSX: {lsx_path}')
+            print(Fore.GREEN + f'  DDS: {dds_path}')
+            self.create_status_label.setText('Atlas created successfully!')
+            self.create_status_label.setStyleSheet('QLabel { color: #66ff66; font-style: italic; }')
+            reply = QMessageBox.question(self, 'Atlas Created', f'New atlas created successfully!\n\nFiles created:\n  {atlas_name}.lsx\n  {atlas_name}.dds\n\nLoad this atlas in the Main tab?', QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                self.tabs.setCurrentIndex(0)
+                self.project_lsx_edit.setText(lsx_path)
+                self.load_atlas()
+                print(Fore.GREEN + f'✓ Auto-loaded new atlas in Main tab')
+        except Exception as e:
+            print(Fore.RED + f'[ERROR] Failed to create atlas: {e}')
+            self.create_status_label.setText('Failed to create atlas')
+            self.create_status_label.setStyleSheet('QLabel { color: #ff6666; font-style: italic; }')
+            QMessageBox.critical(self, 'Error', f'Failed to create atlas:\n{str(e)}')
+
+    def generate_empty_atlas(self, dds_path, atlas_size, tile_size, base_path=''):
+        print(Fore.CYAN + f'[OPERATION] Generating empty atlas...')
+        dom = minidom.Document()
+        save = dom.createElement('save')
+        dom.appendChild(save)
+        version = dom.createElement('version')
+        version.setAttribute('major', '4')
+        version.setAttribute('minor', '0')
+        version.setAttribute('revision', '9')
+        version.setAttribute('build', '320')
+        save.appendChild(version)
+        region_tex = dom.createElement('region')
+        region_tex.setAttribute('id', 'TextureAtlasInfo')
+        save.appendChild(region_tex)
+        node_root_tex = dom.createElement('node')
+        node_root_tex.setAttribute('id', 'root')
+        region_tex.appendChild(node_root_tex)
+        children_tex = dom.createElement('children')
+        node_root_tex.appendChild(children_tex)
+        node_tex_size = dom.createElement('node')
+        node_tex_size.setAttribute('id', 'TextureAtlasTextureSize')
+        attr_height = dom.createElement('attribute')
+        attr_height.setAttribute('id', 'Height')
+        attr_height.setAttribute('type', 'int32')
+        attr_height.setAttribute('value', str(atlas_size))
+        node_tex_size.appendChild(attr_height)
+        attr_width = dom.createElement('attribute')
+        attr_width.setAttribute('id', 'Width')
+        attr_width.setAttribute('type', 'int32')
+        attr_width.setAttribute('value', str(atlas_size))
+        node_tex_size.appendChild(attr_width)
+        children_tex.appendChild(node_tex_size)
+        node_icon_size = dom.createElement('node')
+        node_icon_size.setAttribute('id', 'TextureAtlasIconSize')
+        attr_height = dom.createElement('attribute')
+        attr_height.setAttribute('id', 'Height')
+        attr_height.setAttribute('type', 'int32')
+        attr_height.setAttribute('value', str(tile_size))
+        node_icon_size.appendChild(attr_height)
+        attr_width = dom.createElement('attribute')
+        attr_width.setAttribute('id', 'Width')
+        attr_width.setAttribute('type', 'int32')
+        attr_width.setAttribute('value', str(tile_size))
+        node_icon_size.appendChild(attr_width)
+        children_tex.appendChild(node_icon_size)
+        node_path = dom.createElement('node')
+        node_path.setAttribute('id', 'TextureAtlasPath')
+        attr_path = dom.createElement('attribute')
+        attr_path.setAttribute('id', 'Path')
+        attr_path.setAttribute('type', 'string')
+        attr_path.setAttribute('value', f'Assets/Textures/Icons/{os.path.basename(dds_path)}')
+        node_path.appendChild(attr_path)
+        attr_uuid = dom.createElement('attribute')
+        attr_uuid.setAttribute('id', 'UUID')
+        attr_uuid.setAttribute('type', 'FixedString')
+        attr_uuid.setAttribute('value', str(uuid.uuid4()))
+        node_path.appendChild(attr_uuid)
+        children_tex.appendChild(node_path)
+        region_uv = dom.createElement('region')
+        region_uv.setAttribute('id', 'IconUVList')
+        save.appendChild(region_uv)
+        node_root_uv = dom.createElement('node')
+        node_root_uv.setAttribute('id', 'root')
+        region_uv.appendChild(node_root_uv)
+        children_uv = dom.createElement('children')
+        node_root_uv.appendChild(children_uv)
+        im = Image.new('RGBA', (atlas_size, atlas_size), (0, 0, 0, 0))
+        write_atlas_dds(im, dds_path, tile_size=tile_size)
+        base_name = os.path.splitext(os.path.basename(dds_path))[0]
+        if base_path:
+            lsx_dir = os.path.join(base_path, 'GUI')
+        else:
+            lsx_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(dds_path))), 'GUI')
+        os.makedirs(lsx_dir, exist_ok=True)
+        lsx_path = os.path.join(lsx_dir, f'{base_name}.lsx')
+        write_lsx(dom, lsx_path)
+        print(Fore.GREEN + f'✓ Empty atlas created')
+
+    def generate_atlas_with_icons(self, import_folder, dds_path, atlas_size, tile_size, grid_size, prefix='', auto_resize=False, skill_mode=False, base_path='', png_entries=None):
+        print(Fore.CYAN + f'[OPERATION] Generating atlas with icons from: {import_folder}')
+        if auto_resize:
+            print(Fore.GREEN + f"[DEBUG] Auto-resize enabled ({('Skills' if skill_mode else 'Items')})")
+        dom = minidom.Document()
+        save = dom.createElement('save')
+        dom.appendChild(save)
+        version = dom.createElement('version')
+        version.setAttribute('major', '4')
+        version.setAttribute('minor', '0')
+        version.setAttribute('revision', '9')
+        version.setAttribute('build', '320')
+        save.appendChild(version)
+        region_tex = dom.createElement('region')
+        region_tex.setAttribute('id', 'TextureAtlasInfo')
+        save.appendChild(region_tex)
+        node_root_tex = dom.createElement('node')
+        node_root_tex.setAttribute('id', 'root')
+        region_tex.appendChild(node_root_tex)
+        children_tex = dom.createElement('children')
+        node_root_tex.appendChild(children_tex)
+        node_tex_size = dom.createElement('node')
+        node_tex_size.setAttribute('id', 'TextureAtlasTextureSize')
+        attr_height = dom.createElement('attribute')
+        attr_height.setAttribute('id', 'Height')
+        attr_height.setAttribute('type', 'int32')
+        attr_height.setAttribute('value', str(atlas_size))
+        node_tex_size.appendChild(attr_height)
+        attr_width = dom.createElement('attribute')
+        attr_width.setAttribute('id', 'Width')
+        attr_width.setAttribute('type', 'int32')
+        attr_width.setAttribute('value', str(atlas_size))
+        node_tex_size.appendChild(attr_width)
+        children_tex.appendChild(node_tex_size)
+        node_icon_size = dom.createElement('node')
+        node_icon_size.setAttribute('id', 'TextureAtlasIconSize')
+        attr_height = dom.createElement('attribute')
+        attr_height.setAttribute('id', 'Height')
+        attr_height.setAttribute('type', 'int32')
+        attr_height.setAttribute('value', str(tile_size))
+        node_icon_size.appendChild(attr_height)
+        attr_width = dom.createElement('attribute')
+        attr_width.setAttribute('id', 'Width')
+        attr_width.setAttribute('type', 'int32')
+        attr_width.setAttribute('value', str(tile_size))
+        node_icon_size.appendChild(attr_width)
+        children_tex.appendChild(node_icon_size)
+        node_path = dom.createElement('node')
+        node_path.setAttribute('id', 'TextureAtlasPath')
+        attr_path = dom.createElement('attribute')
+        attr_path.setAttribute('id', 'Path')
+        attr_path.setAttribute('type', 'string')
+        attr_path.setAttribute('value', f'Assets/Textures/Icons/{os.path.basename(dds_path)}')
+        node_path.appendChild(attr_path)
+        attr_uuid = dom.createElement('attribute')
+        attr_uuid.setAttribute('id', 'UUID')
+        attr_uuid.setAttribute('type', 'FixedString')
+        attr_uuid.setAttribute('value', str(uuid.uuid4()))
+        node_path.appendChild(attr_uuid)
+        children_tex.appendChild(node_path)
+        region_uv = dom.createElement('region')
+        region_uv.setAttribute('id', 'IconUVList')
+        save.appendChild(region_uv)
+        node_root_uv = dom.createElement('node')
+        node_root_uv.setAttribute('id', 'root')
+        region_uv.appendChild(node_root_uv)
+        children_uv = dom.createElement('children')
+        node_root_uv.appendChild(children_uv)
+        im = Image.new('RGBA', (atlas_size, atlas_size), (0, 0, 0, 0))
+        max_icons = grid_size * grid_size
+        print(Fore.GREEN + f'[DEBUG] Atlas capacity: {max_icons} icons')
+        if png_entries is None:
+            png_files = sorted([f for f in os.listdir(import_folder) if f.lower().endswith('.png')])
+            print(Fore.GREEN + f'[DEBUG] Found {len(png_files)} PNG files')
+            png_entries, skipped = unique_png_mapkeys(png_files, prefix)
+            if skipped:
+                print(Fore.YELLOW + f'[WARNING] Skipped {len(skipped)} file(s) with duplicate MapKeys')
+        png_files = [png_file for png_file, mapkey in png_entries]
+        index = TileSlotIndex(grid_size)
+        placed = []
+        for idx, (png_file, mapkey) in enumerate(png_entries):
+            png_path = os.path.join(import_folder, png_file)
+            tile = render_icon_tile(png_path, tile_size)
+            placement = index.assign(mapkey, tile_digest(tile))
+            if placement is None:
+                print(Fore.YELLOW + f'[WARNING] Atlas full, skipping remaining {len(png_files) - idx} files')
+                break
+            placed.append((png_file, mapkey))
+            col, row = placement['slot']
+            if placement['paste']:
+                im.paste(tile, (col * tile_size, row * tile_size))
+            else:
+                print(Fore.GREEN + f'  ✓ {mapkey} is identical to an existing icon - sharing slot ({col}, {row})')
+            u1 = col / grid_size
+            v1 = row / grid_size
+            u2 = u1 + 1 / grid_size
+            v2 = v1 + 1 / grid_size
+            node_uv = dom.createElement('node')
+            node_uv.setAttribute('id', 'IconUV')
+            attr_mapkey = dom.createElement('attribute')
+            attr_mapkey.setAttribute('id', 'MapKey')
+            attr_mapkey.setAttribute('type', 'FixedString')
+            attr_mapkey.setAttribute('value', mapkey)
+            node_uv.appendChild(attr_mapkey)
+            attr_u1 = dom.createElement('attribute')
+            attr_u1.setAttribute('id', 'U1')
+            attr_u1.setAttribute('type', 'float')
+            attr_u1.setAttribute('value', str(u1))
+            node_uv.appendChild(attr_u1)
+            attr_v1 = dom.createElement('attribute')
+            attr_v1.setAttribute('id', 'V1')
+            attr_v1.setAttribute('type', 'float')
+            attr_v1.setAttribute('value', str(v1))
+            node_uv.appendChild(attr_v1)
+            attr_u2 = dom.createElement('attribute')
+            attr_u2.setAttribute('id', 'U2')
+            attr_u2.setAttribute('type', 'float')
+            attr_u2.setAttribute('value', str(u2))
+            node_uv.appendChild(attr_u2)
+            attr_v2 = dom.createElement('attribute')
+            attr_v2.setAttribute('id', 'V2')
+            attr_v2.setAttribute('type', 'float')
+            attr_v2.setAttribute('value', str(v2))
+            node_uv.appendChild(attr_v2)
+            children_uv.appendChild(node_uv)
+            print(Fore.GREEN + f'  ✓ Added icon {idx + 1}/{len(png_files)}: {mapkey}')
+        if index.shared_count():
+            print(Fore.GREEN + f'[DEDUPE] {len(placed)} icons use {len(index.refs)} slots ({index.shared_count()} identical icon(s) share a slot)')
+        write_atlas_dds(im, dds_path, tile_size=tile_size)
+        save_tile_digests(dds_path, tile_size, index.digests)
+        base_name = os.path.splitext(os.path.basename(dds_path))[0]
+        lsx_dir = os.path.join(base_path, 'GUI')
+        lsx_path = os.path.join(lsx_dir, f'{base_name}.lsx')
+        write_lsx(dom, lsx_path)
+        print(Fore.GREEN + f'✓ Atlas created with {len(placed)} icons')
+        if auto_resize and placed:
+            print(Fore.CYAN + f'[OPERATION] Auto-resizing {len(placed)} icons...')
+            for idx, (png_file, mapkey) in enumerate(placed):
+                png_path = os.path.join(import_folder, png_file)
+                try:
+                    resize_png(png_path, skill_mode=skill_mode, dest_dir=base_path, output_name=mapkey)
+                    print(Fore.GREEN + f'  ✓ Resized {idx + 1}/{len(placed)}: {mapkey}')
+                except Exception as e:
+                    print(Fore.YELLOW + f'  ⚠ Failed to resize {png_file}: {e}')
+            print(Fore.GREEN + f'✓ Completed resizing {len(placed)} icons')
+
+    def find_icon_all_sizes(self, mapkey):
+        return find_icon_tier_paths(mapkey, self.mode, self.bg3_edit.text().strip(), self.mod_combo.currentText(), self.atlas_path)
+
+    def prefetch_icon_tiers(self, mapkey):
+        if not mapkey or not self.icons:
+            return
+        bg3_data = self.bg3_edit.text().strip()
+        mod = self.mod_combo.currentText()
+        for key in [mapkey] + self.neighbour_mapkeys(mapkey):
+            self.tier_prefetcher.prefetch_icon(key, self.mode, bg3_data, mod, self.atlas_path)
+
+    def get_slot_mapkeys(self):
+        if self.slot_mapkeys is None:
+            slots = {}
+            mapkey_slots = {}
+            for icon in self.icons:
+                slot = get_grid_slot(icon['u1'], icon['v1'], self.grid_size)
+                slots.setdefault(slot, icon['mapkey'])
+                mapkey_slots.setdefault(icon['mapkey'], slot)
+            self.slot_mapkeys = (slots, mapkey_slots)
+        return self.slot_mapkeys
+
+    def neighbour_mapkeys(self, mapkey):
+        slots, mapkey_slots = self.get_slot_mapkeys()
+        center = mapkey_slots.get(mapkey)
+        if center is None:
+            return []
+        neighbours = []
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                key = slots.get((center[0] + dc, center[1] + dr))
+                if key and key != mapkey:
+                    neighbours.append(key)
+        return neighbours
+
+    def closeEvent(self, event):
+        self.tier_prefetcher.shutdown()
+        if self.folder_watcher is not None:
+            self.folder_watcher.stop()
+        self.watch_executor.shutdown(wait=False, cancel_futures=True)
+        for entry in list(self.atlas_cache.entries.values()):
+            if entry.get('journal') is not None:
+                entry['journal'].clear()
+        super().closeEvent(event)
+
+    def preview_full_size(self, mapkey):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'CONTEXT MENU: Preview Full Size (Multi-Size Tabs)')
+        print(Fore.CYAN + f"{'=' * 60}")
+        print(Fore.GREEN + f'[DEBUG] MapKey: {mapkey}')
+        icon_paths = self.find_icon_all_sizes(mapkey)
+        icon_type = icon_paths.pop('icon_type', 'item')
+        if not icon_paths:
+            print(Fore.YELLOW + f"[WARNING] No icon sizes found for '{mapkey}'")
+            QMessageBox.warning(self, 'Preview Not Available', f"Could not find any icon sizes for '{mapkey}'.")
+            return
+        print(Fore.GREEN + f'[DEBUG] Found {len(icon_paths)} icon sizes: {sorted(icon_paths.keys())}')
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f'Preview: {mapkey}')
+        dialog.setModal(True)
+        dialog_layout = QVBoxLayout()
+        tab_widget = QTabWidget()
+        tab_widget.setStyleSheet('\n            QTabWidget::pane {\n                border: 2px solid #555;\n                background-color: #2a2a2a;\n            }\n            QTabBar::tab {\n                background-color: #3a3a3a;\n                color: white;\n                padding: 8px 16px;\n                margin-right: 2px;\n                border: 1px solid #555;\n                border-bottom: none;\n                border-top-left-radius: 4px;\n                border-top-right-radius: 4px;\n            }\n            QTabBar::tab:selected {\n                background-color: #2a2a2a;\n                border-bottom: 2px solid #ff8c00;\n            }\n            QTabBar::tab:hover {\n                background-color: #4a4a4a;\n            }\n        ')
+        sizes_order = [72, 144, 192, 380]
+        for size in sizes_order:
+            if size not in icon_paths:
+                continue
+            dds_path = icon_paths[size]
+            try:
+                print(Fore.CYAN + f'[OPERATION] Fetching {size}px tier from tier cache...')
+                pixmap = QPixmap.fromImage(self.pil_to_qimage(self.tier_prefetcher.get(dds_path)))
+                if pixmap.isNull():
+                    print(Fore.RED + f'[ERROR] Failed to load {size}px preview image')
+                    continue
+                tab_content = QWidget()
+                tab_layout = QVBoxLayout()
+                image_label = QLabel()
+                image_label.setPixmap(pixmap)
+                image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                image_label.setStyleSheet('QLabel { border: 2px solid #555; background-color: #2a2a2a; padding: 10px; }')
+                tab_layout.addWidget(image_label)
+                size_info = QLabel(f'<b>Dimensions:</b> {pixmap.width()}×{pixmap.height()}px')
+                size_info.setStyleSheet('QLabel { padding: 5px; font-size: 11pt; color: #ccc; }')
+                size_info.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                size_info.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+                tab_layout.addWidget(size_info)
+                tab_content.setLayout(tab_layout)
+                tab_widget.addTab(tab_content, f'{size}×{size}px')
+                print(Fore.GREEN + f'✓ Added {size}px tab to preview')
+            except Exception as e:
+                print(Fore.RED + f'[ERROR] Failed to create {size}px preview: {e}')
+                continue
+        dialog_layout.addWidget(tab_widget)
+        available_sizes = ', '.join([f'{s}×{s}' for s in sorted(icon_paths.keys())])
+        primary_path = icon_paths.get(380) or icon_paths.get(192) or icon_paths.get(144) or icon_paths.get(72)
+        info_label = QLabel(f'<b>MapKey:</b> {mapkey}<br><b>Type:</b> {icon_type.capitalize()}<br><b>Path:</b> {primary_path}<br><b>Available Sizes:</b> {available_sizes}px')
+        info_label.setStyleSheet('QLabel { padding: 10px; font-size: 12pt; }')
+        info_label.setWordWrap(True)
+        info_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        dialog_layout.addWidget(info_label)
+        close_btn = QPushButton('Close')
+        close_btn.setStyleSheet('QPushButton { font-size: 12pt; padding: 5px; }')
+        close_btn.clicked.connect(dialog.close)
+        dialog_layout.addWidget(close_btn)
+        dialog.setLayout(dialog_layout)
+        dialog.adjustSize()
+        dialog.setMinimumWidth(420)
+        print(Fore.GREEN + f'[CACHE] {self.tier_prefetcher.cache.describe()}')
+        self.statusBar().showMessage(self.tier_prefetcher.cache.describe())
+        print(Fore.GREEN + f'[POPUP] Showing multi-size preview dialog with {tab_widget.count()} tabs')
+        dialog.exec()
+
+    def replace_icon_from_context(self, mapkey):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'CONTEXT MENU: Replace Icon')
+        print(Fore.CYAN + f"{'=' * 60}")
+        print(Fore.GREEN + f'[DEBUG] MapKey: {mapkey}')
+        if not self.select_mapkey(mapkey):
+            print(Fore.RED + f"[ERROR] Could not select '{mapkey}' in icon browser - replace aborted")
+            return
+        print(Fore.GREEN + f"✓ Selected '{mapkey}' in icon browser")
+        self.replace_icon()
+
+    def copy_mapkey(self, mapkey):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'CONTEXT MENU: Copy MapKey')
+        print(Fore.CYAN + f"{'=' * 60}")
+        print(Fore.GREEN + f'[DEBUG] Copying to clipboard: {mapkey}')
+        clipboard = QApplication.clipboard()
+        clipboard.setText(mapkey)
+        print(Fore.GREEN + f"✓ MapKey '{mapkey}' copied to clipboard")
+        print(Fore.GREEN + f'[POPUP] Showing info toast')
+        msg = QMessageBox(self)
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.setWindowTitle('Copied')
+        msg.setText(f'MapKey copied: {mapkey}')
+        msg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        msg.setDefaultButton(QMessageBox.StandardButton.Ok)
+        QTimer.singleShot(1500, msg.close)
+        msg.exec()
+
+    def delete_icon_from_atlas(self, mapkey):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'CONTEXT MENU: Delete from Atlas')
+        print(Fore.CYAN + f"{'=' * 60}")
+        print(Fore.GREEN + f'[DEBUG] MapKey: {mapkey}')
+        self.delete_icons_from_atlas([mapkey])
+
+    def bulk_delete_icons_gui(self):
+        print(Fore.CYAN + f"\n{'=' * 60}")
+        print(Fore.CYAN + f'USER ACTION: Bulk Delete')
+        print(Fore.CYAN + f"{'=' * 60}")
+        if not self.atlas_im or not self.dom:
+            QMessageBox.warning(self, 'Error', self.strings['error_load'])
+            return
+        text, ok = QInputDialog.getMultiLineText(self, 'Bulk Delete', 'One MapKey or glob pattern (e.g. Old_*) per line.\nPrefix a line with re: for a regular expression.', '\n'.join(self.selected_mapkeys()))
+        if not ok or not text.strip():
+            print(Fore.YELLOW + f'[WARNING] User cancelled bulk delete')
+            return
+        names, patterns, regex = ([], [], [])
+        for line in (line.strip() for line in text.splitlines()):
+            if line.startswith('re:'):
+                regex.append(line[3:].strip())
+            elif any((ch in line for ch in '*?[')):
+                patterns.append(line)
+            elif line:
+                names.append(line)
+        try:
+            selected, missing = select_mapkeys([icon['mapkey'] for icon in self.icons], names, patterns, '|'.join((f'(?:{r})' for r in regex)) or None)
+        except re.error as e:
+            QMessageBox.warning(self, 'Invalid Pattern', f'Invalid regular expression: {e}')
+            return
+        for name in missing:
+            print(Fore.YELLOW + f'[DELETE] {name} is not in the atlas')
+        if not selected:
+            QMessageBox.information(self, 'Bulk Delete', 'No MapKeys in this atlas match.')
+            return
+        self.delete_icons_from_atlas(selected)
+
+    def delete_icons_from_atlas(self, mapkeys):
+        shown = '\n'.join(mapkeys[:15]) + (f'\n... and {len(mapkeys) - 15} more' if len(mapkeys) > 15 else '')
+        print(Fore.YELLOW + f'[POPUP] Showing deletion confirmation for {len(mapkeys)} icon(s)')
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(QMessageBox.Icon.Warning)
+        msg_box.setWindowTitle('Confirm Deletion')
+        msg_box.setText(f"Delete icon '{mapkeys[0]}' from atlas?" if len(mapkeys) == 1 else f'Delete {len(mapkeys)} icons from atlas?')
+        msg_box.setInformativeText('This will:\n• Remove the icons from the atlas\n• Delete all resized versions (72, 144, 192, 380 px)\n• Clear their tiles in the atlas image\n\nUse Undo (Ctrl+Z) to restore the tiles, the LSX entries and the resized files.')
+        if len(mapkeys) > 1:
+            msg_box.setDetailedText(shown)
+        msg_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        msg_box.setDefaultButton(QMessageBox.StandardButton.No)
+        if msg_box.exec() != QMessageBox.StandardButton.Yes:
+            print(Fore.YELLOW + f'[WARNING] User cancelled deletion')
+            return
+        print(Fore.GREEN + f'✓ User confirmed deletion')
+        tier_roots = []
+        if self.mode == 'mod_project':
+            bg3_data = self.bg3_edit.text().strip()
+            mod = self.mod_combo.currentText()
+            if mod and bg3_data:
+                tier_roots.append(os.path.join(bg3_data, 'Mods', mod, 'GUI'))
+        self.journal.begin(f"delete '{mapkeys[0]}'" if len(mapkeys) == 1 else f'delete {len(mapkeys)} icons')
+        report = bulk_delete_icons(self.dom, self.icons, self.atlas_im, mapkeys, self.grid_size, self.tile_size, tier_roots=tier_roots, journal=self.journal, tile_digests=self.tile_digests)
+        if not report['removed']:
+            self.journal.cancel()
+            print(Fore.RED + f"[ERROR] Icon(s) not found: {', '.join(report['missing'])}")
+            return
+        if report['shared']:
+            print(Fore.GREEN + f"[DEDUPE] {report['shared']} deleted MapKey(s) shared a slot with remaining icons - keeping those pixels")
+        self.icon_model.remove_icons(report['removed'])
+        self.slot_index = None
+        self.slot_mapkeys = None
+        if self.search_index is not None:
+            for mapkey in report['removed']:
+                self.search_index.remove(mapkey)
+        if self.icon_filter_edit.text().strip():
+            self.search_mapkeys(self.icon_filter_edit.text())
+        print(Fore.GREEN + f'[DEBUG] Removed from internal list. Total icons now: {len(self.icons)}')
+        self.journal.commit(self.atlas_im)
+        self.update_undo_actions()
+        self.dom_modified = True
+        self.image_modified = True
+        self.refresh_workspace_combo()
+        self.update_preview()
+        message = f"Deleted {len(report['removed'])} icon(s) and {len(report['files'])} resized file(s) in {report['elapsed_ms']:.0f} ms"
+        if report['errors']:
+            message += f" - {len(report['errors'])} file(s) could not be removed, see console"
+        print(Fore.GREEN + f'✓ {message}')
+        self.statusBar().showMessage(message, 8000)
+
+    def load_preferences(self):
+        prefs_file = os.path.join(os.path.dirname(__file__), 'preferences.json')
+        if os.path.exists(prefs_file):
+            with open(prefs_file, 'r', encoding='utf-8') as f:
+                prefs = json.load(f)
+                prefs.setdefault('log_enabled', True)
+                prefs.setdefault('log_directory', os.path.join(os.path.dirname(__file__), 'logs'))
+                prefs.setdefault('log_level', 'DEBUG')
+                prefs.setdefault('max_log_files', 10)
+                prefs.setdefault('texconv_path', '')
+                prefs.setdefault('atlas_cache_mb', 512)
+                prefs.setdefault('tier_cache_mb', 64)
+                prefs.setdefault('undo_budget_mb', 64)
+                return prefs
+        return {'log_enabled': True, 'log_directory': os.path.join(os.path.dirname(__file__), 'logs'), 'log_level': 'DEBUG', 'max_log_files': 10, 'texconv_path': '', 'atlas_cache_mb': 512, 'tier_cache_mb': 64, 'undo_budget_mb': 64}
+
+    def save_preferences(self):
+        prefs = dict(self.prefs)
+        prefs.update({'bg3_data': self.bg3_prefs_edit.text(), 'temp_dir': self.temp_edit.text(), 'output_path': self.output_edit.text(), 'zip_output_path': self.zip_edit.text(), 'preview_size': self.preview_combo.currentText(), 'log_enabled': self.log_enabled_checkbox.isChecked(), 'log_directory': self.log_dir_edit.text(), 'log_level': self.log_level_combo.currentText(), 'max_log_files': self.max_log_files_spinbox.value(), 'texconv_path': self.texconv_path_edit.text(), 'atlas_cache_mb': self.atlas_cache_spinbox.value(), 'undo_budget_mb': self.undo_budget_spinbox.value(), 'build_cache_url': self.build_cache_url_edit.text().strip(), 'profiling_enabled': self.profiling_checkbox.isChecked()})
+        self.prefs = prefs
+        prefs_file = os.path.join(os.path.dirname(__file__), 'preferences.json')
+        with open(prefs_file, 'w', encoding='utf-8') as f:
+            json.dump(prefs, f, indent=2)
+        set_texconv_path(find_texconv(prefs['texconv_path']))
+        self.update_texconv_status()
+        configure_build_cache(prefs.get('build_cache_dir') or None, prefs['build_cache_url'] or None, prefs.get('build_cache_enabled', True), int(prefs.get('build_cache_mb', 2048)) * 1024 * 1024)
+        configure_profiling(prefs['profiling_enabled'], prefs['log_directory'])
+        self.atlas_cache.set_max_bytes(prefs['atlas_cache_mb'] * 1024 * 1024)
+        if self.journal is not None:
+            self.journal.max_bytes = prefs['undo_budget_mb'] * 1024 * 1024
+        self.statusBar().showMessage(self.atlas_cache.describe())
+        QMessageBox.information(self, 'Success', 'Preferences saved.\n\nNote: Logging changes will take effect on next application start.')
+
+    def show_console_viewer(self):
+        if iconmanager.CONSOLE_CAPTURE is None:
+            QMessageBox.warning(self, 'Console Unavailable', "Console capture is not initialized.\n\nThis is likely because the application started in a mode that doesn't support console capture.\n\nTry running the application from the command line to see output.")
+            return
+        try:
+            dialog = ConsoleViewerDialog(iconmanager.CONSOLE_CAPTURE, self)
+            dialog.show()
+        except Exception as e:
+            QMessageBox.critical(self, 'Console Viewer Error', f'Failed to open console viewer:\n\n{str(e)}')
+
+def run_gui():
+    app = QApplication(sys.argv)
+    app.setStyle('Fusion')
+    palette = QPalette()
+    palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))
+    palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
+    palette.setColor(QPalette.ColorRole.Base, QColor(35, 35, 35))
+    palette.setColor(QPalette.ColorRole.AlternateBase, QColor(53, 53, 53))
+    palette.setColor(QPalette.ColorRole.ToolTipBase, Qt.GlobalColor.white)
+    palette.setColor(QPalette.ColorRole.ToolTipText, Qt.GlobalColor.white)
+    palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
+    palette.setColor(QPalette.ColorRole.Button, QColor(53, 53, 53))
+    palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.white)
+    palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red)
+    palette.setColor(QPalette.ColorRole.Link, QColor(42, 130, 218))
+    palette.setColor(QPalette.ColorRole.Highlight, QColor(42, 130, 218))
+    palette.setColor(QPalette.ColorRole.HighlightedText, Qt.GlobalColor.black)
+    app.setPalette(palette)
+    window = GuiWindow()
+    window.show()
+    return app.exec()
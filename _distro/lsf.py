@@ -0,0 +1,379 @@
+import struct
+import zlib
+import uuid
+import base64
+import lspk
+
+LSF_SIGNATURE = b'LSOF'
+LSF_HEADER = struct.Struct('<4sI')
+ENGINE_VERSION_32 = struct.Struct('<I')
+ENGINE_VERSION_64 = struct.Struct('<Q')
+METADATA_V5 = struct.Struct('<8IBBHI')
+METADATA_V6 = struct.Struct('<10IBBHI')
+NODE_ENTRY_V2 = struct.Struct('<Iii')
+NODE_ENTRY_V3 = struct.Struct('<Iiii')
+ATTRIBUTE_ENTRY_V2 = struct.Struct('<IIi')
+ATTRIBUTE_ENTRY_V3 = struct.Struct('<IIiI')
+VERSION_CHUNKED_COMPRESS = 2
+VERSION_EXTENDED_NODES = 3
+VERSION_BG3 = 4
+VERSION_BG3_EXTENDED_HEADER = 5
+VERSION_BG3_ADDITIONAL_BLOB = 6
+VERSION_BG3_PATCH3 = 7
+SUPPORTED_VERSIONS = range(1, 8)
+METADATA_KEYS_AND_ADJACENCY = 1
+COMPRESSION_DEFAULT_LEVEL = 32
+NAME_BUCKETS = 512
+DEFAULT_ENGINE_VERSION = (4, 0, 9, 320)
+TYPE_NAMES = ['None', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'float', 'double', 'ivec2', 'ivec3', 'ivec4', 'fvec2', 'fvec3', 'fvec4', 'mat2x2', 'mat3x3', 'mat3x4', 'mat4x3', 'mat4x4', 'bool', 'string', 'path', 'FixedString', 'LSString', 'uint64', 'ScratchBuffer', 'old_int64', 'int8', 'TranslatedString', 'WString', 'LSWString', 'guid', 'int64', 'TranslatedFSString']
+TYPE_IDS = {name: type_id for type_id, name in enumerate(TYPE_NAMES)}
+NUMERIC_FORMATS = {1: 'B', 2: 'h', 3: 'H', 4: 'i', 5: 'I', 6: 'f', 7: 'd', 8: '2i', 9: '3i', 10: '4i', 11: '2f', 12: '3f', 13: '4f', 14: '4f', 15: '9f', 16: '12f', 17: '12f', 18: '16f', 19: '?', 24: 'Q', 26: 'q', 27: 'b', 32: 'q'}
+STRING_TYPES = (20, 21, 22, 23, 29, 30)
+TYPE_GUID = 31
+TYPE_SCRATCH_BUFFER = 25
+TYPE_TRANSLATED_STRING = 28
+
+class LsfError(Exception):
+    pass
+
+def type_id_of(type_name):
+    if type_name in TYPE_IDS:
+        return TYPE_IDS[type_name]
+    if type_name.isdigit() and int(type_name) < len(TYPE_NAMES):
+        return int(type_name)
+    raise LsfError(f'unknown attribute type {type_name!r}')
+
+def format_float32(value):
+    packed = struct.pack('<f', value)
+    for precision in range(1, 10):
+        text = f'{value:.{precision}g}'
+        if struct.pack('<f', float(text)) == packed:
+            return text
+    return repr(value)
+
+def format_value(type_id, value):
+    if type_id == 6:
+        return format_float32(value)
+    if type_id in (11, 12, 13, 14, 15, 16, 17, 18):
+        return ' '.join((format_float32(v) for v in value))
+    if type_id in (8, 9, 10):
+        return ' '.join((str(v) for v in value))
+    if type_id == 19:
+        return 'True' if value else 'False'
+    if type_id == TYPE_SCRATCH_BUFFER:
+        return base64.b64encode(value).decode('ascii')
+    return str(value)
+
+def parse_value(type_id, text):
+    if type_id in (6, 7):
+        return float(text)
+    if type_id in (8, 9, 10):
+        return tuple((int(v) for v in text.split()))
+    if type_id in (11, 12, 13, 14, 15, 16, 17, 18):
+        return tuple((float(v) for v in text.split()))
+    if type_id == 19:
+        return text.strip().lower() in ('true', '1')
+    if type_id in NUMERIC_FORMATS:
+        return int(text)
+    if type_id == TYPE_SCRATCH_BUFFER:
+        return base64.b64decode(text)
+    if type_id == TYPE_GUID:
+        return str(uuid.UUID(text))
+    if type_id in STRING_TYPES:
+        return text
+    raise LsfError(f'cannot convert {TYPE_NAMES[type_id]} attributes')
+
+def decode_value(type_id, data, version):
+    if type_id in NUMERIC_FORMATS:
+        values = struct.unpack('<' + NUMERIC_FORMATS[type_id], data)
+        return values[0] if len(values) == 1 else values
+    if type_id in STRING_TYPES:
+        return bytes(data).rstrip(b'\x00').decode('utf-8', errors='replace')
+    if type_id == TYPE_GUID:
+        return str(uuid.UUID(bytes_le=bytes(data)))
+    if type_id == TYPE_SCRATCH_BUFFER:
+        return bytes(data)
+    if type_id == TYPE_TRANSLATED_STRING:
+        value = {}
+        pos = 0
+        if version >= VERSION_BG3:
+            (value['version'],) = struct.unpack_from('<H', data, pos)
+            pos += 2
+        else:
+            (length,) = struct.unpack_from('<i', data, pos)
+            value['value'] = bytes(data[pos + 4:pos + 4 + length]).rstrip(b'\x00').decode('utf-8', errors='replace')
+            pos += 4 + length
+        (length,) = struct.unpack_from('<i', data, pos)
+        value['handle'] = bytes(data[pos + 4:pos + 4 + length]).rstrip(b'\x00').decode('utf-8', errors='replace')
+        return value
+    raise LsfError(f'unsupported attribute type {TYPE_NAMES[type_id] if type_id < len(TYPE_NAMES) else type_id}')
+
+def encode_value(type_id, value, version):
+    if type_id in NUMERIC_FORMATS:
+        return struct.pack('<' + NUMERIC_FORMATS[type_id], *(value if isinstance(value, (tuple, list)) else (value,)))
+    if type_id in STRING_TYPES:
+        return value.encode('utf-8') + b'\x00'
+    if type_id == TYPE_GUID:
+        return uuid.UUID(value).bytes_le
+    if type_id == TYPE_SCRATCH_BUFFER:
+        return bytes(value)
+    if type_id == TYPE_TRANSLATED_STRING:
+        handle = value.get('handle', '').encode('utf-8') + b'\x00'
+        if version >= VERSION_BG3:
+            prefix = struct.pack('<H', int(value.get('version', 0)))
+        else:
+            text = value.get('value', '').encode('utf-8') + b'\x00'
+            prefix = struct.pack('<i', len(text)) + text
+        return prefix + struct.pack('<i', len(handle)) + handle
+    raise LsfError(f'unsupported attribute type {TYPE_NAMES[type_id] if type_id < len(TYPE_NAMES) else type_id}')
+
+def unpack_engine_version(packed, version):
+    if version >= VERSION_BG3_EXTENDED_HEADER:
+        return (packed >> 55 & 127, packed >> 47 & 255, packed >> 31 & 65535, packed & 2147483647)
+    return (packed >> 28 & 15, packed >> 24 & 15, packed >> 16 & 255, packed & 65535)
+
+def pack_engine_version(engine_version, version):
+    major, minor, revision, build = engine_version
+    if version >= VERSION_BG3_EXTENDED_HEADER:
+        return (major & 127) << 55 | (minor & 255) << 47 | (revision & 65535) << 31 | build & 2147483647
+    return (major & 15) << 28 | (minor & 15) << 24 | (revision & 255) << 16 | build & 65535
+
+def decompress_section(data, pos, size_on_disk, uncompressed_size, method, chunked):
+    if uncompressed_size == 0:
+        return (b'', pos + size_on_disk)
+    if size_on_disk == 0:
+        return (data[pos:pos + uncompressed_size], pos + uncompressed_size)
+    raw = data[pos:pos + size_on_disk]
+    if method == lspk.COMPRESSION_LZ4 and chunked:
+        payload = lspk.lz4_frame_decompress(raw, uncompressed_size)
+    else:
+        decompress = lspk.DECOMPRESSORS.get(method)
+        if decompress is None:
+            raise LsfError(f'no decompressor for method {method}')
+        payload = decompress(raw, uncompressed_size)
+    if len(payload) != uncompressed_size:
+        raise LsfError(f'section decompressed to {len(payload)} bytes, expected {uncompressed_size}')
+    return (payload, pos + size_on_disk)
+
+def read_names(data):
+    (bucket_count,) = struct.unpack_from('<I', data, 0)
+    pos = 4
+    buckets = []
+    for _ in range(bucket_count):
+        (chain_length,) = struct.unpack_from('<H', data, pos)
+        pos += 2
+        chain = []
+        for _ in range(chain_length):
+            (length,) = struct.unpack_from('<H', data, pos)
+            chain.append(bytes(data[pos + 2:pos + 2 + length]).decode('utf-8'))
+            pos += 2 + length
+        buckets.append(chain)
+    return buckets
+
+def read_lsf(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = memoryview(source)
+    else:
+        with open(source, 'rb') as f:
+            data = memoryview(f.read())
+    try:
+        return decode_lsf(data)
+    except (struct.error, zlib.error, lspk.PakError, IndexError, KeyError, ValueError) as e:
+        raise LsfError(f'corrupt LSF resource: {e}')
+
+def decode_lsf(data):
+    if len(data) < LSF_HEADER.size or data[:4] != LSF_SIGNATURE:
+        raise LsfError('not an LSF resource')
+    _, version = LSF_HEADER.unpack_from(data, 0)
+    if version not in SUPPORTED_VERSIONS:
+        raise LsfError(f'unsupported LSF version {version}')
+    pos = LSF_HEADER.size
+    if version >= VERSION_BG3_EXTENDED_HEADER:
+        (packed,) = ENGINE_VERSION_64.unpack_from(data, pos)
+        pos += ENGINE_VERSION_64.size
+    else:
+        (packed,) = ENGINE_VERSION_32.unpack_from(data, pos)
+        pos += ENGINE_VERSION_32.size
+    if version >= VERSION_BG3_ADDITIONAL_BLOB:
+        strings_size, strings_disk, keys_size, keys_disk, nodes_size, nodes_disk, attributes_size, attributes_disk, values_size, values_disk, compression, _, _, metadata_format = METADATA_V6.unpack_from(data, pos)
+        pos += METADATA_V6.size
+    else:
+        strings_size, strings_disk, nodes_size, nodes_disk, attributes_size, attributes_disk, values_size, values_disk, compression, _, _, metadata_format = METADATA_V5.unpack_from(data, pos)
+        pos += METADATA_V5.size
+    method = compression & 15
+    chunked = version >= VERSION_CHUNKED_COMPRESS
+    strings, pos = decompress_section(data, pos, strings_disk, strings_size, method, False)
+    nodes, pos = decompress_section(data, pos, nodes_disk, nodes_size, method, chunked)
+    attributes, pos = decompress_section(data, pos, attributes_disk, attributes_size, method, chunked)
+    values, pos = decompress_section(data, pos, values_disk, values_size, method, chunked)
+    names = read_names(strings)
+
+    def name_at(index):
+        return names[index >> 16][index & 65535]
+    extended = version >= VERSION_EXTENDED_NODES and metadata_format == METADATA_KEYS_AND_ADJACENCY
+    tree = []
+    first_attributes = []
+    regions = []
+    for fields in (NODE_ENTRY_V3 if extended else NODE_ENTRY_V2).iter_unpack(nodes):
+        if extended:
+            name_index, parent, _, first_attribute = fields
+        else:
+            name_index, first_attribute, parent = fields
+        node = {'id': name_at(name_index), 'attributes': [], 'children': []}
+        if parent == -1:
+            regions.append(node)
+        else:
+            tree[parent]['children'].append(node)
+        tree.append(node)
+        first_attributes.append(first_attribute)
+    if extended:
+        entries = list(ATTRIBUTE_ENTRY_V3.iter_unpack(attributes))
+        for node, index in zip(tree, first_attributes):
+            while index != -1:
+                name_index, type_and_length, index, offset = entries[index]
+                type_id = type_and_length & 63
+                node['attributes'].append({'id': name_at(name_index), 'type': TYPE_NAMES[type_id] if type_id < len(TYPE_NAMES) else str(type_id), 'value': decode_value(type_id, values[offset:offset + (type_and_length >> 6)], version)})
+    else:
+        offset = 0
+        for name_index, type_and_length, node_index in ATTRIBUTE_ENTRY_V2.iter_unpack(attributes):
+            type_id, length = (type_and_length & 63, type_and_length >> 6)
+            tree[node_index]['attributes'].append({'id': name_at(name_index), 'type': TYPE_NAMES[type_id] if type_id < len(TYPE_NAMES) else str(type_id), 'value': decode_value(type_id, values[offset:offset + length], version)})
+            offset += length
+    return {'version': version, 'engine_version': unpack_engine_version(packed, version), 'regions': regions}
+
+class NameTable:
+
+    def __init__(self):
+        self.buckets = [[] for _ in range(NAME_BUCKETS)]
+        self.indices = {}
+
+    def add(self, name):
+        index = self.indices.get(name)
+        if index is None:
+            bucket = zlib.crc32(name.encode('utf-8')) % NAME_BUCKETS
+            index = bucket << 16 | len(self.buckets[bucket])
+            self.buckets[bucket].append(name)
+            self.indices[name] = index
+        return index
+
+    def pack(self):
+        out = bytearray(struct.pack('<I', len(self.buckets)))
+        for chain in self.buckets:
+            out += struct.pack('<H', len(chain))
+            for name in chain:
+                encoded = name.encode('utf-8')
+                out += struct.pack('<H', len(encoded)) + encoded
+        return bytes(out)
+
+def write_lsf(resource, path, compression=lspk.COMPRESSION_ZLIB, version=VERSION_BG3_ADDITIONAL_BLOB):
+    if version < VERSION_BG3_ADDITIONAL_BLOB:
+        raise LsfError(f'writing LSF version {version} is not supported')
+    if compression not in (lspk.COMPRESSION_NONE, lspk.COMPRESSION_ZLIB):
+        raise LsfError(f'write_lsf cannot produce {lspk.COMPRESSION_NAMES.get(compression, compression)} sections')
+    names = NameTable()
+    nodes = []
+    attributes = []
+    values = bytearray()
+    last_child = {}
+
+    def add_node(node, parent):
+        index = len(nodes)
+        nodes.append([names.add(node['id']), parent, -1, -1])
+        if parent in last_child:
+            nodes[last_child[parent]][2] = index
+        last_child[parent] = index
+        previous = None
+        for attr in node['attributes']:
+            type_id = type_id_of(attr['type'])
+            payload = encode_value(type_id, attr['value'], version)
+            current = len(attributes)
+            attributes.append([names.add(attr['id']), type_id | len(payload) << 6, -1, len(values)])
+            values.extend(payload)
+            if previous is None:
+                nodes[index][3] = current
+            else:
+                attributes[previous][2] = current
+            previous = current
+        for child in node['children']:
+            add_node(child, index)
+    for region in resource['regions']:
+        add_node(region, -1)
+    sections = [names.pack(), b''.join((NODE_ENTRY_V3.pack(*row) for row in nodes)), b''.join((ATTRIBUTE_ENTRY_V3.pack(*row) for row in attributes)), bytes(values)]
+    stored = [zlib.compress(section) if compression == lspk.COMPRESSION_ZLIB else section for section in sections]
+    sizes = []
+    for section, payload in zip(sections, stored):
+        sizes += [len(section), len(payload) if compression != lspk.COMPRESSION_NONE else 0]
+    metadata = METADATA_V6.pack(sizes[0], sizes[1], 0, 0, *sizes[2:], compression | (COMPRESSION_DEFAULT_LEVEL if compression else 0), 0, 0, METADATA_KEYS_AND_ADJACENCY)
+    with open(path, 'wb') as f:
+        f.write(LSF_HEADER.pack(LSF_SIGNATURE, version))
+        f.write(ENGINE_VERSION_64.pack(pack_engine_version(resource.get('engine_version') or DEFAULT_ENGINE_VERSION, version)))
+        f.write(metadata)
+        for payload in stored:
+            f.write(payload)
+    return path
+
+def resource_to_dom(resource):
+    from xml.dom import minidom
+    dom = minidom.Document()
+    save = dom.createElement('save')
+    dom.appendChild(save)
+    version = dom.createElement('version')
+    for key, value in zip(('major', 'minor', 'revision', 'build'), resource.get('engine_version') or DEFAULT_ENGINE_VERSION):
+        version.setAttribute(key, str(value))
+    save.appendChild(version)
+
+    def build(node, node_id):
+        element = dom.createElement('node')
+        element.setAttribute('id', node_id)
+        for attr in node['attributes']:
+            attr_element = dom.createElement('attribute')
+            attr_element.setAttribute('id', attr['id'])
+            attr_element.setAttribute('type', attr['type'])
+            if isinstance(attr['value'], dict):
+                for key in ('value', 'handle', 'version'):
+                    if key in attr['value']:
+                        attr_element.setAttribute(key, str(attr['value'][key]))
+            else:
+                attr_element.setAttribute('value', format_value(type_id_of(attr['type']), attr['value']))
+            element.appendChild(attr_element)
+        if node['children']:
+            children = dom.createElement('children')
+            for child in node['children']:
+                children.appendChild(build(child, child['id']))
+            element.appendChild(children)
+        return element
+    for region in resource['regions']:
+        region_element = dom.createElement('region')
+        region_element.setAttribute('id', region['id'])
+        region_element.appendChild(build(region, 'root'))
+        save.appendChild(region_element)
+    return dom
+
+def child_elements(element, tag):
+    return [child for child in element.childNodes if child.nodeType == child.ELEMENT_NODE and child.tagName == tag]
+
+def resource_from_dom(dom):
+    save = dom.documentElement
+    engine_version = DEFAULT_ENGINE_VERSION
+    for version in child_elements(save, 'version'):
+        engine_version = tuple((int(version.getAttribute(key) or 0) for key in ('major', 'minor', 'revision', 'build')))
+
+    def read(element, node_id):
+        node = {'id': node_id, 'attributes': [], 'children': []}
+        for attr_element in child_elements(element, 'attribute'):
+            type_name = attr_element.getAttribute('type')
+            type_id = type_id_of(type_name)
+            if type_id == TYPE_TRANSLATED_STRING:
+                value = {key: attr_element.getAttribute(key) for key in ('value', 'handle', 'version') if attr_element.hasAttribute(key)}
+            else:
+                value = parse_value(type_id, attr_element.getAttribute('value'))
+            node['attributes'].append({'id': attr_element.getAttribute('id'), 'type': TYPE_NAMES[type_id], 'value': value})
+        for children in child_elements(element, 'children'):
+            for child in child_elements(children, 'node'):
+                node['children'].append(read(child, child.getAttribute('id')))
+        return node
+    regions = []
+    for region_element in child_elements(save, 'region'):
+        for root in child_elements(region_element, 'node'):
+            regions.append(read(root, region_element.getAttribute('id')))
+    return {'version': VERSION_BG3_ADDITIONAL_BLOB, 'engine_version': engine_version, 'regions': regions}
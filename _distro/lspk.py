@@ -0,0 +1,325 @@
+import os
+import mmap
+import struct
+import zlib
+import fnmatch
+import threading
+
+LSPK_SIGNATURE = b'LSPK'
+LSPK_HEADER = struct.Struct('<IQIBB16sH')
+LSPK_FILE_LIST_HEADER = struct.Struct('<ii')
+FILE_ENTRY_15 = struct.Struct('<256sQQQIIII')
+FILE_ENTRY_18 = struct.Struct('<256sIHBBII')
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZ4 = 2
+COMPRESSION_ZSTD = 3
+COMPRESSION_NAMES = {COMPRESSION_NONE: 'none', COMPRESSION_ZLIB: 'zlib', COMPRESSION_LZ4: 'lz4', COMPRESSION_ZSTD: 'zstd'}
+SUPPORTED_VERSIONS = (15, 16, 18)
+LZ4_FRAME_MAGIC = 407708164
+
+class PakError(Exception):
+    pass
+
+def lz4_block_decode(src, dst):
+    src = memoryview(src)
+    i = 0
+    n = len(src)
+    while i < n:
+        token = src[i]
+        i += 1
+        length = token >> 4
+        if length == 15:
+            while True:
+                extra = src[i]
+                i += 1
+                length += extra
+                if extra != 255:
+                    break
+        dst += src[i:i + length]
+        i += length
+        if i >= n:
+            break
+        offset = src[i] | src[i + 1] << 8
+        i += 2
+        if offset == 0 or offset > len(dst):
+            raise PakError(f'corrupt LZ4 block (match offset {offset} at output {len(dst)})')
+        length = token & 15
+        if length == 15:
+            while True:
+                extra = src[i]
+                i += 1
+                length += extra
+                if extra != 255:
+                    break
+        length += 4
+        start = len(dst) - offset
+        if offset >= length:
+            dst += dst[start:start + length]
+        else:
+            pattern = dst[start:]
+            dst += (pattern * (length // offset + 1))[:length]
+    return dst
+
+def lz4_block_decompress(data, uncompressed_size):
+    try:
+        import lz4.block
+        return lz4.block.decompress(bytes(data), uncompressed_size=uncompressed_size)
+    except ImportError:
+        pass
+    dst = lz4_block_decode(data, bytearray())
+    if len(dst) != uncompressed_size:
+        raise PakError(f'LZ4 block decoded to {len(dst)} bytes, expected {uncompressed_size}')
+    return bytes(dst)
+
+def lz4_frame_decompress(data, uncompressed_size=None):
+    try:
+        import lz4.frame
+        return lz4.frame.decompress(bytes(data))
+    except ImportError:
+        pass
+    src = memoryview(data)
+    if len(src) < 7 or struct.unpack_from('<I', src, 0)[0] != LZ4_FRAME_MAGIC:
+        raise PakError('not an LZ4 frame')
+    flags = src[4]
+    i = 7 + (8 if flags & 8 else 0) + (4 if flags & 1 else 0)
+    dst = bytearray()
+    while True:
+        (size,) = struct.unpack_from('<I', src, i)
+        i += 4
+        if size == 0:
+            break
+        block = src[i:i + (size & 2147483647)]
+        i += size & 2147483647
+        if flags & 16:
+            i += 4
+        if size & 2147483648:
+            dst += block
+        else:
+            lz4_block_decode(block, dst)
+    if uncompressed_size is not None and len(dst) != uncompressed_size:
+        raise PakError(f'LZ4 frame decoded to {len(dst)} bytes, expected {uncompressed_size}')
+    return bytes(dst)
+
+def lz4_block_store(data):
+    out = bytearray()
+    length = len(data)
+    if length >= 15:
+        out.append(240)
+        length -= 15
+        while length >= 255:
+            out.append(255)
+            length -= 255
+        out.append(length)
+    else:
+        out.append(length << 4)
+    out += data
+    return bytes(out)
+
+def zstd_decompress(data, uncompressed_size):
+    try:
+        import zstandard
+    except ImportError:
+        raise PakError('entry is zstd-compressed - install the zstandard package to read it')
+    return zstandard.ZstdDecompressor().decompress(bytes(data), max_output_size=uncompressed_size)
+
+DECOMPRESSORS = {COMPRESSION_NONE: lambda data, size: bytes(data), COMPRESSION_ZLIB: lambda data, size: zlib.decompress(bytes(data)), COMPRESSION_LZ4: lz4_block_decompress, COMPRESSION_ZSTD: zstd_decompress}
+
+def register_decompressor(method, func):
+    DECOMPRESSORS[method] = func
+
+def normalize_entry_name(name):
+    return name.replace('\\', '/').lstrip('/').lower()
+
+def entry_dest_path(dest_dir, name):
+    parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.')]
+    if not parts or name.replace('\\', '/').startswith('/') or '..' in parts or ':' in parts[0]:
+        raise PakError(f'refusing to extract unsafe entry name {name!r}')
+    root = os.path.realpath(dest_dir)
+    dest_path = os.path.realpath(os.path.join(root, *parts))
+    if os.path.commonpath([root, dest_path]) != root:
+        raise PakError(f'entry {name!r} would be extracted outside {dest_dir}')
+    return dest_path
+
+class PakReader:
+
+    def __init__(self, path, decompressors=None):
+        self.path = path
+        self.decompressors = dict(DECOMPRESSORS)
+        if decompressors:
+            self.decompressors.update(decompressors)
+        self.parts = {}
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.file = open(path, 'rb')
+        try:
+            self.parts[0] = self._map(self.file)
+            self._read_header()
+            self._read_file_list()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name):
+        return normalize_entry_name(name) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _map(self, f):
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            raise PakError(f'cannot map {f.name}: {e}')
+
+    def _read_header(self):
+        data = self.parts[0]
+        if data[:4] != LSPK_SIGNATURE:
+            raise PakError(f'{self.path} is not an LSPK package')
+        if len(data) < 4 + LSPK_HEADER.size:
+            raise PakError(f'{self.path} is truncated')
+        self.version, self.file_list_offset, self.file_list_size, self.flags, self.priority, self.md5, self.num_parts = LSPK_HEADER.unpack_from(data, 4)
+        if self.version not in SUPPORTED_VERSIONS:
+            raise PakError(f'unsupported LSPK version {self.version} (supported: {", ".join(map(str, SUPPORTED_VERSIONS))})')
+
+    def _read_file_list(self):
+        data = self.parts[0]
+        num_files, compressed_size = LSPK_FILE_LIST_HEADER.unpack_from(data, self.file_list_offset)
+        entry_struct = FILE_ENTRY_18 if self.version == 18 else FILE_ENTRY_15
+        start = self.file_list_offset + LSPK_FILE_LIST_HEADER.size
+        if num_files < 0 or compressed_size < 0 or start + compressed_size > len(data):
+            raise PakError(f'{self.path} has a corrupt file list')
+        table = lz4_block_decompress(data[start:start + compressed_size], num_files * entry_struct.size)
+        for fields in entry_struct.iter_unpack(table):
+            if self.version == 18:
+                raw_name, offset_low, offset_high, part, flags, size_on_disk, uncompressed_size = fields
+                offset = offset_low | offset_high << 32
+            else:
+                raw_name, offset, size_on_disk, uncompressed_size, part, flags, _, _ = fields
+            name = raw_name.split(b'\x00', 1)[0].decode('utf-8', errors='replace')
+            self.entries[normalize_entry_name(name)] = {'name': name, 'offset': offset, 'size_on_disk': size_on_disk, 'uncompressed_size': uncompressed_size or size_on_disk, 'compression': flags & 15 if uncompressed_size else COMPRESSION_NONE, 'part': part}
+
+    def part_path(self, part):
+        stem, ext = os.path.splitext(self.path)
+        return self.path if part == 0 else f'{stem}_{part}{ext}'
+
+    def _part(self, part):
+        with self.lock:
+            if part not in self.parts:
+                path = self.part_path(part)
+                if not os.path.exists(path):
+                    raise PakError(f'archive part {part} is missing: {path}')
+                with open(path, 'rb') as f:
+                    self.parts[part] = self._map(f)
+            return self.parts[part]
+
+    def names(self, pattern=None):
+        names = [entry['name'] for entry in self.entries.values()]
+        if pattern:
+            pattern = normalize_entry_name(pattern)
+            names = [name for name in names if fnmatch.fnmatchcase(normalize_entry_name(name), pattern)]
+        return sorted(names)
+
+    def find(self, name):
+        return self.entries.get(normalize_entry_name(name))
+
+    def read(self, name):
+        entry = self.find(name)
+        if entry is None:
+            raise KeyError(name)
+        data = self._part(entry['part'])
+        end = entry['offset'] + entry['size_on_disk']
+        if end > len(data):
+            raise PakError(f"{entry['name']} lies outside {self.part_path(entry['part'])}")
+        raw = data[entry['offset']:end]
+        if entry['compression'] == COMPRESSION_NONE:
+            return bytes(raw)
+        decompress = self.decompressors.get(entry['compression'])
+        if decompress is None:
+            raise PakError(f"{entry['name']}: no decompressor for method {entry['compression']}")
+        return decompress(raw, entry['uncompressed_size'])
+
+    def extract(self, name, dest_path):
+        payload = self.read(name)
+        os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+        with open(dest_path, 'wb') as f:
+            f.write(payload)
+        return dest_path
+
+    def close(self):
+        for mapped in self.parts.values():
+            mapped.close()
+        self.parts = {}
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class PakSet:
+
+    def __init__(self, paths, decompressors=None):
+        self.readers = []
+        for path in paths:
+            self.readers.append(PakReader(path, decompressors))
+        self.readers.sort(key=lambda reader: reader.priority, reverse=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def locate(self, name):
+        for reader in self.readers:
+            if name in reader:
+                return reader
+        return None
+
+    def names(self, pattern=None):
+        return sorted(set((name for reader in self.readers for name in reader.names(pattern))))
+
+    def read(self, name):
+        reader = self.locate(name)
+        if reader is None:
+            raise KeyError(name)
+        return reader.read(name)
+
+    def close(self):
+        for reader in self.readers:
+            reader.close()
+
+def write_pak(path, files, compression=COMPRESSION_NONE, priority=0):
+    entries = []
+    body = bytearray()
+    header_size = 4 + LSPK_HEADER.size
+    for name, payload in files.items():
+        payload = bytes(payload)
+        method = compression if payload else COMPRESSION_NONE
+        if method == COMPRESSION_ZLIB:
+            stored = zlib.compress(payload)
+        elif method == COMPRESSION_LZ4:
+            stored = lz4_block_store(payload)
+        elif method == COMPRESSION_NONE:
+            stored = payload
+        else:
+            raise PakError(f'write_pak cannot produce {COMPRESSION_NAMES.get(compression, compression)} entries')
+        offset = header_size + len(body)
+        body += stored
+        encoded = name.replace('\\', '/').encode('utf-8')
+        if len(encoded) >= 256:
+            raise PakError(f'entry name too long: {name}')
+        entries.append(FILE_ENTRY_18.pack(encoded, offset & 4294967295, offset >> 32, 0, method, len(stored), 0 if method == COMPRESSION_NONE else len(payload)))
+    table = lz4_block_store(b''.join(entries))
+    file_list_offset = header_size + len(body)
+    with open(path, 'wb') as f:
+        f.write(LSPK_SIGNATURE)
+        f.write(LSPK_HEADER.pack(18, file_list_offset, LSPK_FILE_LIST_HEADER.size + len(table), 0, priority, bytes(16), 1))
+        f.write(body)
+        f.write(LSPK_FILE_LIST_HEADER.pack(len(entries), len(table)))
+        f.write(table)
+    return path
@@ -0,0 +1,18 @@
+import os
+
+from PIL import Image
+
+from iconmanager import build_arg_parser, parse_lsx, run_build_command
+
+
+def test_build_creates_missing_output_folder(tmp_path):
+    png_folder = tmp_path / 'png'
+    png_folder.mkdir()
+    for idx in range(3):
+        Image.new('RGBA', (64, 64), (60 * idx, 100, 200, 255)).save(str(png_folder / f'Icon_{idx}.png'))
+    output = str(tmp_path / 'new_dir' / 'nested' / 'X.dds')
+    args = build_arg_parser().parse_args(['build', str(png_folder), '--output', output])
+    assert run_build_command(args) == 0
+    assert os.path.isfile(output)
+    _, _, icons, atlas_size, _ = parse_lsx(os.path.splitext(output)[0] + '.lsx')
+    assert atlas_size == 512 and len(icons) == 3
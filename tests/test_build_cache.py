@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from iconmanager import BuildCache, make_build_cache_server
+
+
+def artifact_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def cache_server(tmp_path):
+    servers = []
+
+    def start(read_only=False):
+        server = make_build_cache_server(str(tmp_path / 'store'), port=0, read_only=read_only)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_address[1]}'
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def put_artifact(url, key, data, digest):
+    request = urllib.request.Request(f'{url}/v1/artifacts/{key}', data=data, method='PUT')
+    request.add_header('Content-Type', 'application/octet-stream')
+    request.add_header('X-Artifact-SHA256', digest)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_remote_hit_fills_local_cache(tmp_path, cache_server):
+    url = cache_server()
+    data = b'encoded dds bytes' * 64
+    key = artifact_key(data)
+    BuildCache(str(tmp_path / 'a'), url).put(key, data)
+    teammate = BuildCache(str(tmp_path / 'b'), url)
+    assert teammate.get(key) == data
+    assert teammate.stats['remote_hits'] == 1
+    assert teammate.get(key) == data
+    assert teammate.stats['local_hits'] == 1
+
+
+def test_miss(tmp_path, cache_server):
+    cache = BuildCache(str(tmp_path / 'a'), cache_server())
+    assert cache.get('0' * 64) is None
+    assert cache.stats['misses'] == 1
+    assert cache.remote_ok
+
+
+def test_bad_digest_is_rejected(tmp_path, cache_server):
+    url = cache_server()
+    data = b'artifact'
+    key = artifact_key(data)
+    assert put_artifact(url, key, data, artifact_key(b'something else')) == 400
+    assert BuildCache(str(tmp_path / 'a'), url).get(key) is None
+    assert put_artifact(url, key, data, key) == 201
+    assert BuildCache(str(tmp_path / 'b'), url).get(key) == data
+
+
+def test_read_only_server_refuses_uploads(tmp_path, cache_server):
+    url = cache_server(read_only=True)
+    data = b'artifact'
+    key = artifact_key(data)
+    assert put_artifact(url, key, data, key) == 403
+    cache = BuildCache(str(tmp_path / 'a'), url)
+    cache.put(key, data)
+    assert cache.stats['uploads'] == 0
+    assert cache.get(key) == data
+    assert BuildCache(str(tmp_path / 'b'), url).get(key) is None
+
+
+def test_local_cache_evicts_least_recently_used(tmp_path):
+    cache = BuildCache(str(tmp_path / 'a'), max_bytes=1000)
+    keys = []
+    for i in range(5):
+        data = bytes([i]) * 300
+        keys.append(artifact_key(data))
+        cache.put(keys[-1], data)
+        os.utime(cache.path_for(keys[-1]), (i, i))
+        if i == 2:
+            os.utime(cache.path_for(keys[0]), (10, 10))
+    assert cache.local_bytes <= 1000
+    assert cache.stats['evictions'] >= 2
+    assert cache.get(keys[-1]) == bytes([4]) * 300
+    assert cache.get(keys[0]) == bytes([0]) * 300
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is None
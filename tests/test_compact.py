@@ -0,0 +1,49 @@
+import numpy as np
+from PIL import Image
+
+from iconmanager import compact_atlas_layout, create_new_atlas, find_icon_uv_node, get_grid_slot, minidom, set_icon_uv_slot
+
+TILE = 16
+GRID = 4
+SLOTS = {'Icon_0': (3, 3), 'Icon_1': (0, 2), 'Icon_2': (2, 1), 'Icon_3': (2, 1)}
+COLORS = {(3, 3): (220, 40, 40, 255), (0, 2): (40, 220, 40, 255), (2, 1): (40, 40, 220, 128)}
+
+
+def scattered_atlas(tmp_path):
+    png_folder = tmp_path / 'png'
+    png_folder.mkdir()
+    for idx, mapkey in enumerate(SLOTS):
+        Image.new('RGBA', (TILE, TILE), (idx, 0, 0, 255)).save(str(png_folder / f'{mapkey}.png'))
+    create_new_atlas(str(png_folder), str(tmp_path / 'Icons.dds'), GRID * TILE, TILE, GRID)
+    dom = minidom.parse(str(tmp_path / 'Icons.lsx'))
+    for mapkey, slot in SLOTS.items():
+        set_icon_uv_slot(find_icon_uv_node(dom, mapkey), slot, GRID)
+    arr = np.zeros((GRID * TILE, GRID * TILE, 4), dtype=np.uint8)
+    for (col, row), color in COLORS.items():
+        arr[row * TILE:(row + 1) * TILE, col * TILE:(col + 1) * TILE] = color
+        arr[row * TILE, col * TILE] = (col, row, 7, 255)
+    return Image.fromarray(arr, 'RGBA'), dom
+
+
+def tile_at(arr, slot):
+    col, row = slot
+    return arr[row * TILE:(row + 1) * TILE, col * TILE:(col + 1) * TILE]
+
+
+def test_compaction_keeps_uvs_on_their_pixels(tmp_path):
+    atlas_im, dom = scattered_atlas(tmp_path)
+    old = np.asarray(atlas_im)
+    result = compact_atlas_layout(atlas_im, dom, GRID * TILE, TILE, TILE)
+    assert result['atlas_size'] == 2 * TILE and result['slots'] == 3
+    assert result['atlas_im'].size == (2 * TILE, 2 * TILE)
+    new = np.asarray(result['atlas_im'])
+    icons = {icon['mapkey']: icon for icon in result['icons']}
+    for mapkey, slot in SLOTS.items():
+        attrs = {attr.getAttribute('id'): float(attr.getAttribute('value')) for attr in find_icon_uv_node(dom, mapkey).getElementsByTagName('attribute') if attr.getAttribute('id') != 'MapKey'}
+        assert attrs == {'U1': icons[mapkey]['u1'], 'V1': icons[mapkey]['v1'], 'U2': icons[mapkey]['u2'], 'V2': icons[mapkey]['v2']}
+        new_slot = get_grid_slot(attrs['U1'], attrs['V1'], 2)
+        assert np.array_equal(tile_at(new, new_slot), tile_at(old, slot))
+    assert icons['Icon_2']['u1'] == icons['Icon_3']['u1'] and icons['Icon_2']['v1'] == icons['Icon_3']['v1']
+    sizes = [attr.getAttribute('value') for attr in dom.getElementsByTagName('attribute') if attr.getAttribute('id') in ('Width', 'Height') and attr.parentNode.getAttribute('id') == 'TextureAtlasTextureSize']
+    assert sizes == [str(2 * TILE), str(2 * TILE)]
+    assert compact_atlas_layout(result['atlas_im'], dom, 2 * TILE, TILE, TILE) is None
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('PyQt6')
+
+from console_viewer_widget import ConsoleCapture, ConsoleFilterModel, ConsoleRecordModel
+
+
+def texts(model):
+    return [model.index(row, 0).data().split('  ', 1)[1] for row in range(model.rowCount())]
+
+
+def test_model_follows_the_ring_buffer():
+    capture = ConsoleCapture(capacity=5, install=False)
+    model = ConsoleRecordModel(capture)
+    capture.stdout.write('[INFO] line 0\n[INFO] line 1\n[INFO] line 2\n')
+    assert model.poll() == 3 and texts(model) == ['[INFO] line 0', '[INFO] line 1', '[INFO] line 2']
+    for idx in range(3, 15):
+        capture.stdout.write(f'[INFO] line {idx}\n')
+        model.poll()
+        assert texts(model) == [f'[INFO] line {n}' for n in range(max(0, idx - 4), idx + 1)]
+    assert len(model.records) - model.head == 5 and model.head < capture.capacity
+    capture.stdout.write(''.join(f'[INFO] burst {idx}\n' for idx in range(8)))
+    model.poll()
+    assert texts(model) == [f'[INFO] burst {n}' for n in range(3, 8)]
+    model.clear()
+    assert model.rowCount() == 0
+
+
+def test_filter_model_reads_through_the_offset():
+    capture = ConsoleCapture(capacity=4, install=False)
+    model = ConsoleRecordModel(capture)
+    proxy = ConsoleFilterModel()
+    proxy.setSourceModel(model)
+    for idx in range(6):
+        capture.stdout.write(f"[{'ERROR' if idx % 2 else 'INFO'}] [STAGE{idx % 3}] message {idx}\n")
+        model.poll()
+    proxy.set_filters(min_level='ERROR')
+    assert texts(proxy) == ['[ERROR] [STAGE0] message 3', '[ERROR] [STAGE2] message 5']
+    proxy.set_filters(min_level='DEBUG', needle='message 4')
+    assert texts(proxy) == ['[INFO] [STAGE1] message 4']
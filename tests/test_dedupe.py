@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from iconmanager import TileSlotIndex, create_new_atlas, decode_dds_image, get_grid_slot, load_tile_digests, minidom, parse_lsx, save_tile_digests, tile_digest, update_atlas, write_lsx
+
+RED = (220, 40, 40, 255)
+BLUE = (40, 40, 220, 255)
+GREEN = (40, 220, 40, 255)
+
+
+def digest(color, size=16):
+    return tile_digest(Image.new('RGBA', (size, size), color))
+
+
+def test_identical_tiles_share_a_slot():
+    index = TileSlotIndex(2)
+    first = index.assign('A', digest(RED))
+    second = index.assign('B', digest(RED))
+    assert first == {'slot': (0, 0), 'paste': True, 'freed': None, 'shared': False}
+    assert second == {'slot': (0, 0), 'paste': False, 'freed': None, 'shared': True}
+    assert index.shared_count() == 1
+
+
+def test_replacing_a_shared_icon_splits_it_off():
+    index = TileSlotIndex(2)
+    index.assign('A', digest(RED))
+    index.assign('B', digest(RED))
+    placement = index.assign('A', digest(BLUE))
+    assert placement == {'slot': (1, 0), 'paste': True, 'freed': None, 'shared': False}
+    assert index.slots == {'A': (1, 0), 'B': (0, 0)}
+    assert index.digests[(0, 0)] == digest(RED)
+
+
+def test_full_atlas_returns_none():
+    index = TileSlotIndex(2)
+    for idx, color in enumerate([RED, BLUE, GREEN, (1, 2, 3, 255)]):
+        assert index.assign(f'K{idx}', digest(color)) is not None
+    assert index.assign('K4', digest((9, 9, 9, 255))) is None
+    index.assign('K5', digest(RED))
+    assert index.slots['K5'] == (0, 0)
+
+
+def test_digest_sidecar_round_trip(tmp_path):
+    dds_path = str(tmp_path / 'Icons.dds')
+    with open(dds_path, 'wb') as f:
+        f.write(b'DDS ')
+    digests = {(0, 0): digest(RED), (1, 0): digest(BLUE)}
+    save_tile_digests(dds_path, 64, digests)
+    assert load_tile_digests(dds_path, 64) == digests
+    assert load_tile_digests(dds_path, 32) == {}
+    os.utime(dds_path, ns=(0, 0))
+    assert load_tile_digests(dds_path, 64) == {}
+
+
+def tile_color(atlas_im, icon, grid_size, tile_size):
+    col, row = get_grid_slot(icon['u1'], icon['v1'], grid_size)
+    tile = np.asarray(atlas_im.convert('RGBA'))[row * tile_size:(row + 1) * tile_size, col * tile_size:(col + 1) * tile_size]
+    return tuple(int(v) for v in tile.reshape(-1, 4).mean(axis=0).round())
+
+
+def test_update_splits_shared_slot_and_keeps_pixels(tmp_path):
+    png_folder = tmp_path / 'png'
+    png_folder.mkdir()
+    for name, color in (('Icon_a', RED), ('Icon_b', RED), ('Icon_c', GREEN)):
+        Image.new('RGBA', (64, 64), color).save(str(png_folder / f'{name}.png'))
+    dds_path = str(tmp_path / 'Icons.dds')
+    create_new_atlas(str(png_folder), dds_path, 256, 64, 4)
+    lsx_path = str(tmp_path / 'Icons.lsx')
+    dom = minidom.parse(lsx_path)
+    for attr in dom.getElementsByTagName('attribute'):
+        if attr.getAttribute('id') == 'Path':
+            attr.setAttribute('value', 'Icons.dds')
+    write_lsx(dom, lsx_path)
+    _, _, icons, _, _ = parse_lsx(lsx_path)
+    slots = {icon['mapkey']: get_grid_slot(icon['u1'], icon['v1'], 4) for icon in icons}
+    assert slots['Icon_a'] == slots['Icon_b'] != slots['Icon_c']
+    replacement = tmp_path / 'replace'
+    replacement.mkdir()
+    Image.new('RGBA', (64, 64), BLUE).save(str(replacement / 'Icon_a.png'))
+    update_atlas(lsx_path, str(replacement))
+    _, _, icons, _, _ = parse_lsx(lsx_path)
+    by_key = {icon['mapkey']: icon for icon in icons}
+    assert get_grid_slot(by_key['Icon_b']['u1'], by_key['Icon_b']['v1'], 4) == slots['Icon_b']
+    assert get_grid_slot(by_key['Icon_a']['u1'], by_key['Icon_a']['v1'], 4) not in slots.values()
+    atlas_im = decode_dds_image(dds_path)
+    colors = {key: tile_color(atlas_im, icon, 4, 64) for key, icon in by_key.items()}
+    for key, expected in (('Icon_a', BLUE), ('Icon_b', RED), ('Icon_c', GREEN)):
+        assert max(abs(a - b) for a, b in zip(colors[key], expected)) <= 8, (key, colors[key])
@@ -0,0 +1,53 @@
+import json
+import os
+
+from PIL import Image
+
+from iconmanager import build_arg_parser, create_new_atlas, run_diff_command
+
+RED = (220, 40, 40, 255)
+GREEN = (40, 220, 40, 255)
+BLUE = (40, 40, 220, 255)
+GOLD = (220, 180, 40, 255)
+GREY = (128, 128, 128, 255)
+
+
+def build(root, name, icons):
+    png_folder = os.path.join(root, name)
+    os.makedirs(png_folder)
+    for mapkey, color in icons.items():
+        Image.new('RGBA', (64, 64), color).save(os.path.join(png_folder, f'{mapkey}.png'))
+    dds_path = os.path.join(root, f'{name}.dds')
+    create_new_atlas(png_folder, dds_path, 256, 64, 4)
+    atlas_im = Image.new('RGBA', (256, 256), (0, 0, 0, 0))
+    for idx, mapkey in enumerate(sorted(icons)):
+        atlas_im.paste(Image.new('RGBA', (64, 64), icons[mapkey]), (idx * 64, 0))
+    atlas_im.save(dds_path, 'DDS', pixel_format='DXT5')
+    return os.path.join(root, f'{name}.lsx'), dds_path
+
+
+def test_diff_reports_added_removed_changed_and_moved(tmp_path):
+    root = str(tmp_path)
+    old_lsx, old_dds = build(root, 'old', {'Icon_a': RED, 'Icon_b': GREEN, 'Icon_c': BLUE, 'Icon_d': GOLD})
+    new_lsx, new_dds = build(root, 'new', {'Icon_a': RED, 'Icon_b': GREY, 'Icon_d': GOLD, 'Icon_e': BLUE})
+    report = os.path.join(root, 'diff.json')
+    sheet = os.path.join(root, 'diff.png')
+    args = build_arg_parser().parse_args(['diff', old_lsx, new_lsx, '--old-dds', old_dds, '--new-dds', new_dds, '--report', report, '--sheet', sheet, '--fail-on-change'])
+    assert run_diff_command(args) == 1
+    with open(report, 'r', encoding='utf-8') as f:
+        result = json.load(f)
+    assert result['added'] == ['Icon_e']
+    assert result['removed'] == ['Icon_c']
+    assert result['changed'] == ['Icon_b']
+    assert result['moved'] == [{'mapkey': 'Icon_d', 'from': [3, 0], 'to': [2, 0], 'changed': False}]
+    assert result['unchanged'] == 1
+    assert os.path.isfile(sheet)
+
+
+def test_identical_atlases_have_no_changes(tmp_path):
+    root = str(tmp_path)
+    icons = {'Icon_a': RED, 'Icon_b': GREEN}
+    old_lsx, old_dds = build(root, 'old', icons)
+    new_lsx, new_dds = build(root, 'new', icons)
+    args = build_arg_parser().parse_args(['diff', old_lsx, new_lsx, '--old-dds', old_dds, '--new-dds', new_dds, '--fail-on-change'])
+    assert run_diff_command(args) == 0
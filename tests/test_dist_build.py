@@ -0,0 +1,47 @@
+import os
+import re
+import subprocess
+import sys
+
+from PIL import Image
+
+ICONMANAGER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '_distro', 'iconmanager.py')
+UUID_RE = re.compile(b'value="[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"')
+
+
+def make_icons(folder, count=6, size=128):
+    os.makedirs(folder)
+    for i in range(count):
+        im = Image.new('RGBA', (size, size), (40 * i % 256, 90, 255 - 30 * i, 255))
+        for x in range(i, size, 7):
+            im.putpixel((x, (x * 3 + i) % size), (255, 255, 255, 0))
+        im.save(os.path.join(folder, f'Icon_{i:02d}.png'))
+
+
+def dist_build(tmp_path, workers):
+    out = tmp_path / f'out_{workers}'
+    proc = subprocess.run([sys.executable, ICONMANAGER, '--no-build-cache', 'dist-build', str(tmp_path / 'src'), '--output-dir', str(out), '--workers', str(workers), '--listen', '127.0.0.1:0', '--icons-per-atlas', '4', '--batch', '2'], cwd=tmp_path, capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    return out, proc.stdout
+
+
+def read_tree(root):
+    files = {}
+    for folder, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(folder, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            files[os.path.relpath(path, root)] = UUID_RE.sub(b'value="<uuid>"', data) if name.endswith('.lsx') else data
+    return files
+
+
+def test_multi_worker_build_matches_single_process(tmp_path):
+    make_icons(str(tmp_path / 'src'))
+    single, _ = dist_build(tmp_path, 1)
+    multi, log = dist_build(tmp_path, 2)
+    assert 'local-2' in log
+    single_files = read_tree(single)
+    assert any((name.endswith('.dds') for name in single_files))
+    assert any((name.endswith('.lsx') for name in single_files))
+    assert read_tree(multi) == single_files
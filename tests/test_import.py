@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+DISTRO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '_distro')
+PROBE = 'import json, sys\nimport iconmanager\nprint(json.dumps({"modules": sorted(sys.modules), "texconv_probed": iconmanager._texconv_resolved}))'
+
+
+def test_import_stays_lazy():
+    proc = subprocess.run([sys.executable, '-c', PROBE], cwd=DISTRO, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    loaded = set(result['modules'])
+    for module in ('PyQt6', 'numpy', 'PIL'):
+        assert module not in loaded
+    assert not result['texconv_probed']
+
+GUI_PROBE = 'import json, sys\nimport iconmanager, iconmanager_gui\niconmanager_gui.run_gui = lambda: 0\ntry:\n    iconmanager.main([])\nexcept SystemExit:\n    pass\ncapture = iconmanager.CONSOLE_CAPTURE\nsys.__stdout__.write(json.dumps({"installed": capture is not None and sys.stdout is capture.stdout, "captured": capture is not None and any("Console Capture Active" in r[4] for r in capture.snapshot())}) + "\\n")'
+
+
+def test_gui_startup_installs_console_capture(tmp_path):
+    pytest.importorskip('PyQt6')
+    env = dict(os.environ, PYTHONPATH=DISTRO)
+    proc = subprocess.run([sys.executable, '-c', GUI_PROBE], cwd=str(tmp_path), env=env, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    result = json.loads([line for line in proc.stdout.splitlines() if line.startswith('{')][-1])
+    assert result == {'installed': True, 'captured': True}
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from iconmanager import EditJournal, append_icon_uv, compact_atlas_layout, create_new_atlas, find_icon_uv_node, minidom, set_icon_uv_slot
+
+TILE = 64
+GRID = 4
+
+
+@pytest.fixture
+def atlas(tmp_path):
+    png_folder = tmp_path / 'png'
+    png_folder.mkdir()
+    for idx in range(3):
+        Image.new('RGBA', (TILE, TILE), (60 * idx, 200 - 50 * idx, 90, 255)).save(str(png_folder / f'Icon_{idx}.png'))
+    dds_path = str(tmp_path / 'Icons.dds')
+    create_new_atlas(str(png_folder), dds_path, GRID * TILE, TILE, GRID)
+    dom = minidom.parse(str(tmp_path / 'Icons.lsx'))
+    arr = np.zeros((GRID * TILE, GRID * TILE, 4), dtype=np.uint8)
+    for idx in range(3):
+        arr[:TILE, idx * TILE:(idx + 1) * TILE] = (60 * idx, 200 - 50 * idx, 90, 255)
+    return Image.fromarray(arr, 'RGBA'), dom
+
+
+def snapshot(atlas_im, dom):
+    return (atlas_im.size, atlas_im.tobytes(), dom.toxml())
+
+
+def check_undo_redo(journal, before, after, atlas_im, dom):
+    assert not journal.is_clean()
+    edit, atlas_im, _ = journal.undo(atlas_im)
+    assert edit is not None and snapshot(atlas_im, dom) == before
+    assert journal.is_clean()
+    edit, atlas_im, _ = journal.redo(atlas_im)
+    assert edit is not None and snapshot(atlas_im, dom) == after
+    assert not journal.is_clean()
+    journal.mark_clean()
+    edit, atlas_im, _ = journal.undo(atlas_im)
+    assert snapshot(atlas_im, dom) == before and not journal.is_clean()
+    return atlas_im
+
+
+def test_add_undo_redo(atlas):
+    atlas_im, dom = atlas
+    journal = EditJournal()
+    journal.mark_clean()
+    before = snapshot(atlas_im, dom)
+    box = (3 * TILE, 0, 4 * TILE, TILE)
+    journal.begin("add 'Icon_new'")
+    journal.capture_tile(atlas_im, box)
+    atlas_im.paste(Image.new('RGBA', (TILE, TILE), (250, 250, 0, 255)), box[:2])
+    node = append_icon_uv(dom, 'Icon_new', 0.75, 0.0, 1.0, 0.25)
+    journal.record_insert(node.parentNode, node)
+    journal.commit(atlas_im)
+    after = snapshot(atlas_im, dom)
+    check_undo_redo(journal, before, after, atlas_im, dom)
+    assert find_icon_uv_node(dom, 'Icon_new') is None
+
+
+def test_replace_undo_redo(atlas):
+    atlas_im, dom = atlas
+    journal = EditJournal()
+    journal.mark_clean()
+    before = snapshot(atlas_im, dom)
+    node = find_icon_uv_node(dom, 'Icon_1')
+    journal.begin("replace 'Icon_1'")
+    for box in ((TILE, 0, 2 * TILE, TILE), (0, TILE, TILE, 2 * TILE)):
+        journal.capture_tile(atlas_im, box)
+    atlas_im.paste((0, 0, 0, 0), (TILE, 0, 2 * TILE, TILE))
+    atlas_im.paste(Image.new('RGBA', (TILE, TILE), (0, 0, 250, 255)), (0, TILE))
+    journal.capture_attributes([attr for attr in node.getElementsByTagName('attribute') if attr.getAttribute('id') in ('U1', 'U2', 'V1', 'V2')])
+    set_icon_uv_slot(node, (0, 1), GRID)
+    journal.commit(atlas_im)
+    after = snapshot(atlas_im, dom)
+    check_undo_redo(journal, before, after, atlas_im, dom)
+
+
+def test_compact_undo_redo(atlas):
+    atlas_im, dom = atlas
+    journal = EditJournal()
+    journal.mark_clean()
+    before = snapshot(atlas_im, dom)
+    journal.begin('compact atlas')
+    journal.capture_image(atlas_im, {'atlas_size': GRID * TILE})
+    journal.capture_attributes([attr for attr in dom.getElementsByTagName('attribute') if attr.getAttribute('id') in ('U1', 'U2', 'V1', 'V2', 'Width', 'Height')])
+    result = compact_atlas_layout(atlas_im, dom, GRID * TILE, TILE, TILE)
+    journal.commit(result['atlas_im'], {'atlas_size': result['atlas_size']})
+    atlas_im = result['atlas_im']
+    after = snapshot(atlas_im, dom)
+    assert atlas_im.size == (2 * TILE, 2 * TILE)
+    atlas_im = check_undo_redo(journal, before, after, atlas_im, dom)
+    edit, atlas_im, state = journal.redo(atlas_im)
+    assert state == {'atlas_size': 2 * TILE}
+    edit, atlas_im, state = journal.undo(atlas_im)
+    assert state == {'atlas_size': GRID * TILE}
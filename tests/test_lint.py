@@ -0,0 +1,32 @@
+import os
+
+from PIL import Image
+
+from iconmanager import EXPORT_ORDER_ITEMS, find_icon_tier_paths, get_export_profile, lint_tier_header, read_dds_header
+
+
+def write_tier(root, folder, mapkey, size):
+    path = os.path.join(root, *folder.split('\\'), f'{mapkey}.dds')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGBA', (size, size), (200, 40, 40, 255)).save(path, 'DDS', pixel_format='DXT5')
+    return path
+
+
+def test_pillow_fallback_tiers_are_warnings(tmp_path):
+    tier = get_export_profile('items')['tiers'][0]
+    header = read_dds_header(write_tier(str(tmp_path), tier['folder'], 'Icon', tier['size']))
+    assert header['format'] == 'BC3_UNORM' and header['mipmaps'] == 1
+    assert lint_tier_header(header, tier)[0] == 'format'
+    assert lint_tier_header(header, tier, fallback=True)[0] == 'fallback'
+    assert lint_tier_header(header, dict(tier, size=tier['size'] * 2), fallback=True)[0] == 'size'
+
+
+def test_find_icon_tier_paths_uses_tier_listing(tmp_path):
+    root = str(tmp_path)
+    atlas_path = os.path.join(root, 'Icons.lsx')
+    expected = {tier['size']: write_tier(root, tier['folder'], 'Icon_A', tier['size']) for tier in EXPORT_ORDER_ITEMS[:2]}
+    assert find_icon_tier_paths('Icon_A', 'standalone', None, None, atlas_path) == dict(expected, icon_type='item')
+    assert find_icon_tier_paths('icon_b', 'standalone', None, None, atlas_path) == {'icon_type': 'item'}
+    tier = EXPORT_ORDER_ITEMS[3]
+    later = write_tier(root, tier['folder'], 'Icon_A', tier['size'])
+    assert find_icon_tier_paths('Icon_A', 'standalone', None, None, atlas_path)[tier['size']] == later
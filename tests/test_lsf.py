@@ -0,0 +1,69 @@
+import os
+
+import pytest
+from PIL import Image
+
+import lsf
+import lspk
+from iconmanager import compact_atlas, convert_atlas_resource, create_new_atlas, minidom, parse_lsx, update_atlas, write_lsx
+
+COLORS = [(220, 40, 40, 255), (40, 220, 40, 255), (40, 40, 220, 255)]
+
+
+def make_atlas(root):
+    png_folder = os.path.join(root, 'png')
+    os.makedirs(png_folder)
+    for idx, color in enumerate(COLORS):
+        Image.new('RGBA', (64, 64), color).save(os.path.join(png_folder, f'Icon_{idx}.png'))
+    dds_path = os.path.join(root, 'Icons.dds')
+    create_new_atlas(png_folder, dds_path, 256, 64, 4)
+    lsx_path = os.path.join(root, 'Icons.lsx')
+    dom = minidom.parse(lsx_path)
+    for attr in dom.getElementsByTagName('attribute'):
+        if attr.getAttribute('id') == 'Path':
+            attr.setAttribute('value', 'Icons.dds')
+    write_lsx(dom, lsx_path)
+    return png_folder, lsx_path
+
+
+def mapkey_uvs(dom):
+    icons = {}
+    for node in dom.getElementsByTagName('node'):
+        if node.getAttribute('id') == 'IconUV':
+            attrs = {attr.getAttribute('id'): attr.getAttribute('value') for attr in node.getElementsByTagName('attribute')}
+            icons[attrs['MapKey']] = tuple(float(attrs[aid]) for aid in ('U1', 'V1', 'U2', 'V2'))
+    return icons
+
+
+@pytest.mark.parametrize('compression', [lspk.COMPRESSION_NONE, lspk.COMPRESSION_ZLIB])
+def test_round_trip_real_atlas(tmp_path, compression):
+    _, lsx_path = make_atlas(str(tmp_path))
+    resource = lsf.resource_from_dom(minidom.parse(lsx_path))
+    lsf_path = str(tmp_path / 'Icons.lsf')
+    lsf.write_lsf(resource, lsf_path, compression=compression)
+    back = lsf.read_lsf(lsf_path)
+    assert back == resource
+    assert mapkey_uvs(lsf.resource_to_dom(back)) == mapkey_uvs(minidom.parse(lsx_path))
+
+
+def test_compact_keeps_lsf(tmp_path):
+    _, lsx_path = make_atlas(str(tmp_path))
+    lsf_path = str(tmp_path / 'Icons.lsf')
+    convert_atlas_resource(lsx_path, lsf_path)
+    os.remove(lsx_path)
+    result = compact_atlas(lsf_path, min_size=64)
+    assert result['changed'] and result['atlas_size'] == 128
+    dom, _, icons, atlas_size, _ = parse_lsx(lsf_path)
+    assert atlas_size == 128 and len(icons) == len(COLORS)
+    assert not [name for name in os.listdir(str(tmp_path)) if '.compact.' in name]
+
+
+def test_update_keeps_lsf(tmp_path):
+    png_folder, lsx_path = make_atlas(str(tmp_path))
+    lsf_path = str(tmp_path / 'Icons.lsf')
+    convert_atlas_resource(lsx_path, lsf_path)
+    os.remove(lsx_path)
+    Image.new('RGBA', (64, 64), (200, 200, 40, 255)).save(os.path.join(png_folder, 'Icon_new.png'))
+    result = update_atlas(lsf_path, png_folder, png_files=['Icon_new.png'], add_missing=True)
+    assert result['added'] == ['Icon_new'] and result['lsx_path'] == lsf_path
+    assert 'Icon_new' in mapkey_uvs(lsf.resource_to_dom(lsf.read_lsf(lsf_path)))
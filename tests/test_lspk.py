@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+import lspk
+from iconmanager import extract_pak_entry
+
+FILES = {'Public/MyMod/GUI/Icons_Items.lsx': b'<?xml version="1.0"?><save/>' * 40, 'Public/MyMod/Assets/Textures/Icons/Icons_Items.dds': bytes(range(256)) * 64, 'Mods/MyMod/meta.lsx': b'meta', 'Public/MyMod/empty.txt': b''}
+
+
+@pytest.mark.parametrize('compression', [lspk.COMPRESSION_NONE, lspk.COMPRESSION_ZLIB, lspk.COMPRESSION_LZ4])
+def test_round_trip(tmp_path, compression):
+    path = lspk.write_pak(str(tmp_path / 'Test.pak'), FILES, compression=compression)
+    with lspk.PakReader(path) as reader:
+        assert len(reader) == len(FILES)
+        assert reader.names() == sorted(FILES)
+        for name, payload in FILES.items():
+            assert reader.read(name) == payload
+            entry = reader.find(name)
+            assert entry['compression'] == (compression if payload else lspk.COMPRESSION_NONE)
+        assert reader.read('public\\mymod\\gui\\icons_items.lsx') == FILES['Public/MyMod/GUI/Icons_Items.lsx']
+        assert reader.names('public/mymod/gui/*.lsx') == ['Public/MyMod/GUI/Icons_Items.lsx']
+
+
+def test_lz4_block_with_matches():
+    block = bytes([0x44]) + b'abcd' + bytes([4, 0]) + bytes([0x50]) + b'efghi'
+    assert lspk.lz4_block_decompress(block, 17) == b'abcdabcdabcdefghi'
+    with pytest.raises(lspk.PakError):
+        lspk.lz4_block_decompress(block, 16)
+
+
+def test_higher_priority_pak_wins(tmp_path):
+    base = lspk.write_pak(str(tmp_path / 'Base.pak'), {'a.txt': b'base', 'b.txt': b'only base'}, compression=lspk.COMPRESSION_ZLIB)
+    patch = lspk.write_pak(str(tmp_path / 'Patch.pak'), {'a.txt': b'patched'}, compression=lspk.COMPRESSION_LZ4, priority=30)
+    with lspk.PakSet([base, patch]) as paks:
+        assert paks.read('a.txt') == b'patched'
+        assert paks.read('b.txt') == b'only base'
+        assert paks.names() == ['a.txt', 'b.txt']
+
+
+def test_extract_pak_entry(tmp_path):
+    path = lspk.write_pak(str(tmp_path / 'Test.pak'), FILES, compression=lspk.COMPRESSION_LZ4)
+    with lspk.PakSet([path]) as paks:
+        dest_path = extract_pak_entry(paks, 'Public/MyMod/GUI/Icons_Items.lsx', str(tmp_path / 'out'))
+    assert dest_path == os.path.realpath(tmp_path / 'out' / 'Public' / 'MyMod' / 'GUI' / 'Icons_Items.lsx')
+    with open(dest_path, 'rb') as f:
+        assert f.read() == FILES['Public/MyMod/GUI/Icons_Items.lsx']
+
+
+@pytest.mark.parametrize('name', ['../evil.txt', 'Public/../../evil.txt', 'Public\\..\\..\\evil.txt', '/etc/evil.txt', 'C:/Windows/evil.txt'])
+def test_extract_refuses_names_outside_dest(tmp_path, name):
+    path = lspk.write_pak(str(tmp_path / 'Evil.pak'), {name: b'payload'}, compression=lspk.COMPRESSION_ZLIB)
+    with lspk.PakSet([path]) as paks:
+        with pytest.raises(lspk.PakError):
+            extract_pak_entry(paks, name, str(tmp_path / 'out' / 'cache'))
+    assert not (tmp_path / 'evil.txt').exists()
+    assert not (tmp_path / 'out' / 'evil.txt').exists()
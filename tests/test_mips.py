@@ -0,0 +1,30 @@
+import numpy as np
+from PIL import Image
+
+from iconmanager import build_mip_chain
+
+
+def circle_atlas(size=256, tile=64, radius=24):
+    yy, xx = np.mgrid[0:tile, 0:tile]
+    alpha = ((yy - tile / 2 + 0.5) ** 2 + (xx - tile / 2 + 0.5) ** 2 < radius ** 2) * 255
+    arr = np.zeros((size, size, 4), dtype=np.uint8)
+    arr[..., 0] = 200
+    arr[..., 1] = np.arange(size, dtype=np.uint8)[None, :]
+    arr[..., 3] = np.tile(alpha, (size // tile, size // tile))
+    return Image.fromarray(arr, 'RGBA')
+
+
+def test_chain_halves_down_to_the_minimum_tile():
+    levels = build_mip_chain(circle_atlas(), 64)
+    assert [level.size for level in levels] == [(256, 256), (128, 128), (64, 64), (32, 32), (16, 16)]
+
+
+def test_chain_keeps_alpha_coverage_and_fills_transparent_colour():
+    levels = build_mip_chain(circle_atlas(), 64)
+    base = np.asarray(levels[0])
+    coverage = (base[..., 3] >= 128).mean()
+    for level in levels[1:]:
+        arr = np.asarray(level)
+        texels = (arr.shape[0] // 4) * (arr.shape[1] // 4)
+        assert abs((arr[..., 3] >= 128).mean() - coverage) <= max(0.01, 4.0 / texels)
+    assert (base[base[..., 3] == 0][:, 0] == 200).all()
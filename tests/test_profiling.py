@@ -0,0 +1,17 @@
+import glob
+import os
+
+from iconmanager import IconService, configure_profiling
+
+
+def test_service_profiles_each_call(tmp_path):
+    configure_profiling(True, str(tmp_path))
+    service = IconService(workers=1)
+    try:
+        service.call('ping', {})
+        service.call('cache.stats', {})
+    finally:
+        service.close()
+        configure_profiling(False)
+    names = sorted(os.path.basename(path).split('.', 1)[1].split('_', 1)[1] for path in glob.glob(os.path.join(str(tmp_path), '*.pstats')))
+    assert names == ['serve_cache.stats.pstats', 'serve_ping.pstats']
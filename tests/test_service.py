@@ -0,0 +1,64 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from iconmanager import IconService, ServiceClient, ServiceError, make_service_server
+
+
+@pytest.fixture
+def service_server():
+    servers = []
+
+    def start(token=None):
+        service = IconService(workers=1)
+        server = make_service_server(service, port=0, token=token)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append((service, server))
+        return f'http://127.0.0.1:{server.server_address[1]}'
+    yield start
+    for service, server in servers:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def post(url, body, headers):
+    request = urllib.request.Request(f'{url}/rpc', data=body, headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+def test_rpc_round_trip(service_server):
+    url = service_server()
+    client = ServiceClient(url, timeout=5)
+    assert client.call('ping')['calls'] == 1
+    assert client.call('cache.stats')['atlases'] == []
+    with pytest.raises(ServiceError) as excinfo:
+        client.call('no.such.method')
+    assert excinfo.value.code == -32601
+    status, reply = post(url, json.dumps({'jsonrpc': '2.0', 'id': 'x', 'method': 'ping'}).encode('utf-8'), {'Content-Type': 'application/json; charset=utf-8'})
+    assert status == 200 and reply['id'] == 'x' and reply['result']['calls'] == 4
+
+
+def test_cross_origin_and_non_json_requests_are_rejected(service_server):
+    url = service_server()
+    body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'ping'}).encode('utf-8')
+    assert post(url, body, {'Content-Type': 'application/json', 'Origin': 'http://evil.example'})[0] == 403
+    assert post(url, body, {'Content-Type': 'application/json', 'Host': 'evil.example'})[0] == 403
+    assert post(url, body, {'Content-Type': 'text/plain'})[0] == 415
+    assert post(url, body, {'Content-Type': 'application/x-www-form-urlencoded'})[0] == 415
+    assert post(url, body, {'Content-Type': 'application/json', 'Origin': 'http://localhost:3000'})[0] == 200
+
+
+def test_token_is_required_when_set(service_server):
+    url = service_server(token='s3cret')
+    body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'ping'}).encode('utf-8')
+    assert post(url, body, {'Content-Type': 'application/json'})[0] == 401
+    assert post(url, body, {'Content-Type': 'application/json', 'Authorization': 'Bearer wrong'})[0] == 401
+    assert ServiceClient(url, token='s3cret', timeout=5).call('ping')['calls'] == 1